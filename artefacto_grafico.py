@@ -0,0 +1,61 @@
+# artefacto_grafico.py
+import base64
+import json
+from dataclasses import asdict, dataclass, field
+from functools import cached_property
+from typing import List
+
+# Tipos de gráfico
+TIPO_BARRAS = "barras"
+TIPO_LINEAS = "lineas"
+
+@dataclass
+class GraficoGenerado:
+    """
+    Gráfico ya dibujado: la imagen PNG y los datos con los que se dibujó.
+
+    La pantalla muestra el PNG y el PDF vuelve a trazar los datos como un dibujo
+    vectorial de reportlab, así el PDF no recibe una imagen reescalada ni hay que
+    decodificar nada. El PNG se guarda en bytes; el texto base64 que pide Flet se
+    arma una sola vez, la primera vez que se muestra.
+    """
+    tipo: str
+    titulo: str
+    etiqueta_x: str
+    etiqueta_y: str
+    color: str
+    etiquetas: List[str] = field(default_factory=list)
+    valores: List[float] = field(default_factory=list)
+    png: bytes = field(default=b"", repr=False)
+
+    @cached_property
+    def png_base64(self) -> str:
+        """
+        La imagen PNG en base64, para 'ft.Image(src_base64=...)'.
+        """
+        return base64.b64encode(self.png).decode()
+
+    def datos_json(self) -> str:
+        """
+        Serializa todo menos la imagen (se guarda aparte como PNG en la caché en disco).
+
+        Returns:
+            str: Los datos del gráfico en JSON.
+        """
+        datos = asdict(self)
+        del datos["png"]
+        return json.dumps(datos, ensure_ascii=False)
+
+    @classmethod
+    def desde_json(cls, texto: str, png: bytes) -> "GraficoGenerado":
+        """
+        Reconstruye un gráfico a partir de sus datos en JSON y su imagen.
+
+        Args:
+            texto (str): Datos generados por 'datos_json'.
+            png (bytes): Imagen PNG.
+
+        Returns:
+            GraficoGenerado: El gráfico.
+        """
+        return cls(png=png, **json.loads(texto))
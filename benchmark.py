@@ -0,0 +1,492 @@
+# benchmark.py
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, fields
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Mide el rendimiento de la aplicación con datos a escala de producción, sin interfaz:
+#
+#     python benchmark.py [--productos N] [--anios N] [--ventas-por-dia N] ... [--salida benchmark.json]
+#
+# La primera vez llena DIRECTORIO_BENCHMARK/inventario.db con datos_sinteticos.py y guarda una
+# copia (ARCHIVO_BASE); las siguientes ejecuciones parten de esa copia, así cada medición
+# empieza con los mismos datos aunque los escenarios registren ventas y devoluciones
+# ('--regenerar' vuelve a generarla). Cada escenario se ejecuta una vez en frío y
+# 'repeticiones' veces más; el resultado (tiempos, versiones y commit) se guarda en JSON
+# para comparar entre commits con '--comparar anterior.json'.
+
+DIRECTORIO_BENCHMARK = "benchmark_datos"
+ARCHIVO_BASE = "inventario_base.db"
+ARCHIVO_VOLUMENES = "volumenes.json"
+DIRECTORIO_SALIDAS = "salidas"  # Archivos CSV y PDF que generan los escenarios de exportación
+ARCHIVO_RESULTADOS = "benchmark.json"
+VERSION_RESULTADOS = 1
+REPETICIONES = 5
+DIAS_PERIODO = 365  # Días, hasta la última venta, que abarcan los reportes, gráficos y exportaciones
+LINEAS_CARRITO = (1, 10, 50)  # Líneas de los carritos de los escenarios de venta
+UMBRAL_CAMBIO = 10.0  # Porcentaje a partir del cual '--comparar' marca un escenario como más lento o más rápido
+
+# Categorías de los escenarios
+CATEGORIA_VENTA = "venta"
+CATEGORIA_REPORTE = "reporte"
+CATEGORIA_GRAFICO = "grafico"
+CATEGORIA_EXPORTACION = "exportacion"
+CATEGORIA_DEVOLUCION = "devolucion"
+
+@dataclass
+class Escenario:
+    """
+    Operación que se mide.
+
+    Attributes:
+        nombre (str): Nombre único del escenario (la clave para comparar resultados).
+        categoria (str): Categoría (CATEGORIA_*).
+        ejecutar (Callable[[], Any]): Función que hace la operación completa.
+    """
+    nombre: str
+    categoria: str
+    ejecutar: Callable[[], Any]
+
+@dataclass
+class ContextoBenchmark:
+    """
+    Datos que comparten los escenarios.
+
+    Attributes:
+        desde (str): Fecha de inicio del período de los reportes y gráficos.
+        hasta (str): Fecha de fin del período (el último día con ventas).
+        productos (List[Tuple[int, str, float]]): (id, nombre, precio) de cada producto.
+        cliente_ids (List[int]): IDs de los clientes.
+        azar (random.Random): Números aleatorios de los escenarios que eligen datos.
+    """
+    desde: str
+    hasta: str
+    productos: List[Tuple[int, str, float]]
+    cliente_ids: List[int]
+    azar: random.Random
+
+    def carrito(self, lineas: int) -> List[Tuple[int, str, int, float]]:
+        """
+        Arma un carrito con productos distintos, como el de la pantalla de ventas.
+        """
+        return [(producto_id, nombre, self.azar.randint(1, 3), precio)
+                for producto_id, nombre, precio in self.azar.sample(self.productos, min(lineas, len(self.productos)))]
+
+def _copiar_base(origen: str, destino: str):
+    """
+    Copia una base de datos SQLite con la API de copias de seguridad (incluye lo pendiente en el WAL).
+    """
+    with sqlite3.connect(origen) as fuente, sqlite3.connect(destino) as copia:
+        fuente.backup(copia)
+    fuente.close()
+    copia.close()
+
+def _borrar_base(ruta: str):
+    for archivo in (ruta, f"{ruta}-wal", f"{ruta}-shm"):
+        if os.path.exists(archivo):
+            os.remove(archivo)
+
+def preparar_datos(volumenes, regenerar: bool = False) -> Dict[str, Any]:
+    """
+    Deja inventario.db (en el directorio actual) con los datos sintéticos: los genera si no
+    hay una copia base o si se pide regenerarlos, y si no copia la base guardada.
+
+    Args:
+        volumenes (VolumenesSinteticos): Cantidades a generar.
+        regenerar (bool): Si es True se generan aunque exista la copia base. Por defecto es False.
+
+    Returns:
+        Dict[str, Any]: Volúmenes de la copia base y segundos de la generación (None si no se generó).
+    """
+    from database import DB_PATH, close_all_connections
+    from datos_sinteticos import generar_datos
+
+    close_all_connections()
+    if regenerar or not os.path.exists(ARCHIVO_BASE):
+        _borrar_base(ARCHIVO_BASE)
+        _borrar_base(DB_PATH)
+
+        def informar(hechos: int, total: Optional[int]):
+            if hechos == total or hechos % 30 == 0:
+                print(f"\rGenerando datos: día {hechos} de {total}", end="", flush=True)
+
+        inicio = time.perf_counter()
+        generar_datos(volumenes, progreso=informar)
+        segundos = time.perf_counter() - inicio
+        print()
+        close_all_connections()
+        _copiar_base(DB_PATH, ARCHIVO_BASE)
+        with open(ARCHIVO_VOLUMENES, "w", encoding="utf-8") as archivo:
+            json.dump(asdict(volumenes), archivo, indent=2)
+        return {"volumenes": asdict(volumenes), "generacion_segundos": round(segundos, 3)}
+
+    _borrar_base(DB_PATH)
+    _copiar_base(ARCHIVO_BASE, DB_PATH)
+    try:
+        with open(ARCHIVO_VOLUMENES, encoding="utf-8") as archivo:
+            guardados = json.load(archivo)
+    except (OSError, ValueError):
+        guardados = None
+    return {"volumenes": guardados, "generacion_segundos": None}
+
+def crear_contexto(dias: int, semilla: int) -> ContextoBenchmark:
+    """
+    Lee de la base los datos que usan los escenarios.
+
+    Args:
+        dias (int): Días del período de los reportes y gráficos.
+        semilla (int): Semilla de los números aleatorios.
+
+    Returns:
+        ContextoBenchmark: El contexto.
+
+    Raises:
+        ValueError: Si la base no tiene ventas.
+    """
+    from database import create_connection
+
+    with create_connection() as conn:
+        ultima = conn.execute("SELECT MAX(fecha) FROM Facturas").fetchone()[0]
+        productos = conn.execute("SELECT id, nombre, precio FROM Productos ORDER BY id").fetchall()
+        cliente_ids = [fila[0] for fila in conn.execute("SELECT id FROM Clientes ORDER BY id")]
+    if ultima is None or not productos or not cliente_ids:
+        raise ValueError("La base de datos no tiene ventas; genere los datos sintéticos.")
+    hasta = date.fromisoformat(ultima)
+    desde = hasta - timedelta(days=dias - 1)
+    return ContextoBenchmark(desde.isoformat(), hasta.isoformat(), productos, cliente_ids, random.Random(semilla))
+
+def _abrir_reporte(datos) -> int:
+    """
+    Lee y formatea la primera ventana de un reporte, como la lista paginada al abrirlo.
+    """
+    from datos_reporte import TAMANO_VENTANA
+
+    filas = datos.obtener(0, TAMANO_VENTANA + 1)
+    for fila in filas:
+        datos.formatear(fila)
+    return len(filas)
+
+def escenarios_venta(contexto: ContextoBenchmark, lineas: Sequence[int]) -> List[Escenario]:
+    """
+    Registro de una venta y PDF de su factura, con carritos de distintos tamaños.
+    """
+    from models import Factura
+    from exportacion import exportar_factura_pdf
+
+    def vender(cantidad: int):
+        return Factura.registrar_venta(contexto.azar.choice(contexto.cliente_ids), contexto.hasta,
+                                       contexto.carrito(cantidad), 0, 0.16)
+
+    def factura_pdf(cantidad: int):
+        ruta = os.path.join(DIRECTORIO_SALIDAS, f"factura_{cantidad}_lineas.pdf")
+        return exportar_factura_pdf(ruta, "BENCHMARK", contexto.hasta,
+                                    ("Cliente de prueba", "0412-0000000", "cliente@ejemplo.com"),
+                                    contexto.carrito(cantidad), 5, 0.16)
+
+    escenarios = []
+    for cantidad in lineas:
+        escenarios.append(Escenario(f"venta_{cantidad}_lineas", CATEGORIA_VENTA, lambda c=cantidad: vender(c)))
+        escenarios.append(Escenario(f"factura_pdf_{cantidad}_lineas", CATEGORIA_VENTA, lambda c=cantidad: factura_pdf(c)))
+    return escenarios
+
+def escenarios_reporte(contexto: ContextoBenchmark) -> List[Escenario]:
+    """
+    Apertura de cada reporte (reporte_*.py) con los mismos parámetros que la pantalla de reportes.
+    """
+    from reporte_productos import datos_productos
+    from reporte_clientes import datos_clientes
+    from reporte_proveedores import datos_proveedores
+    from reporte_ventas import datos_ventas
+    from reporte_compras import datos_compras
+    from reporte_devoluciones import datos_devoluciones
+    from calculo_balance import AGRUPACION_MES, AGRUPACION_PRODUCTO, calcular_balance, datos_balance, totalizar
+
+    desde, hasta = contexto.desde, contexto.hasta
+
+    def balance(agrupacion: Optional[str]):
+        filas = calcular_balance(desde, hasta, agrupacion=agrupacion)
+        totalizar(filas)
+        return _abrir_reporte(datos_balance(filas))
+
+    return [
+        Escenario("reporte_productos", CATEGORIA_REPORTE, lambda: _abrir_reporte(datos_productos())),
+        Escenario("reporte_clientes", CATEGORIA_REPORTE, lambda: _abrir_reporte(datos_clientes())),
+        Escenario("reporte_proveedores", CATEGORIA_REPORTE, lambda: _abrir_reporte(datos_proveedores())),
+        Escenario("reporte_ventas", CATEGORIA_REPORTE, lambda: _abrir_reporte(datos_ventas(desde, hasta))),
+        Escenario("reporte_compras", CATEGORIA_REPORTE, lambda: _abrir_reporte(datos_compras(desde, hasta))),
+        Escenario("reporte_devoluciones", CATEGORIA_REPORTE, lambda: _abrir_reporte(datos_devoluciones(desde, hasta))),
+        Escenario("reporte_balance", CATEGORIA_REPORTE, lambda: balance(None)),
+        Escenario("reporte_balance_por_mes", CATEGORIA_REPORTE, lambda: balance(AGRUPACION_MES)),
+        Escenario("reporte_balance_por_producto", CATEGORIA_REPORTE, lambda: balance(AGRUPACION_PRODUCTO)),
+    ]
+
+def escenarios_grafico(contexto: ContextoBenchmark) -> List[Escenario]:
+    """
+    Consulta y dibujo de cada gráfico del menú de gráficos (graficos.py), sin la caché de gráficos.
+    """
+    import graficos_ventas
+    import graficos_clientes
+    import graf_ventas_diarias
+    import graf_dev_clientes
+    import graf_dev_productos
+    import graf_comp_provee
+    import graf_comp_producto
+    from dibujo_graficos import dibujar_grafico_barras, dibujar_grafico_lineas, dibujar_serie
+    from graf_tablero import GraficoTableroApp
+    from tablero import GRAFICOS_TABLERO, agregar_tablero
+
+    desde, hasta = contexto.desde, contexto.hasta
+    periodo = f"({desde} - {hasta})"
+
+    def barras(query: str, titulo: str, etiqueta_x: str, etiqueta_y: str, color: str):
+        return lambda: dibujar_grafico_barras(query, (desde, hasta), f"{titulo} {periodo}", etiqueta_x, etiqueta_y, color)
+
+    def devoluciones_o_compras(query: str, titulo: str, color: str):
+        # Mismos argumentos que BaseApp.generar_grafico_devoluciones
+        return barras(query, titulo, 'Nombres', 'Total Devoluciones ($)', color)
+
+    def tablero():
+        series = agregar_tablero(desde, hasta, [grafico.titulo for grafico in GRAFICOS_TABLERO])
+        for grafico in GRAFICOS_TABLERO:
+            dibujar_serie(*GraficoTableroApp.argumentos_grafico(grafico, desde, hasta), *series[grafico.titulo])
+
+    return [
+        Escenario("grafico_ventas_acumuladas_productos", CATEGORIA_GRAFICO,
+                  barras(graficos_ventas.QUERY_VENTAS_ACUMULADAS, graficos_ventas.TITULO_VENTAS_ACUMULADAS,
+                         'Productos', 'Ventas Acumuladas ($)', 'blue')),
+        Escenario("grafico_ventas_acumuladas_clientes", CATEGORIA_GRAFICO,
+                  barras(graficos_clientes.QUERY_VENTAS_ACUMULADAS, graficos_clientes.TITULO_VENTAS_ACUMULADAS,
+                         'Clientes', 'Ventas Acumuladas ($)', 'blue')),
+        Escenario("grafico_ventas_diarias", CATEGORIA_GRAFICO,
+                  lambda: dibujar_grafico_lineas(graf_ventas_diarias.QUERY_VENTAS_DIARIAS, (desde, hasta),
+                                                 f"Ventas Diarias {periodo}", 'Fecha', 'Ventas Totales ($)')),
+        Escenario("grafico_devoluciones_clientes", CATEGORIA_GRAFICO,
+                  devoluciones_o_compras(graf_dev_clientes.QUERY_DEVOLUCIONES_CLIENTES,
+                                         graf_dev_clientes.TITULO_DEVOLUCIONES_CLIENTES, 'red')),
+        Escenario("grafico_devoluciones_productos", CATEGORIA_GRAFICO,
+                  devoluciones_o_compras(graf_dev_productos.QUERY_DEVOLUCIONES_PRODUCTOS,
+                                         graf_dev_productos.TITULO_DEVOLUCIONES_PRODUCTOS, 'orange')),
+        Escenario("grafico_compras_proveedores", CATEGORIA_GRAFICO,
+                  devoluciones_o_compras(graf_comp_provee.QUERY_COMPRAS_ACUMULADAS,
+                                         graf_comp_provee.TITULO_COMPRAS_ACUMULADAS, 'green')),
+        Escenario("grafico_compras_productos", CATEGORIA_GRAFICO,
+                  devoluciones_o_compras(graf_comp_producto.QUERY_COMPRAS_ACUMULADAS,
+                                         graf_comp_producto.TITULO_COMPRAS_ACUMULADAS, 'blue')),
+        Escenario("grafico_tablero", CATEGORIA_GRAFICO, tablero),
+    ]
+
+def escenarios_exportacion(contexto: ContextoBenchmark) -> List[Escenario]:
+    """
+    Exportación del reporte de ventas del período a CSV, CSV comprimido y PDF.
+    """
+    from reporte_ventas import TITULO_VENTAS, datos_ventas
+    from exportacion import EXTENSION_GZIP, exportar_csv, exportar_pdf
+
+    desde, hasta = contexto.desde, contexto.hasta
+    ruta = os.path.join(DIRECTORIO_SALIDAS, "reporte_ventas")
+    return [
+        Escenario("exportar_csv_ventas", CATEGORIA_EXPORTACION,
+                  lambda: exportar_csv(datos_ventas(desde, hasta), f"{ruta}.csv")),
+        Escenario("exportar_csv_gzip_ventas", CATEGORIA_EXPORTACION,
+                  lambda: exportar_csv(datos_ventas(desde, hasta), f"{ruta}.csv{EXTENSION_GZIP}", comprimir=True)),
+        Escenario("exportar_pdf_ventas", CATEGORIA_EXPORTACION,
+                  lambda: exportar_pdf(datos_ventas(desde, hasta), f"{ruta}.pdf", TITULO_VENTAS)),
+    ]
+
+def escenarios_devolucion(contexto: ContextoBenchmark) -> List[Escenario]:
+    """
+    Flujo de devoluciones: búsqueda de la factura y sus líneas (como la pantalla de
+    devoluciones) y registro de la devolución de un producto.
+    """
+    from database import create_connection
+    from busqueda import IndiceBusqueda
+    from devoluciones import QUERY_FACTURAS, QUERY_LINEAS_FACTURA
+    from models import Devolucion
+
+    with create_connection() as conn:
+        factura_ids = [fila[0] for fila in conn.execute("SELECT factura_id FROM Facturas")]
+
+    def buscar_factura() -> Tuple[str, List[Tuple]]:
+        factura_id = contexto.azar.choice(factura_ids)
+        with create_connection() as conn:
+            facturas = conn.execute(QUERY_FACTURAS).fetchall()
+        IndiceBusqueda(facturas).buscar(factura_id)
+        with create_connection() as conn:
+            return factura_id, conn.execute(QUERY_LINEAS_FACTURA, (factura_id,)).fetchall()
+
+    def registrar_devolucion():
+        factura_id = contexto.azar.choice(factura_ids)
+        with create_connection() as conn:
+            producto_id = conn.execute(QUERY_LINEAS_FACTURA, (factura_id,)).fetchone()[0]
+        return Devolucion.registrar_devolucion(factura_id, contexto.hasta, [(producto_id, 1)])
+
+    return [
+        Escenario("devolucion_buscar_factura", CATEGORIA_DEVOLUCION, buscar_factura),
+        Escenario("devolucion_registrar", CATEGORIA_DEVOLUCION, registrar_devolucion),
+    ]
+
+def medir(escenario: Escenario, repeticiones: int) -> Dict[str, Any]:
+    """
+    Ejecuta un escenario una vez en frío y 'repeticiones' veces más, y resume los tiempos.
+    Si el escenario falla se anota el error y se sigue con los demás.
+
+    Args:
+        escenario (Escenario): El escenario.
+        repeticiones (int): Ejecuciones medidas después de la ejecución en frío.
+
+    Returns:
+        Dict[str, Any]: Nombre, categoría, tiempos (en segundos) y error.
+    """
+    resultado: Dict[str, Any] = {"nombre": escenario.nombre, "categoria": escenario.categoria, "en_frio": None,
+                                 "segundos": [], "error": None}
+    try:
+        for numero in range(repeticiones + 1):
+            inicio = time.perf_counter()
+            escenario.ejecutar()
+            segundos = round(time.perf_counter() - inicio, 6)
+            if numero == 0:
+                resultado["en_frio"] = segundos
+            else:
+                resultado["segundos"].append(segundos)
+    except Exception as e:
+        resultado["error"] = f"{type(e).__name__}: {str(e)}"
+    tiempos = resultado["segundos"]
+    if tiempos:
+        resultado.update(minimo=min(tiempos), mediana=statistics.median(tiempos),
+                         promedio=round(statistics.fmean(tiempos), 6), maximo=max(tiempos))
+    return resultado
+
+def _commit_actual() -> Dict[str, Any]:
+    """
+    Commit del código medido y si había cambios sin confirmar (None si no es un repositorio git).
+    """
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=directorio, capture_output=True, text=True,
+                                timeout=10, check=True).stdout.strip()
+        cambios = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=directorio,
+                                 capture_output=True, text=True, timeout=10, check=True).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return {"commit": None, "cambios_sin_confirmar": None}
+    return {"commit": commit, "cambios_sin_confirmar": bool(cambios)}
+
+def comparar_resultados(anterior: Dict[str, Any], actual: Dict[str, Any]) -> List[Tuple[str, float, float, float]]:
+    """
+    Compara las medianas de los escenarios presentes en dos resultados.
+
+    Args:
+        anterior (Dict[str, Any]): Resultados de referencia.
+        actual (Dict[str, Any]): Resultados nuevos.
+
+    Returns:
+        List[Tuple[str, float, float, float]]: (escenario, mediana anterior, mediana actual, cambio en %).
+    """
+    medianas = {escenario["nombre"]: escenario.get("mediana") for escenario in anterior.get("escenarios", [])}
+    comparacion = []
+    for escenario in actual.get("escenarios", []):
+        previa, nueva = medianas.get(escenario["nombre"]), escenario.get("mediana")
+        if previa and nueva is not None:
+            comparacion.append((escenario["nombre"], previa, nueva, (nueva - previa) / previa * 100))
+    return comparacion
+
+def _leer_argumentos(argumentos: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    from datos_sinteticos import VolumenesSinteticos
+
+    parser = argparse.ArgumentParser(description="Benchmark de la aplicación con datos sintéticos.")
+    parser.add_argument("--directorio", default=DIRECTORIO_BENCHMARK,
+                        help="Directorio de la base de datos y los archivos del benchmark.")
+    parser.add_argument("--regenerar", action="store_true", help="Genera los datos aunque ya exista la copia base.")
+    volumenes = parser.add_argument_group("volúmenes de los datos sintéticos")
+    for campo in fields(VolumenesSinteticos):
+        volumenes.add_argument(f"--{campo.name.replace('_', '-')}", type=campo.type, default=campo.default)
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES, help="Ejecuciones medidas por escenario.")
+    parser.add_argument("--dias", type=int, default=DIAS_PERIODO, help="Días del período de reportes y gráficos.")
+    parser.add_argument("--lineas", type=int, nargs="+", default=list(LINEAS_CARRITO),
+                        help="Líneas de los carritos de venta.")
+    parser.add_argument("--solo", nargs="+", default=[],
+                        help="Ejecuta solo los escenarios cuyo nombre contiene alguno de estos textos.")
+    parser.add_argument("--salida", default=ARCHIVO_RESULTADOS, help="Archivo JSON de resultados.")
+    parser.add_argument("--comparar", help="Resultados anteriores (JSON) con los que comparar.")
+    return parser.parse_args(argumentos)
+
+def main(argumentos: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Prepara los datos, ejecuta los escenarios y guarda los resultados.
+
+    Returns:
+        Dict[str, Any]: Los resultados guardados.
+    """
+    opciones = _leer_argumentos(argumentos)
+    if opciones.repeticiones < 1 or opciones.dias < 1 or min(opciones.lineas) < 1:
+        raise ValueError("Las repeticiones, los días y las líneas deben ser al menos 1.")
+    salida = os.path.abspath(opciones.salida)
+    anterior = None
+    if opciones.comparar:
+        with open(opciones.comparar, encoding="utf-8") as archivo:
+            anterior = json.load(archivo)
+
+    # La base de datos (database.DB_PATH) y los archivos generados son relativos al directorio actual
+    os.makedirs(os.path.join(opciones.directorio, DIRECTORIO_SALIDAS), exist_ok=True)
+    os.chdir(opciones.directorio)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from datos_sinteticos import VolumenesSinteticos, contar_registros
+
+    volumenes = VolumenesSinteticos(**{campo.name: getattr(opciones, campo.name) for campo in fields(VolumenesSinteticos)})
+    datos = preparar_datos(volumenes, opciones.regenerar)
+    contexto = crear_contexto(opciones.dias, volumenes.semilla)
+    registros = contar_registros()
+
+    escenarios = (escenarios_venta(contexto, opciones.lineas) + escenarios_reporte(contexto)
+                  + escenarios_grafico(contexto) + escenarios_exportacion(contexto) + escenarios_devolucion(contexto))
+    if opciones.solo:
+        escenarios = [escenario for escenario in escenarios if any(texto in escenario.nombre for texto in opciones.solo)]
+
+    medidos = []
+    for escenario in escenarios:
+        print(f"{escenario.nombre}...", end=" ", flush=True)
+        medido = medir(escenario, opciones.repeticiones)
+        print(medido["error"] or f"mediana {medido['mediana'] * 1000:.1f} ms")
+        medidos.append(medido)
+
+    resultados = {
+        "version": VERSION_RESULTADOS,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        **_commit_actual(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "procesadores": os.cpu_count(),
+        **datos,
+        "registros": registros,
+        "periodo": {"desde": contexto.desde, "hasta": contexto.hasta},
+        "repeticiones": opciones.repeticiones,
+        "escenarios": medidos,
+    }
+    temporal = f"{salida}.tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+    os.replace(temporal, salida)
+    print(f"Resultados guardados en {salida}")
+
+    if anterior is not None:
+        print(f"Comparación con {opciones.comparar} (commit {anterior.get('commit')}):")
+        for nombre, previa, nueva, cambio in comparar_resultados(anterior, resultados):
+            marca = "más lento" if cambio >= UMBRAL_CAMBIO else "más rápido" if cambio <= -UMBRAL_CAMBIO else ""
+            print(f"{nombre:40} {previa * 1000:10.1f} ms {nueva * 1000:10.1f} ms {cambio:+7.1f} % {marca}")
+    return resultados
+
+if __name__ == "__main__":
+    try:
+        main()
+    except ValueError as e:
+        sys.exit(f"Error: {str(e)}")
@@ -0,0 +1,256 @@
+# busqueda.py
+from bisect import bisect_left
+from typing import List, Sequence, Tuple
+from database import create_connection
+from migraciones import TABLAS_FTS
+
+LIMITE_RESULTADOS = 200  # Cantidad máxima de resultados que se muestran en un selector
+
+class IndiceBusqueda:
+    """
+    Índice de búsqueda del selector de facturas de devoluciones, cuyos registros
+    (número de factura, nombre del cliente) ya están en memoria. Productos, clientes y
+    proveedores se buscan en la base de datos con buscar_registros/buscar_ids.
+
+    Los resultados van en este orden: el número exacto, los registros con alguna palabra
+    (el número o una palabra del nombre) que empieza con el texto y, por último, los que
+    lo contienen en cualquier posición (el criterio de filtrado original). Las palabras se
+    guardan ordenadas, así los prefijos se encuentran por búsqueda binaria; la búsqueda de
+    subcadenas parte de los resultados de la consulta anterior cuando el texto nuevo la
+    contiene, por lo que se achica a medida que se escribe. El índice se construye con la
+    primera búsqueda, no al abrir la pantalla.
+    """
+    def __init__(self, registros: Sequence[Tuple]):
+        """
+        Constructor de la clase IndiceBusqueda.
+
+        Args:
+            registros (Sequence[Tuple]): Registros (número de factura, nombre del cliente).
+        """
+        self.registros = list(registros)
+        self._textos = None
+        self._ids = None
+        self._palabras = None
+        self._posiciones = None
+        self._anterior = None  # (consulta, posiciones que la contienen)
+
+    def _construir(self):
+        """
+        Construye el índice de palabras y el texto normalizado de los registros.
+        """
+        textos, ids, palabras = [], {}, []
+        for posicion, (factura_id, nombre) in enumerate(self.registros):
+            id_texto = str(factura_id).lower()
+            nombre = str(nombre or "").lower()
+            textos.append(f"{id_texto}\n{nombre}")
+            ids.setdefault(id_texto, posicion)
+            palabras.extend((palabra, posicion) for palabra in [id_texto, *nombre.split()])
+        palabras.sort()
+        self._textos = textos
+        self._ids = ids
+        self._palabras = [palabra for palabra, _ in palabras]
+        self._posiciones = [posicion for _, posicion in palabras]
+
+    def _por_prefijo(self, consulta: str) -> List[int]:
+        """
+        Busca los registros con alguna palabra que empieza con la consulta, en orden alfabético.
+
+        Args:
+            consulta (str): Texto normalizado.
+
+        Returns:
+            List[int]: Posiciones de los registros.
+        """
+        posiciones = []
+        indice = bisect_left(self._palabras, consulta)
+        while indice < len(self._palabras) and self._palabras[indice].startswith(consulta):
+            posiciones.append(self._posiciones[indice])
+            indice += 1
+        return posiciones
+
+    def _por_subcadena(self, consulta: str) -> List[int]:
+        """
+        Busca los registros que contienen la consulta, partiendo de los resultados de la
+        consulta anterior cuando la nueva la contiene.
+
+        Args:
+            consulta (str): Texto normalizado.
+
+        Returns:
+            List[int]: Posiciones de los registros, en su orden original.
+        """
+        if self._anterior and self._anterior[0] in consulta:
+            candidatas = self._anterior[1]
+        else:
+            candidatas = range(len(self._textos))
+        textos = self._textos
+        coincidencias = [posicion for posicion in candidatas if consulta in textos[posicion]]
+        self._anterior = (consulta, coincidencias)
+        return coincidencias
+
+    def buscar(self, consulta: str) -> List[Tuple]:
+        """
+        Busca facturas por número o por nombre del cliente.
+
+        Args:
+            consulta (str): Texto ingresado en el filtro.
+
+        Returns:
+            List[Tuple]: Registros que coinciden, ordenados por relevancia (todos si no hay texto).
+        """
+        consulta = (consulta or "").strip().lower()
+        if not consulta:
+            return self.registros
+        if self._textos is None:
+            self._construir()
+        exacto = [self._ids[consulta]] if consulta in self._ids else []
+        posiciones = dict.fromkeys(exacto + self._por_prefijo(consulta) + self._por_subcadena(consulta))
+        return [self.registros[posicion] for posicion in posiciones]
+
+def _expresion_fts(texto: str) -> str:
+    """
+    Convierte el texto del filtro en una expresión FTS5: cada palabra se busca como
+    prefijo y entre comillas, así los caracteres especiales no se interpretan como operadores.
+
+    Args:
+        texto (str): Texto ingresado en el filtro.
+
+    Returns:
+        str: Expresión para MATCH.
+    """
+    return " ".join('"' + palabra.replace('"', '""') + '"*' for palabra in texto.split())
+
+def _consulta_busqueda(tabla: str, columnas: str, texto: str) -> Tuple[str, list]:
+    """
+    Arma la consulta de búsqueda de texto completo sobre una tabla.
+
+    Los resultados se ordenan por el ID exacto (si el texto es un número) y luego por
+    relevancia (bm25); sin texto se devuelven en el orden de los IDs.
+
+    Args:
+        tabla (str): Tabla base (Productos, Clientes o Proveedores).
+        columnas (str): Columnas a devolver de la tabla base (alias 't').
+        texto (str): Texto ingresado en el filtro.
+
+    Returns:
+        Tuple[str, list]: Consulta y parámetros, sin los de LIMIT/OFFSET.
+
+    Raises:
+        ValueError: Si la tabla no tiene índice de texto completo.
+    """
+    if tabla not in TABLAS_FTS:
+        raise ValueError(f"La tabla {tabla} no tiene búsqueda de texto completo.")
+    tabla_fts = TABLAS_FTS[tabla][0]
+    texto = (texto or "").strip()
+    if not texto:
+        return f"SELECT {columnas} FROM {tabla} t ORDER BY t.id LIMIT ? OFFSET ?", []
+
+    id_buscado = int(texto) if texto.isdigit() else -1
+    consulta = f"""
+        SELECT {columnas}
+        FROM (
+            SELECT id AS id_resultado, 0 AS grupo, 0 AS relevancia FROM {tabla} WHERE id = ?
+            UNION ALL
+            SELECT rowid, 1, bm25({tabla_fts}) FROM {tabla_fts} WHERE {tabla_fts} MATCH ? AND rowid <> ?
+        ) r
+        JOIN {tabla} t ON t.id = r.id_resultado
+        ORDER BY r.grupo, r.relevancia, t.id
+        LIMIT ? OFFSET ?
+    """
+    return consulta, [id_buscado, _expresion_fts(texto), id_buscado]
+
+def _consulta_subcadena(tabla: str, columnas: str, texto: str) -> Tuple[str, list]:
+    """
+    Arma la consulta de los registros cuyo ID o nombre contiene el texto en cualquier
+    posición (el criterio de filtrado original) y que la búsqueda de texto completo no
+    encontró. Recorre toda la tabla, por eso solo se usa para completar los resultados.
+
+    Args:
+        tabla (str): Tabla base (Productos, Clientes o Proveedores).
+        columnas (str): Columnas a devolver de la tabla base (alias 't').
+        texto (str): Texto ingresado en el filtro (no vacío).
+
+    Returns:
+        Tuple[str, list]: Consulta y parámetros, sin los de LIMIT/OFFSET.
+    """
+    tabla_fts = TABLAS_FTS[tabla][0]
+    texto = texto.strip()
+    id_buscado = int(texto) if texto.isdigit() else -1
+    consulta = f"""
+        SELECT {columnas}
+        FROM {tabla} t
+        WHERE (instr(lower(t.nombre), ?) > 0 OR instr(CAST(t.id AS TEXT), ?) > 0)
+          AND t.id <> ?
+          AND t.id NOT IN (SELECT rowid FROM {tabla_fts} WHERE {tabla_fts} MATCH ?)
+        ORDER BY t.id
+        LIMIT ? OFFSET ?
+    """
+    return consulta, [texto.lower(), texto.lower(), id_buscado, _expresion_fts(texto)]
+
+def _buscar(tabla: str, columnas: str, texto: str, limite: int, desplazamiento: int) -> List[Tuple]:
+    """
+    Busca una página de registros: primero los que encuentra el índice de texto completo
+    y, si no llenan la página, los que contienen el texto en cualquier posición.
+
+    Args:
+        tabla (str): Tabla base (Productos, Clientes o Proveedores).
+        columnas (str): Columnas a devolver de la tabla base (alias 't').
+        texto (str): Texto ingresado en el filtro.
+        limite (int): Cantidad máxima de registros.
+        desplazamiento (int): Registros a saltar (paginación).
+
+    Returns:
+        List[Tuple]: Registros de la página.
+    """
+    consulta, parametros = _consulta_busqueda(tabla, columnas, texto)
+    with create_connection() as conn:
+        filas = conn.execute(consulta, parametros + [limite, desplazamiento]).fetchall()
+        if len(filas) >= limite or not (texto or "").strip():
+            return filas
+        # El índice solo encuentra palabras que empiezan con el texto ("ana" no encuentra
+        # "Mariana"); la página se completa con las coincidencias en cualquier posición, que
+        # van después de todas las del índice
+        if filas:
+            encontrados = desplazamiento + len(filas)
+        else:
+            encontrados = conn.execute(f"SELECT COUNT(*) FROM ({consulta})", parametros + [-1, 0]).fetchone()[0]
+        consulta, parametros = _consulta_subcadena(tabla, columnas, texto)
+        return filas + conn.execute(
+            consulta, parametros + [limite - len(filas), max(0, desplazamiento - encontrados)]
+        ).fetchall()
+
+def buscar_registros(tabla: str, texto: str, limite: int = LIMITE_RESULTADOS,
+                     desplazamiento: int = 0) -> List[Tuple]:
+    """
+    Busca registros de productos, clientes o proveedores en la base de datos.
+
+    La coincidencia la resuelve SQLite con el índice FTS5, por lo que solo se leen
+    los registros de la página pedida. Si el índice no llena la página, se completa con
+    los registros cuyo ID o nombre contiene el texto en cualquier posición.
+
+    Args:
+        tabla (str): Tabla base (Productos, Clientes o Proveedores).
+        texto (str): Texto ingresado en el filtro (ID o palabras del nombre y demás columnas).
+        limite (int, optional): Cantidad máxima de registros. Defaults to LIMITE_RESULTADOS.
+        desplazamiento (int, optional): Registros a saltar (paginación). Defaults to 0.
+
+    Returns:
+        List[Tuple]: Registros con todas las columnas de la tabla.
+    """
+    return _buscar(tabla, "t.*", texto, limite, desplazamiento)
+
+def buscar_ids(tabla: str, texto: str, limite: int = LIMITE_RESULTADOS, desplazamiento: int = 0) -> List[int]:
+    """
+    Busca en la base de datos y devuelve solo los IDs, para tomar los registros de una
+    caché (p. ej. el catálogo de productos).
+
+    Args:
+        tabla (str): Tabla base (Productos, Clientes o Proveedores).
+        texto (str): Texto ingresado en el filtro.
+        limite (int, optional): Cantidad máxima de IDs. Defaults to LIMITE_RESULTADOS.
+        desplazamiento (int, optional): IDs a saltar (paginación). Defaults to 0.
+
+    Returns:
+        List[int]: IDs ordenados por relevancia.
+    """
+    return [fila[0] for fila in _buscar(tabla, "t.id", texto, limite, desplazamiento)]
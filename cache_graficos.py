@@ -0,0 +1,214 @@
+# cache_graficos.py
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence, Tuple
+from database import create_connection
+from migraciones import TABLAS_VERSIONADAS
+from artefacto_grafico import GraficoGenerado
+
+DIRECTORIO_CACHE_GRAFICOS = 'cache_graficos'
+MAXIMO_EN_MEMORIA = 32  # Gráficos que se guardan en memoria
+MAXIMO_EN_DISCO = 200  # Gráficos que se guardan en disco; al pasarse se borran los más viejos
+EXTENSION_GRAFICO = ".png"
+EXTENSION_DATOS = ".json"  # Datos del gráfico, junto a su imagen
+
+def tablas_consulta(query: str) -> List[str]:
+    """
+    Obtiene las tablas versionadas que lee una consulta.
+
+    Args:
+        query (str): Consulta SQL.
+
+    Returns:
+        List[str]: Tablas de TABLAS_VERSIONADAS nombradas en la consulta.
+    """
+    return [tabla for tabla in TABLAS_VERSIONADAS if re.search(rf"\b{tabla}\b", query)]
+
+def versiones_tablas(tablas: Sequence[str]) -> Tuple[Tuple[str, int], ...]:
+    """
+    Lee la versión actual de cada tabla (una sola consulta al índice de VersionesTablas).
+
+    Args:
+        tablas (Sequence[str]): Tablas versionadas.
+
+    Returns:
+        Tuple[Tuple[str, int], ...]: (tabla, versión) ordenado por tabla.
+    """
+    if not tablas:
+        return ()
+    marcadores = ", ".join("?" * len(tablas))
+    with create_connection() as conn:
+        filas = conn.execute(f"SELECT tabla, version FROM VersionesTablas WHERE tabla IN ({marcadores})",
+                             list(tablas)).fetchall()
+    return tuple(sorted(filas))
+
+def clave_grafico(tipo: str, query: str, desde: str, hasta: str, argumentos: Sequence[Any] = ()) -> str:
+    """
+    Arma la clave de un gráfico: cambia si cambia el gráfico pedido, la consulta o los
+    datos de las tablas que lee.
+
+    Args:
+        tipo (str): Tipo de gráfico (p. ej. su título).
+        query (str): Consulta SQL del gráfico.
+        desde (str): Fecha de inicio del rango.
+        hasta (str): Fecha de fin del rango.
+        argumentos (Sequence[Any]): Resto de los argumentos del dibujo (títulos, colores). Por defecto es ().
+
+    Returns:
+        str: Clave en hexadecimal, usable como nombre de archivo.
+    """
+    versiones = versiones_tablas(tablas_consulta(query))
+    return hashlib.sha1(repr((tipo, query, desde, hasta, tuple(argumentos), versiones)).encode()).hexdigest()
+
+class CacheGraficos:
+    """
+    Caché de gráficos en dos niveles: los más recientes en memoria (LRU) y el resto en
+    disco (la imagen PNG y sus datos en JSON), así sobreviven a un reinicio de la aplicación.
+
+    Las claves incluyen la versión de los datos (clave_grafico), por lo que un gráfico
+    nunca se invalida: cuando los datos cambian se pide con otra clave y las entradas
+    viejas terminan saliendo por antigüedad.
+    """
+    def __init__(self, directorio: Optional[str] = None, maximo_memoria: int = MAXIMO_EN_MEMORIA,
+                 maximo_disco: int = MAXIMO_EN_DISCO):
+        """
+        Constructor de la clase CacheGraficos.
+
+        Args:
+            directorio (Optional[str]): Directorio del nivel en disco. Por defecto es None
+                (DIRECTORIO_CACHE_GRAFICOS dentro del directorio de trabajo).
+            maximo_memoria (int): Gráficos en memoria. Por defecto es MAXIMO_EN_MEMORIA.
+            maximo_disco (int): Gráficos en disco. Por defecto es MAXIMO_EN_DISCO.
+        """
+        self.directorio = directorio
+        self.maximo_memoria = maximo_memoria
+        self.maximo_disco = maximo_disco
+        self._memoria: "OrderedDict[str, GraficoGenerado]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _ruta(self, clave: str) -> str:
+        directorio = self.directorio or os.path.join(os.getcwd(), DIRECTORIO_CACHE_GRAFICOS)
+        return os.path.join(directorio, clave + EXTENSION_GRAFICO)
+
+    def _recordar(self, clave: str, grafico: GraficoGenerado):
+        with self._lock:
+            self._memoria[clave] = grafico
+            self._memoria.move_to_end(clave)
+            while len(self._memoria) > self.maximo_memoria:
+                self._memoria.popitem(last=False)
+
+    def obtener(self, clave: str) -> Optional[GraficoGenerado]:
+        """
+        Busca un gráfico en memoria y, si no está, en disco.
+
+        Args:
+            clave (str): Clave del gráfico.
+
+        Returns:
+            Optional[GraficoGenerado]: El gráfico, o None si no está en la caché.
+        """
+        with self._lock:
+            if clave in self._memoria:
+                self._memoria.move_to_end(clave)
+                return self._memoria[clave]
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'rb') as archivo:
+                png = archivo.read()
+            with open(ruta[:-len(EXTENSION_GRAFICO)] + EXTENSION_DATOS, encoding='utf-8') as archivo:
+                grafico = GraficoGenerado.desde_json(archivo.read(), png)
+        except (OSError, ValueError, TypeError):
+            return None
+        self._recordar(clave, grafico)
+        return grafico
+
+    def guardar(self, clave: str, grafico: GraficoGenerado):
+        """
+        Guarda un gráfico en memoria y en disco. Un error al escribir en disco no se
+        propaga: el gráfico queda al menos en memoria.
+
+        Args:
+            clave (str): Clave del gráfico.
+            grafico (GraficoGenerado): El gráfico.
+        """
+        self._recordar(clave, grafico)
+        ruta = self._ruta(clave)
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            # Los datos se escriben antes que la imagen: un PNG en disco siempre tiene su JSON
+            self._escribir(ruta[:-len(EXTENSION_GRAFICO)] + EXTENSION_DATOS, grafico.datos_json().encode('utf-8'))
+            self._escribir(ruta, grafico.png)
+            self._recortar_disco(os.path.dirname(ruta))
+        except OSError as e:
+            print(f"Error al guardar el gráfico en la caché: {str(e)}")
+
+    @staticmethod
+    def _escribir(ruta: str, contenido: bytes):
+        """
+        Escribe un archivo de forma atómica (a un temporal que después se renombra).
+        """
+        temporal = f"{ruta}.{threading.get_ident()}.tmp"
+        with open(temporal, 'wb') as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta)
+
+    def _recortar_disco(self, directorio: str):
+        """
+        Borra los gráficos más viejos del disco cuando hay más de 'maximo_disco'.
+        """
+        archivos = [entrada for entrada in os.scandir(directorio) if entrada.name.endswith(EXTENSION_GRAFICO)]
+        if len(archivos) <= self.maximo_disco:
+            return
+        archivos.sort(key=lambda entrada: entrada.stat().st_mtime)
+        for entrada in archivos[:len(archivos) - self.maximo_disco]:
+            for ruta in (entrada.path, entrada.path[:-len(EXTENSION_GRAFICO)] + EXTENSION_DATOS):
+                try:
+                    os.remove(ruta)
+                except OSError:
+                    pass
+
+    def vaciar(self):
+        """
+        Borra todos los gráficos de la caché, en memoria y en disco.
+        """
+        with self._lock:
+            self._memoria.clear()
+        directorio = os.path.dirname(self._ruta(""))
+        if os.path.isdir(directorio):
+            for entrada in os.scandir(directorio):
+                if entrada.name.endswith((EXTENSION_GRAFICO, EXTENSION_DATOS)):
+                    os.remove(entrada.path)
+
+# Caché compartida por todas las pantallas de gráficos
+_cache = CacheGraficos()
+
+def obtener_grafico(clave: str) -> Optional[GraficoGenerado]:
+    """
+    Busca un gráfico en la caché compartida.
+
+    Args:
+        clave (str): Clave del gráfico (clave_grafico).
+
+    Returns:
+        Optional[GraficoGenerado]: El gráfico, o None si no está.
+    """
+    return _cache.obtener(clave)
+
+def guardar_grafico(clave: str, grafico: GraficoGenerado):
+    """
+    Guarda un gráfico en la caché compartida.
+
+    Args:
+        clave (str): Clave del gráfico (clave_grafico).
+        grafico (GraficoGenerado): El gráfico.
+    """
+    _cache.guardar(clave, grafico)
+
+def vaciar_cache_graficos():
+    """
+    Vacía la caché compartida (p. ej. después de reiniciar la base de datos).
+    """
+    _cache.vaciar()
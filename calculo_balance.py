@@ -0,0 +1,256 @@
+# calculo_balance.py
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from database import create_connection
+from datos_reporte import ColumnaReporte, DatosReporte, formato_moneda
+from resumenes import RESUMEN_CLIENTE, RESUMEN_PRODUCTO, RESUMEN_PROVEEDOR, SIN_ENTIDAD
+
+# El balance (ventas, devoluciones, compras y margen neto) se calcula con una sola
+# consulta: una rama por tipo de movimiento unidas con UNION ALL y agrupadas al final.
+# Cada rama lee el resumen diario más chico que alcance para sus filtros y su
+# agrupación (resumenes.py); solo cuando se combinan filtros que ningún resumen tiene
+# (p. ej. producto y cliente a la vez) lee las tablas de movimientos.
+
+# Agrupaciones del balance
+AGRUPACION_DIA = "dia"
+AGRUPACION_MES = "mes"
+AGRUPACION_PRODUCTO = "producto"
+AGRUPACION_CLIENTE = "cliente"
+AGRUPACIONES = {
+    None: "Sin agrupar",
+    AGRUPACION_DIA: "Por día",
+    AGRUPACION_MES: "Por mes",
+    AGRUPACION_PRODUCTO: "Por producto",
+    AGRUPACION_CLIENTE: "Por cliente",
+}
+
+# Entidad por la que agrupa cada agrupación (las demás agrupan por fecha)
+ENTIDAD_AGRUPACION = {AGRUPACION_PRODUCTO: "producto", AGRUPACION_CLIENTE: "cliente"}
+# Tabla con el nombre de cada entidad
+TABLA_ENTIDAD = {"producto": "Productos", "cliente": "Clientes", "proveedor": "Proveedores"}
+# Grupo de los movimientos sin la entidad agrupada (p. ej. las compras al agrupar por cliente);
+# como en los resúmenes, su clave es SIN_ENTIDAD
+SIN_ASIGNAR = "(Sin asignar)"
+
+VENTAS = "ventas"
+DEVOLUCIONES = "devoluciones"
+COMPRAS = "compras"
+MEDIDAS = (VENTAS, DEVOLUCIONES, COMPRAS)
+
+# Tablas de movimientos: origen, columna de cada entidad (None si no la tiene) e importe
+MOVIMIENTOS = {
+    VENTAS: dict(
+        origen="Facturas f JOIN FacturaLineas l ON l.factura_id = f.factura_id",
+        fecha="f.fecha", producto="l.producto_id", cliente="f.cliente_id", proveedor=None,
+        importe="l.cantidad * l.precio_unitario"),
+    DEVOLUCIONES: dict(
+        origen="""Devoluciones d
+            LEFT JOIN FacturaLineas l ON l.id = (
+                SELECT id FROM FacturaLineas
+                WHERE factura_id = d.factura_id AND producto_id = d.producto_id
+                LIMIT 1
+            )""",
+        fecha="d.fecha", producto="d.producto_id", cliente="d.cliente_id", proveedor=None,
+        importe="d.cantidad * IFNULL(l.precio_unitario, 0)"),
+    COMPRAS: dict(
+        origen="Compras c", fecha="c.fecha", producto="c.producto_id", cliente=None, proveedor="c.proveedor_id",
+        importe="c.cantidad * c.precio_costo"),
+}
+
+# Resúmenes diarios: entidad y medidas que tiene cada uno, en orden de preferencia
+RESUMENES = (
+    (RESUMEN_PRODUCTO, "producto", (VENTAS, DEVOLUCIONES, COMPRAS)),
+    (RESUMEN_CLIENTE, "cliente", (VENTAS, DEVOLUCIONES)),
+    (RESUMEN_PROVEEDOR, "proveedor", (COMPRAS,)),
+)
+
+class FilaBalance(NamedTuple):
+    """
+    Una fila del balance: un grupo (o el total) con sus importes.
+    """
+    grupo: str
+    ventas: float
+    devoluciones: float
+    compras: float
+    margen: float  # ventas - devoluciones - compras
+
+COLUMNAS_BALANCE = [
+    ColumnaReporte("Grupo"),
+    ColumnaReporte("Ventas", formato_moneda),
+    ColumnaReporte("Devoluciones", formato_moneda),
+    ColumnaReporte("Compras", formato_moneda),
+    ColumnaReporte("Margen Neto", formato_moneda),
+]
+
+def _clave_fecha(columna: str, agrupacion: Optional[str]) -> str:
+    """
+    Expresión de la clave de grupo para las agrupaciones por fecha (o sin agrupar).
+    """
+    if agrupacion == AGRUPACION_DIA:
+        return columna
+    if agrupacion == AGRUPACION_MES:
+        return f"substr({columna}, 1, 7)"
+    return "NULL"
+
+def _rama(medida: str, desde: Optional[str], hasta: Optional[str], filtros: Dict[str, int],
+          agrupacion: Optional[str]) -> Optional[Tuple[str, List[Any]]]:
+    """
+    Arma la rama de la consulta de un tipo de movimiento.
+
+    Returns:
+        Optional[Tuple[str, List[Any]]]: SELECT (clave, ventas, devoluciones, compras) y sus
+            parámetros, o None si un filtro excluye este movimiento (p. ej. compras filtradas por cliente).
+    """
+    movimiento = MOVIMIENTOS[medida]
+    if any(movimiento[entidad] is None for entidad in filtros):
+        return None
+    entidad_grupo = ENTIDAD_AGRUPACION.get(agrupacion)
+    sin_entidad = entidad_grupo is not None and movimiento[entidad_grupo] is None
+    if sin_entidad:
+        entidad_grupo = None
+    entidades = set(filtros) | ({entidad_grupo} if entidad_grupo else set())
+
+    # El resumen más chico que tenga la medida y todas las entidades usadas
+    origen = None
+    for tabla, entidad_resumen, medidas in RESUMENES:
+        if medida in medidas and entidades <= {entidad_resumen}:
+            columna = f"{entidad_resumen}_id"
+            origen = tabla
+            columnas = dict(fecha="fecha", **{entidad_resumen: columna})
+            importe = f"SUM({medida})"
+            break
+    if origen is None:
+        origen = movimiento["origen"]
+        columnas = movimiento
+        importe = f"SUM({movimiento['importe']})"
+
+    if sin_entidad:
+        clave = str(SIN_ENTIDAD)  # Todo el movimiento va al grupo SIN_ASIGNAR
+    elif entidad_grupo:
+        clave = f"IFNULL({columnas[entidad_grupo]}, {SIN_ENTIDAD})"
+    else:
+        clave = _clave_fecha(columnas["fecha"], agrupacion)
+    condiciones, params = [], []
+    if desde and hasta:
+        condiciones.append(f"{columnas['fecha']} BETWEEN ? AND ?")
+        params.extend([desde, hasta])
+    for entidad, entidad_id in filtros.items():
+        condiciones.append(f"{columnas[entidad]} = ?")
+        params.append(entidad_id)
+    importes = ", ".join(f"{importe if otra == medida else 0} AS {otra}" for otra in MEDIDAS)
+    consulta = f"SELECT {clave} AS grupo, {importes} FROM {origen}"
+    if condiciones:
+        consulta += " WHERE " + " AND ".join(condiciones)
+    consulta += " GROUP BY grupo"
+    return consulta, params
+
+def construir_consulta_balance(desde: Optional[str] = None, hasta: Optional[str] = None,
+                               producto_id: Optional[int] = None, cliente_id: Optional[int] = None,
+                               proveedor_id: Optional[int] = None,
+                               agrupacion: Optional[str] = None) -> Tuple[str, List[Any]]:
+    """
+    Construye la consulta única del balance.
+
+    Los filtros se combinan: el de producto se aplica a todos los movimientos, el de
+    cliente a ventas y devoluciones y el de proveedor a las compras. Un movimiento que
+    no tiene la entidad filtrada (p. ej. las compras con un filtro de cliente) no suma.
+
+    Args:
+        desde (Optional[str]): Fecha de inicio. Por defecto es None (sin límite).
+        hasta (Optional[str]): Fecha de fin. Por defecto es None (sin límite).
+        producto_id (Optional[int]): ID del producto a filtrar. Por defecto es None.
+        cliente_id (Optional[int]): ID del cliente a filtrar. Por defecto es None.
+        proveedor_id (Optional[int]): ID del proveedor a filtrar. Por defecto es None.
+        agrupacion (Optional[str]): Una de las claves de AGRUPACIONES. Por defecto es None (solo el total).
+
+    Returns:
+        Tuple[str, List[Any]]: Consulta SQL y parámetros; devuelve filas (grupo, ventas,
+            devoluciones, compras, margen).
+
+    Raises:
+        ValueError: Si la agrupación no existe.
+    """
+    if agrupacion not in AGRUPACIONES:
+        raise ValueError(f"Agrupación desconocida: {agrupacion}")
+    filtros = {entidad: entidad_id for entidad, entidad_id in
+               (("producto", producto_id), ("cliente", cliente_id), ("proveedor", proveedor_id)) if entidad_id}
+
+    ramas, params = [], []
+    for medida in MEDIDAS:
+        rama = _rama(medida, desde, hasta, filtros, agrupacion)
+        if rama:
+            ramas.append(rama[0])
+            params.extend(rama[1])
+    if not ramas:
+        ramas.append("SELECT NULL AS grupo, 0 AS ventas, 0 AS devoluciones, 0 AS compras")
+
+    entidad_grupo = ENTIDAD_AGRUPACION.get(agrupacion)
+    if entidad_grupo:
+        etiqueta = f"COALESCE(e.nombre, '{SIN_ASIGNAR}')"
+        union = f"LEFT JOIN {TABLA_ENTIDAD[entidad_grupo]} e ON e.id = t.grupo"
+        orden = "e.nombre IS NULL, e.nombre"
+    elif agrupacion:
+        etiqueta, union, orden = f"COALESCE(t.grupo, '{SIN_ASIGNAR}')", "", "t.grupo"
+    else:
+        etiqueta, union, orden = "'Total'", "", "1"
+    consulta = f"""
+        SELECT {etiqueta}, IFNULL(SUM(t.ventas), 0), IFNULL(SUM(t.devoluciones), 0), IFNULL(SUM(t.compras), 0),
+               IFNULL(SUM(t.ventas), 0) - IFNULL(SUM(t.devoluciones), 0) - IFNULL(SUM(t.compras), 0)
+        FROM ({" UNION ALL ".join(ramas)}) AS t
+        {union}
+        GROUP BY t.grupo
+        ORDER BY {orden}
+    """
+    return consulta, params
+
+def calcular_balance(desde: Optional[str] = None, hasta: Optional[str] = None, producto_id: Optional[int] = None,
+                     cliente_id: Optional[int] = None, proveedor_id: Optional[int] = None,
+                     agrupacion: Optional[str] = None) -> List[FilaBalance]:
+    """
+    Calcula el balance con una sola consulta (ver construir_consulta_balance).
+
+    Returns:
+        List[FilaBalance]: Una fila por grupo, o una sola fila 'Total' si no se agrupa.
+    """
+    consulta, params = construir_consulta_balance(desde, hasta, producto_id, cliente_id, proveedor_id, agrupacion)
+    with create_connection() as conn:
+        filas = [FilaBalance(*fila) for fila in conn.execute(consulta, params)]
+    return filas or [FilaBalance("Total", 0.0, 0.0, 0.0, 0.0)]
+
+def totalizar(filas: List[FilaBalance]) -> FilaBalance:
+    """
+    Suma las filas de un balance agrupado.
+
+    Args:
+        filas (List[FilaBalance]): Filas del balance.
+
+    Returns:
+        FilaBalance: Fila 'Total'.
+    """
+    return FilaBalance("Total", *(sum(fila[i] for fila in filas) for i in range(1, len(FilaBalance._fields))))
+
+def nombres_filtros(producto_id: Optional[int] = None, cliente_id: Optional[int] = None,
+                    proveedor_id: Optional[int] = None) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Lee en una sola consulta los nombres del producto, el cliente y el proveedor filtrados.
+
+    Returns:
+        Tuple[Optional[str], Optional[str], Optional[str]]: Nombres (None si no hay filtro o el ID no existe).
+    """
+    with create_connection() as conn:
+        return conn.execute("""
+            SELECT (SELECT nombre FROM Productos WHERE id = ?),
+                   (SELECT nombre FROM Clientes WHERE id = ?),
+                   (SELECT nombre FROM Proveedores WHERE id = ?)
+        """, (producto_id, cliente_id, proveedor_id)).fetchone()
+
+def datos_balance(filas: List[FilaBalance]) -> DatosReporte:
+    """
+    Arma los datos de reporte (pantalla y CSV) de un balance ya calculado.
+
+    Args:
+        filas (List[FilaBalance]): Filas del balance.
+
+    Returns:
+        DatosReporte: Columnas y filas del balance.
+    """
+    return DatosReporte(COLUMNAS_BALANCE, filas)
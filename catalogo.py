@@ -0,0 +1,172 @@
+# catalogo.py
+import threading
+from typing import Dict, List, Optional, Tuple
+from database import create_connection
+
+# Columnas de cada producto en caché: (id, nombre, descripcion, precio, stock, ultimo_precio_costo).
+# Las cinco primeras coinciden con 'SELECT * FROM Productos'.
+CONSULTA_PRODUCTOS = """
+    SELECT p.id, p.nombre, p.descripcion, p.precio, p.stock, u.precio_costo
+    FROM Productos p
+    LEFT JOIN UltimoCosto u ON u.producto_id = p.id
+"""
+LIMITE_PARAMETROS = 500  # Ids por consulta al recargar productos modificados
+
+class CatalogoProductos:
+    """
+    Caché en memoria del catálogo de productos, indexada por id y compartida por todas las pantallas.
+
+    Los triggers de Productos y UltimoCosto registran el id de cada producto modificado
+    en la tabla CambiosProductos, cuya clave autoincremental funciona como versión del
+    catálogo. Al pedir los productos se compara la versión en caché con la última de la
+    base de datos (una sola lectura del índice); si cambió, solo se vuelven a leer los
+    productos modificados, sin importar si la escritura la hizo esta terminal (ventas,
+    compras, devoluciones, modelos) u otra. Si la caché quedó más atrás que el registro
+    conservado, se recarga completa.
+    """
+    def __init__(self):
+        self._productos: Dict[int, Tuple] = {}
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _cargar_todo(self, cursor):
+        """
+        Carga el catálogo completo.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor de la base de datos.
+        """
+        cursor.execute(CONSULTA_PRODUCTOS + " ORDER BY p.id")
+        self._productos = {fila[0]: fila for fila in cursor.fetchall()}
+
+    def _cargar_cambios(self, cursor, hasta: int):
+        """
+        Vuelve a leer solo los productos modificados desde la versión en caché.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor de la base de datos.
+            hasta (int): Última versión a aplicar.
+        """
+        cursor.execute("""
+            SELECT DISTINCT producto_id FROM CambiosProductos WHERE version > ? AND version <= ?
+        """, (self._version, hasta))
+        ids = [fila[0] for fila in cursor.fetchall()]
+        for inicio in range(0, len(ids), LIMITE_PARAMETROS):
+            lote = ids[inicio:inicio + LIMITE_PARAMETROS]
+            marcadores = ", ".join("?" * len(lote))
+            cursor.execute(CONSULTA_PRODUCTOS + f" WHERE p.id IN ({marcadores})", lote)
+            filas = {fila[0]: fila for fila in cursor.fetchall()}
+            for producto_id in lote:
+                if producto_id in filas:
+                    self._productos[producto_id] = filas[producto_id]
+                else:
+                    self._productos.pop(producto_id, None)
+
+    def _sincronizar(self):
+        """
+        Pone la caché al día con la base de datos, dentro de una lectura consistente.
+        """
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            cursor.execute("""
+                SELECT (SELECT MIN(version) FROM CambiosProductos), (SELECT MAX(version) FROM CambiosProductos)
+            """)
+            minima, maxima = cursor.fetchone()
+            maxima = maxima or 0
+            if self._version == maxima:
+                return
+            if (self._version is None or maxima < self._version
+                    or (minima is not None and minima > self._version + 1)):
+                self._cargar_todo(cursor)
+            else:
+                self._cargar_cambios(cursor, maxima)
+            self._version = maxima
+
+    def productos(self) -> List[Tuple]:
+        """
+        Obtiene todos los productos, ordenados por id.
+
+        Returns:
+            List[Tuple]: Productos (id, nombre, descripcion, precio, stock, ultimo_precio_costo).
+        """
+        with self._lock:
+            self._sincronizar()
+            return list(self._productos.values())
+
+    def producto(self, producto_id: int) -> Optional[Tuple]:
+        """
+        Obtiene un producto por su id.
+
+        Args:
+            producto_id (int): ID del producto.
+
+        Returns:
+            Optional[Tuple]: Producto, o None si no existe.
+        """
+        with self._lock:
+            self._sincronizar()
+            return self._productos.get(producto_id)
+
+    def productos_por_id(self, producto_ids: List[int]) -> List[Tuple]:
+        """
+        Obtiene varios productos por id, en el mismo orden, con una sola sincronización.
+
+        Args:
+            producto_ids (List[int]): IDs de los productos.
+
+        Returns:
+            List[Tuple]: Productos encontrados.
+        """
+        with self._lock:
+            self._sincronizar()
+            return [self._productos[producto_id] for producto_id in producto_ids if producto_id in self._productos]
+
+    def invalidar(self):
+        """
+        Descarta la caché; la próxima consulta recarga el catálogo completo.
+        """
+        with self._lock:
+            self._productos = {}
+            self._version = None
+
+_catalogo = CatalogoProductos()
+
+def obtener_productos() -> List[Tuple]:
+    """
+    Obtiene todos los productos del catálogo en caché.
+
+    Returns:
+        List[Tuple]: Productos (id, nombre, descripcion, precio, stock, ultimo_precio_costo).
+    """
+    return _catalogo.productos()
+
+def obtener_producto(producto_id: int) -> Optional[Tuple]:
+    """
+    Obtiene un producto del catálogo en caché.
+
+    Args:
+        producto_id (int): ID del producto.
+
+    Returns:
+        Optional[Tuple]: Producto, o None si no existe.
+    """
+    return _catalogo.producto(producto_id)
+
+def obtener_productos_por_id(producto_ids: List[int]) -> List[Tuple]:
+    """
+    Obtiene varios productos del catálogo en caché, en el orden de los ids recibidos.
+
+    Args:
+        producto_ids (List[int]): IDs de los productos.
+
+    Returns:
+        List[Tuple]: Productos (id, nombre, descripcion, precio, stock, ultimo_precio_costo).
+    """
+    return _catalogo.productos_por_id(producto_ids)
+
+def invalidar_catalogo():
+    """
+    Descarta el catálogo en caché (p. ej. después de reiniciar la base de datos).
+    """
+    _catalogo.invalidar()
@@ -2,9 +2,10 @@
 import flet as ft
 from typing import Callable, List, Tuple
 from models import Cliente
-from libreria import BaseApp, get_db_connection, FormField
+from libreria import BaseApp, get_db_connection, FormField, ListaPaginada
 from libreria import BLUE_COLOR, RED_COLOR, HEADER_SIZE, BUTTON_TEXT_SIZE, COLOR_SNACKBAR
 import time
+from busqueda import buscar_registros, LIMITE_RESULTADOS
 
 class ClienteApp(BaseApp):
     """
@@ -15,39 +16,26 @@ class ClienteApp(BaseApp):
 
     def listar_clientes(self) -> None:
         """Lista todos los clientes disponibles en la base de datos."""
-        clientes = self._obtener_clientes()
         self.page.controls.clear()
         self.page.add(ft.Text("Listado de Clientes", size=HEADER_SIZE))
 
-        lista_clientes = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True, spacing=10)
-
         def filtrar_clientes(e):
             """
             Filtra los clientes según el filtro introducido por el usuario.
             """
-            filtro = filtro_field.value.lower()
-            clientes_filtrados = [cliente for cliente in clientes if filtro in str(cliente[0]).lower() or filtro in cliente[1].lower()]
-            actualizar_lista_clientes(clientes_filtrados)
-
-        def actualizar_lista_clientes(clientes_filtrados):
-            """
-            Actualiza la lista de clientes mostrando los clientes filtrados.
-            Args:
-                clientes_filtrados (List[Tuple]): Lista de clientes filtrados.
-            """
-            lista_clientes.controls.clear()
-            for cliente in clientes_filtrados:
-                lista_clientes.controls.append(self._crear_boton_cliente(cliente))
-            self.page.update()
+            lista_clientes.recargar()
 
         filtro_field = ft.TextField(label="Filtrar por ID o Nombre", on_change=filtrar_clientes, width=500, border_color=ft.colors.OUTLINE)
 
-        actualizar_lista_clientes(clientes)
+        # Los clientes se leen por ventanas a medida que se desplaza la lista
+        lista_clientes = ListaPaginada(
+            lambda desplazamiento, limite: self._obtener_clientes(filtro_field.value, limite, desplazamiento),
+            self._crear_boton_cliente)
 
         self.page.add(
             filtro_field,
             ft.Container(
-                content=lista_clientes,
+                content=lista_clientes.control,
                 expand=True,
                 height=400,
                 width=500,
@@ -59,15 +47,17 @@ class ClienteApp(BaseApp):
         self.page.add(ft.ElevatedButton("Volver", on_click=lambda _: self.main_menu()))
         self.page.update()
 
-    def _obtener_clientes(self) -> List[Tuple]:
-        """Obtiene la lista de clientes desde la base de datos.
+    def _obtener_clientes(self, filtro: str = "", limite: int = LIMITE_RESULTADOS,
+                          desplazamiento: int = 0) -> List[Tuple]:
+        """Busca los clientes en la base de datos (índice de texto completo).
+        Args:
+            filtro (str): ID o palabras del nombre, teléfono o email. Vacío para listar los primeros.
+            limite (int): Cantidad máxima de clientes.
+            desplazamiento (int): Clientes a saltar (paginación).
         Returns:
             List[Tuple]: Lista de tuplas con los detalles de los clientes.
             """
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM Clientes")
-            return cursor.fetchall()
+        return buscar_registros("Clientes", filtro, limite, desplazamiento)
 
     def _crear_boton_cliente(self, cliente: Tuple) -> ft.ElevatedButton:
         """Crea un botón con la información del cliente.
@@ -161,7 +151,7 @@ class ClienteApp(BaseApp):
             """
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM Ventas WHERE cliente_id=?", (cliente_id,))
+            cursor.execute("SELECT COUNT(*) FROM Facturas WHERE cliente_id=?", (cliente_id,))
             return cursor.fetchone()[0] > 0
 
     def agregar(self) -> None:
@@ -2,9 +2,10 @@
 import flet as ft
 from typing import List, Tuple, Optional
 from models import Compra, Producto, Proveedor
-from database import create_connection
+from catalogo import obtener_productos_por_id
 import datetime
-from libreria import BaseApp, FormField
+from libreria import BaseApp, FormField, ListaPaginada
+from busqueda import buscar_registros, buscar_ids
 
 
 class ComprasApp(BaseApp):
@@ -27,19 +28,11 @@ class ComprasApp(BaseApp):
         """
         Muestra una lista de proveedores en la aplicación.
         """
-        with create_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM Proveedores")
-            proveedores = cursor.fetchall()
-
         def filtrar_proveedores(e):
             """
             Filtra la lista de proveedores según el texto ingresado en el campo de filtro.
             """
-            filtro = filtro_field.value.lower()
-            proveedores_filtrados = [proveedor for proveedor in proveedores if
-                                     filtro in str(proveedor[0]).lower() or filtro in proveedor[1].lower()]
-            actualizar_lista_proveedores(proveedores_filtrados)
+            proveedor_list.recargar()
 
         def seleccionar_proveedor(e):
             """
@@ -50,31 +43,26 @@ class ComprasApp(BaseApp):
             self.page.update()
             self.main_menu()
 
-        def actualizar_lista_proveedores(proveedores_filtrados):
+        def crear_boton_proveedor(proveedor):
             """
-            Actualiza la lista de proveedores en la aplicación.
-            :param proveedores_filtrados: Lista de proveedores filtrados.
+            Crea el botón de un proveedor de la lista.
+            :param proveedor: Datos del proveedor.
             """
-            proveedor_list.controls.clear()
-            for proveedor in proveedores_filtrados:
-                proveedor_list.controls.append(
-                    ft.ElevatedButton(
-                        content=ft.Column([
-                            ft.Row([
-                                ft.Text(f"Nombre: ", color="blue"),
-                                ft.Text(f"{proveedor[1]}", weight=ft.FontWeight.BOLD, color="white"),
-                                ft.Text(f"Teléfono: ", color="blue"),
-                                ft.Text(f"{proveedor[2]}", weight=ft.FontWeight.BOLD, color="white")
-                            ], alignment=ft.MainAxisAlignment.CENTER),
-                        ],
-                            alignment=ft.MainAxisAlignment.CENTER,
-                            horizontal_alignment=ft.CrossAxisAlignment.CENTER
-                        ),
-                        on_click=seleccionar_proveedor,
-                        data=(proveedor[0], proveedor[1])
-                    )
-                )
-            self.page.update()
+            return ft.ElevatedButton(
+                content=ft.Column([
+                    ft.Row([
+                        ft.Text(f"Nombre: ", color="blue"),
+                        ft.Text(f"{proveedor[1]}", weight=ft.FontWeight.BOLD, color="white"),
+                        ft.Text(f"Teléfono: ", color="blue"),
+                        ft.Text(f"{proveedor[2]}", weight=ft.FontWeight.BOLD, color="white")
+                    ], alignment=ft.MainAxisAlignment.CENTER),
+                ],
+                    alignment=ft.MainAxisAlignment.CENTER,
+                    horizontal_alignment=ft.CrossAxisAlignment.CENTER
+                ),
+                on_click=seleccionar_proveedor,
+                data=(proveedor[0], proveedor[1])
+            )
 
         self.page.controls.clear()
         self.page.add(ft.Text("Seleccionar Proveedor", size=24))
@@ -82,14 +70,14 @@ class ComprasApp(BaseApp):
         filtro_field = ft.TextField(label="Filtrar por ID o Nombre", on_change=filtrar_proveedores, width=500,
                                     border_color=ft.colors.OUTLINE)
 
-        proveedor_list = ft.ListView(expand=1, spacing=10, padding=20, auto_scroll=True)
-
-        actualizar_lista_proveedores(proveedores)
+        proveedor_list = ListaPaginada(
+            lambda desplazamiento, limite: buscar_registros("Proveedores", filtro_field.value, limite, desplazamiento),
+            crear_boton_proveedor, expand=1, padding=20)
 
         self.page.add(
             filtro_field,
             ft.Container(
-                content=proveedor_list,
+                content=proveedor_list.control,
                 height=400,
                 width=600,
                 border=ft.border.all(1, ft.colors.OUTLINE),
@@ -103,30 +91,11 @@ class ComprasApp(BaseApp):
         """
         Muestra una lista de productos en la aplicación.
         """
-        with create_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM Productos")
-            productos = cursor.fetchall()
-
-            for i, producto in enumerate(productos):
-                cursor.execute("""
-                    SELECT precio_costo
-                    FROM Compras
-                    WHERE producto_id = ?
-                    ORDER BY fecha DESC
-                    LIMIT 1
-                """, (producto[0],))
-                precio_costo = cursor.fetchone()
-                productos[i] += (precio_costo[0] if precio_costo else None,)
-
         def filtrar_productos(e):
             """
             Filtra la lista de productos según el texto ingresado en el campo de filtro.
             """
-            filtro = filtro_field.value.lower()
-            productos_filtrados = [producto for producto in productos if
-                                   filtro in str(producto[0]).lower() or filtro in producto[1].lower()]
-            actualizar_lista_productos(productos_filtrados)
+            producto_list.recargar()
 
         def agregar_al_carrito(e):
             """
@@ -164,33 +133,29 @@ class ComprasApp(BaseApp):
             self.mostrar_mensaje(f"Agregado al carrito: {producto_nombre} x{cantidad}", "green")
             self.actualizar_vista_carrito()
 
-        def actualizar_lista_productos(productos_filtrados):
+        def crear_fila_producto(producto):
             """
-            Actualiza la lista de productos en la vista.
-            :param productos_filtrados: Lista de productos filtrados.
+            Crea la fila de un producto de la lista.
+            :param producto: Datos del producto.
             """
-            producto_list.controls.clear()
-            for producto in productos_filtrados:
-                ultimo_precio_costo = producto[5] if producto[5] is not None else "N/A"
-                producto_row = ft.Row([
-                    ft.Text(f"Nombre: ", color="blue"),
-                    ft.Text(f"{producto[1]}", weight=ft.FontWeight.BOLD, color="white"),
-                    ft.Text(f"Stock: ", color="blue"),
-                    ft.Text(f"{producto[4]}", weight=ft.FontWeight.BOLD, color="white"),
-                    ft.Text(f"Último Precio Costo: $", color="blue"),
-                    ft.Text(f"{float(ultimo_precio_costo) if ultimo_precio_costo != 'N/A' else 'N/A'}",
-                            weight=ft.FontWeight.BOLD, color="white"),
-                    ft.TextField(label="Cantidad", value="1", width=100),
-                    ft.TextField(label="Precio Costo", value=str(ultimo_precio_costo), width=100),
-                    ft.ElevatedButton(
-                        "Agregar al carrito",
-                        on_click=agregar_al_carrito,
-                        data=(producto[0], producto[1], producto[2], producto[3], producto[4], ultimo_precio_costo)
-                    )
-                ])
-
-                producto_list.controls.append(producto_row)
-            self.page.update()
+            ultimo_precio_costo = producto[5] if producto[5] is not None else "N/A"
+            return ft.Row([
+                ft.Text(f"Nombre: ", color="blue"),
+                ft.Text(f"{producto[1]}", weight=ft.FontWeight.BOLD, color="white"),
+                ft.Text(f"Stock: ", color="blue"),
+                ft.Text(f"{producto[4]}", weight=ft.FontWeight.BOLD, color="white"),
+                ft.Text(f"Último Precio Costo: $", color="blue"),
+                ft.Text(f"{float(ultimo_precio_costo) if ultimo_precio_costo != 'N/A' else 'N/A'}",
+                        weight=ft.FontWeight.BOLD, color="white"),
+                ft.TextField(label="Cantidad", value="1", width=100),
+                ft.TextField(label="Precio Costo", value=str(ultimo_precio_costo), width=100),
+                ft.ElevatedButton(
+                    "Agregar al carrito",
+                    on_click=agregar_al_carrito,
+                    data=(producto[0], producto[1], producto[2], producto[3], producto[4], ultimo_precio_costo)
+                )
+            ])
+
 
         self.page.controls.clear()
         self.page.add(ft.Text("Seleccionar Productos", size=24))
@@ -198,14 +163,15 @@ class ComprasApp(BaseApp):
         filtro_field = ft.TextField(label="Filtrar por ID o Nombre", on_change=filtrar_productos, width=500,
                                     border_color=ft.colors.OUTLINE)
 
-        producto_list = ft.ListView(expand=1, spacing=10, padding=20, auto_scroll=True)
-
-        actualizar_lista_productos(productos)
+        producto_list = ListaPaginada(
+            lambda desplazamiento, limite: obtener_productos_por_id(
+                buscar_ids("Productos", filtro_field.value, limite, desplazamiento)),
+            crear_fila_producto, expand=1, padding=20)
 
         self.page.add(
             filtro_field,
             ft.Container(
-                content=producto_list,
+                content=producto_list.control,
                 height=400,
                 border=ft.border.all(1, ft.colors.OUTLINE),
                 border_radius=ft.border_radius.all(10),
@@ -381,33 +347,11 @@ class ComprasApp(BaseApp):
 
             fecha = datetime.datetime.now().strftime("%Y-%m-%d")
 
-            with create_connection() as conn:
-                cursor = conn.cursor()
-                try:
-                    for producto_id, producto_nombre, cantidad, precio_costo in self.carrito:
-                        nueva_compra = Compra(
-                            proveedor_id=proveedor_id,
-                            producto_id=producto_id,
-                            cantidad=cantidad,
-                            fecha=fecha,
-                            precio_costo=precio_costo,
-                            nro_referencia=nro_referencia
-                        )
-                        nueva_compra.save(cursor)
-
-                        cursor.execute("SELECT stock FROM Productos WHERE id=?", (producto_id,))
-                        stock_result = cursor.fetchone()
-
-                        if stock_result is None:
-                            raise ValueError(f"Error: Producto con ID {producto_id} no encontrado")
-
-                        cursor.execute("UPDATE Productos SET stock = stock + ? WHERE id = ?", (cantidad, producto_id))
-
-                    conn.commit()
-                    self.mostrar_mensaje("Compra finalizada con éxito", "green")
-                except Exception as e:
-                    conn.rollback()
-                    self.mostrar_mensaje(f"Error: {str(e)}", "red")
+            try:
+                Compra.registrar_compra(proveedor_id, fecha, self.carrito, nro_referencia)
+                self.mostrar_mensaje("Compra finalizada con éxito", "green")
+            except Exception as e:
+                self.mostrar_mensaje(f"Error: {str(e)}", "red")
 
             self.proveedor_field.value = ""
             self.nro_referencia_field.value = ""
@@ -1,15 +1,290 @@
 # database.py
+import atexit
+import itertools
 import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Iterable, Optional, Sequence
+import traza_sql
 
-def create_connection():
+DB_PATH = 'inventario.db'
+POOL_SIZE = 4  # Conexiones inactivas que se conservan para reutilizar
+BUSY_TIMEOUT = 5.0  # Segundos de espera si otra terminal tiene la base de datos bloqueada
+
+# PRAGMAs aplicados a cada conexión nueva del pool
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",  # Escrituras sin bloquear a los lectores y sin fsync por transacción
+    "PRAGMA synchronous=NORMAL",  # Seguro en modo WAL; fsync solo en los checkpoints
+    "PRAGMA cache_size=-16000",  # Caché de páginas de ~16 MB por conexión
+    "PRAGMA mmap_size=268435456",  # Lecturas mapeadas en memoria (256 MB)
+    "PRAGMA temp_store=MEMORY",  # Tablas temporales e índices de ORDER BY/GROUP BY en memoria
+)
+
+
+class PooledConnection:
+    """
+    Conexión prestada por el pool.
+
+    Delega todos los atributos en la conexión sqlite3 real. Al usarse con 'with'
+    confirma (o revierte si hubo una excepción) y devuelve la conexión al pool;
+    'close()' también la devuelve en lugar de cerrarla.
+    """
+    def __init__(self, pool, conn: sqlite3.Connection):
+        self._pool = pool
+        self._conn = conn
+
+    def _conexion_activa(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return self._conn
+
+    def __getattr__(self, name):
+        return getattr(self._conexion_activa(), name)
+
+    def __enter__(self):
+        self._conexion_activa()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if self._conn is not None:
+                if exc_type is None:
+                    self.commit()
+                else:
+                    self.rollback()
+        finally:
+            self.close()
+        return False
+
+    def close(self):
+        """
+        Devuelve la conexión al pool. Llamarlo más de una vez no tiene efecto.
+        """
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn)
+
+
+class ConexionTrazada(PooledConnection):
+    """
+    Conexión prestada con la traza SQL activa (ver traza_sql).
+
+    El set_trace_callback de SQLite marca dónde empieza cada sentencia; la conexión suma
+    a la sentencia en curso solo el tiempo que pasa dentro de SQLite (execute*, fetch* y
+    commit/rollback, también los de sus cursores), no el que el llamador usa entre una
+    lectura y otra. Una sentencia se registra cuando empieza la siguiente o cuando la
+    conexión vuelve al pool.
+    """
+    def __init__(self, pool, conn: sqlite3.Connection):
+        super().__init__(pool, conn)
+        self._sentencia: Optional[str] = None  # Texto de la sentencia en curso, como lo informa SQLite
+        self._duracion = 0.0
+        self._parametros = 0
+        self._llamador = ""
+        self._llamada = 0  # Cuenta las llamadas a execute*/commit/rollback
+        self._llamada_sentencia = 0  # Llamada en la que empezó la sentencia en curso
+        self._contexto = (0, "")  # (parámetros, llamador) de la última llamada
+        self._desde: Optional[float] = None  # Entrada a SQLite de la llamada en curso
+        conn.set_trace_callback(self._al_empezar_sentencia)
+
+    def _al_empezar_sentencia(self, sql: str):
+        ahora = time.perf_counter()
+        # Los disparadores repiten el texto de la sentencia que los dispara: es la misma ejecución
+        if sql == self._sentencia and self._llamada == self._llamada_sentencia:
+            return
+        # Si la sentencia anterior es de esta misma llamada, el tiempo hasta aquí es suyo; si es
+        # de una llamada anterior, el tiempo desde la entrada a SQLite es de la nueva (la prepara)
+        if self._desde is not None and self._sentencia is not None and self._llamada_sentencia == self._llamada:
+            self._duracion += ahora - self._desde
+            self._desde = ahora
+        self._registrar_sentencia()
+        self._sentencia, self._llamada_sentencia = sql, self._llamada
+        self._parametros, self._llamador = self._contexto
+
+    def _registrar_sentencia(self):
+        if self._sentencia is not None:
+            traza_sql.registrar_ejecucion(self._sentencia, self._parametros, self._duracion, self._llamador)
+            self._sentencia = None
+            self._duracion = 0.0
+
+    def _en_sqlite(self, funcion: Callable, *args, parametros: Optional[int] = None) -> Any:
+        """
+        Llama a una función de sqlite3 sumando su tiempo a la sentencia en curso.
+
+        Args:
+            funcion (Callable): Método de la conexión o de un cursor.
+            parametros (Optional[int]): En execute*, commit y rollback, la cantidad de parámetros:
+                empieza una llamada nueva y se toma su llamador. Por defecto es None (fetch*).
+        """
+        if parametros is not None:
+            self._llamada += 1
+            self._contexto = (parametros, traza_sql.llamador())
+        self._desde = time.perf_counter()
+        try:
+            return funcion(*args)
+        finally:
+            if self._sentencia is not None:
+                self._duracion += time.perf_counter() - self._desde
+            self._desde = None
+
+    def cursor(self) -> "CursorTrazado":
+        return CursorTrazado(self, self._conexion_activa().cursor())
+
+    def execute(self, sql: str, parametros: Sequence = ()) -> "CursorTrazado":
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql: str, filas: Iterable[Sequence]) -> "CursorTrazado":
+        return self.cursor().executemany(sql, filas)
+
+    def executescript(self, script: str) -> "CursorTrazado":
+        return self.cursor().executescript(script)
+
+    def commit(self):
+        self._en_sqlite(self._conexion_activa().commit, parametros=0)
+
+    def rollback(self):
+        self._en_sqlite(self._conexion_activa().rollback, parametros=0)
+
+    def close(self):
+        if self._conn is not None:
+            self._registrar_sentencia()
+            self._conn.set_trace_callback(None)
+        super().close()
+
+
+class CursorTrazado:
     """
-    Crea y retorna una conexión a la base de datos SQLite.
+    Cursor de una ConexionTrazada: delega en el cursor sqlite3 real y mide sus llamadas.
+    """
+    def __init__(self, conexion: ConexionTrazada, cursor: sqlite3.Cursor):
+        self._conexion = conexion
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, sql: str, parametros: Sequence = ()) -> "CursorTrazado":
+        self._conexion._en_sqlite(self._cursor.execute, sql, parametros, parametros=len(parametros))
+        return self
+
+    def executemany(self, sql: str, filas: Iterable[Sequence]) -> "CursorTrazado":
+        filas = iter(filas)
+        primera = next(filas, None)
+        filas = itertools.chain([primera], filas) if primera is not None else ()
+        self._conexion._en_sqlite(self._cursor.executemany, sql, filas,
+                                  parametros=len(primera) if primera is not None else 0)
+        return self
+
+    def executescript(self, script: str) -> "CursorTrazado":
+        self._conexion._en_sqlite(self._cursor.executescript, script, parametros=0)
+        return self
+
+    def fetchone(self):
+        return self._conexion._en_sqlite(self._cursor.fetchone)
+
+    def fetchmany(self, size: Optional[int] = None):
+        if size is None:
+            return self._conexion._en_sqlite(self._cursor.fetchmany)
+        return self._conexion._en_sqlite(self._cursor.fetchmany, size)
+
+    def fetchall(self):
+        return self._conexion._en_sqlite(self._cursor.fetchall)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._conexion._en_sqlite(self._cursor.__next__)
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones SQLite reutilizables para todo el proceso.
+
+    Las conexiones se crean bajo demanda con los PRAGMAs de rendimiento aplicados
+    y, al devolverse, se conservan hasta 'size' conexiones inactivas. Una conexión
+    prestada pertenece a un único hilo hasta que se devuelve, por lo que se abren
+    con check_same_thread=False para poder reutilizarlas desde los hilos de Flet.
+    """
+    def __init__(self, path: str = DB_PATH, size: int = POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = deque()
+        self._lock = threading.Lock()
+
+    def _new_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        """
+        Presta una conexión del pool, creando una nueva si no hay inactivas.
+
+        Returns:
+            PooledConnection: Conexión prestada.
+        """
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._new_connection()
+        if traza_sql.traza_activa():
+            return ConexionTrazada(self, conn)
+        return PooledConnection(self, conn)
+
+    def release(self, conn: sqlite3.Connection):
+        """
+        Recibe una conexión devuelta. Revierte cualquier transacción pendiente y
+        la conserva si hay espacio; si no, la cierra.
+
+        Args:
+            conn (sqlite3.Connection): Conexión a devolver.
+        """
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+        except sqlite3.Error:
+            conn.close()
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self):
+        """
+        Cierra todas las conexiones inactivas del pool.
+        """
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            conn.close()
+
+
+_pool = ConnectionPool()
+atexit.register(_pool.close_all)
+
+def create_connection() -> PooledConnection:
+    """
+    Presta una conexión del pool de la base de datos SQLite.
+
+    La conexión debe devolverse usando 'with create_connection() as conn:' (que
+    además confirma o revierte la transacción) o llamando a 'conn.close()'.
 
     Returns:
-        sqlite3.Connection: Objeto de conexión a la base de datos.
+        PooledConnection: Objeto de conexión a la base de datos.
+    """
+    return _pool.acquire()
+
+def close_all_connections():
+    """
+    Cierra las conexiones inactivas del pool (p. ej. antes de reemplazar el archivo de la base de datos).
     """
-    conn = sqlite3.connect('inventario.db')
-    return conn
+    _pool.close_all()
 
 def create_tables():
     """
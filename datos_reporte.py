@@ -0,0 +1,242 @@
+# datos_reporte.py
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from database import create_connection
+
+TAMANO_VENTANA = 50  # Filas que se leen por vez de una consulta paginada
+
+def formato_moneda(valor: Any) -> str:
+    """
+    Formatea un importe para mostrarlo; los importes desconocidos se muestran como "N/A".
+
+    Args:
+        valor (Any): Importe o None.
+
+    Returns:
+        str: Importe con el signo de pesos y dos decimales.
+    """
+    return f"${valor:.2f}" if valor is not None else "N/A"
+
+def formato_texto(valor: Any) -> str:
+    """
+    Formatea un valor cualquiera para mostrarlo.
+
+    Args:
+        valor (Any): Valor de la celda.
+
+    Returns:
+        str: Valor como texto ("" si es None).
+    """
+    return "" if valor is None else str(valor)
+
+class ConsultaPaginada:
+    """
+    Resultado de una consulta SQL que se lee por ventanas en lugar de cargarse completo.
+
+    'obtener' lee una ventana (para mostrar en pantalla) y la iteración recorre el
+    resultado completo con un cursor y fetchmany (para exportar), sin tener todas las
+    filas en memoria a la vez.
+
+    Con una clave de orden (columnas del resultado que no se repiten) las ventanas se
+    leen por clave: cada una sigue después de la última fila leída de la anterior
+    (WHERE (clave) > (?, ...)), así la ventana N no recorre las N-1 anteriores como con
+    OFFSET. Sin clave se usa LIMIT/OFFSET.
+    """
+    def __init__(self, query: str, params: Optional[List[Any]] = None, tamano_ventana: int = TAMANO_VENTANA,
+                 clave: Sequence[str] = ()):
+        """
+        Constructor de la clase ConsultaPaginada.
+
+        Args:
+            query (str): Consulta SQL sin LIMIT/OFFSET (ni ORDER BY si se indica la clave).
+            params (Optional[List[Any]]): Parámetros de la consulta. Por defecto es None.
+            tamano_ventana (int): Filas por lectura al iterar. Por defecto es TAMANO_VENTANA.
+            clave (Sequence[str]): Columnas del resultado que lo ordenan sin repetirse. Por defecto
+                es () (la consulta trae su propio ORDER BY y se pagina con OFFSET).
+        """
+        self.clave = tuple(clave)
+        self._query_base = query
+        self.query = f"SELECT * FROM ({query}) ORDER BY {', '.join(self.clave)}" if self.clave else query
+        self.params = list(params or [])
+        self.tamano_ventana = tamano_ventana
+        # Clave de la fila anterior a cada posición donde terminó una ventana ya leída
+        self._claves: Dict[int, Tuple] = {}
+        self._indices_clave: Optional[List[int]] = None
+
+    def obtener(self, desplazamiento: int, limite: int) -> List[Tuple]:
+        """
+        Lee una ventana del resultado.
+
+        Args:
+            desplazamiento (int): Filas a saltar.
+            limite (int): Cantidad máxima de filas.
+
+        Returns:
+            List[Tuple]: Filas de la ventana.
+        """
+        if not self.clave:
+            with create_connection() as conn:
+                return conn.execute(f"{self.query} LIMIT ? OFFSET ?", self.params + [limite, desplazamiento]).fetchall()
+
+        # Se continúa desde la posición conocida más cercana: al desplazarse, la misma en que
+        # terminó la ventana anterior; la lista pide una fila de más, por eso también se guarda
+        # la clave de la anteúltima fila
+        inicio = max((posicion for posicion in self._claves if posicion <= desplazamiento), default=0)
+        columnas = ", ".join(self.clave)
+        condicion, valores = "", []
+        if inicio:
+            condicion = f"WHERE ({columnas}) > ({', '.join('?' * len(self.clave))})"
+            valores = list(self._claves[inicio])
+        with create_connection() as conn:
+            cursor = conn.execute(
+                f"SELECT * FROM ({self._query_base}) {condicion} ORDER BY {columnas} LIMIT ? OFFSET ?",
+                self.params + valores + [limite, desplazamiento - inicio]
+            )
+            filas = cursor.fetchall()
+        if self._indices_clave is None:
+            nombres = [descripcion[0] for descripcion in cursor.description]
+            self._indices_clave = [nombres.index(columna) for columna in self.clave]
+        for posicion in range(max(0, len(filas) - 2), len(filas)):
+            self._claves[desplazamiento + posicion + 1] = tuple(filas[posicion][i] for i in self._indices_clave)
+        return filas
+
+    def contar(self) -> int:
+        """
+        Cuenta las filas del resultado sin leerlas.
+
+        Returns:
+            int: Cantidad de filas.
+        """
+        with create_connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM ({self.query})", self.params).fetchone()[0]
+
+    def lotes(self, tamano: Optional[int] = None) -> Iterator[List[Tuple]]:
+        """
+        Recorre el resultado completo en lotes leídos con fetchmany, con un solo cursor abierto.
+
+        Args:
+            tamano (Optional[int]): Filas por lote. Por defecto es 'tamano_ventana'.
+
+        Yields:
+            List[Tuple]: Lote de filas.
+        """
+        with create_connection() as conn:
+            cursor = conn.execute(self.query, self.params)
+            while True:
+                filas = cursor.fetchmany(tamano or self.tamano_ventana)
+                if not filas:
+                    break
+                yield filas
+
+    def __iter__(self) -> Iterator[Tuple]:
+        for lote in self.lotes():
+            yield from lote
+
+@dataclass
+class ColumnaReporte:
+    """
+    Columna de un reporte: encabezado y forma de mostrar sus valores.
+    """
+    titulo: str
+    formato: Callable[[Any], str] = formato_texto
+
+class DatosReporte:
+    """
+    Modelo de datos de un reporte: las columnas y las filas, en el mismo orden.
+
+    Las filas son las tuplas tal como las devuelve la base de datos (números como
+    números, fechas como texto), no controles de la interfaz. La pantalla las lee por
+    ventanas con 'obtener' y las exportaciones las recorren completas iterando, por lo
+    que un reporte se puede exportar sin mostrarlo ni crear controles de Flet. Las
+    columnas que la consulta trae de más al final (p. ej. la clave de orden de una
+    ConsultaPaginada) se descartan.
+    """
+    def __init__(self, columnas: Sequence[ColumnaReporte], filas: Union[ConsultaPaginada, Iterable[Tuple]]):
+        """
+        Constructor de la clase DatosReporte.
+
+        Args:
+            columnas (Sequence[ColumnaReporte]): Columnas del reporte.
+            filas (Union[ConsultaPaginada, Iterable[Tuple]]): Filas del reporte, con un valor por columna.
+        """
+        self.columnas = list(columnas)
+        self.filas = filas
+
+    @property
+    def encabezados(self) -> List[str]:
+        """
+        Encabezados de las columnas.
+        """
+        return [columna.titulo for columna in self.columnas]
+
+    def obtener(self, desplazamiento: int, limite: int) -> List[Tuple]:
+        """
+        Lee una ventana de filas.
+
+        Args:
+            desplazamiento (int): Filas a saltar.
+            limite (int): Cantidad máxima de filas.
+
+        Returns:
+            List[Tuple]: Filas de la ventana.
+        """
+        if isinstance(self.filas, ConsultaPaginada):
+            return self._recortar(self.filas.obtener(desplazamiento, limite))
+        return list(self.filas[desplazamiento:desplazamiento + limite])
+
+    def _recortar(self, filas: List[Tuple]) -> List[Tuple]:
+        """
+        Deja en cada fila solo las columnas del reporte.
+        """
+        ancho = len(self.columnas)
+        return [fila[:ancho] for fila in filas] if filas and len(filas[0]) > ancho else filas
+
+    def formatear(self, fila: Tuple) -> List[str]:
+        """
+        Convierte una fila en los textos que se muestran (pantalla y PDF).
+
+        Args:
+            fila (Tuple): Fila del reporte.
+
+        Returns:
+            List[str]: Un texto por columna.
+        """
+        return [columna.formato(valor) for columna, valor in zip(self.columnas, fila)]
+
+    def contar(self) -> Optional[int]:
+        """
+        Cuenta las filas del reporte, si se puede saber sin recorrerlas.
+
+        Returns:
+            Optional[int]: Cantidad de filas, o None si las filas vienen de un iterador.
+        """
+        if isinstance(self.filas, ConsultaPaginada):
+            return self.filas.contar()
+        return len(self.filas) if isinstance(self.filas, Sequence) else None
+
+    def lotes(self, tamano: int) -> Iterator[List[Tuple]]:
+        """
+        Recorre todas las filas en lotes.
+
+        Args:
+            tamano (int): Filas por lote.
+
+        Yields:
+            List[Tuple]: Lote de filas.
+        """
+        if isinstance(self.filas, ConsultaPaginada):
+            for lote in self.filas.lotes(tamano):
+                yield self._recortar(lote)
+            return
+        filas = iter(self.filas)
+        while True:
+            lote = list(islice(filas, tamano))
+            if not lote:
+                break
+            yield lote
+
+    def __iter__(self) -> Iterator[Tuple]:
+        if isinstance(self.filas, ConsultaPaginada):
+            return (fila for lote in self.lotes(self.filas.tamano_ventana) for fila in lote)
+        return iter(self.filas)
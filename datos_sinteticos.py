@@ -0,0 +1,186 @@
+# datos_sinteticos.py
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from database import create_connection, create_tables
+from migraciones import aplicar_migraciones
+from models import Cliente, Compra, Devolucion, Factura, Producto, Proveedor
+from exportacion import Progreso
+
+# Módulo sin Flet: llena la base de datos con datos inventados para medir el rendimiento
+# (ver benchmark.py). Todo se escribe con los modelos (Factura.registrar_venta,
+# Compra.registrar_compra, Devolucion.registrar_devolucion), así el stock, los resúmenes
+# diarios, las secuencias de facturas y los índices de búsqueda quedan como en el uso real.
+
+STOCK_INICIAL = 1_000_000  # Stock de cada producto, para que ninguna venta se rechace
+LOTE_ENTIDADES = 1000  # Productos, clientes o proveedores que se guardan por transacción
+MAXIMO_DIAS_DEVOLUCION = 15  # Días después de la venta en los que puede llegar una devolución
+
+# Palabras con las que se arman los nombres (variados, para que la búsqueda no sea trivial)
+ARTICULOS = ("Tornillo", "Tuerca", "Arandela", "Clavo", "Bisagra", "Cable", "Lámpara", "Pintura", "Cinta",
+             "Llave", "Tubo", "Codo", "Válvula", "Brocha", "Rodillo", "Candado", "Manguera", "Enchufe")
+MATERIALES = ("acero", "bronce", "plástico", "aluminio", "cobre", "madera", "PVC", "galvanizado")
+NOMBRES = ("Ana", "Luis", "María", "José", "Carmen", "Pedro", "Rosa", "Jorge", "Elena", "Carlos", "Lucía", "Miguel")
+APELLIDOS = ("Pérez", "González", "Rodríguez", "Hernández", "García", "Martínez", "López", "Díaz", "Torres", "Rivas")
+RUBROS = ("Distribuidora", "Ferretería", "Importadora", "Suministros", "Comercial", "Industrias")
+
+@dataclass
+class VolumenesSinteticos:
+    """
+    Cantidades de datos a generar.
+
+    Attributes:
+        productos (int): Productos del catálogo.
+        clientes (int): Clientes.
+        proveedores (int): Proveedores.
+        anios (int): Años de movimientos, hasta la fecha final.
+        ventas_por_dia (int): Facturas por día, en promedio.
+        lineas_por_venta (int): Líneas como máximo por factura.
+        compras_por_dia (int): Compras por día, en promedio.
+        lineas_por_compra (int): Productos como máximo por compra.
+        porcentaje_devoluciones (float): Porcentaje de facturas con una devolución.
+        semilla (int): Semilla de los números aleatorios (los mismos volúmenes y semilla dan los mismos datos).
+    """
+    productos: int = 2000
+    clientes: int = 1000
+    proveedores: int = 100
+    anios: int = 3
+    ventas_por_dia: int = 20
+    lineas_por_venta: int = 8
+    compras_por_dia: int = 3
+    lineas_por_compra: int = 10
+    porcentaje_devoluciones: float = 2.0
+    semilla: int = 1
+
+    def validar(self):
+        """
+        Raises:
+            ValueError: Si alguna cantidad no es válida.
+        """
+        if min(self.productos, self.clientes, self.proveedores, self.anios, self.lineas_por_venta,
+               self.lineas_por_compra) < 1:
+            raise ValueError("Los productos, clientes, proveedores, años y líneas deben ser al menos 1.")
+        if min(self.ventas_por_dia, self.compras_por_dia) < 0:
+            raise ValueError("Las ventas y compras por día no pueden ser negativas.")
+        if not 0 <= self.porcentaje_devoluciones <= 100:
+            raise ValueError("El porcentaje de devoluciones debe estar entre 0 y 100.")
+
+def _guardar_en_lotes(entidades: List) -> List[int]:
+    """
+    Guarda productos, clientes o proveedores en transacciones de LOTE_ENTIDADES.
+
+    Returns:
+        List[int]: IDs asignados.
+    """
+    for inicio in range(0, len(entidades), LOTE_ENTIDADES):
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            for entidad in entidades[inicio:inicio + LOTE_ENTIDADES]:
+                entidad.save(cursor)
+    return [entidad.id for entidad in entidades]
+
+def _telefono(azar: random.Random) -> str:
+    return f"0{azar.choice((412, 414, 416, 424, 426))}-{azar.randint(1000000, 9999999)}"
+
+def _cantidad_del_dia(azar: random.Random, promedio: int) -> int:
+    """
+    Cantidad de movimientos de un día: entre la mitad y una vez y media del promedio.
+    """
+    return azar.randint(promedio // 2, promedio + promedio // 2) if promedio else 0
+
+def base_vacia() -> bool:
+    """
+    Indica si la base de datos no tiene productos, clientes ni facturas.
+    """
+    with create_connection() as conn:
+        return not any(conn.execute(f"SELECT EXISTS (SELECT 1 FROM {tabla})").fetchone()[0]
+                       for tabla in ("Productos", "Clientes", "Facturas"))
+
+def contar_registros() -> Dict[str, int]:
+    """
+    Cuenta las filas de las tablas de datos.
+
+    Returns:
+        Dict[str, int]: Filas por tabla.
+    """
+    with create_connection() as conn:
+        return {tabla: conn.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+                for tabla in ("Productos", "Clientes", "Proveedores", "Facturas", "FacturaLineas", "Compras",
+                              "Devoluciones")}
+
+def generar_datos(volumenes: VolumenesSinteticos, hasta: Optional[date] = None,
+                  progreso: Optional[Progreso] = None) -> Dict[str, int]:
+    """
+    Crea las tablas si hace falta y las llena con datos inventados. La base debe estar vacía.
+
+    Primero se guardan los productos, clientes y proveedores; después se recorren los días
+    y en cada uno se registran las compras, las ventas y las devoluciones de ventas anteriores.
+
+    Args:
+        volumenes (VolumenesSinteticos): Cantidades a generar.
+        hasta (Optional[date]): Último día con movimientos. Por defecto es hoy.
+        progreso (Optional[Progreso]): Se llama después de cada día con los días hechos y el total.
+
+    Returns:
+        Dict[str, int]: Filas por tabla al terminar (ver contar_registros).
+
+    Raises:
+        ValueError: Si los volúmenes no son válidos o la base de datos ya tiene datos.
+    """
+    volumenes.validar()
+    create_tables()
+    aplicar_migraciones()
+    if not base_vacia():
+        raise ValueError("La base de datos ya tiene datos; los datos sintéticos se generan en una base vacía.")
+
+    azar = random.Random(volumenes.semilla)
+    productos = [Producto(f"{azar.choice(ARTICULOS)} {azar.choice(MATERIALES)} {numero}",
+                          f"Artículo de prueba {numero}", round(azar.uniform(1, 500), 2), STOCK_INICIAL)
+                 for numero in range(1, volumenes.productos + 1)]
+    producto_ids = _guardar_en_lotes(productos)
+    precios = {producto.id: producto.precio for producto in productos}
+    cliente_ids = _guardar_en_lotes([
+        Cliente(f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)} {numero}", _telefono(azar),
+                f"cliente{numero}@ejemplo.com")
+        for numero in range(1, volumenes.clientes + 1)])
+    proveedor_ids = _guardar_en_lotes([
+        Proveedor(f"{azar.choice(RUBROS)} {azar.choice(APELLIDOS)} {numero}", _telefono(azar),
+                  f"proveedor{numero}@ejemplo.com")
+        for numero in range(1, volumenes.proveedores + 1)])
+
+    hasta = hasta or date.today()
+    dias = volumenes.anios * 365
+    primer_dia = hasta - timedelta(days=dias - 1)
+    # Devoluciones pendientes por día: (factura_id, [(producto_id, cantidad)])
+    devoluciones: Dict[date, List[Tuple[str, List[Tuple[int, int]]]]] = {}
+
+    for numero_dia in range(dias):
+        dia = primer_dia + timedelta(days=numero_dia)
+        fecha = dia.isoformat()
+
+        for numero in range(_cantidad_del_dia(azar, volumenes.compras_por_dia)):
+            carrito = [(producto_id, "", azar.randint(10, 200), round(precios[producto_id] * azar.uniform(0.5, 0.8), 2))
+                       for producto_id in azar.sample(producto_ids,
+                                                      min(azar.randint(1, volumenes.lineas_por_compra), len(producto_ids)))]
+            Compra.registrar_compra(azar.choice(proveedor_ids), fecha, carrito, f"OC-{fecha}-{numero + 1}")
+
+        for _ in range(_cantidad_del_dia(azar, volumenes.ventas_por_dia)):
+            carrito = [(producto_id, "", azar.randint(1, 5), precios[producto_id])
+                       for producto_id in azar.sample(producto_ids,
+                                                      min(azar.randint(1, volumenes.lineas_por_venta), len(producto_ids)))]
+            factura = Factura.registrar_venta(azar.choice(cliente_ids), fecha, carrito,
+                                              azar.choice((0, 0, 0, 5, 10)), azar.choice((0, 0.16)))
+            if azar.random() * 100 < volumenes.porcentaje_devoluciones:
+                producto_id, _, cantidad, _ = azar.choice(carrito)
+                dia_devolucion = min(dia + timedelta(days=azar.randint(0, MAXIMO_DIAS_DEVOLUCION)), hasta)
+                devoluciones.setdefault(dia_devolucion, []).append(
+                    (factura.factura_id, [(producto_id, azar.randint(1, cantidad))]))
+
+        for factura_id, devueltos in devoluciones.pop(dia, []):
+            Devolucion.registrar_devolucion(factura_id, fecha, devueltos)
+
+        if progreso:
+            progreso(numero_dia + 1, dias)
+
+    return contar_registros()
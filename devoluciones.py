@@ -2,9 +2,23 @@
 import flet as ft
 from typing import List, Tuple, Optional
 from database import create_connection
-from models import Venta, Producto, Devolucion
+from models import Producto, Devolucion
 import datetime
-from libreria import BaseApp, FormField
+from libreria import BaseApp, FormField, ListaPaginada
+from busqueda import IndiceBusqueda
+
+# Consultas de la búsqueda de la factura a devolver
+QUERY_FACTURAS = """
+    SELECT f.factura_id, c.nombre
+    FROM Facturas f
+    JOIN Clientes c ON f.cliente_id = c.id
+"""
+QUERY_LINEAS_FACTURA = """
+    SELECT l.producto_id, p.nombre, l.cantidad, l.precio_unitario
+    FROM FacturaLineas l
+    JOIN Productos p ON l.producto_id = p.id
+    WHERE l.factura_id=?
+"""
 
 
 class DevolucionesApp(BaseApp):
@@ -23,11 +37,7 @@ class DevolucionesApp(BaseApp):
         """
         with create_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-            SELECT DISTINCT v.factura_id, c.nombre
-            FROM Ventas v
-            JOIN Clientes c ON v.cliente_id = c.id
-            """)
+            cursor.execute(QUERY_FACTURAS)
             facturas = cursor.fetchall()
 
         def filtrar_facturas(e):
@@ -36,10 +46,7 @@ class DevolucionesApp(BaseApp):
             :param e: Evento de cambio de texto en el campo de filtro.
             :return: None
             """
-            filtro = filtro_field.value.lower()
-            facturas_filtradas = [factura for factura in facturas if
-                                  filtro in factura[0].lower() or filtro in factura[1].lower()]
-            actualizar_lista_facturas(facturas_filtradas)
+            facturas_list.recargar(ventana_facturas(indice.buscar(filtro_field.value)))
 
         def seleccionar_factura(e):
             """
@@ -51,33 +58,36 @@ class DevolucionesApp(BaseApp):
             self.factura_seleccionada = factura_id
             self.mostrar_factura(factura_id)
 
-        def actualizar_lista_facturas(facturas_filtradas):
+        def crear_boton_factura(factura):
+            """
+            Crea el botón de una factura de la lista.
+            :param factura: Tupla (factura_id, nombre del cliente).
+            :return: Botón de la factura.
+            """
+            factura_id, cliente_nombre = factura
+            return ft.ElevatedButton(
+                content=ft.Column([
+                    ft.Row([
+                        ft.Text(f"Factura ID: ", color="blue"),
+                        ft.Text(f"{factura_id}", weight=ft.FontWeight.BOLD, color="white"),
+                        ft.Text(f"Cliente: ", color="blue"),
+                        ft.Text(f"{cliente_nombre}", weight=ft.FontWeight.BOLD, color="white")
+                    ], alignment=ft.MainAxisAlignment.CENTER),
+                ],
+                    alignment=ft.MainAxisAlignment.CENTER,
+                    horizontal_alignment=ft.CrossAxisAlignment.CENTER
+                ),
+                on_click=seleccionar_factura,
+                data=factura_id
+            )
+
+        def ventana_facturas(facturas_filtradas):
             """
-            Actualiza la lista de facturas filtradas.
+            Devuelve la función que lee una ventana de las facturas filtradas.
             :param facturas_filtradas: Lista de facturas filtradas.
-            :return: None
+            :return: Función (desplazamiento, límite) -> facturas.
             """
-            facturas_list.controls.clear()
-            for factura in facturas_filtradas:
-                factura_id, cliente_nombre = factura
-                facturas_list.controls.append(
-                    ft.ElevatedButton(
-                        content=ft.Column([
-                            ft.Row([
-                                ft.Text(f"Factura ID: ", color="blue"),
-                                ft.Text(f"{factura_id}", weight=ft.FontWeight.BOLD, color="white"),
-                                ft.Text(f"Cliente: ", color="blue"),
-                                ft.Text(f"{cliente_nombre}", weight=ft.FontWeight.BOLD, color="white")
-                            ], alignment=ft.MainAxisAlignment.CENTER),
-                        ],
-                            alignment=ft.MainAxisAlignment.CENTER,
-                            horizontal_alignment=ft.CrossAxisAlignment.CENTER
-                        ),
-                        on_click=seleccionar_factura,
-                        data=factura_id
-                    )
-                )
-            self.page.update()
+            return lambda desplazamiento, limite: facturas_filtradas[desplazamiento:desplazamiento + limite]
 
         self.page.controls.clear()
         self.page.add(ft.Text("Seleccionar Factura", size=24))
@@ -85,14 +95,13 @@ class DevolucionesApp(BaseApp):
         filtro_field = ft.TextField(label="Filtrar por ID o Nombre", on_change=filtrar_facturas, width=500,
                                     border_color=ft.colors.OUTLINE)
 
-        facturas_list = ft.ListView(expand=True, spacing=10, padding=20, auto_scroll=True)
-
-        actualizar_lista_facturas(facturas)
+        indice = IndiceBusqueda(facturas)
+        facturas_list = ListaPaginada(ventana_facturas(indice.buscar("")), crear_boton_factura, padding=20)
 
         self.page.add(
             filtro_field,
             ft.Container(
-                content=facturas_list,
+                content=facturas_list.control,
                 height=400,
                 width=600,
                 border=ft.border.all(1, ft.colors.OUTLINE),
@@ -110,7 +119,7 @@ class DevolucionesApp(BaseApp):
         """
         with create_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM Ventas WHERE factura_id=?", (factura_id,))
+            cursor.execute(QUERY_LINEAS_FACTURA, (factura_id,))
             detalles_factura = cursor.fetchall()
 
         def agregar_devolucion(e):
@@ -150,31 +159,23 @@ class DevolucionesApp(BaseApp):
         self.page.add(ft.Divider(height=20, color="transparent"))
 
         factura_content = ft.ListView(expand=True, spacing=10, padding=20, auto_scroll=True)
-        with create_connection() as conn:
-            cursor = conn.cursor()
-            for detalle in detalles_factura:
-                producto_id = detalle[2]
-                cantidad_vendida = detalle[3]
-                cursor.execute("SELECT nombre, precio FROM Productos WHERE id=?", (producto_id,))
-                producto_info = cursor.fetchone()
-                producto_nombre, precio = producto_info
-
-                producto_row = ft.Row([
-                    ft.Text(f"Nombre: ", color="blue"),
-                    ft.Text(f"{producto_nombre}", weight=ft.FontWeight.BOLD, color="white"),
-                    ft.Text(f"Cantidad Vendida: ", color="blue"),
-                    ft.Text(f"{cantidad_vendida}", weight=ft.FontWeight.BOLD, color="white"),
-                    ft.Text(f"Precio: $", color="blue"),
-                    ft.Text(f"{precio:.2f}", weight=ft.FontWeight.BOLD, color="white"),
-                    ft.TextField(label="Cantidad a Devolver", value=str(cantidad_vendida), width=100),
-                    ft.ElevatedButton(
-                        "Agregar al carrito",
-                        on_click=agregar_devolucion,
-                        data=(producto_id, producto_nombre, cantidad_vendida, precio)
-                    )
-                ])
-
-                factura_content.controls.append(producto_row)
+        for producto_id, producto_nombre, cantidad_vendida, precio in detalles_factura:
+            producto_row = ft.Row([
+                ft.Text(f"Nombre: ", color="blue"),
+                ft.Text(f"{producto_nombre}", weight=ft.FontWeight.BOLD, color="white"),
+                ft.Text(f"Cantidad Vendida: ", color="blue"),
+                ft.Text(f"{cantidad_vendida}", weight=ft.FontWeight.BOLD, color="white"),
+                ft.Text(f"Precio: $", color="blue"),
+                ft.Text(f"{precio:.2f}", weight=ft.FontWeight.BOLD, color="white"),
+                ft.TextField(label="Cantidad a Devolver", value=str(cantidad_vendida), width=100),
+                ft.ElevatedButton(
+                    "Agregar al carrito",
+                    on_click=agregar_devolucion,
+                    data=(producto_id, producto_nombre, cantidad_vendida, precio)
+                )
+            ])
+
+            factura_content.controls.append(producto_row)
 
         self.page.add(
             ft.Container(
@@ -202,10 +203,9 @@ class DevolucionesApp(BaseApp):
             cursor = conn.cursor()
             cursor.execute("""
             SELECT c.nombre
-            FROM Ventas v
-            JOIN Clientes c ON v.cliente_id = c.id
-            WHERE v.factura_id=?
-            LIMIT 1
+            FROM Facturas f
+            JOIN Clientes c ON f.cliente_id = c.id
+            WHERE f.factura_id=?
             """, (self.factura_seleccionada,))
             cliente_nombre = cursor.fetchone()[0]
 
@@ -247,45 +247,18 @@ class DevolucionesApp(BaseApp):
             self.mostrar_mensaje("Error: Seleccione una factura y al menos un producto para devolver", "red")
             return
 
-        with create_connection() as conn:
-            cursor = conn.cursor()
-            try:
-                cursor.execute("""
-                    SELECT cliente_id FROM Ventas WHERE factura_id = ?
-                """, (self.factura_seleccionada,))
-                cliente_id = cursor.fetchone()
-
-                if cliente_id is None:
-                    raise ValueError("Error: No se encontró el cliente asociado a la factura.")
-
-                cliente_id = cliente_id[0]
-
-                for producto_id, _, cantidad_devolver, _ in self.productos_a_devolver:
-                    cursor.execute("SELECT stock FROM Productos WHERE id=?", (producto_id,))
-                    stock_result = cursor.fetchone()
-
-                    if stock_result is None:
-                        raise ValueError(f"Error: Producto con ID {producto_id} no encontrado")
-
-                    stock = stock_result[0]
-                    nuevo_stock = stock + cantidad_devolver
-                    cursor.execute("UPDATE Productos SET stock = ? WHERE id = ?", (nuevo_stock, producto_id))
-
-                    fecha_devolucion = datetime.datetime.now().strftime("%Y-%m-%d")
-                    devolucion = Devolucion(self.factura_seleccionada, producto_id, cantidad_devolver, fecha_devolucion,
-                                            cliente_id)
-                    devolucion.save(cursor)
-
-                conn.commit()
-                self.mostrar_mensaje("Devolución finalizada con éxito", "green")
+        fecha_devolucion = datetime.datetime.now().strftime("%Y-%m-%d")
+        try:
+            Devolucion.registrar_devolucion(self.factura_seleccionada, fecha_devolucion,
+                                            [(producto_id, cantidad) for producto_id, _, cantidad, _ in self.productos_a_devolver])
+            self.mostrar_mensaje("Devolución finalizada con éxito", "green")
 
-                self.factura_seleccionada = None
-                self.productos_a_devolver = []
-                self.main_menu_callback()
+            self.factura_seleccionada = None
+            self.productos_a_devolver = []
+            self.main_menu_callback()
 
-            except Exception as e:
-                conn.rollback()
-                self.mostrar_mensaje(f"Error: {str(e)}", "red")
+        except Exception as e:
+            self.mostrar_mensaje(f"Error: {str(e)}", "red")
 
 
 def devoluciones_app(page: ft.Page, main_menu_callback):
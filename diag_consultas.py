@@ -0,0 +1,132 @@
+# diag_consultas.py
+import flet as ft
+from typing import Callable
+from libreria import BaseApp, ListaPaginada, BLUE_COLOR
+from datos_reporte import ColumnaReporte, DatosReporte
+from pantalla_diagnostico import formato_milisegundos
+import traza_sql
+
+# Constantes
+TITULO_CONSULTAS = "Consultas SQL"
+ORDENES = {
+    traza_sql.ORDEN_TOTAL: "Tiempo total",
+    traza_sql.ORDEN_MAXIMO: "Ejecución más lenta",
+    traza_sql.ORDEN_PROMEDIO: "Tiempo promedio",
+    traza_sql.ORDEN_EJECUCIONES: "Cantidad de ejecuciones",
+}
+COLUMNAS_CONSULTAS = [
+    ColumnaReporte("Sentencia"),
+    ColumnaReporte("Ejecuciones"),
+    ColumnaReporte("Total", formato_milisegundos),
+    ColumnaReporte("Promedio", formato_milisegundos),
+    ColumnaReporte("Máximo", formato_milisegundos),
+    ColumnaReporte("Lentas"),
+    ColumnaReporte("Parámetros"),
+    ColumnaReporte("Llamadores", ", ".join),
+]
+
+class DiagnosticoConsultasApp(BaseApp):
+    """
+    Clase para activar la traza SQL (ver traza_sql) y mostrar las sentencias que más pesan.
+    """
+    def __init__(self, page: ft.Page, main_menu_callback: Callable[[], None]):
+        super().__init__(page, main_menu_callback)
+        self.orden = traza_sql.ORDEN_TOTAL
+
+    def datos_consultas(self) -> DatosReporte:
+        """
+        Arma el reporte de las sentencias registradas, en el orden elegido.
+        :return: Columnas y filas del reporte.
+        """
+        filas = [(estadistica.sql, estadistica.ejecuciones, estadistica.total, estadistica.promedio,
+                  estadistica.maximo, estadistica.lentas, estadistica.parametros,
+                  estadistica.llamadores_principales())
+                 for estadistica in traza_sql.sentencias_mayores(self.orden)]
+        return DatosReporte(COLUMNAS_CONSULTAS, filas)
+
+    def cambiar_traza(self, _):
+        """
+        Activa o desactiva la traza de las conexiones que se presten a partir de ahora.
+        :return: None
+        """
+        if traza_sql.traza_activa():
+            traza_sql.desactivar_traza()
+        else:
+            traza_sql.activar_traza()
+        self.mostrar_consultas()
+
+    def guardar_estadisticas(self, _):
+        """
+        Guarda las estadísticas en el archivo JSON.
+        :return: None
+        """
+        try:
+            ruta = traza_sql.guardar_estadisticas()
+            self.mostrar_mensaje(f"Estadísticas guardadas en {ruta}", "green")
+        except OSError as e:
+            self.mostrar_mensaje(f"Error al guardar las estadísticas: {str(e)}", "red")
+
+    def vaciar_estadisticas(self, _):
+        """
+        Borra las estadísticas acumuladas.
+        :return: None
+        """
+        traza_sql.vaciar_estadisticas()
+        self.mostrar_consultas()
+
+    def mostrar_consultas(self):
+        """
+        Muestra el estado de la traza y las sentencias registradas.
+        :return: None
+        """
+        def cambiar_orden(e):
+            self.orden = e.control.value
+            self.mostrar_consultas()
+
+        activa = traza_sql.traza_activa()
+        datos = self.datos_consultas()
+
+        self.page.controls.clear()
+        self.page.add(ft.Text(TITULO_CONSULTAS, size=24, text_align=ft.TextAlign.CENTER))
+        self.page.add(ft.Divider(height=20, color="transparent"))
+        self.page.add(ft.Row([
+            ft.Text("Traza:", weight=ft.FontWeight.BOLD, color=BLUE_COLOR),
+            ft.Text("Activa" if activa else "Inactiva"),
+            ft.ElevatedButton("Desactivar Traza" if activa else "Activar Traza", on_click=self.cambiar_traza),
+        ], alignment=ft.MainAxisAlignment.CENTER))
+        self.page.add(ft.Row([
+            ft.Text("Consultas lentas:", weight=ft.FontWeight.BOLD, color=BLUE_COLOR),
+            ft.Text(f"más de {formato_milisegundos(traza_sql.UMBRAL_CONSULTA_LENTA)} en "
+                    f"{traza_sql.ARCHIVO_CONSULTAS_LENTAS}"),
+        ], alignment=ft.MainAxisAlignment.CENTER))
+        self.page.add(ft.Row([
+            ft.Dropdown(label="Ordenar por", value=self.orden, width=250, on_change=cambiar_orden,
+                        options=[ft.dropdown.Option(clave, texto) for clave, texto in ORDENES.items()])
+        ], alignment=ft.MainAxisAlignment.CENTER))
+
+        if datos.filas:
+            lista = ListaPaginada(datos.obtener, lambda fila: self._crear_fila_reporte(datos, fila))
+            self.page.add(ft.Container(content=lista.control, expand=True))
+        else:
+            self.page.add(ft.Text("Todavía no hay consultas registradas." if activa else
+                                  f"Active la traza aquí o inicie la aplicación con '{traza_sql.OPCION_TRAZA}' "
+                                  f"o con la variable de entorno {traza_sql.VARIABLE_TRAZA}=1.",
+                                  text_align=ft.TextAlign.CENTER))
+
+        self.page.add(ft.Row([
+            ft.ElevatedButton("Actualizar", on_click=lambda _: self.mostrar_consultas()),
+            ft.ElevatedButton("Guardar Estadísticas", on_click=self.guardar_estadisticas),
+            ft.ElevatedButton("Vaciar Estadísticas", on_click=self.vaciar_estadisticas),
+            ft.ElevatedButton("Volver", on_click=lambda _: self.main_menu_callback()),
+        ], alignment=ft.MainAxisAlignment.CENTER))
+        self.page.update()
+
+def diag_consultas_app(page: ft.Page, main_menu_callback: Callable[[], None]):
+    """
+    Crea una instancia de la aplicación de consultas SQL y la ejecuta.
+    :param page: La página de la interfaz de usuario.
+    :param main_menu_callback: La función de devolución de llamada para volver al menú anterior.
+    :return: None
+    """
+    app = DiagnosticoConsultasApp(page, main_menu_callback)
+    app.mostrar_consultas()
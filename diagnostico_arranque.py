@@ -0,0 +1,275 @@
+# diagnostico_arranque.py
+import time
+INICIO_ARRANQUE = time.perf_counter()  # main.py importa este módulo antes que cualquier otro
+
+import importlib.abc
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Módulo sin Flet y solo con la biblioteca estándar: main.py lo importa primero para
+# tomar el momento de inicio y, en modo diagnóstico, cronometrar las importaciones
+# que vienen después.
+#
+# Siempre se registran las etapas del arranque (marcar_etapa) y el informe se guarda
+# en ARCHIVO_TIEMPOS_ARRANQUE. El modo diagnóstico se activa con 'main.py --diagnostico'
+# o con la variable de entorno VCI_DIAGNOSTICO=1; además mide cada módulo importado y
+# las operaciones del arranque (medir), y guarda todo en ARCHIVO_DIAGNOSTICO (JSON),
+# que se consulta desde Mantenimiento > Diagnóstico de Arranque.
+
+OPCION_DIAGNOSTICO = "--diagnostico"
+VARIABLE_DIAGNOSTICO = "VCI_DIAGNOSTICO"
+ARCHIVO_TIEMPOS_ARRANQUE = "tiempos_arranque.txt"
+ARCHIVO_DIAGNOSTICO = "diagnostico_arranque.json"
+VERSION_DIAGNOSTICO = 1  # Cambia si cambia la estructura del JSON
+
+# Operaciones del arranque que se miden
+OPERACION_CREATE_TABLES = "database.create_tables"
+OPERACION_MIGRACIONES = "migraciones.aplicar_migraciones"
+OPERACION_PASSWORD_APP = "password.password_app"
+OPERACION_CARGAR_CREDENCIALES = "usuarios.cargar_credenciales"
+MOMENTO_PRIMER_PAGE_UPDATE = "primer page.update()"
+
+class _CargadorCronometrado(importlib.abc.Loader):
+    """
+    Envuelve el cargador de un módulo para medir cuánto tarda en crearse y ejecutarse.
+    """
+    def __init__(self, cargador: importlib.abc.Loader, cronometro: "_CronometroImportaciones"):
+        self._cargador = cargador
+        self._cronometro = cronometro
+
+    def create_module(self, spec):
+        # En los módulos de extensión (.pyd/.so) la carga ocurre aquí
+        with self._cronometro.midiendo(spec.name):
+            return self._cargador.create_module(spec)
+
+    def exec_module(self, modulo):
+        # El módulo queda con su cargador original (lo usan pkgutil, importlib.resources, etc.)
+        modulo.__loader__ = self._cargador
+        if getattr(modulo, "__spec__", None) is not None:
+            modulo.__spec__.loader = self._cargador
+        with self._cronometro.midiendo(modulo.__name__):
+            self._cargador.exec_module(modulo)
+
+    def __getattr__(self, nombre: str) -> Any:
+        return getattr(self._cargador, nombre)
+
+class _CronometroImportaciones(importlib.abc.MetaPathFinder):
+    """
+    Buscador que se pone primero en sys.meta_path: deja que los demás encuentren cada
+    módulo y envuelve su cargador para cronometrarlo.
+
+    Por módulo se guarda el tiempo acumulado (incluye los módulos que importa) y el
+    propio (sin ellos), como 'python -X importtime', pero sin tener que lanzar el
+    intérprete con esa opción (el ejecutable compilado no la admite).
+    """
+    def __init__(self):
+        self.tiempos: Dict[str, List[float]] = {}  # Módulo -> [acumulado, propio]
+        self._local = threading.local()  # Pila de tiempos de los hijos, por hilo
+        self._lock = threading.Lock()
+
+    def find_spec(self, nombre: str, ruta: Optional[Sequence[str]], objetivo=None):
+        for buscador in sys.meta_path:
+            if buscador is self or not hasattr(buscador, "find_spec"):
+                continue
+            spec = buscador.find_spec(nombre, ruta, objetivo)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _CargadorCronometrado(spec.loader, self)
+            return spec
+        return None
+
+    @contextmanager
+    def midiendo(self, modulo: str) -> Iterator[None]:
+        """
+        Mide la carga de un módulo y descuenta de su tiempo propio el de los que importa.
+        """
+        pila = self._local.__dict__.setdefault("pila", [])
+        pila.append(0.0)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracion = time.perf_counter() - inicio
+            hijos = pila.pop()
+            if pila:
+                pila[-1] += duracion
+            with self._lock:
+                tiempos = self.tiempos.setdefault(modulo, [0.0, 0.0])
+                tiempos[0] += duracion
+                tiempos[1] += duracion - hijos
+
+# Estado del arranque actual
+_etapas: List[Tuple[str, float]] = []  # (nombre, momento en que terminó)
+_operaciones: Dict[str, float] = {}  # Operación -> segundos
+_momentos: Dict[str, float] = {}  # Momento -> segundos desde el inicio
+_cronometro: Optional[_CronometroImportaciones] = None
+
+def diagnostico_pedido(argumentos: Optional[Sequence[str]] = None, entorno: Optional[Dict[str, str]] = None) -> bool:
+    """
+    Indica si se pidió el modo diagnóstico por la línea de comandos o por la variable de entorno.
+
+    Args:
+        argumentos (Optional[Sequence[str]]): Argumentos de la línea de comandos. Por defecto es sys.argv.
+        entorno (Optional[Dict[str, str]]): Variables de entorno. Por defecto es os.environ.
+
+    Returns:
+        bool: True si se pidió el modo diagnóstico.
+    """
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    entorno = os.environ if entorno is None else entorno
+    valor = entorno.get(VARIABLE_DIAGNOSTICO, "").strip().lower()
+    return OPCION_DIAGNOSTICO in argumentos or valor not in ("", "0", "no", "false")
+
+def iniciar() -> None:
+    """
+    Activa el modo diagnóstico si se pidió: desde aquí se cronometra cada importación.
+    """
+    global _cronometro
+    if _cronometro is None and diagnostico_pedido():
+        _cronometro = _CronometroImportaciones()
+        sys.meta_path.insert(0, _cronometro)
+
+def diagnostico_activo() -> bool:
+    """
+    Indica si el modo diagnóstico está activo.
+    """
+    return _cronometro is not None
+
+def marcar_etapa(nombre: str) -> None:
+    """
+    Registra el fin de una etapa del arranque.
+
+    Args:
+        nombre (str): Nombre de la etapa.
+    """
+    _etapas.append((nombre, time.perf_counter()))
+
+def marcar_momento(nombre: str) -> None:
+    """
+    Registra, solo la primera vez, cuántos segundos pasaron desde el inicio hasta un momento del arranque.
+
+    Args:
+        nombre (str): Nombre del momento (p. ej. MOMENTO_PRIMER_PAGE_UPDATE).
+    """
+    _momentos.setdefault(nombre, time.perf_counter() - INICIO_ARRANQUE)
+
+@contextmanager
+def medir(operacion: str) -> Iterator[None]:
+    """
+    Mide una operación del arranque (solo la primera vez que se ejecuta).
+
+    Args:
+        operacion (str): Nombre de la operación (p. ej. OPERACION_CREATE_TABLES).
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _operaciones.setdefault(operacion, time.perf_counter() - inicio)
+
+def informe_arranque() -> str:
+    """
+    Arma el informe de tiempos del arranque: la duración de cada etapa y el total.
+
+    Returns:
+        str: El informe, una línea por etapa.
+    """
+    lineas = []
+    anterior = INICIO_ARRANQUE
+    for nombre, momento in _etapas:
+        lineas.append(f"{nombre}: {momento - anterior:.3f} s")
+        anterior = momento
+    lineas.append(f"Total hasta la pantalla de inicio de sesión: {anterior - INICIO_ARRANQUE:.3f} s")
+    return "\n".join(lineas)
+
+def datos_diagnostico() -> Dict[str, Any]:
+    """
+    Reúne los datos del diagnóstico del arranque actual.
+
+    Returns:
+        Dict[str, Any]: Datos con la estructura de ARCHIVO_DIAGNOSTICO.
+    """
+    etapas = []
+    anterior = INICIO_ARRANQUE
+    for nombre, momento in _etapas:
+        etapas.append({"nombre": nombre, "segundos": momento - anterior})
+        anterior = momento
+    tiempos = dict(_cronometro.tiempos) if _cronometro else {}
+    importaciones = [
+        {"modulo": modulo, "acumulado": acumulado, "propio": propio}
+        for modulo, (acumulado, propio) in sorted(tiempos.items(), key=lambda item: item[1][0], reverse=True)
+    ]
+    return {
+        "version": VERSION_DIAGNOSTICO,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "ejecutable": sys.executable,
+        "argumentos": sys.argv[1:],
+        "total_segundos": anterior - INICIO_ARRANQUE,
+        "etapas": etapas,
+        "operaciones": dict(_operaciones),
+        "momentos": dict(_momentos),
+        "importaciones": importaciones,
+    }
+
+def guardar_diagnostico(ruta: str = ARCHIVO_DIAGNOSTICO) -> str:
+    """
+    Escribe el diagnóstico en un archivo JSON (primero en un temporal, así una lectura
+    nunca encuentra el archivo a medio escribir).
+
+    Args:
+        ruta (str): Ruta del archivo. Por defecto es ARCHIVO_DIAGNOSTICO.
+
+    Returns:
+        str: Ruta del archivo.
+    """
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump(datos_diagnostico(), archivo, ensure_ascii=False, indent=2)
+    os.replace(temporal, ruta)
+    return ruta
+
+def leer_diagnostico(ruta: str = ARCHIVO_DIAGNOSTICO) -> Optional[Dict[str, Any]]:
+    """
+    Lee el último diagnóstico guardado.
+
+    Args:
+        ruta (str): Ruta del archivo. Por defecto es ARCHIVO_DIAGNOSTICO.
+
+    Returns:
+        Optional[Dict[str, Any]]: Los datos del diagnóstico, o None si todavía no se generó ninguno.
+
+    Raises:
+        ValueError: Si el archivo no es un diagnóstico válido.
+    """
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding="utf-8") as archivo:
+        datos = json.load(archivo)
+    if not isinstance(datos, dict) or datos.get("version") != VERSION_DIAGNOSTICO:
+        raise ValueError(f"El archivo {ruta} no es un diagnóstico de arranque válido")
+    return datos
+
+def finalizar_arranque() -> None:
+    """
+    Cierra el registro del arranque: muestra el informe en la consola y lo guarda en
+    ARCHIVO_TIEMPOS_ARRANQUE (el ejecutable compilado no tiene consola). En modo
+    diagnóstico deja de cronometrar las importaciones y guarda ARCHIVO_DIAGNOSTICO.
+    """
+    informe = informe_arranque()
+    print(informe)
+    try:
+        with open(ARCHIVO_TIEMPOS_ARRANQUE, 'w', encoding='utf-8') as archivo:
+            archivo.write(f"{datetime.now():%Y-%m-%d %H:%M:%S}\n{informe}\n")
+        if _cronometro is not None:
+            if _cronometro in sys.meta_path:
+                sys.meta_path.remove(_cronometro)
+            print(f"Diagnóstico de arranque guardado en {guardar_diagnostico()}")
+    except OSError as e:
+        print(f"Error al guardar los tiempos de arranque: {e}")
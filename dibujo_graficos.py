@@ -0,0 +1,205 @@
+# dibujo_graficos.py
+import io
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+from database import create_connection
+from artefacto_grafico import GraficoGenerado, TIPO_BARRAS, TIPO_LINEAS
+
+# Módulo sin Flet: sus funciones se ejecutan en los procesos del gestor de trabajos.
+# No usa pyplot: cada gráfico se dibuja en una Figure propia con su FigureCanvasAgg.
+# matplotlib se importa al crear la primera plantilla, no al importar el módulo.
+
+# Tamaño en pulgadas y márgenes fijos de cada tipo de gráfico. Los márgenes dejan lugar
+# a las etiquetas giradas del eje X, cortadas a LARGO_ETIQUETA caracteres, así no hace
+# falta tight_layout (que dibuja la figura una vez más solo para medirla).
+TAMANOS = {TIPO_BARRAS: (12, 6), TIPO_LINEAS: (10, 6)}
+MARGENES = {
+    TIPO_BARRAS: dict(left=0.08, right=0.98, top=0.93, bottom=0.36),
+    TIPO_LINEAS: dict(left=0.08, right=0.98, top=0.93, bottom=0.22),
+}
+LARGO_ETIQUETA = 24
+TAMANO_ETIQUETA = 9  # Puntos de las etiquetas del eje X
+
+class PlantillaGrafico:
+    """
+    Figura de un tipo de gráfico que se reutiliza entre dibujos: solo se limpian los
+    ejes, sin volver a crear la figura, el lienzo ni el renderizador.
+    """
+    def __init__(self, tipo: str):
+        """
+        Constructor de la clase PlantillaGrafico.
+
+        Args:
+            tipo (str): Tipo de gráfico (TIPO_BARRAS o TIPO_LINEAS).
+        """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.tipo = tipo
+        self.figura = Figure(figsize=TAMANOS[tipo])
+        self.lienzo = FigureCanvasAgg(self.figura)
+        self.ejes = self.figura.add_subplot()
+        self.figura.subplots_adjust(**MARGENES[tipo])
+
+    def png(self) -> bytes:
+        """
+        Dibuja la figura y la devuelve como PNG.
+
+        Returns:
+            bytes: La imagen PNG.
+        """
+        buffer = io.BytesIO()
+        self.figura.savefig(buffer, format='png')
+        return buffer.getvalue()
+
+class MotorGraficos:
+    """
+    Dibuja los gráficos sobre plantillas que se conservan calientes entre pedidos.
+
+    Cada tipo de gráfico tiene una lista de plantillas libres: un dibujo toma una (o
+    crea otra si están todas en uso) y la devuelve al terminar, así dos hilos nunca
+    dibujan sobre la misma figura y se puede llamar desde los hilos de trabajo.
+    """
+    def __init__(self):
+        self._libres: Dict[str, List[PlantillaGrafico]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def plantilla(self, tipo: str) -> Iterator[PlantillaGrafico]:
+        """
+        Presta una plantilla libre del tipo pedido con los ejes limpios.
+
+        Args:
+            tipo (str): Tipo de gráfico.
+
+        Yields:
+            PlantillaGrafico: Plantilla para dibujar.
+        """
+        with self._lock:
+            libres = self._libres.setdefault(tipo, [])
+            plantilla = libres.pop() if libres else None
+        if plantilla is None:
+            plantilla = PlantillaGrafico(tipo)
+        plantilla.ejes.clear()
+        try:
+            yield plantilla
+        finally:
+            with self._lock:
+                self._libres[tipo].append(plantilla)
+
+    def dibujar(self, tipo: str, titulo: str, etiqueta_x: str, etiqueta_y: str, color: str,
+                etiquetas: List[str], valores: List[float]) -> GraficoGenerado:
+        """
+        Dibuja un gráfico de barras o de líneas.
+
+        Args:
+            tipo (str): Tipo de gráfico (TIPO_BARRAS o TIPO_LINEAS).
+            titulo (str): Título del gráfico.
+            etiqueta_x (str): Etiqueta del eje X.
+            etiqueta_y (str): Etiqueta del eje Y.
+            color (str): Color de las barras o de la línea.
+            etiquetas (List[str]): Etiqueta de cada punto.
+            valores (List[float]): Valor de cada punto.
+
+        Returns:
+            GraficoGenerado: La imagen PNG y los datos del gráfico.
+        """
+        with self.plantilla(tipo) as plantilla:
+            ejes = plantilla.ejes
+            posiciones = range(len(valores))
+            if tipo == TIPO_BARRAS:
+                ejes.bar(posiciones, valores, color=color)
+            else:
+                ejes.plot(posiciones, valores, marker='o', color=color)
+            ejes.set_xticks(posiciones)
+            ejes.set_xticklabels([_cortar(etiqueta) for etiqueta in etiquetas], rotation=45, ha='right',
+                                 fontsize=TAMANO_ETIQUETA)
+            ejes.set_xlabel(etiqueta_x)
+            ejes.set_ylabel(etiqueta_y)
+            ejes.set_title(titulo)
+            png = plantilla.png()
+        return GraficoGenerado(tipo, titulo, etiqueta_x, etiqueta_y, color, etiquetas, valores, png)
+
+def _cortar(etiqueta: str) -> str:
+    """
+    Corta una etiqueta del eje X para que entre en el margen inferior.
+    """
+    return etiqueta if len(etiqueta) <= LARGO_ETIQUETA else etiqueta[:LARGO_ETIQUETA - 1] + "…"
+
+# Motor compartido por los trabajos de cada proceso (o hilo)
+_motor = MotorGraficos()
+
+def _leer_serie(query: str, params: Sequence[Any]) -> Tuple[List[str], List[float]]:
+    """
+    Ejecuta la consulta de un gráfico.
+
+    Args:
+        query (str): Consulta SQL que devuelve (etiqueta, valor) por punto.
+        params (Sequence[Any]): Parámetros de la consulta.
+
+    Returns:
+        Tuple[List[str], List[float]]: Etiquetas y valores.
+    """
+    with create_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, tuple(params))
+        filas = cursor.fetchall()
+    return [str(fila[0]) for fila in filas], [fila[1] or 0 for fila in filas]
+
+def dibujar_grafico_barras(query: str, params: Sequence[Any], titulo: str, etiqueta_x: str,
+                           etiqueta_y: str, color: str) -> GraficoGenerado:
+    """
+    Consulta los datos de un gráfico de barras y lo dibuja.
+
+    Args:
+        query (str): Consulta SQL que devuelve (nombre, total) por barra.
+        params (Sequence[Any]): Parámetros de la consulta.
+        titulo (str): Título del gráfico.
+        etiqueta_x (str): Etiqueta del eje X.
+        etiqueta_y (str): Etiqueta del eje Y.
+        color (str): Color de las barras.
+
+    Returns:
+        GraficoGenerado: La imagen PNG y los datos del gráfico.
+    """
+    nombres, totales = _leer_serie(query, params)
+    return _motor.dibujar(TIPO_BARRAS, titulo, etiqueta_x, etiqueta_y, color, nombres, totales)
+
+def dibujar_grafico_lineas(query: str, params: Sequence[Any], titulo: str, etiqueta_x: str,
+                           etiqueta_y: str, color: str = 'blue') -> GraficoGenerado:
+    """
+    Consulta los datos de un gráfico de líneas y lo dibuja.
+
+    Args:
+        query (str): Consulta SQL que devuelve (fecha, total) por punto.
+        params (Sequence[Any]): Parámetros de la consulta.
+        titulo (str): Título del gráfico.
+        etiqueta_x (str): Etiqueta del eje X.
+        etiqueta_y (str): Etiqueta del eje Y.
+        color (str): Color de la línea. Por defecto es 'blue'.
+
+    Returns:
+        GraficoGenerado: La imagen PNG y los datos del gráfico.
+    """
+    fechas, totales = _leer_serie(query, params)
+    return _motor.dibujar(TIPO_LINEAS, titulo, etiqueta_x, etiqueta_y, color, fechas, totales)
+
+def dibujar_serie(tipo: str, titulo: str, etiqueta_x: str, etiqueta_y: str, color: str,
+                  etiquetas: List[str], valores: List[float]) -> GraficoGenerado:
+    """
+    Dibuja un gráfico con datos ya calculados (p. ej. los del tablero), sin consultar la base.
+
+    Args:
+        tipo (str): Tipo de gráfico (TIPO_BARRAS o TIPO_LINEAS).
+        titulo (str): Título del gráfico.
+        etiqueta_x (str): Etiqueta del eje X.
+        etiqueta_y (str): Etiqueta del eje Y.
+        color (str): Color de las barras o de la línea.
+        etiquetas (List[str]): Etiqueta de cada punto.
+        valores (List[float]): Valor de cada punto.
+
+    Returns:
+        GraficoGenerado: La imagen PNG y los datos del gráfico.
+    """
+    return _motor.dibujar(tipo, titulo, etiqueta_x, etiqueta_y, color, etiquetas, valores)
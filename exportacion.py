@@ -0,0 +1,452 @@
+# exportacion.py
+import csv
+import gzip
+import os
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, List, Optional, Sequence, Tuple
+from datos_reporte import DatosReporte
+from artefacto_grafico import GraficoGenerado, TIPO_BARRAS
+
+# reportlab se importa dentro de las funciones que generan PDF: este módulo también lo usan
+# las exportaciones CSV y las pantallas de reportes, que así no cargan reportlab al abrirse.
+if TYPE_CHECKING:
+    from reportlab.graphics.shapes import Drawing
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.platypus import TableStyle
+
+FILAS_POR_LOTE = 1000  # Filas que se leen del cursor y se escriben por vez
+TAMANO_BUFFER = 1024 * 1024  # Bytes que se acumulan antes de escribir en el disco
+EXTENSION_GZIP = ".gz"
+
+# Página de los reportes PDF (mismas medidas que SimpleDocTemplate con carta y márgenes de 1")
+MARGEN_PDF = 72
+ALTURA_TITULO_PDF = 750
+FUENTE_PDF = 'Helvetica'
+FUENTE_ENCABEZADO_PDF = 'Helvetica-Bold'
+TAMANO_FUENTE_PDF = 7
+INTERLINEADO_PDF = 8
+RELLENO_CELDA_PDF = 3  # Relleno superior e inferior de las celdas (el inferior del encabezado es mayor)
+RELLENO_ENCABEZADO_PDF = 12
+RELLENO_LATERAL_PDF = 6
+
+# Gráficos en PDF: espacio para el título, las etiquetas giradas del eje X y las del eje Y
+MARGEN_GRAFICO_PDF = 60
+ALTO_ETIQUETAS_GRAFICO_PDF = 110
+LARGO_ETIQUETA_GRAFICO_PDF = 28  # Caracteres de una etiqueta del eje X antes de cortarla
+
+# Recibe (filas escritas, total de filas o None si no se conoce)
+Progreso = Callable[[int, Optional[int]], None]
+
+@contextmanager
+def _borrar_si_falla(ruta: str):
+    """
+    Borra el archivo a medio escribir si la exportación se interrumpe (error o cancelación).
+
+    Args:
+        ruta (str): Ruta del archivo.
+    """
+    try:
+        yield
+    except BaseException:
+        if os.path.exists(ruta):
+            os.remove(ruta)
+        raise
+
+def abrir_salida_csv(ruta: str, comprimir: bool = False):
+    """
+    Abre un archivo de texto para escribir un CSV, con buffer y opcionalmente comprimido con gzip.
+
+    Args:
+        ruta (str): Ruta del archivo.
+        comprimir (bool): Si es True se escribe comprimido con gzip. Por defecto es False.
+
+    Returns:
+        TextIO: Archivo abierto para escritura.
+    """
+    if comprimir:
+        return gzip.open(ruta, 'wt', newline='', encoding='utf-8')
+    return open(ruta, 'w', newline='', encoding='utf-8', buffering=TAMANO_BUFFER)
+
+def exportar_csv(datos: DatosReporte, ruta: str, comprimir: bool = False,
+                 progreso: Optional[Progreso] = None) -> int:
+    """
+    Escribe un reporte en un archivo CSV a medida que lo lee de la base de datos.
+
+    Las filas se leen del cursor en lotes de FILAS_POR_LOTE y se escriben enseguida,
+    por lo que la memoria usada no depende del tamaño del reporte. Los valores se
+    escriben sin formato (los importes como números).
+
+    Args:
+        datos (DatosReporte): Columnas y filas del reporte.
+        ruta (str): Ruta del archivo CSV.
+        comprimir (bool): Si es True se escribe comprimido con gzip. Por defecto es False.
+        progreso (Optional[Progreso]): Se llama después de cada lote con las filas escritas
+            y el total. Por defecto es None.
+
+    Returns:
+        int: Cantidad de filas escritas, sin contar los encabezados.
+    """
+    total = datos.contar() if progreso else None
+    escritas = 0
+    with _borrar_si_falla(ruta), abrir_salida_csv(ruta, comprimir) as archivo:
+        writer = csv.writer(archivo)
+        writer.writerow(datos.encabezados)
+        for lote in datos.lotes(FILAS_POR_LOTE):
+            writer.writerows(lote)
+            escritas += len(lote)
+            if progreso:
+                progreso(escritas, total)
+    return escritas
+
+@lru_cache(maxsize=None)
+def _estilo_tabla_pdf() -> "TableStyle":
+    """
+    Estilo de las tablas de los reportes PDF, armado una sola vez y compartido por todas
+    las páginas y reportes.
+    """
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), FUENTE_ENCABEZADO_PDF),
+        ('FONTNAME', (0, 1), (-1, -1), FUENTE_PDF),
+        ('FONTSIZE', (0, 0), (-1, -1), TAMANO_FUENTE_PDF),
+        ('LEADING', (0, 0), (-1, -1), INTERLINEADO_PDF),
+        ('TOPPADDING', (0, 0), (-1, -1), RELLENO_CELDA_PDF),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), RELLENO_CELDA_PDF),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), RELLENO_ENCABEZADO_PDF),
+        ('LEFTPADDING', (0, 0), (-1, -1), RELLENO_LATERAL_PDF),
+        ('RIGHTPADDING', (0, 0), (-1, -1), RELLENO_LATERAL_PDF),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ])
+
+def _dibujar_encabezado_pdf(canvas: "Canvas", titulo: str, pagina: int):
+    """
+    Dibuja el título del reporte y el número de página.
+
+    Args:
+        canvas (Canvas): Lienzo de la página.
+        titulo (str): Título del reporte.
+        pagina (int): Número de página.
+    """
+    from reportlab.lib.pagesizes import letter
+
+    canvas.saveState()
+    canvas.setFont('Helvetica-Bold', 16)
+    ancho, _ = letter
+    canvas.drawString((ancho - canvas.stringWidth(titulo, 'Helvetica-Bold', 16)) / 2, ALTURA_TITULO_PDF, titulo)
+    canvas.setFont('Times-Roman', 10)
+    canvas.drawRightString(ancho - 30, ALTURA_TITULO_PDF, f"Página {pagina}")
+    canvas.restoreState()
+
+def _ajustar_texto_pdf(texto: str, fuente: str, ancho: float, maximo_sin_medir: int) -> Tuple[str, int]:
+    """
+    Corta un texto en líneas que entren en el ancho de una columna.
+
+    Los textos cortos (la mayoría) se devuelven tal cual sin medirlos.
+
+    Args:
+        texto (str): Texto de la celda.
+        fuente (str): Fuente del texto.
+        ancho (float): Ancho disponible en puntos.
+        maximo_sin_medir (int): Largo hasta el cual el texto entra aunque sus caracteres sean los más anchos.
+
+    Returns:
+        Tuple[str, int]: Texto con saltos de línea y cantidad de líneas.
+    """
+    if len(texto) <= maximo_sin_medir:
+        return texto, 1
+    from reportlab.lib.utils import simpleSplit
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    if stringWidth(texto, fuente, TAMANO_FUENTE_PDF) <= ancho:
+        return texto, 1
+    lineas = simpleSplit(texto, fuente, TAMANO_FUENTE_PDF, ancho) or [texto]
+    return "\n".join(lineas), len(lineas)
+
+def exportar_pdf(datos: DatosReporte, ruta: str, titulo: str, progreso: Optional[Progreso] = None) -> int:
+    """
+    Escribe un reporte en un archivo PDF, página por página.
+
+    En lugar de una única tabla con todas las filas, cada página recibe su propia
+    tabla con las filas que entran en ella, se dibuja y se cierra antes de leer las
+    siguientes; así en memoria están las filas de una página y, hasta guardar el
+    archivo, solo el contenido ya comprimido de las anteriores. Las celdas son texto
+    simple (los textos largos se cortan en líneas de antemano, sin Paragraph), por lo
+    que el alto de cada fila se conoce sin que la tabla mida sus celdas, y el estilo
+    de la tabla se arma una sola vez.
+
+    Args:
+        datos (DatosReporte): Columnas y filas del reporte.
+        ruta (str): Ruta del archivo PDF.
+        titulo (str): Título que se muestra en cada página.
+        progreso (Optional[Progreso]): Se llama después de cada página con las filas escritas
+            y el total. Por defecto es None.
+
+    Returns:
+        int: Cantidad de filas escritas.
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.platypus import Table
+
+    ancho, _ = letter
+    ancho_util = ancho - 2 * MARGEN_PDF
+    tope_tabla = ALTURA_TITULO_PDF - 30
+    alto_util = tope_tabla - MARGEN_PDF
+    ancho_columna = ancho_util / max(1, len(datos.columnas))
+    anchos = [ancho_columna] * len(datos.columnas)
+    ancho_texto = ancho_columna - 2 * RELLENO_LATERAL_PDF
+    # Ningún carácter de Helvetica es más ancho que el tamaño de la fuente
+    maximo_sin_medir = int(ancho_texto / TAMANO_FUENTE_PDF)
+
+    def ajustar_fila(textos, fuente):
+        celdas, lineas = [], 1
+        for texto in textos:
+            celda, cantidad = _ajustar_texto_pdf(texto, fuente, ancho_texto, maximo_sin_medir)
+            celdas.append(celda)
+            lineas = max(lineas, cantidad)
+        return celdas, lineas * INTERLINEADO_PDF
+
+    encabezado, alto_encabezado = ajustar_fila(datos.encabezados, FUENTE_ENCABEZADO_PDF)
+    alto_encabezado += RELLENO_CELDA_PDF + RELLENO_ENCABEZADO_PDF
+
+    total = datos.contar() if progreso else None
+    escritas = 0
+    pagina = 0
+    filas, alturas, alto_pagina = [], [], alto_encabezado
+    canvas = Canvas(ruta, pagesize=letter, pageCompression=1)
+
+    def dibujar_pagina():
+        nonlocal pagina, escritas
+        pagina += 1
+        tabla = Table([encabezado] + filas, colWidths=anchos, rowHeights=[alto_encabezado] + alturas)
+        tabla.setStyle(_estilo_tabla_pdf())
+        _, alto_tabla = tabla.wrapOn(canvas, ancho_util, alto_util)
+        _dibujar_encabezado_pdf(canvas, titulo, pagina)
+        tabla.drawOn(canvas, MARGEN_PDF, tope_tabla - alto_tabla)
+        canvas.showPage()
+        escritas += len(filas)
+        if progreso:
+            progreso(escritas, total)
+
+    with _borrar_si_falla(ruta):
+        for lote in datos.lotes(FILAS_POR_LOTE):
+            for fila in lote:
+                celdas, alto = ajustar_fila(datos.formatear(fila), FUENTE_PDF)
+                alto += 2 * RELLENO_CELDA_PDF
+                if filas and alto_pagina + alto > alto_util:
+                    dibujar_pagina()
+                    filas, alturas, alto_pagina = [], [], alto_encabezado
+                filas.append(celdas)
+                alturas.append(alto)
+                alto_pagina += alto
+        if filas or pagina == 0:
+            dibujar_pagina()
+        canvas.save()
+    return escritas
+
+def exportar_factura_pdf(ruta: str, factura_id: str, fecha: str, cliente: Sequence[str],
+                         lineas: Sequence[Tuple[int, str, int, float]], descuento_porcentaje: float,
+                         tasa_impuesto: float) -> str:
+    """
+    Escribe el PDF de una factura.
+
+    Recibe todos los datos ya leídos (no consulta la base de datos), así se puede
+    ejecutar en otro proceso mientras la caja sigue con la venta siguiente.
+
+    Args:
+        ruta (str): Ruta del archivo PDF.
+        factura_id (str): Número de la factura.
+        fecha (str): Fecha de la venta.
+        cliente (Sequence[str]): Nombre, teléfono y email del cliente.
+        lineas (Sequence[Tuple[int, str, int, float]]): (producto_id, nombre, cantidad, precio) de cada línea.
+        descuento_porcentaje (float): Porcentaje de descuento aplicado.
+        tasa_impuesto (float): Tasa de impuesto de la factura.
+
+    Returns:
+        str: Ruta del archivo PDF.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    cliente_nombre, cliente_telefono, cliente_email = cliente
+    doc = SimpleDocTemplate(ruta, pagesize=letter)
+    elements = []
+
+    styles = getSampleStyleSheet()
+    elements.append(Paragraph("Inversiones Torino, C.A.", styles['Heading1']))
+    elements.append(Spacer(1, 12))
+
+    factura_info = [
+        ["Nro. Factura:", factura_id],
+        ["Fecha:", fecha],
+        ["Cliente:", cliente_nombre],
+        ["Teléfono:", cliente_telefono],
+        ["Email:", cliente_email],
+        ["Descuento:", f"{descuento_porcentaje}%"]
+    ]
+    t = Table(factura_info, colWidths=[100, 300])
+    t.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ]))
+    elements.append(t)
+    elements.append(Spacer(1, 12))
+
+    data: List[List[str]] = [["Producto", "Cantidad", "Precio", "Total"]]
+    total_venta = 0
+    for producto_id, producto_nombre, cantidad, precio in lineas:
+        total = cantidad * precio
+        total_venta += total
+        data.append([producto_nombre, str(cantidad), f"${precio:.2f}", f"${total:.2f}"])
+
+    t = Table(data, colWidths=[250, 70, 70, 70])
+    t.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ]))
+    elements.append(t)
+    elements.append(Spacer(1, 12))
+
+    descuento = total_venta * (descuento_porcentaje / 100)
+    total_venta_con_descuento = total_venta - descuento
+    impuesto = total_venta_con_descuento * tasa_impuesto
+    total_con_impuesto = total_venta_con_descuento + impuesto
+    data = [
+        ["Total de la venta:", f"${total_venta:.2f}"],
+        [f"Descuento ({descuento_porcentaje:.2f}%):", f"${descuento:.2f}"],
+        ["Total con descuento:", f"${total_venta_con_descuento:.2f}"],
+        [f"Impuesto ({tasa_impuesto * 100:.2f}%):", f"${impuesto:.2f}"],
+        ["Total con impuesto:", f"${total_con_impuesto:.2f}"]
+    ]
+    t = Table(data, colWidths=[350, 110])
+    t.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
+    ]))
+    elements.append(t)
+
+    with _borrar_si_falla(ruta):
+        doc.build(elements)
+    return ruta
+
+def dibujo_grafico_pdf(grafico: GraficoGenerado, ancho: float, alto: float) -> "Drawing":
+    """
+    Traza un gráfico como dibujo vectorial de reportlab a partir de sus datos.
+
+    Args:
+        grafico (GraficoGenerado): Gráfico con sus etiquetas y valores.
+        ancho (float): Ancho del dibujo en puntos.
+        alto (float): Alto del dibujo en puntos.
+
+    Returns:
+        Drawing: El dibujo, listo para agregar a un documento.
+    """
+    from reportlab.graphics.charts.barcharts import VerticalBarChart
+    from reportlab.graphics.charts.linecharts import HorizontalLineChart
+    from reportlab.graphics.shapes import Drawing, Group, String
+    from reportlab.graphics.widgets.markers import makeMarker
+    from reportlab.lib import colors
+
+    dibujo = Drawing(ancho, alto)
+    dibujo.add(String(ancho / 2, alto - 14, grafico.titulo, textAnchor='middle', fontName=FUENTE_ENCABEZADO_PDF,
+                      fontSize=11))
+    if not grafico.valores:
+        dibujo.add(String(ancho / 2, alto / 2, "Sin datos en el rango de fechas", textAnchor='middle',
+                          fontName=FUENTE_PDF))
+        return dibujo
+
+    color = colors.toColor(grafico.color, colors.blue)
+    if grafico.tipo == TIPO_BARRAS:
+        serie = VerticalBarChart()
+        serie.bars[0].fillColor = color
+        serie.bars[0].strokeColor = None
+    else:
+        serie = HorizontalLineChart()
+        serie.lines[0].strokeColor = color
+        serie.lines[0].symbol = makeMarker('FilledCircle', size=4, fillColor=color)
+    serie.x = MARGEN_GRAFICO_PDF
+    serie.y = ALTO_ETIQUETAS_GRAFICO_PDF
+    serie.width = ancho - MARGEN_GRAFICO_PDF - 10
+    serie.height = alto - ALTO_ETIQUETAS_GRAFICO_PDF - 30
+    serie.data = [list(grafico.valores)]
+    serie.valueAxis.valueMin = 0
+    serie.valueAxis.labels.fontName = FUENTE_PDF
+    serie.valueAxis.labels.fontSize = 7
+    serie.categoryAxis.categoryNames = [
+        etiqueta if len(etiqueta) <= LARGO_ETIQUETA_GRAFICO_PDF else etiqueta[:LARGO_ETIQUETA_GRAFICO_PDF - 1] + "…"
+        for etiqueta in grafico.etiquetas
+    ]
+    serie.categoryAxis.labels.angle = 45
+    serie.categoryAxis.labels.boxAnchor = 'ne'
+    serie.categoryAxis.labels.fontName = FUENTE_PDF
+    serie.categoryAxis.labels.fontSize = 7
+    dibujo.add(serie)
+
+    dibujo.add(String(serie.x + serie.width / 2, 4, grafico.etiqueta_x, textAnchor='middle', fontName=FUENTE_PDF,
+                      fontSize=9))
+    etiqueta_y = Group(String(0, 0, grafico.etiqueta_y, textAnchor='middle', fontName=FUENTE_PDF, fontSize=9))
+    etiqueta_y.translate(12, serie.y + serie.height / 2)
+    etiqueta_y.rotate(90)
+    dibujo.add(etiqueta_y)
+    return dibujo
+
+def exportar_grafico_pdf(grafico: GraficoGenerado, ruta: str, titulo: str, desde: str, hasta: str,
+                         orientacion: str = 'portrait', ancho: float = 700, alto: float = 400) -> str:
+    """
+    Escribe un PDF con un gráfico trazado en vectores (sin pasar por la imagen PNG).
+
+    Args:
+        grafico (GraficoGenerado): Gráfico a exportar.
+        ruta (str): Ruta del archivo PDF.
+        titulo (str): Título de la página.
+        desde (str): Fecha de inicio del rango de fechas.
+        hasta (str): Fecha de fin del rango de fechas.
+        orientacion (str): 'portrait' o 'landscape'. Por defecto es 'portrait'.
+        ancho (float): Ancho del gráfico en puntos (como mucho el de la página). Por defecto es 700.
+        alto (float): Alto del gráfico en puntos. Por defecto es 400.
+
+    Returns:
+        str: Ruta del archivo PDF.
+    """
+    from reportlab.lib.pagesizes import landscape, letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+    pagesize = landscape(letter) if orientacion == 'landscape' else letter
+    doc = SimpleDocTemplate(ruta, pagesize=pagesize)
+    styles = getSampleStyleSheet()
+    elements = [
+        Paragraph(titulo, styles['Title']),
+        Paragraph(f"Fecha Inicio: {desde}", styles['Normal']),
+        Paragraph(f"Fecha Final: {hasta}", styles['Normal']),
+        dibujo_grafico_pdf(grafico, min(ancho, doc.width), alto),
+    ]
+    with _borrar_si_falla(ruta):
+        doc.build(elements)
+    return ruta
@@ -7,6 +7,15 @@ from libreria import BaseApp
 TITULO_COMPRAS_ACUMULADAS = "Top 25 Productos con Más Compras"
 FORMATO_FECHA = '%Y-%m-%d'
 COLOR_SNACKBAR = "white"
+QUERY_COMPRAS_ACUMULADAS = """
+    SELECT p.nombre, SUM(r.compras) AS total_compras
+    FROM ResumenDiarioProducto r
+    JOIN Productos p ON r.producto_id = p.id
+    WHERE r.fecha BETWEEN ? AND ? AND r.unidades_compradas > 0
+    GROUP BY p.nombre
+    ORDER BY total_compras DESC
+    LIMIT 25
+"""
 
 class GraficosComprasProductos(BaseApp):
     """
@@ -20,16 +29,7 @@ class GraficosComprasProductos(BaseApp):
         Abre la ventana de compras acumuladas.
         :return: None
         """
-        query = """
-            SELECT p.nombre, SUM(c.cantidad * c.precio_costo) AS total_compras
-            FROM Compras c
-            JOIN Productos p ON c.producto_id = p.id
-            WHERE c.fecha BETWEEN ? AND ?
-            GROUP BY p.nombre
-            ORDER BY total_compras DESC
-            LIMIT 25
-        """
-        super().open_compras_o_devoluciones(TITULO_COMPRAS_ACUMULADAS, query, 'blue')
+        super().open_compras_o_devoluciones(TITULO_COMPRAS_ACUMULADAS, QUERY_COMPRAS_ACUMULADAS, 'blue')
 
 def graf_comp_producto_app(page: ft.Page, main_menu_callback: Callable[[], None]):
     """
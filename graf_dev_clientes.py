@@ -7,6 +7,15 @@ from libreria import BaseApp
 TITULO_DEVOLUCIONES_CLIENTES = "Top 25 Clientes con Más Devoluciones"
 FORMATO_FECHA = '%Y-%m-%d'
 COLOR_SNACKBAR = "white"
+QUERY_DEVOLUCIONES_CLIENTES = """
+    SELECT c.nombre, SUM(r.devoluciones) AS total_devoluciones
+    FROM ResumenDiarioCliente r
+    JOIN Clientes c ON r.cliente_id = c.id
+    WHERE r.fecha BETWEEN ? AND ? AND r.unidades_devueltas > 0
+    GROUP BY c.id
+    ORDER BY total_devoluciones DESC
+    LIMIT 25
+"""
 
 class GraficoDevolucionesClientes(BaseApp):
     """
@@ -20,17 +29,7 @@ class GraficoDevolucionesClientes(BaseApp):
         Abre la ventana de devoluciones de clientes.
         :return: None
         """
-        query = """
-            SELECT c.nombre, SUM(d.cantidad * p.precio) AS total_devoluciones
-            FROM Devoluciones d
-            JOIN Clientes c ON d.cliente_id = c.id
-            JOIN Productos p ON d.producto_id = p.id
-            WHERE d.fecha BETWEEN ? AND ?
-            GROUP BY c.id
-            ORDER BY total_devoluciones DESC
-            LIMIT 25
-        """
-        super().open_compras_o_devoluciones(TITULO_DEVOLUCIONES_CLIENTES, query, 'red')
+        super().open_compras_o_devoluciones(TITULO_DEVOLUCIONES_CLIENTES, QUERY_DEVOLUCIONES_CLIENTES, 'red')
 
 def graf_devoluciones_clientes_app(page: ft.Page, main_menu_callback: Callable[[], None]):
     """
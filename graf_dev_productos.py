@@ -7,6 +7,15 @@ from libreria import BaseApp
 TITULO_DEVOLUCIONES_PRODUCTOS = "Top 25 Productos con Más Devoluciones"
 FORMATO_FECHA = '%Y-%m-%d'
 COLOR_SNACKBAR = "white"
+QUERY_DEVOLUCIONES_PRODUCTOS = """
+    SELECT p.nombre, SUM(r.devoluciones) AS total_devoluciones
+    FROM ResumenDiarioProducto r
+    JOIN Productos p ON r.producto_id = p.id
+    WHERE r.fecha BETWEEN ? AND ? AND r.unidades_devueltas > 0
+    GROUP BY p.id
+    ORDER BY total_devoluciones DESC
+    LIMIT 25
+"""
 
 class GraficoDevolucionesProductos(BaseApp):
     """
@@ -20,16 +29,7 @@ class GraficoDevolucionesProductos(BaseApp):
         Abre el diálogo de devoluciones de productos.
         :return: None
         """
-        query = """
-            SELECT p.nombre, SUM(d.cantidad * p.precio) AS total_devoluciones
-            FROM Devoluciones d
-            JOIN Productos p ON d.producto_id = p.id
-            WHERE d.fecha BETWEEN ? AND ?
-            GROUP BY p.id
-            ORDER BY total_devoluciones DESC
-            LIMIT 25
-        """
-        super().open_compras_o_devoluciones(TITULO_DEVOLUCIONES_PRODUCTOS, query, 'orange')
+        super().open_compras_o_devoluciones(TITULO_DEVOLUCIONES_PRODUCTOS, QUERY_DEVOLUCIONES_PRODUCTOS, 'orange')
 
 def graf_devoluciones_productos_app(page: ft.Page, main_menu_callback: Callable[[], None]):
     """
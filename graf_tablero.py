@@ -0,0 +1,201 @@
+# graf_tablero.py
+import flet as ft
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+from libreria import BaseApp, BLUE_COLOR
+from tablero import GRAFICOS_TABLERO, CONSULTAS_RESUMEN, RESUMEN_FUENTE, GraficoTablero, agregar_tablero
+from dibujo_graficos import dibujar_serie
+from cache_graficos import clave_grafico, guardar_grafico, obtener_grafico
+from trabajos import Trabajo
+from artefacto_grafico import GraficoGenerado
+
+# Constantes
+TITULO_TABLERO = "Tablero de Gráficos"
+FORMATO_FECHA = '%Y-%m-%d'
+ANCHO_CELDA = 480
+ALTO_CELDA = 240
+
+class GraficoTableroApp(BaseApp):
+    """
+    Clase para mostrar los siete gráficos de la sección en un tablero, para un mismo rango de fechas.
+
+    Los gráficos que están en la caché se muestran enseguida. Para el resto, un trabajo
+    calcula todos los datos en una sola pasada (tablero.agregar_tablero) y después cada
+    gráfico se dibuja en su propio trabajo, en paralelo en los procesos del gestor.
+    """
+    def __init__(self, page: ft.Page, main_menu_callback: Callable[[], None]):
+        super().__init__(page, main_menu_callback)
+        self.celdas: Dict[str, ft.Container] = {}
+        self.trabajos: List[Trabajo] = []
+        self.generacion = 0  # Cambia con cada pedido: descarta resultados de pedidos anteriores
+
+    @staticmethod
+    def argumentos_grafico(grafico: GraficoTablero, desde: str, hasta: str) -> Tuple:
+        """
+        Argumentos de dibujo de un gráfico del tablero (también forman parte de su clave en la caché).
+        :param grafico: El gráfico del tablero.
+        :param desde: Fecha de inicio del rango de fechas.
+        :param hasta: Fecha de fin del rango de fechas.
+        :return: (tipo, título, etiqueta X, etiqueta Y, color).
+        """
+        return (grafico.tipo, f'{grafico.titulo} ({desde} - {hasta})', grafico.etiqueta_x,
+                grafico.etiqueta_y, grafico.color)
+
+    def generar_tablero(self, desde: str, hasta: str):
+        """
+        Muestra los gráficos de la caché y genera en segundo plano los que faltan.
+        :param desde: Fecha de inicio del rango de fechas.
+        :param hasta: Fecha de fin del rango de fechas.
+        :return: None
+        """
+        for trabajo in self.trabajos:
+            trabajo.cancelar()
+        self.trabajos = []
+        self.generacion += 1
+        generacion = self.generacion
+
+        faltantes: Dict[str, str] = {}
+        for grafico in GRAFICOS_TABLERO:
+            tabla, _ = RESUMEN_FUENTE[grafico.fuente]
+            clave = clave_grafico(f"Tablero: {grafico.titulo}", CONSULTAS_RESUMEN[tabla], desde, hasta,
+                                  self.argumentos_grafico(grafico, desde, hasta))
+            cacheado = obtener_grafico(clave)
+            if cacheado is not None:
+                self.mostrar_en_celda(grafico.titulo, desde, hasta, cacheado)
+            else:
+                faltantes[grafico.titulo] = clave
+                self.mostrar_espera(grafico.titulo)
+        self.page.update()
+        if not faltantes:
+            return
+
+        def dibujar(series: Dict[str, Tuple[List[str], List[float]]]):
+            if generacion != self.generacion:
+                return
+            for grafico in GRAFICOS_TABLERO:
+                if grafico.titulo in faltantes:
+                    etiquetas, valores = series[grafico.titulo]
+                    self.trabajos.append(self.ejecutar_en_segundo_plano(
+                        f"Dibujando {grafico.titulo}", dibujar_serie,
+                        *self.argumentos_grafico(grafico, desde, hasta), etiquetas, valores,
+                        en_proceso=True, mostrar_indicador=False,
+                        al_terminar=self.al_dibujar(grafico.titulo, faltantes[grafico.titulo], desde, hasta,
+                                                    generacion)))
+
+        self.trabajos.append(self.ejecutar_en_segundo_plano(
+            "Calculando datos del tablero", agregar_tablero, desde, hasta, list(faltantes),
+            en_proceso=True, al_terminar=dibujar))
+
+    def al_dibujar(self, titulo: str, clave: str, desde: str, hasta: str,
+                   generacion: int) -> Callable[[GraficoGenerado], None]:
+        """
+        Arma la función que recibe un gráfico dibujado: lo guarda en la caché y lo muestra
+        en su celda si el pedido sigue vigente.
+        :param titulo: Título del gráfico.
+        :param clave: Clave del gráfico en la caché.
+        :param desde: Fecha de inicio del rango de fechas.
+        :param hasta: Fecha de fin del rango de fechas.
+        :param generacion: Pedido al que pertenece el gráfico.
+        :return: La función.
+        """
+        def terminar(grafico: GraficoGenerado):
+            guardar_grafico(clave, grafico)
+            if generacion == self.generacion:
+                self.mostrar_en_celda(titulo, desde, hasta, grafico)
+                self.page.update()
+        return terminar
+
+    def mostrar_espera(self, titulo: str):
+        """
+        Muestra un indicador de espera en la celda de un gráfico.
+        :param titulo: Título del gráfico.
+        :return: None
+        """
+        celda = self.celdas[titulo]
+        celda.content = ft.Column([
+            ft.Text(titulo, weight=ft.FontWeight.BOLD),
+            ft.Container(ft.ProgressRing(), alignment=ft.alignment.center, height=ALTO_CELDA)
+        ])
+        celda.on_click = None
+
+    def mostrar_en_celda(self, titulo: str, desde: str, hasta: str, grafico: GraficoGenerado):
+        """
+        Muestra un gráfico en su celda; al hacer clic se abre en grande, con la opción de generar el PDF.
+        :param titulo: Título del gráfico.
+        :param desde: Fecha de inicio del rango de fechas.
+        :param hasta: Fecha de fin del rango de fechas.
+        :param grafico: El gráfico generado.
+        :return: None
+        """
+        celda = self.celdas[titulo]
+        celda.content = ft.Column([
+            ft.Text(titulo, weight=ft.FontWeight.BOLD),
+            ft.Image(src_base64=grafico.png_base64, width=ANCHO_CELDA, height=ALTO_CELDA, fit=ft.ImageFit.CONTAIN)
+        ])
+        celda.on_click = lambda _: self.mostrar_grafico(
+            desde, hasta, titulo, grafico,
+            lambda grafico, desde, hasta: self.generar_pdf(grafico, desde, hasta, titulo, orientation='landscape'))
+
+    def open_tablero(self):
+        """
+        Abre la ventana del tablero.
+        :return: None
+        """
+        desde_field = ft.TextField(label="Desde", hint_text=FORMATO_FECHA,
+                                   value=datetime.today().strftime(FORMATO_FECHA))
+        hasta_field = ft.TextField(label="Hasta", hint_text=FORMATO_FECHA,
+                                   value=datetime.today().strftime(FORMATO_FECHA))
+        self.celdas = {
+            grafico.titulo: ft.Container(ft.Text(grafico.titulo, weight=ft.FontWeight.BOLD), width=ANCHO_CELDA + 20,
+                                         padding=10, border=ft.border.all(1, BLUE_COLOR), border_radius=8)
+            for grafico in GRAFICOS_TABLERO
+        }
+
+        def generar_tablero(_):
+            """
+            Genera los gráficos del tablero para el rango elegido.
+            :return: None
+            """
+            desde = desde_field.value
+            hasta = hasta_field.value
+
+            if not self._validar_fechas(desde, hasta):
+                return
+
+            self.generar_tablero(desde, hasta)
+
+        def volver(_):
+            """
+            Cancela los trabajos pendientes y vuelve al menú.
+            :return: None
+            """
+            for trabajo in self.trabajos:
+                trabajo.cancelar()
+            self.generacion += 1
+            self.main_menu_callback()
+
+        self.page.controls.clear()
+        self.page.add(
+            ft.Text(TITULO_TABLERO, size=24),
+            ft.Column([
+                self.crear_fila_fecha(desde_field, "Desde"),
+                self.crear_fila_fecha(hasta_field, "Hasta")
+            ]),
+            ft.Row([
+                ft.ElevatedButton("Generar Tablero", on_click=generar_tablero),
+                ft.ElevatedButton("Volver", on_click=volver)
+            ]),
+            ft.Column([ft.Row(list(self.celdas.values()), wrap=True, spacing=10, run_spacing=10)],
+                      scroll=ft.ScrollMode.AUTO, expand=True)
+        )
+        self.page.update()
+
+def graf_tablero_app(page: ft.Page, main_menu_callback: Callable[[], None]):
+    """
+    Crea una instancia de la aplicación del tablero de gráficos y la ejecuta.
+    :param page: La página de la interfaz de usuario.
+    :param main_menu_callback: La función de devolución de llamada para volver al menú principal.
+    :return: None
+    """
+    app = GraficoTableroApp(page, main_menu_callback)
+    app.open_tablero()
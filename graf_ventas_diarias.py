@@ -1,16 +1,13 @@
 # graf_ventas_diarias.py
 import flet as ft
 from datetime import datetime
-from database import create_connection
-import matplotlib.pyplot as plt
-import io
-import base64
-from typing import Callable
+from typing import Callable, Optional
 import os
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Image
 from libreria import BaseApp
+from dibujo_graficos import dibujar_grafico_lineas
+from trabajos import Trabajo
+from artefacto_grafico import GraficoGenerado
+from exportacion import exportar_grafico_pdf
 
 # Constantes
 TITULO_VENTAS_DIARIAS = "Ventas Diarias"
@@ -18,6 +15,14 @@ FORMATO_FECHA = '%Y-%m-%d'
 ANCHO_GRAFICO = 800
 ALTO_GRAFICO = 600
 COLOR_SNACKBAR = "white"
+# El resumen diario por cliente (resumenes.py) incluye todas las ventas, también las sin cliente
+QUERY_VENTAS_DIARIAS = """
+    SELECT r.fecha, SUM(r.ventas) AS total_ventas
+    FROM ResumenDiarioCliente r
+    WHERE r.fecha BETWEEN ? AND ? AND r.unidades_vendidas > 0
+    GROUP BY r.fecha
+    ORDER BY r.fecha
+"""
 
 class GraficoVentasDiarias(BaseApp):
     """
@@ -26,89 +31,45 @@ class GraficoVentasDiarias(BaseApp):
     def __init__(self, page: ft.Page, main_menu_callback: Callable[[], None]):
         super().__init__(page, main_menu_callback)
 
-    def generar_grafico_ventas_diarias(self, desde: str, hasta: str) -> str:
+    def generar_grafico_ventas_diarias(self, desde: str, hasta: str,
+                                       al_terminar: Callable[[GraficoGenerado], None]) -> Optional[Trabajo]:
         """
-        Genera un gráfico de ventas diarias.
+        Genera en otro proceso un gráfico de ventas diarias, o lo toma de la caché.
         :param desde: Fecha de inicio del rango de fechas.
         :param hasta: Fecha de fin del rango de fechas.
-        :return: La imagen del gráfico en formato base64.
+        :param al_terminar: Recibe el gráfico generado.
+        :return: El trabajo que genera el gráfico, o None si estaba en la caché.
         """
-        with create_connection() as conn:
-            cursor = conn.cursor()
-            query = """
-                SELECT v.fecha, SUM(v.cantidad * p.precio) AS total_ventas
-                FROM Ventas v
-                JOIN Productos p ON v.producto_id = p.id
-                WHERE v.fecha BETWEEN ? AND ?
-                GROUP BY v.fecha
-            """
-            cursor.execute(query, (desde, hasta))
-            ventas = cursor.fetchall()
-
-        fechas = [venta[0] for venta in ventas]
-        totales = [venta[1] for venta in ventas]
-
-        plt.switch_backend('Agg')
-        plt.figure(figsize=(10, 6))
-        plt.plot(fechas, totales, marker='o')
-        plt.xlabel('Fecha')
-        plt.ylabel('Ventas Totales ($)')
-        plt.title(f'Ventas Diarias ({desde} - {hasta})')
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode()
-        plt.close()
-
-        return image_base64
-
-    def generar_pdf(self, image_base64: str, desde: str, hasta: str, orientation: str = 'portrait'):
+        return self.generar_grafico(TITULO_VENTAS_DIARIAS, QUERY_VENTAS_DIARIAS, desde, hasta,
+                                    dibujar_grafico_lineas, al_terminar,
+                                    f'Ventas Diarias ({desde} - {hasta})', 'Fecha', 'Ventas Totales ($)')
+
+    def generar_pdf(self, grafico: GraficoGenerado, desde: str, hasta: str, orientation: str = 'portrait') -> Trabajo:
         """
-        Genera un archivo PDF con el gráfico de ventas diarias.
-        :param image_base64: La imagen del gráfico en formato base64.
+        Genera en otro proceso un archivo PDF con el gráfico de ventas diarias, trazado en vectores,
+        y avisa con la ruta del archivo al terminar.
+        :param grafico: El gráfico generado.
         :param desde: Fecha de inicio del rango de fechas.
         :param hasta: Fecha de fin del rango de fechas.
         :param orientation: Orientación del PDF ('portrait' o 'landscape').
-        :return: La ruta del archivo PDF generado.
+        :return: El trabajo que genera el PDF.
         """
         pdf_dir = os.path.join(os.getcwd(), 'Graficos_PDF')
         os.makedirs(pdf_dir, exist_ok=True)
         pdf_path = os.path.join(pdf_dir, f'ventas_diarias_{desde}_{hasta}.pdf')
 
-        if orientation == 'landscape':
-            pagesize = landscape(letter)
-        else:
-            pagesize = letter
-
-        doc = SimpleDocTemplate(pdf_path, pagesize=pagesize)
-        styles = getSampleStyleSheet()
-        elements = []
-
-        # Título
-        elements.append(Paragraph(TITULO_VENTAS_DIARIAS, styles['Title']))
-
-        # Fecha de inicio y final
-        elements.append(Paragraph(f"Fecha Inicio: {desde}", styles['Normal']))
-        elements.append(Paragraph(f"Fecha Final: {hasta}", styles['Normal']))
-
-        # Imagen del gráfico
-        image_data = base64.b64decode(image_base64)
-        elements.append(Image(io.BytesIO(image_data), width=500, height=300))
-
-        doc.build(elements)
-
-        return pdf_path
+        return self.ejecutar_en_segundo_plano(
+            "Generando PDF", exportar_grafico_pdf, grafico, pdf_path, TITULO_VENTAS_DIARIAS, desde, hasta,
+            orientation, ancho=500, alto=300, en_proceso=True,
+            al_terminar=lambda ruta: self.mostrar_mensaje(f"PDF generado en: {ruta}", "blue"))
 
-    def mostrar_grafico(self, desde: str, hasta: str):
+    def mostrar_grafico(self, desde: str, hasta: str, grafico: GraficoGenerado):
         """
         Muestra el gráfico de ventas diarias en una ventana de diálogo.
         :param desde: Fecha de inicio del rango de fechas.
         :param hasta: Fecha de fin del rango de fechas.
+        :param grafico: El gráfico generado.
         """
-        image_base64 = self.generar_grafico_ventas_diarias(desde, hasta)
 
         def close_dlg(_):
             """
@@ -123,8 +84,7 @@ class GraficoVentasDiarias(BaseApp):
             Genera un archivo PDF con el gráfico de ventas diarias.
             :return: None
             """
-            pdf_path = self.generar_pdf(image_base64, desde, hasta, orientation='landscape')
-            self.mostrar_mensaje(f"PDF generado en: {pdf_path}", "blue")
+            self.generar_pdf(grafico, desde, hasta, orientation='landscape')
 
         dlg = ft.AlertDialog(
             title=ft.Text(TITULO_VENTAS_DIARIAS),
@@ -135,7 +95,7 @@ class GraficoVentasDiarias(BaseApp):
                     ft.Text("Fecha Final:", weight=ft.FontWeight.BOLD, color="blue"),
                     ft.Text(hasta)
                 ], alignment=ft.MainAxisAlignment.CENTER),
-                ft.Image(src_base64=image_base64, width=ANCHO_GRAFICO, height=ALTO_GRAFICO, fit=ft.ImageFit.CONTAIN)
+                ft.Image(src_base64=grafico.png_base64, width=ANCHO_GRAFICO, height=ALTO_GRAFICO, fit=ft.ImageFit.CONTAIN)
             ], scroll=ft.ScrollMode.AUTO),  # Habilitar scroll en la columna
             actions=[
                 ft.TextButton("Cerrar", on_click=close_dlg),
@@ -169,7 +129,8 @@ class GraficoVentasDiarias(BaseApp):
             if not self._validar_fechas(desde, hasta):
                 return
 
-            self.mostrar_grafico(desde, hasta)
+            self.generar_grafico_ventas_diarias(
+                desde, hasta, lambda grafico: self.mostrar_grafico(desde, hasta, grafico))
 
         self.page.controls.clear()
         self.page.add(
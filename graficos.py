@@ -9,6 +9,7 @@ from graf_dev_clientes import graf_devoluciones_clientes_app
 from graf_dev_productos import graf_devoluciones_productos_app
 from graf_comp_provee import graf_comp_provee_app
 from graf_comp_producto import graf_comp_producto_app
+from graf_tablero import graf_tablero_app
 from nav_graficos_pdf import nav_graficos_pdf_app
 
 # Constantes
@@ -78,6 +79,13 @@ class GraficosApp:
             self.page.controls.clear()  # Limpiar los controles actuales
             graf_comp_producto_app(self.page, lambda: self.main_menu())
 
+        def open_tablero(_):
+            """
+            Abre la interfaz del tablero con todos los gráficos para un mismo rango de fechas
+            """
+            self.page.controls.clear()  # Limpiar los controles actuales
+            graf_tablero_app(self.page, lambda: self.main_menu())
+
         def open_nav_graficos_pdf(_):
             """
             Abre la interfaz de navegación de gráficos en PDF
@@ -95,6 +103,7 @@ class GraficosApp:
             ft.ElevatedButton("Devoluciones por Producto (Top 25)", on_click=open_devoluciones_productos),
             ft.ElevatedButton("Compras por Proveedores (Top 25)", on_click=open_compras_proveedores),
             ft.ElevatedButton("Compras por Producto (Top 25)", on_click=open_compras_productos),
+            ft.ElevatedButton("Tablero (Todos los Gráficos)", on_click=open_tablero),
             ft.ElevatedButton("Navegar en Graficos PDF", on_click=lambda _: self.nav_graficos_pdf()),  # Agregar este botón al menu de Graficos
             ft.ElevatedButton("Volver al Menú Principal", on_click=lambda _: self.main_menu_callback())
         )
@@ -1,12 +1,11 @@
 # graficos_ventas.py
 import flet as ft
 from datetime import datetime
-from database import create_connection
-import matplotlib.pyplot as plt
-import io
-import base64
-from typing import Callable
+from typing import Callable, Optional
 from libreria import BaseApp
+from dibujo_graficos import dibujar_grafico_barras
+from trabajos import Trabajo
+from artefacto_grafico import GraficoGenerado
 
 # Constantes
 TITULO_VENTAS_ACUMULADAS = "Top 25 Productos con Más Ventas"
@@ -14,6 +13,19 @@ FORMATO_FECHA = '%Y-%m-%d'
 ANCHO_GRAFICO = 800
 ALTO_GRAFICO = 600
 COLOR_SNACKBAR = "white"
+QUERY_VENTAS_ACUMULADAS = """
+    SELECT p.nombre, t.total_ventas
+    FROM (
+        SELECT r.producto_id, SUM(r.ventas) AS total_ventas
+        FROM ResumenDiarioProducto r
+        WHERE r.fecha BETWEEN ? AND ? AND r.unidades_vendidas > 0
+        GROUP BY r.producto_id
+        ORDER BY total_ventas DESC
+        LIMIT 25
+    ) t
+    JOIN Productos p ON t.producto_id = p.id
+    ORDER BY t.total_ventas DESC
+"""
 
 class GraficosVentas(BaseApp):
     """
@@ -22,54 +34,26 @@ class GraficosVentas(BaseApp):
     def __init__(self, page: ft.Page, main_menu_callback: Callable[[], None]):
         super().__init__(page, main_menu_callback)
 
-    def generar_grafico_ventas_acumuladas(self, desde: str, hasta: str) -> str:
+    def generar_grafico_ventas_acumuladas(self, desde: str, hasta: str, al_terminar: Callable[[GraficoGenerado], None]) -> Optional[Trabajo]:
         """
-        Genera un gráfico de ventas acumuladas.
+        Genera en otro proceso un gráfico de ventas acumuladas, o lo toma de la caché.
         :param desde: Fecha de inicio del rango de fechas.
         :param hasta: Fecha de fin del rango de fechas.
-        :return: La imagen del gráfico en formato base64.
+        :param al_terminar: Recibe el gráfico generado.
+        :return: El trabajo que genera el gráfico, o None si estaba en la caché.
         """
-        with create_connection() as conn:
-            cursor = conn.cursor()
-            query = """
-                SELECT p.nombre, SUM(v.cantidad * p.precio) AS total_ventas
-                FROM Ventas v
-                JOIN Productos p ON v.producto_id = p.id
-                WHERE v.fecha BETWEEN ? AND ?
-                GROUP BY p.nombre
-                ORDER BY total_ventas DESC
-                LIMIT 25
-            """
-            cursor.execute(query, (desde, hasta))
-            ventas = cursor.fetchall()
-
-        productos = [venta[0] for venta in ventas]
-        totales = [venta[1] for venta in ventas]
-
-        plt.switch_backend('Agg')
-        plt.figure(figsize=(12, 6))
-        plt.bar(productos, totales, color='blue')
-        plt.xlabel('Productos')
-        plt.ylabel('Ventas Acumuladas ($)')
-        plt.title(f'Top 25 Productos con Más Ventas ({desde} - {hasta})')
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode()
-        plt.close()
-
-        return image_base64
+        return self.generar_grafico(TITULO_VENTAS_ACUMULADAS, QUERY_VENTAS_ACUMULADAS, desde, hasta,
+                                    dibujar_grafico_barras, al_terminar,
+                                    f'{TITULO_VENTAS_ACUMULADAS} ({desde} - {hasta})', 'Productos',
+                                    'Ventas Acumuladas ($)', 'blue')
 
-    def mostrar_grafico(self, desde: str, hasta: str):
+    def mostrar_grafico(self, desde: str, hasta: str, grafico: GraficoGenerado):
         """
         Muestra el gráfico de ventas acumuladas en la interfaz de usuario.
         :param desde: Fecha de inicio del rango de fechas.
         :param hasta: Fecha de fin del rango de fechas.
+        :param grafico: El gráfico generado.
         """
-        image_base64 = self.generar_grafico_ventas_acumuladas(desde, hasta)
 
         def close_dlg(_):
             """
@@ -84,8 +68,7 @@ class GraficosVentas(BaseApp):
             Genera un archivo PDF con el gráfico de ventas acumuladas.
             :return: None
             """
-            pdf_path = self.generar_pdf(image_base64, desde, hasta, TITULO_VENTAS_ACUMULADAS, orientation='landscape')
-            self.mostrar_mensaje(f"PDF generado en: {pdf_path}", "blue")
+            self.generar_pdf(grafico, desde, hasta, TITULO_VENTAS_ACUMULADAS, orientation='landscape')
 
         dlg = ft.AlertDialog(
             title=ft.Text(TITULO_VENTAS_ACUMULADAS),
@@ -96,7 +79,7 @@ class GraficosVentas(BaseApp):
                     ft.Text("Fecha Final:", weight=ft.FontWeight.BOLD, color="blue"),
                     ft.Text(hasta)
                 ], alignment=ft.MainAxisAlignment.CENTER),
-                ft.Image(src_base64=image_base64, width=ANCHO_GRAFICO, height=ALTO_GRAFICO, fit=ft.ImageFit.CONTAIN)
+                ft.Image(src_base64=grafico.png_base64, width=ANCHO_GRAFICO, height=ALTO_GRAFICO, fit=ft.ImageFit.CONTAIN)
             ], scroll=ft.ScrollMode.AUTO),
             actions=[
                 ft.TextButton("Cerrar", on_click=close_dlg),
@@ -130,7 +113,8 @@ class GraficosVentas(BaseApp):
             if not self._validar_fechas(desde, hasta):
                 return
 
-            self.mostrar_grafico(desde, hasta)
+            self.generar_grafico_ventas_acumuladas(
+                desde, hasta, lambda grafico: self.mostrar_grafico(desde, hasta, grafico))
 
         self.page.controls.clear()
         self.page.add(
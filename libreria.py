@@ -3,15 +3,18 @@ import flet as ft
 from typing import Callable, List, Tuple, Optional, Any
 from contextlib import contextmanager
 from database import create_connection
+from datos_reporte import DatosReporte, TAMANO_VENTANA
+from trabajos import Trabajo, enviar_trabajo
+from dibujo_graficos import dibujar_grafico_barras
+from cache_graficos import clave_grafico, guardar_grafico, obtener_grafico
+from artefacto_grafico import GraficoGenerado
+from exportacion import exportar_grafico_pdf
+import metricas_ui
 from dataclasses import dataclass
 from datetime import datetime
-import matplotlib.pyplot as plt
-import io
-import base64
 import os
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Image
+import threading
+import time
 
 # Constantes
 BLUE_COLOR = "blue"
@@ -22,20 +25,21 @@ COLOR_SNACKBAR = "white"
 FORMATO_FECHA = '%Y-%m-%d'
 ANCHO_GRAFICO = 800
 ALTO_GRAFICO = 600
+MAXIMO_FILAS_VISIBLES = 500  # Controles vivos como máximo en una lista paginada
+UMBRAL_DESPLAZAMIENTO = 200  # Píxeles antes del final en los que se carga la siguiente ventana
+INTERVALO_PROGRESO = 0.25  # Segundos mínimos entre actualizaciones del avance de un trabajo
 
 @contextmanager
 def get_db_connection():
     """
     Administrador de contexto para manejar conexiones a la base de datos.
+    La conexión se presta del pool de 'database' y se devuelve al salir.
 
     Yields:
         Connection: Objeto de conexión a la base de datos.
     """
-    conn = create_connection()
-    try:
+    with create_connection() as conn:
         yield conn
-    finally:
-        conn.close()
 
 def _crear_menu_fila(text1: str, on_click1: Callable,
                      text2: str, on_click2: Callable) -> ft.Row:
@@ -64,26 +68,145 @@ class FormField:
     label: str
     value: Optional[str] = None
 
+class ListaPaginada:
+    """
+    Lista de Flet que carga sus filas por ventanas a medida que se desplaza.
+
+    Al llegar al final del desplazamiento se pide la siguiente ventana a 'obtener_filas'.
+    La lista mantiene como máximo 'maximo_filas' controles vivos; pasado ese límite se
+    navega por bloques con los botones "Anteriores"/"Siguientes", que descartan los
+    controles del bloque actual.
+    """
+    def __init__(self, obtener_filas: Callable[[int, int], List[Any]],
+                 crear_control: Callable[[Any], ft.Control] = lambda control: control,
+                 tamano_ventana: int = TAMANO_VENTANA, maximo_filas: int = MAXIMO_FILAS_VISIBLES,
+                 **kwargs):
+        """
+        Constructor de la clase ListaPaginada.
+
+        Args:
+            obtener_filas (Callable[[int, int], List[Any]]): Devuelve las filas dado (desplazamiento, límite).
+            crear_control (Callable[[Any], ft.Control]): Arma el control de una fila. Por defecto la fila
+                ya es un control.
+            tamano_ventana (int): Filas por ventana. Por defecto es TAMANO_VENTANA.
+            maximo_filas (int): Controles vivos como máximo. Por defecto es MAXIMO_FILAS_VISIBLES.
+            **kwargs: Argumentos adicionales para el ft.ListView.
+        """
+        self.obtener_filas = obtener_filas
+        self.crear_control = crear_control
+        self.tamano_ventana = tamano_ventana
+        self.maximo_filas = maximo_filas
+        kwargs.setdefault("expand", True)
+        kwargs.setdefault("spacing", 10)
+        self.lista = ft.ListView(on_scroll=self._al_desplazar, **kwargs)
+        self.etiqueta = ft.Text()
+        self.boton_anterior = ft.TextButton("Anteriores", on_click=lambda _: self._mover_bloque(-1))
+        self.boton_siguiente = ft.TextButton("Siguientes", on_click=lambda _: self._mover_bloque(1))
+        self.control = ft.Column([
+            self.lista,
+            ft.Row([self.boton_anterior, self.etiqueta, self.boton_siguiente],
+                   alignment=ft.MainAxisAlignment.CENTER)
+        ], expand=kwargs["expand"])
+        self._inicio = 0
+        self._hay_mas = False
+        self._lock = threading.Lock()
+        self._cargar_desde(0)
+
+    def _cargar_desde(self, inicio: int):
+        """
+        Descarta los controles actuales y carga la primera ventana del bloque que empieza en 'inicio'.
+
+        Args:
+            inicio (int): Primera fila del bloque.
+        """
+        self.lista.controls.clear()
+        self._inicio = inicio
+        self._hay_mas = True
+        self._cargar_ventana()
+
+    def _cargar_ventana(self):
+        """
+        Agrega la siguiente ventana de filas al bloque actual, sin pasar de 'maximo_filas'.
+        """
+        cargadas = len(self.lista.controls)
+        limite = min(self.tamano_ventana, self.maximo_filas - cargadas)
+        if not self._hay_mas or limite <= 0:
+            return
+        # Se pide una fila de más para saber si quedan filas sin otra consulta
+        filas = list(self.obtener_filas(self._inicio + cargadas, limite + 1))
+        self._hay_mas = len(filas) > limite
+        self.lista.controls.extend(self.crear_control(fila) for fila in filas[:limite])
+        self._actualizar_navegacion()
+
+    def _actualizar_navegacion(self):
+        """
+        Actualiza la etiqueta de filas mostradas y la visibilidad de los botones de bloque.
+        """
+        cargadas = len(self.lista.controls)
+        self.etiqueta.value = f"Filas {self._inicio + 1}-{self._inicio + cargadas}" if cargadas else "Sin resultados"
+        self.boton_anterior.visible = self._inicio > 0
+        self.boton_siguiente.visible = self._hay_mas and cargadas >= self.maximo_filas
+
+    def _al_desplazar(self, e: ft.OnScrollEvent):
+        """
+        Carga la siguiente ventana cuando el desplazamiento llega al final de la lista.
+        """
+        if e.pixels < e.max_scroll_extent - UMBRAL_DESPLAZAMIENTO:
+            return
+        with self._lock:
+            cargadas = len(self.lista.controls)
+            self._cargar_ventana()
+            if len(self.lista.controls) != cargadas:
+                self.control.update()
+
+    def _mover_bloque(self, direccion: int):
+        """
+        Muestra el bloque anterior o el siguiente.
+
+        Args:
+            direccion (int): -1 para el anterior, 1 para el siguiente.
+        """
+        with self._lock:
+            self._cargar_desde(max(0, self._inicio + direccion * self.maximo_filas))
+            self.lista.scroll_to(offset=0)
+            self.control.update()
+
+    def recargar(self, obtener_filas: Optional[Callable[[int, int], List[Any]]] = None):
+        """
+        Vuelve a cargar la lista desde la primera fila (p. ej. al cambiar el filtro).
+
+        Args:
+            obtener_filas (Optional[Callable[[int, int], List[Any]]]): Nueva fuente de filas.
+                Por defecto se mantiene la actual.
+        """
+        with self._lock:
+            if obtener_filas is not None:
+                self.obtener_filas = obtener_filas
+            self._cargar_desde(0)
+            if self.control.page:
+                self.control.update()
+
 class BaseApp:
     """
     Clase base para las aplicaciones que utilizan la interfaz de usuario.
 
     Attributes:
-        page (ft.Page): Página de la aplicación.
+        page (ft.Page): Página de la aplicación (una metricas_ui.PaginaMedida si las métricas de la
+            interfaz están activas: cada manejador de eventos registra su duración y sus actualizaciones).
         main_menu_callback (Callable[[], None]): Función de devolución de llamada para volver al menú principal.
     """
     def __init__(self, page: ft.Page, main_menu_callback: Callable[[], None]):
-        self.page = page
+        self.page = metricas_ui.medir_pagina(page)
         self.main_menu_callback = main_menu_callback
 
-    def _agregar_reporte(self, titulo: str, elementos: List[Any], desde: Optional[str] = None,
+    def _agregar_reporte(self, titulo: str, datos: DatosReporte, desde: Optional[str] = None,
                          hasta: Optional[str] = None):
         """
         Agrega un reporte a la página.
 
         Args:
             titulo (str): Título del reporte.
-            elementos (List[Any]): Lista de elementos a mostrar en el reporte.
+            datos (DatosReporte): Columnas y filas del reporte.
             desde (Optional[str]): Fecha de inicio del reporte. Por defecto es None.
             hasta (Optional[str]): Fecha de fin del reporte. Por defecto es None.
         """
@@ -99,16 +222,104 @@ class BaseApp:
                 ft.Text(hasta)
             ], alignment=ft.MainAxisAlignment.CENTER))
 
-        column = ft.Column(expand=True, scroll=ft.ScrollMode.AUTO)
-        list_view = ft.ListView(expand=True, spacing=10, controls=elementos)
-        column.controls.append(list_view)
-        self.page.add(ft.Container(content=column, expand=True))
+        lista = ListaPaginada(datos.obtener, lambda fila: self._crear_fila_reporte(datos, fila))
+        self.page.add(ft.Container(content=lista.control, expand=True))
 
-        self.page.add(ft.ElevatedButton("Generar CSV", on_click=lambda _: self.generar_csv_reporte(titulo, elementos)))
-        self.page.add(ft.ElevatedButton("Generar PDF", on_click=lambda _: self.generar_pdf_reporte(titulo, elementos)))
+        comprimir_csv = ft.Checkbox(label="Comprimir CSV (gzip)", value=False)
+        self.page.add(ft.Row([
+            ft.ElevatedButton("Generar CSV",
+                              on_click=lambda _: self.generar_csv_reporte(titulo, datos, comprimir_csv.value)),
+            comprimir_csv
+        ]))
+        self.page.add(ft.ElevatedButton("Generar PDF", on_click=lambda _: self.generar_pdf_reporte(titulo, datos)))
         self.page.add(ft.ElevatedButton("Volver", on_click=lambda _: self.main_menu()))
         self.page.update()
 
+    def _crear_fila_reporte(self, datos: DatosReporte, fila: Tuple) -> ft.Row:
+        """
+        Crea la fila de la interfaz de usuario que muestra una fila de un reporte.
+
+        Args:
+            datos (DatosReporte): Reporte al que pertenece la fila.
+            fila (Tuple): Fila del reporte.
+
+        Returns:
+            ft.Row: Fila con un título y un valor por columna.
+        """
+        controles = []
+        for encabezado, valor in zip(datos.encabezados, datos.formatear(fila)):
+            controles.append(ft.Text(f"{encabezado}:", weight=ft.FontWeight.BOLD, color=BLUE_COLOR))
+            controles.append(ft.Text(valor))
+        return ft.Row(controles, alignment=ft.MainAxisAlignment.CENTER)
+
+    def ejecutar_en_segundo_plano(self, descripcion: str, funcion: Callable[..., Any], *args,
+                                  en_proceso: bool = False, con_progreso: bool = False,
+                                  al_terminar: Optional[Callable[[Any], None]] = None,
+                                  mostrar_indicador: bool = True, **kwargs) -> Trabajo:
+        """
+        Ejecuta una función en segundo plano y vuelve enseguida, sin bloquear la página.
+
+        Mientras dura el trabajo se muestra un indicador con su avance y un botón para
+        cancelarlo; al terminar se quita el indicador y se llama a 'al_terminar' con el
+        resultado. Los errores y la cancelación se informan con mostrar_mensaje.
+
+        Args:
+            descripcion (str): Descripción del trabajo (p. ej. "Generando PDF").
+            funcion (Callable): Función a ejecutar; si 'en_proceso' es True debe estar
+                definida a nivel de módulo en un módulo sin Flet.
+            en_proceso (bool): Si es True corre en otro proceso (matplotlib, reportlab). Por defecto es False.
+            con_progreso (bool): Si es True la función recibe el argumento 'progreso'. Por defecto es False.
+            al_terminar (Optional[Callable[[Any], None]]): Recibe el resultado. Por defecto es None.
+            mostrar_indicador (bool): Si es False no se agrega el indicador a la página. Por defecto es True.
+
+        Returns:
+            Trabajo: El trabajo encolado.
+        """
+        indicador = None
+        ultima_actualizacion = [0.0]
+
+        def quitar_indicador():
+            if indicador is not None and indicador in self.page.controls:
+                self.page.controls.remove(indicador)
+                self.page.update()
+
+        def progresar(hechos: int, total: Optional[int]):
+            ahora = time.monotonic()
+            if indicador is None or (ahora - ultima_actualizacion[0] < INTERVALO_PROGRESO and hechos != total):
+                return
+            ultima_actualizacion[0] = ahora
+            barra_progreso.value = hechos / total if total else None
+            texto_progreso.value = f"{descripcion}... {hechos} de {total}" if total else f"{descripcion}... {hechos}"
+            self.page.update()
+
+        @metricas_ui.medir_manejador(f"{type(self).__module__}: {descripcion} (al terminar)")
+        def terminar(resultado: Any):
+            quitar_indicador()
+            if al_terminar:
+                al_terminar(resultado)
+
+        def fallar(error: Exception):
+            quitar_indicador()
+            self.mostrar_mensaje(f"Error: {descripcion}: {str(error)}", RED_COLOR)
+
+        def cancelar():
+            quitar_indicador()
+            self.mostrar_mensaje(f"{descripcion}: cancelado", BLUE_COLOR)
+
+        if mostrar_indicador:
+            texto_progreso = ft.Text(f"{descripcion}...")
+            barra_progreso = ft.ProgressBar(width=400)
+            boton_cancelar = ft.TextButton("Cancelar")
+            indicador = ft.Column([ft.Row([texto_progreso, boton_cancelar]), barra_progreso])
+            self.page.add(indicador)
+
+        trabajo = enviar_trabajo(funcion, *args, descripcion=descripcion, en_proceso=en_proceso,
+                                 con_progreso=con_progreso, al_progresar=progresar, al_terminar=terminar,
+                                 al_fallar=fallar, al_cancelar=cancelar, **kwargs)
+        if indicador is not None:
+            boton_cancelar.on_click = lambda _: trabajo.cancelar()
+        return trabajo
+
     def mostrar_mensaje(self, mensaje: str, color: str):
         """
         Muestra un mensaje en la barra de notificaciones.
@@ -258,50 +469,59 @@ class BaseApp:
             self.mostrar_mensaje(f"Error: {str(e)}", RED_COLOR)
             return False
 
-    def generar_grafico_devoluciones(self, desde: str, hasta: str, titulo: str, query: str, color: str) -> str:
+    def generar_grafico_devoluciones(self, desde: str, hasta: str, titulo: str, query: str, color: str,
+                                     al_terminar: Callable[[GraficoGenerado], None]) -> Optional[Trabajo]:
         """
-        Genera un gráfico de devoluciones y lo guarda en un archivo PDF.
+        Genera en otro proceso un gráfico de devoluciones (o compras) sin bloquear la página,
+        o lo toma de la caché si los datos no cambiaron.
         :param desde: Fecha de inicio del rango de fechas.
         :param hasta: Fecha de fin del rango de fechas.
         :param titulo: Título del gráfico.
         :param query: Consulta SQL para obtener los datos.
         :param color: Color del gráfico.
-        :return: La imagen del gráfico en formato base64.
+        :param al_terminar: Recibe el gráfico generado.
+        :return: El trabajo que genera el gráfico, o None si estaba en la caché.
         """
-        with create_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, (desde, hasta))
-            devoluciones = cursor.fetchall()
+        return self.generar_grafico(titulo, query, desde, hasta, dibujar_grafico_barras, al_terminar,
+                                    f'{titulo} ({desde} - {hasta})', 'Nombres', 'Total Devoluciones ($)', color)
 
-        nombres = [dev[0] for dev in devoluciones]
-        totales = [dev[1] for dev in devoluciones]
-
-        plt.switch_backend('Agg')
-        plt.figure(figsize=(12, 6))
-        plt.bar(nombres, totales, color=color)
-        plt.xlabel('Nombres')
-        plt.ylabel('Total Devoluciones ($)')
-        plt.title(f'{titulo} ({desde} - {hasta})')
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
+    def generar_grafico(self, tipo: str, query: str, desde: str, hasta: str,
+                        funcion: Callable[..., GraficoGenerado], al_terminar: Callable[[GraficoGenerado], None],
+                        *argumentos) -> Optional[Trabajo]:
+        """
+        Obtiene un gráfico de la caché o, si no está, lo genera en otro proceso y lo guarda.
+        :param tipo: Tipo de gráfico (su título).
+        :param query: Consulta SQL del gráfico; sus parámetros son (desde, hasta).
+        :param desde: Fecha de inicio del rango de fechas.
+        :param hasta: Fecha de fin del rango de fechas.
+        :param funcion: Función de dibujo_graficos que recibe la consulta, los parámetros y 'argumentos'.
+        :param al_terminar: Recibe el gráfico generado.
+        :return: El trabajo que genera el gráfico, o None si estaba en la caché.
+        """
+        clave = clave_grafico(tipo, query, desde, hasta, argumentos)
+        grafico = obtener_grafico(clave)
+        if grafico is not None:
+            al_terminar(grafico)
+            return None
 
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode()
-        plt.close()
+        def terminar(grafico: GraficoGenerado):
+            guardar_grafico(clave, grafico)
+            al_terminar(grafico)
 
-        return image_base64
+        return self.ejecutar_en_segundo_plano("Generando gráfico", funcion, query, (desde, hasta), *argumentos,
+                                              en_proceso=True, al_terminar=terminar)
 
-    def generar_pdf(self, image_base64: str, desde: str, hasta: str, titulo: str, orientation: str = 'portrait'):
+    def generar_pdf(self, grafico: GraficoGenerado, desde: str, hasta: str, titulo: str,
+                    orientation: str = 'portrait') -> Trabajo:
         """
-        Genera un archivo PDF con el gráfico de devoluciones.
-        :param image_base64: La imagen del gráfico en formato base64.
+        Genera en otro proceso un archivo PDF con el gráfico de devoluciones, trazado en vectores,
+        y avisa con la ruta del archivo al terminar.
+        :param grafico: El gráfico generado.
         :param desde: Fecha de inicio del rango de fechas.
         :param hasta: Fecha de fin del rango de fechas.
         :param titulo: Título del gráfico.
         :param orientation: Orientación del PDF (portrait o landscape).
-        :return: La ruta del archivo PDF generado.
+        :return: El trabajo que genera el PDF.
         """
         pdf_dir = os.path.join(os.getcwd(), 'Graficos_PDF')
         os.makedirs(pdf_dir, exist_ok=True)
@@ -317,44 +537,25 @@ class BaseApp:
             titulo_archivo = "top_25_ventas_producto"
         elif titulo == "Top 25 Clientes con Más Ventas":
             titulo_archivo = "top_25_ventas_clientes"
+        elif titulo == "Ventas Diarias":
+            titulo_archivo = "ventas_diarias"
 
         pdf_path = os.path.join(pdf_dir, f'{titulo_archivo.lower().replace(" ", "_")}_{desde}_{hasta}.pdf')
 
-        if orientation == 'landscape':
-            pagesize = landscape(letter)
-        else:
-            pagesize = letter
+        return self.ejecutar_en_segundo_plano(
+            "Generando PDF", exportar_grafico_pdf, grafico, pdf_path, titulo, desde, hasta, orientation,
+            en_proceso=True, al_terminar=lambda ruta: self.mostrar_mensaje(f"PDF generado en: {ruta}", BLUE_COLOR))
 
-        doc = SimpleDocTemplate(pdf_path, pagesize=pagesize)
-        styles = getSampleStyleSheet()
-        elements = []
-
-        # Título
-        elements.append(Paragraph(titulo, styles['Title']))
-
-        # Fecha de inicio y final
-        elements.append(Paragraph(f"Fecha Inicio: {desde}", styles['Normal']))
-        elements.append(Paragraph(f"Fecha Final: {hasta}", styles['Normal']))
-
-        # Imagen del gráfico
-        image_data = base64.b64decode(image_base64)
-        elements.append(Image(io.BytesIO(image_data), width=700, height=400))
-
-        doc.build(elements)
-
-        return pdf_path
-
-    def mostrar_grafico(self, desde: str, hasta: str, titulo: str, generar_grafico_callback: Callable, generar_pdf_callback: Callable):
+    def mostrar_grafico(self, desde: str, hasta: str, titulo: str, grafico: GraficoGenerado,
+                        generar_pdf_callback: Callable):
         """
         Muestra el gráfico de devoluciones en una ventana emergente.
         :param desde: Fecha de inicio del rango de fechas.
         :param hasta: Fecha de fin del rango de fechas.
         :param titulo: Título del gráfico.
-        :param generar_grafico_callback: Función de devolución de llamada para generar el gráfico.
-        :param generar_pdf_callback: Función de devolución de llamada para generar el PDF.
+        :param grafico: El gráfico generado.
+        :param generar_pdf_callback: Función que genera el PDF en segundo plano (ver generar_pdf).
         """
-        image_base64 = generar_grafico_callback(desde, hasta)
-
         def close_dlg(_):
             """
             Cierra la ventana emergente.
@@ -366,8 +567,7 @@ class BaseApp:
             """
             Genera un archivo PDF con el gráfico de devoluciones.
             """
-            pdf_path = generar_pdf_callback(image_base64, desde, hasta)
-            self.mostrar_mensaje(f"PDF generado en: {pdf_path}", BLUE_COLOR)
+            generar_pdf_callback(grafico, desde, hasta)
 
         dlg = ft.AlertDialog(
             title=ft.Text(titulo),
@@ -378,7 +578,7 @@ class BaseApp:
                     ft.Text("Fecha Final:", weight=ft.FontWeight.BOLD, color="blue"),
                     ft.Text(hasta)
                 ], alignment=ft.MainAxisAlignment.CENTER),
-                ft.Image(src_base64=image_base64, width=ANCHO_GRAFICO, height=ALTO_GRAFICO, fit=ft.ImageFit.CONTAIN)
+                ft.Image(src_base64=grafico.png_base64, width=ANCHO_GRAFICO, height=ALTO_GRAFICO, fit=ft.ImageFit.CONTAIN)
             ], scroll=ft.ScrollMode.AUTO),
             actions=[
                 ft.TextButton("Cerrar", on_click=close_dlg),
@@ -423,9 +623,12 @@ class BaseApp:
                 self.mostrar_mensaje("La fecha 'Hasta' no puede ser menor que la fecha 'Desde'.", RED_COLOR)
                 return
 
-            self.mostrar_grafico(desde, hasta, titulo,
-                                 lambda desde, hasta: self.generar_grafico_devoluciones(desde, hasta, titulo, query, color),
-                                 lambda image_base64, desde, hasta: self.generar_pdf(image_base64, desde, hasta, titulo, orientation='landscape'))
+            self.generar_grafico_devoluciones(
+                desde, hasta, titulo, query, color,
+                lambda grafico: self.mostrar_grafico(
+                    desde, hasta, titulo, grafico,
+                    lambda grafico, desde, hasta: self.generar_pdf(grafico, desde, hasta, titulo,
+                                                                   orientation='landscape')))
 
         self.page.controls.clear()
         self.page.add(
@@ -1,18 +1,22 @@
 # main.py
+import diagnostico_arranque  # Primero: toma el momento de inicio del arranque
+if __name__ == "__main__":
+    # En modo diagnóstico ('--diagnostico' o VCI_DIAGNOSTICO=1) cronometra las importaciones siguientes
+    diagnostico_arranque.iniciar()
+
 import flet as ft
-from typing import List, Tuple, Callable
+import importlib
+from typing import List, Callable
 import password
-from producto import producto_app
-from cliente import cliente_app
-from proveedor import proveedor_app
-from ventas import ventas_app
-from compras import compras_app
-from reportes import reportes_app
-from reiniciar_db import reiniciar_db_app
 from usuarios import cargar_credenciales, crear_usuario, modificar_usuario, eliminar_usuario
-from devoluciones import devoluciones_app
-from graficos import graficos_app
 import database
+import migraciones
+import secuencias
+import resumenes
+import trabajos
+import traza_sql
+import metricas_ui
+import multiprocessing
 import os
 import subprocess
 from datetime import datetime
@@ -31,6 +35,36 @@ COLOR_ERROR = "red"
 COLOR_EXITO = "black"
 COLOR_SNACKBAR = "white"
 
+# Pantallas de la aplicación: (módulo, función que la abre). Cada módulo se importa la
+# primera vez que se abre su pantalla (ver cargar_pantalla), así el arranque no carga
+# todas las pantallas, reportlab ni matplotlib antes de mostrar el inicio de sesión.
+PANTALLAS = {
+    "productos": ("producto", "producto_app"),
+    "clientes": ("cliente", "cliente_app"),
+    "proveedores": ("proveedor", "proveedor_app"),
+    "ventas": ("ventas", "ventas_app"),
+    "compras": ("compras", "compras_app"),
+    "reportes": ("reportes", "reportes_app"),
+    "devoluciones": ("devoluciones", "devoluciones_app"),
+    "graficos": ("graficos", "graficos_app"),
+    "reiniciar_db": ("reiniciar_db", "reiniciar_db_app"),
+    "diagnostico": ("pantalla_diagnostico", "pantalla_diagnostico_app"),
+    "consultas": ("diag_consultas", "diag_consultas_app"),
+}
+
+def cargar_pantalla(nombre: str) -> Callable:
+    """
+    Devuelve la función que abre una pantalla, importando su módulo si todavía no se usó.
+
+    Args:
+        nombre (str): Clave de la pantalla en PANTALLAS.
+
+    Returns:
+        Callable: La función de la pantalla, que recibe la página y la función para volver al menú.
+    """
+    modulo, funcion = PANTALLAS[nombre]
+    return getattr(importlib.import_module(modulo), funcion)
+
 class MainApp:
     """
     Clase principal de la aplicación.
@@ -43,7 +77,7 @@ class MainApp:
         Args:
             page (ft.Page): La página principal de la aplicación.
         """
-        self.page = page
+        self.page = metricas_ui.medir_pagina(page)
         self.page.title = TITULO_APP
         self.page.vertical_alignment = ft.MainAxisAlignment.CENTER
         self.page.horizontal_alignment = ft.CrossAxisAlignment.CENTER
@@ -76,7 +110,6 @@ class MainApp:
     def login_screen(self) -> None:
         """Muestra la pantalla de inicio de sesión."""
         self.page.controls.clear()
-        self.key, self.usuarios_reales = cargar_credenciales()
 
         def validar_login(e):
             """
@@ -113,6 +146,10 @@ class MainApp:
             )
         )
         self.page.update()
+        diagnostico_arranque.marcar_momento(diagnostico_arranque.MOMENTO_PRIMER_PAGE_UPDATE)
+        # Las credenciales se leen con la pantalla ya visible (desencriptarlas carga cryptography)
+        with diagnostico_arranque.medir(diagnostico_arranque.OPERACION_CARGAR_CREDENCIALES):
+            self.key, self.usuarios_reales = cargar_credenciales()
 
     def main_menu(self) -> None:
         """Muestra el menú principal de la aplicación."""
@@ -156,43 +193,43 @@ class MainApp:
             ft.ElevatedButton(text2, icon=icon2, on_click=on_click2),
         ], alignment=ft.MainAxisAlignment.CENTER)
 
-    def _open_app(self, app_function: Callable) -> None:
-        """Abre una aplicación específica."""
+    def _open_app(self, pantalla: str) -> None:
+        """Abre una aplicación específica (ver PANTALLAS), importándola si es la primera vez."""
         self.page.controls.clear()
-        app_function(self.page, self.main_menu)
+        cargar_pantalla(pantalla)(self.page, self.main_menu)
         self.page.update()
 
     def open_productos(self, _) -> None:
         """Abre la aplicación de gestión de productos."""
-        self._open_app(producto_app)
+        self._open_app("productos")
 
     def open_clientes(self, _) -> None:
         """Abre la aplicación de gestión de clientes."""
-        self._open_app(cliente_app)
+        self._open_app("clientes")
 
     def open_proveedores(self, _) -> None:
         """Abre la aplicación de gestión de proveedores."""
-        self._open_app(proveedor_app)
+        self._open_app("proveedores")
 
     def open_ventas(self, _) -> None:
         """Abre la aplicación de gestión de ventas."""
-        self._open_app(ventas_app)
+        self._open_app("ventas")
 
     def open_compras(self, _) -> None:
         """Abre la aplicación de gestión de compras."""
-        self._open_app(compras_app)
+        self._open_app("compras")
 
     def open_reportes(self, _) -> None:
         """Abre la aplicación de reportes."""
-        self._open_app(reportes_app)
+        self._open_app("reportes")
 
     def open_devoluciones(self, _) -> None:
         """Abre la aplicación de gestión de devoluciones."""
-        self._open_app(devoluciones_app)
+        self._open_app("devoluciones")
 
     def open_graficos(self, _) -> None:
         """Abre la aplicación de gráficos."""
-        self._open_app(graficos_app)
+        self._open_app("graficos")
 
     def open_mantenimiento(self, _) -> None:
         """Abre la aplicación de mantenimiento."""
@@ -212,6 +249,9 @@ class MainApp:
                         ft.ElevatedButton("Reiniciar Base de Datos", icon=ft.icons.SETTINGS,
                                           on_click=self.reiniciar_db),
                         ft.Divider(height=20, color="transparent"),
+                        ft.ElevatedButton("Reconstruir Resúmenes Diarios", icon=ft.icons.REFRESH,
+                                          on_click=self.reconstruir_resumenes),
+                        ft.Divider(height=20, color="transparent"),
                         ft.ElevatedButton("Crear Usuario", icon=ft.icons.PERSON_ADD, on_click=self.crear_usuario),
                         ft.Divider(height=20, color="transparent"),
                         ft.ElevatedButton("Modificar Usuario", icon=ft.icons.EDIT, on_click=self.modificar_usuario),
@@ -222,6 +262,14 @@ class MainApp:
                                           on_click=lambda _: abrir_instalador_sumatra_pdf(self)),
                     ], alignment=ft.MainAxisAlignment.CENTER),
                     ft.Divider(height=20, color="transparent"),
+                    ft.Row([
+                        ft.ElevatedButton("Diagnóstico de Arranque", icon=ft.icons.TIMER,
+                                          on_click=self.abrir_diagnostico_arranque),
+                        ft.Divider(height=20, color="transparent"),
+                        ft.ElevatedButton("Consultas SQL", icon=ft.icons.QUERY_STATS,
+                                          on_click=self.abrir_consultas_sql),
+                    ], alignment=ft.MainAxisAlignment.CENTER),
+                    ft.Divider(height=20, color="transparent"),
                     ft.Row([
                         ft.ElevatedButton("Volver al Menú Principal", icon=ft.icons.ARROW_BACK,
                                           on_click=lambda _: self.main_menu()),
@@ -242,7 +290,25 @@ class MainApp:
 
     def reiniciar_db(self, _) -> None:
         """Reinicia la base de datos."""
-        reiniciar_db_app(self.page, self.main_menu)
+        cargar_pantalla("reiniciar_db")(self.page, self.main_menu)
+        self.page.update()
+
+    def reconstruir_resumenes(self, _) -> None:
+        """Vuelve a calcular en segundo plano los resúmenes diarios de ventas, compras y devoluciones."""
+        self.mostrar_mensaje("Reconstruyendo resúmenes diarios...", COLOR_EXITO)
+        trabajos.enviar_trabajo(
+            resumenes.reconstruir_resumenes, descripcion="Reconstruir resúmenes diarios",
+            al_terminar=lambda _: self.mostrar_mensaje("Resúmenes diarios reconstruidos con éxito", COLOR_EXITO),
+            al_fallar=lambda e: self.mostrar_mensaje(f"Error al reconstruir los resúmenes: {str(e)}", COLOR_ERROR))
+
+    def abrir_diagnostico_arranque(self, _) -> None:
+        """Muestra los tiempos del último arranque en modo diagnóstico."""
+        cargar_pantalla("diagnostico")(self.page, self.mantenimiento_menu)
+        self.page.update()
+
+    def abrir_consultas_sql(self, _) -> None:
+        """Muestra la traza SQL: las sentencias que más tiempo llevan y las consultas lentas."""
+        cargar_pantalla("consultas")(self.page, self.mantenimiento_menu)
         self.page.update()
 
     def crear_usuario(self, _) -> None:
@@ -401,10 +467,7 @@ class MainApp:
 
     def reiniciar_numero_factura(self) -> None:
         """Reinicia el número de factura a '00000001'."""
-        with database.create_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("UPDATE Ventas SET factura_id = '00000001' WHERE id = (SELECT MAX(id) FROM Ventas)")
-            conn.commit()
+        secuencias.reiniciar_secuencia(secuencias.SECUENCIA_FACTURAS, 0)
         self.mostrar_mensaje("Número de factura reiniciado a '00000001'", COLOR_ERROR)
 
     def mostrar_mensaje(self, mensaje: str, color: str) -> None:
@@ -471,11 +534,30 @@ def main(page: ft.Page) -> None:
     Args:
         page (ft.Page): La página principal de la aplicación.
     """
+    diagnostico_arranque.marcar_etapa("Inicio de Flet")
     app = MainApp(page)
-    password.password_app()
+    with diagnostico_arranque.medir(diagnostico_arranque.OPERACION_PASSWORD_APP):
+        password.password_app()
+    diagnostico_arranque.marcar_etapa("Archivo de credenciales")
     app.login_screen()
+    diagnostico_arranque.marcar_etapa("Pantalla de inicio de sesión")
+    diagnostico_arranque.finalizar_arranque()
 
 if __name__ == "__main__":
-    database.create_tables()
-    ft.app(target=main)
+    # Necesario para los procesos del gestor de trabajos en el ejecutable compilado
+    multiprocessing.freeze_support()
+    diagnostico_arranque.marcar_etapa("Importaciones")
+    if traza_sql.traza_pedida():
+        traza_sql.activar_traza()
+    if metricas_ui.metricas_pedidas():
+        metricas_ui.activar_metricas()
+    with diagnostico_arranque.medir(diagnostico_arranque.OPERACION_CREATE_TABLES):
+        database.create_tables()
+    with diagnostico_arranque.medir(diagnostico_arranque.OPERACION_MIGRACIONES):
+        migraciones.aplicar_migraciones()
+    diagnostico_arranque.marcar_etapa("Base de datos y migraciones")
+    try:
+        ft.app(target=main)
+    finally:
+        trabajos.cerrar_trabajos()
 
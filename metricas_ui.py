@@ -0,0 +1,408 @@
+# metricas_ui.py
+import atexit
+import bisect
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence
+
+# Módulo sin Flet (solo la biblioteca estándar): libreria.BaseApp y main.MainApp lo usan para
+# medir la interfaz.
+#
+# Con las métricas activas ('main.py --metricas-ui' o la variable de entorno VCI_METRICAS_UI=1)
+# cada pantalla trabaja con una PaginaMedida en lugar de la página de Flet. La PaginaMedida
+# cuenta cada page.update() y page.add(), mide cuánto tardan y recorre el árbol de controles
+# para saber cuántos se envían. En ese mismo recorrido envuelve con medir_manejador los
+# manejadores de eventos (on_click, on_change, ...) que todavía no estaban medidos, así cada
+# manejador registra su duración, las actualizaciones que hizo y el tamaño del árbol en cada una,
+# sin tocar las pantallas. El tiempo del recorrido no se cuenta en la duración del manejador.
+#
+# Al cerrar la aplicación los percentiles y el histograma de cada manejador quedan en
+# ARCHIVO_METRICAS_UI. Sin las métricas activas las pantallas usan la página de Flet directamente.
+
+OPCION_METRICAS = "--metricas-ui"
+VARIABLE_METRICAS = "VCI_METRICAS_UI"
+ARCHIVO_METRICAS_UI = "metricas_ui.json"
+MAXIMO_MUESTRAS = 5000  # Muestras que conserva cada manejador para los percentiles (las más recientes)
+PERCENTILES = (50, 95, 99)
+LIMITES_HISTOGRAMA = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)  # Segundos; el último tramo no tiene límite
+SIN_MANEJADOR = "(fuera de manejadores)"  # Actualizaciones de trabajos en segundo plano y del arranque
+
+# Eventos cuyos manejadores se miden y atributos por los que se recorre el árbol de controles
+EVENTOS_MEDIDOS = ("on_click", "on_change", "on_submit", "on_select", "on_dismiss", "on_scroll")
+ATRIBUTOS_HIJOS = ("controls", "content", "actions", "title", "subtitle", "leading", "trailing")
+ATRIBUTOS_PAGINA = ("overlay", "dialog", "snack_bar", "banner", "bottom_sheet")
+
+def percentil(ordenados: Sequence[float], porcentaje: float) -> float:
+    """
+    Calcula un percentil por rango más cercano.
+
+    Args:
+        ordenados (Sequence[float]): Valores ordenados de menor a mayor.
+        porcentaje (float): Percentil a calcular (de 0 a 100).
+
+    Returns:
+        float: El valor del percentil, o 0.0 si no hay valores.
+    """
+    if not ordenados:
+        return 0.0
+    return ordenados[max(0, math.ceil(porcentaje / 100 * len(ordenados)) - 1)]
+
+def _percentiles(valores: Iterable[float], escala: float = 1.0) -> Dict[str, float]:
+    ordenados = sorted(valores)
+    return {f"p{porcentaje}": round(percentil(ordenados, porcentaje) * escala, 3) for porcentaje in PERCENTILES}
+
+def nombre_manejador(funcion: Callable, control: Any = None) -> str:
+    """
+    Nombre con el que se registra un manejador: módulo y función ('ventas.VentaApp.mostrar_venta.finalizar_venta').
+    Las funciones lambda llevan además el texto del control ('... .<lambda> [Volver]').
+
+    Args:
+        funcion (Callable): El manejador.
+        control (Any): Control al que pertenece. Por defecto es None.
+
+    Returns:
+        str: El nombre.
+    """
+    nombre = getattr(funcion, "__qualname__", type(funcion).__name__).replace(".<locals>", "")
+    modulo = getattr(funcion, "__module__", None)
+    if modulo:
+        nombre = f"{modulo}.{nombre}"
+    if "<lambda>" in nombre and control is not None:
+        texto = next((valor for valor in (getattr(control, atributo, None) for atributo in ("text", "label", "tooltip"))
+                      if isinstance(valor, str) and valor), type(control).__name__)
+        nombre = f"{nombre} [{texto}]"
+    return nombre
+
+@dataclass
+class EstadisticaManejador:
+    """
+    Mediciones de un manejador de eventos.
+
+    Attributes:
+        nombre (str): Nombre del manejador (ver nombre_manejador).
+        llamadas (int): Veces que se ejecutó.
+        errores (int): Ejecuciones que terminaron con una excepción.
+        total (float): Segundos sumados de todas las ejecuciones.
+        maximo (float): Segundos de la ejecución más lenta.
+        actualizaciones (int): page.update() y page.add() que hizo en total.
+        tiempo_actualizaciones (float): Segundos que pasó dentro de esas actualizaciones.
+        histograma (List[int]): Ejecuciones por tramo de duración (ver LIMITES_HISTOGRAMA).
+        duraciones (Deque[float]): Últimas duraciones, para los percentiles.
+        actualizaciones_por_llamada (Deque[int]): Actualizaciones de cada una de las últimas ejecuciones.
+        controles (Deque[int]): Tamaño del árbol de controles en cada una de las últimas actualizaciones.
+    """
+    nombre: str
+    llamadas: int = 0
+    errores: int = 0
+    total: float = 0.0
+    maximo: float = 0.0
+    actualizaciones: int = 0
+    tiempo_actualizaciones: float = 0.0
+    histograma: List[int] = field(default_factory=lambda: [0] * (len(LIMITES_HISTOGRAMA) + 1))
+    duraciones: Deque[float] = field(default_factory=lambda: deque(maxlen=MAXIMO_MUESTRAS))
+    actualizaciones_por_llamada: Deque[int] = field(default_factory=lambda: deque(maxlen=MAXIMO_MUESTRAS))
+    controles: Deque[int] = field(default_factory=lambda: deque(maxlen=MAXIMO_MUESTRAS))
+
+    def agregar_llamada(self, duracion: float, actualizaciones: int, error: bool):
+        self.llamadas += 1
+        self.errores += error
+        self.total += duracion
+        self.maximo = max(self.maximo, duracion)
+        self.histograma[bisect.bisect_left(LIMITES_HISTOGRAMA, duracion)] += 1
+        self.duraciones.append(duracion)
+        self.actualizaciones_por_llamada.append(actualizaciones)
+
+    def agregar_actualizacion(self, controles: int, duracion: float):
+        self.actualizaciones += 1
+        self.tiempo_actualizaciones += duracion
+        self.controles.append(controles)
+
+    def resumen(self) -> Dict[str, Any]:
+        """
+        Devuelve las mediciones para exportar, con los tiempos en milisegundos.
+        """
+        limites = [f"hasta {limite * 1000:g} ms" for limite in LIMITES_HISTOGRAMA]
+        limites.append(f"más de {LIMITES_HISTOGRAMA[-1] * 1000:g} ms")
+        return {
+            "manejador": self.nombre,
+            "llamadas": self.llamadas,
+            "errores": self.errores,
+            "total_ms": round(self.total * 1000, 3),
+            "promedio_ms": round(self.total / self.llamadas * 1000, 3) if self.llamadas else 0.0,
+            "maximo_ms": round(self.maximo * 1000, 3),
+            "duracion_ms": _percentiles(self.duraciones, 1000),
+            "histograma": dict(zip(limites, self.histograma)),
+            "actualizaciones": self.actualizaciones,
+            "tiempo_actualizaciones_ms": round(self.tiempo_actualizaciones * 1000, 3),
+            "actualizaciones_por_llamada": _percentiles(self.actualizaciones_por_llamada),
+            "controles_por_actualizacion": dict(_percentiles(self.controles),
+                                                maximo=max(self.controles, default=0)),
+        }
+
+class _Medicion:
+    """
+    Manejador en curso en un hilo: sus actualizaciones y el tiempo de recorrer el árbol.
+    """
+    __slots__ = ("estadistica", "actualizaciones", "sobrecarga")
+
+    def __init__(self, estadistica: EstadisticaManejador):
+        self.estadistica = estadistica
+        self.actualizaciones = 0
+        self.sobrecarga = 0.0
+
+class RegistroManejadores:
+    """
+    Mediciones de los manejadores del proceso. Flet ejecuta cada evento en un hilo, por eso los
+    manejadores en curso se guardan por hilo (una pila, por si un manejador llama a otro).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._estadisticas: Dict[str, EstadisticaManejador] = {}
+        self._local = threading.local()
+
+    def _estadistica(self, nombre: str) -> EstadisticaManejador:
+        estadistica = self._estadisticas.get(nombre)
+        if estadistica is None:
+            estadistica = self._estadisticas[nombre] = EstadisticaManejador(nombre)
+        return estadistica
+
+    def _pila(self) -> List[_Medicion]:
+        pila = getattr(self._local, "pila", None)
+        if pila is None:
+            pila = self._local.pila = []
+        return pila
+
+    def ejecutar(self, nombre: str, funcion: Callable, *args, **kwargs) -> Any:
+        """
+        Ejecuta un manejador y registra su duración y sus actualizaciones.
+        """
+        with self._lock:
+            medicion = _Medicion(self._estadistica(nombre))
+        pila = self._pila()
+        pila.append(medicion)
+        error = False
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        except BaseException:
+            error = True
+            raise
+        finally:
+            duracion = time.perf_counter() - inicio - medicion.sobrecarga
+            pila.pop()
+            if pila:
+                pila[-1].sobrecarga += medicion.sobrecarga
+            with self._lock:
+                medicion.estadistica.agregar_llamada(duracion, medicion.actualizaciones, error)
+
+    def registrar_actualizacion(self, controles: int, duracion: float, sobrecarga: float):
+        """
+        Registra una actualización de la página en el manejador en curso del hilo.
+
+        Args:
+            controles (int): Controles del árbol de la página.
+            duracion (float): Segundos que tardó la actualización.
+            sobrecarga (float): Segundos de la medición (el recorrido del árbol), que se descuentan.
+        """
+        pila = self._pila()
+        with self._lock:
+            if pila:
+                medicion = pila[-1]
+                medicion.actualizaciones += 1
+                medicion.sobrecarga += sobrecarga
+                estadistica = medicion.estadistica
+            else:
+                estadistica = self._estadistica(SIN_MANEJADOR)
+            estadistica.agregar_actualizacion(controles, duracion)
+
+    def resumen(self) -> List[Dict[str, Any]]:
+        """
+        Devuelve las mediciones de cada manejador, del p95 más lento al más rápido.
+        """
+        with self._lock:
+            resumenes = [estadistica.resumen() for estadistica in self._estadisticas.values()]
+        clave = f"p{PERCENTILES[1]}" if len(PERCENTILES) > 1 else f"p{PERCENTILES[0]}"
+        return sorted(resumenes, key=lambda resumen: (resumen["duracion_ms"][clave], resumen["total_ms"]),
+                      reverse=True)
+
+    def vaciar(self):
+        with self._lock:
+            self._estadisticas.clear()
+
+# Registro del proceso y estado de las métricas
+_registro = RegistroManejadores()
+_activas = False
+_guardar_al_salir = False
+
+def medir_manejador(nombre: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """
+    Decorador que mide un manejador de eventos mientras las métricas están activas.
+
+    Args:
+        nombre (Optional[str]): Nombre con el que se registra. Por defecto es el de nombre_manejador.
+
+    Returns:
+        Callable: El decorador.
+    """
+    def decorador(funcion: Callable) -> Callable:
+        nombre_registro = nombre or nombre_manejador(funcion)
+
+        @wraps(funcion)
+        def medido(*args, **kwargs):
+            if not _activas:
+                return funcion(*args, **kwargs)
+            return _registro.ejecutar(nombre_registro, funcion, *args, **kwargs)
+
+        medido._manejador_medido = True
+        return medido
+    return decorador
+
+def medir_controles(raices: Iterable[Any]) -> int:
+    """
+    Recorre el árbol de controles, cuenta los controles y envuelve con medir_manejador los
+    manejadores de eventos que todavía no estaban medidos.
+
+    Args:
+        raices (Iterable[Any]): Controles desde los que se recorre.
+
+    Returns:
+        int: Cantidad de controles.
+    """
+    pendientes = [control for control in raices if control is not None]
+    vistos = set()
+    while pendientes:
+        control = pendientes.pop()
+        if id(control) in vistos:
+            continue
+        vistos.add(id(control))
+        for evento in EVENTOS_MEDIDOS:
+            manejador = getattr(control, evento, None)
+            if callable(manejador) and not getattr(manejador, "_manejador_medido", False):
+                setattr(control, evento, medir_manejador(nombre_manejador(manejador, control))(manejador))
+        for atributo in ATRIBUTOS_HIJOS:
+            hijo = getattr(control, atributo, None)
+            if isinstance(hijo, (list, tuple)):
+                pendientes.extend(elemento for elemento in hijo if elemento is not None and not isinstance(elemento, str))
+            elif hijo is not None and not isinstance(hijo, str):
+                pendientes.append(hijo)
+    return len(vistos)
+
+class PaginaMedida:
+    """
+    Página de Flet que mide sus actualizaciones (ver el comentario del módulo). Todo lo demás
+    (controles, atributos, otros métodos) pasa a la página original.
+    """
+    def __init__(self, pagina: Any):
+        object.__setattr__(self, "_pagina", pagina)
+
+    def __getattr__(self, nombre: str) -> Any:
+        return getattr(self._pagina, nombre)
+
+    def __setattr__(self, nombre: str, valor: Any):
+        setattr(self._pagina, nombre, valor)
+
+    def update(self, *controles):
+        return self._medir(self._pagina.update, *controles)
+
+    def add(self, *controles):
+        return self._medir(self._pagina.add, *controles)
+
+    def _medir(self, metodo: Callable, *args) -> Any:
+        inicio = time.perf_counter()
+        try:
+            return metodo(*args)
+        finally:
+            fin = time.perf_counter()
+            raices = list(self._pagina.controls)
+            for atributo in ATRIBUTOS_PAGINA:
+                valor = getattr(self._pagina, atributo, None)
+                raices.extend(valor if isinstance(valor, list) else [valor])
+            controles = medir_controles(raices)
+            _registro.registrar_actualizacion(controles, fin - inicio, time.perf_counter() - fin)
+
+def medir_pagina(pagina: Any) -> Any:
+    """
+    Devuelve la página que deben usar las pantallas: una PaginaMedida si las métricas están
+    activas, o la misma página si no lo están o ya está medida.
+    """
+    if not _activas or isinstance(pagina, PaginaMedida):
+        return pagina
+    return PaginaMedida(pagina)
+
+def metricas_pedidas(argumentos: Optional[Sequence[str]] = None, entorno: Optional[Dict[str, str]] = None) -> bool:
+    """
+    Indica si se pidieron las métricas por la línea de comandos o por la variable de entorno.
+
+    Args:
+        argumentos (Optional[Sequence[str]]): Argumentos de la línea de comandos. Por defecto es sys.argv.
+        entorno (Optional[Dict[str, str]]): Variables de entorno. Por defecto es os.environ.
+
+    Returns:
+        bool: True si se pidieron las métricas.
+    """
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    entorno = os.environ if entorno is None else entorno
+    valor = entorno.get(VARIABLE_METRICAS, "").strip().lower()
+    return OPCION_METRICAS in argumentos or valor not in ("", "0", "no", "false")
+
+def metricas_activas() -> bool:
+    """
+    Indica si las pantallas que se creen a partir de ahora se miden.
+    """
+    return _activas
+
+def activar_metricas():
+    """
+    Activa las métricas para las pantallas que se creen a partir de ahora; al cerrar la
+    aplicación se guardan en ARCHIVO_METRICAS_UI.
+    """
+    global _activas, _guardar_al_salir
+    _activas = True
+    if not _guardar_al_salir:
+        _guardar_al_salir = True
+        atexit.register(guardar_metricas)
+
+def desactivar_metricas():
+    """
+    Desactiva las métricas (las páginas ya medidas siguen contando las actualizaciones).
+    """
+    global _activas
+    _activas = False
+
+def resumen_metricas() -> List[Dict[str, Any]]:
+    """
+    Las mediciones de cada manejador (ver RegistroManejadores.resumen).
+    """
+    return _registro.resumen()
+
+def vaciar_metricas():
+    """
+    Borra las mediciones acumuladas.
+    """
+    _registro.vaciar()
+
+def guardar_metricas(ruta: str = ARCHIVO_METRICAS_UI) -> str:
+    """
+    Guarda las mediciones de cada manejador en un archivo JSON.
+
+    Args:
+        ruta (str): Ruta del archivo. Por defecto es ARCHIVO_METRICAS_UI.
+
+    Returns:
+        str: Ruta del archivo.
+    """
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump({"fecha": datetime.now().isoformat(timespec="seconds"), "percentiles": list(PERCENTILES),
+                   "muestras_por_manejador": MAXIMO_MUESTRAS, "manejadores": resumen_metricas()},
+                  archivo, ensure_ascii=False, indent=2)
+    os.replace(temporal, ruta)
+    return ruta
@@ -0,0 +1,504 @@
+# migraciones.py
+from typing import Sequence
+from database import create_connection
+from resumenes import TABLAS_RESUMEN, reconstruir_resumenes
+
+# Cada migración es una función que recibe un cursor y aplica un cambio de esquema.
+# La versión del esquema se guarda en 'PRAGMA user_version' y corresponde a la
+# posición (desde 1) de la última migración aplicada en la lista MIGRACIONES.
+# Las migraciones ya publicadas no deben modificarse; los cambios nuevos se agregan al final.
+
+def _migracion_indices_transacciones(cursor):
+    """
+    Crea los índices de las tablas de transacciones según las consultas reales de la aplicación.
+
+    - Ventas/Devoluciones por factura_id: devoluciones.mostrar_factura y ventas.generar_numero_factura (MAX).
+    - (producto_id, fecha) y (cliente_id/proveedor_id, fecha): filtros de los reportes y gráficos
+      y las verificaciones de ventas registradas al eliminar productos o clientes.
+    - fecha: rangos 'fecha BETWEEN ? AND ?' de los reportes y gráficos sin otro filtro.
+    - Compras (producto_id, fecha, precio_costo): último precio de costo de cada producto
+      (compras.listar_productos y reporte_productos) sin leer la tabla.
+    """
+    for sentencia in (
+        "CREATE INDEX IF NOT EXISTS idx_ventas_factura ON Ventas(factura_id)",
+        "CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON Ventas(fecha)",
+        "CREATE INDEX IF NOT EXISTS idx_ventas_producto_fecha ON Ventas(producto_id, fecha)",
+        "CREATE INDEX IF NOT EXISTS idx_ventas_cliente_fecha ON Ventas(cliente_id, fecha)",
+
+        "CREATE INDEX IF NOT EXISTS idx_compras_fecha ON Compras(fecha)",
+        "CREATE INDEX IF NOT EXISTS idx_compras_producto_fecha ON Compras(producto_id, fecha, precio_costo)",
+        "CREATE INDEX IF NOT EXISTS idx_compras_proveedor_fecha ON Compras(proveedor_id, fecha)",
+
+        "CREATE INDEX IF NOT EXISTS idx_devoluciones_factura ON Devoluciones(factura_id)",
+        "CREATE INDEX IF NOT EXISTS idx_devoluciones_fecha ON Devoluciones(fecha)",
+        "CREATE INDEX IF NOT EXISTS idx_devoluciones_producto_fecha ON Devoluciones(producto_id, fecha)",
+        "CREATE INDEX IF NOT EXISTS idx_devoluciones_cliente_fecha ON Devoluciones(cliente_id, fecha)",
+    ):
+        cursor.execute(sentencia)
+
+def _migracion_secuencias(cursor):
+    """
+    Crea la tabla de secuencias y la inicializa con el último número de factura usado,
+    para que los números nuevos sigan la numeración existente.
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Secuencias (
+        nombre TEXT PRIMARY KEY,  -- Nombre de la secuencia (p. ej. 'factura')
+        valor INTEGER NOT NULL  -- Último número entregado
+    )
+    ''')
+    cursor.execute('''
+    INSERT OR IGNORE INTO Secuencias (nombre, valor)
+    SELECT 'factura', COALESCE(MAX(CAST(factura_id AS INTEGER)), 0) FROM Ventas
+    ''')
+
+def _migracion_facturas(cursor):
+    """
+    Separa las ventas en un encabezado de factura (Facturas) y sus líneas (FacturaLineas),
+    con el precio unitario, el descuento y el impuesto capturados al momento de la venta.
+
+    Las ventas existentes se copian usando el precio actual del producto (el único
+    disponible) con descuento e impuesto en 0. La tabla Ventas se reemplaza por una
+    vista con las mismas columnas para no romper consultas externas.
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Facturas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,  -- Identificador único de la factura
+        factura_id TEXT NOT NULL UNIQUE,  -- Número de factura
+        cliente_id INTEGER,  -- Identificador del cliente
+        fecha DATE NOT NULL,  -- Fecha de la venta
+        descuento_porcentaje REAL NOT NULL DEFAULT 0,  -- Descuento aplicado a la factura (%)
+        tasa_impuesto REAL NOT NULL DEFAULT 0,  -- Tasa de impuesto aplicada (fracción, p. ej. 0.16)
+        FOREIGN KEY (cliente_id) REFERENCES Clientes(id)  -- Clave foránea que referencia al cliente
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS FacturaLineas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,  -- Identificador único de la línea
+        factura_id TEXT NOT NULL,  -- Número de factura
+        producto_id INTEGER,  -- Identificador del producto vendido
+        cantidad INTEGER NOT NULL,  -- Cantidad vendida
+        precio_unitario REAL NOT NULL,  -- Precio del producto al momento de la venta
+        descuento REAL NOT NULL DEFAULT 0,  -- Monto de descuento de la línea
+        impuesto REAL NOT NULL DEFAULT 0,  -- Monto de impuesto de la línea
+        FOREIGN KEY (factura_id) REFERENCES Facturas(factura_id),  -- Clave foránea que referencia a la factura
+        FOREIGN KEY (producto_id) REFERENCES Productos(id)  -- Clave foránea que referencia al producto
+    )
+    ''')
+    cursor.execute('''
+    INSERT INTO Facturas (factura_id, cliente_id, fecha)
+    SELECT factura_id, MIN(cliente_id), MIN(fecha)
+    FROM Ventas
+    GROUP BY factura_id
+    ''')
+    cursor.execute('''
+    INSERT INTO FacturaLineas (id, factura_id, producto_id, cantidad, precio_unitario)
+    SELECT v.id, v.factura_id, v.producto_id, v.cantidad, COALESCE(p.precio, 0)
+    FROM Ventas v
+    LEFT JOIN Productos p ON v.producto_id = p.id
+    ''')
+    cursor.execute("DROP TABLE Ventas")
+    cursor.execute('''
+    CREATE VIEW Ventas AS
+    SELECT l.id, f.cliente_id, l.producto_id, l.cantidad, f.fecha, l.factura_id
+    FROM FacturaLineas l
+    JOIN Facturas f ON f.factura_id = l.factura_id
+    ''')
+    for sentencia in (
+        "CREATE INDEX IF NOT EXISTS idx_facturas_fecha ON Facturas(fecha)",
+        "CREATE INDEX IF NOT EXISTS idx_facturas_cliente_fecha ON Facturas(cliente_id, fecha)",
+        "CREATE INDEX IF NOT EXISTS idx_factura_lineas_factura ON FacturaLineas(factura_id, producto_id)",
+        "CREATE INDEX IF NOT EXISTS idx_factura_lineas_producto ON FacturaLineas(producto_id)",
+    ):
+        cursor.execute(sentencia)
+
+def _recalcular_ultimo_costo(producto):
+    """
+    Sentencias que recalculan la fila de UltimoCosto de un producto dentro de un trigger.
+
+    Args:
+        producto (str): Referencia al producto en el trigger ('NEW.producto_id' u 'OLD.producto_id').
+
+    Returns:
+        str: Sentencias SQL para el cuerpo del trigger.
+    """
+    return f'''
+        DELETE FROM UltimoCosto WHERE producto_id = {producto};
+        INSERT INTO UltimoCosto (producto_id, compra_id, fecha, precio_costo)
+        SELECT producto_id, id, fecha, precio_costo
+        FROM Compras
+        WHERE producto_id = {producto}
+        ORDER BY fecha DESC, id DESC
+        LIMIT 1;
+    '''
+
+def _migracion_ultimo_costo(cursor):
+    """
+    Crea la proyección UltimoCosto con el último precio de costo de cada producto.
+
+    La tabla se mantiene con triggers sobre Compras (cada cambio recalcula solo el
+    producto afectado usando idx_compras_producto_fecha). Así compras.listar_productos
+    y reporte_productos obtienen todos los productos con su último costo en una sola
+    consulta, sin una subconsulta por producto.
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS UltimoCosto (
+        producto_id INTEGER PRIMARY KEY,  -- Identificador del producto
+        compra_id INTEGER NOT NULL,  -- Compra de la que proviene el costo
+        fecha TEXT,  -- Fecha de esa compra
+        precio_costo REAL,  -- Último precio de costo del producto
+        FOREIGN KEY (producto_id) REFERENCES Productos(id)  -- Clave foránea que referencia al producto
+    )
+    ''')
+    cursor.execute('''
+    INSERT OR REPLACE INTO UltimoCosto (producto_id, compra_id, fecha, precio_costo)
+    SELECT producto_id, id, fecha, precio_costo
+    FROM (
+        SELECT producto_id, id, fecha, precio_costo,
+               ROW_NUMBER() OVER (PARTITION BY producto_id ORDER BY fecha DESC, id DESC) AS orden
+        FROM Compras
+        WHERE producto_id IS NOT NULL
+    )
+    WHERE orden = 1
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_ultimo_costo_insert AFTER INSERT ON Compras
+    BEGIN
+        {_recalcular_ultimo_costo('NEW.producto_id')}
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_ultimo_costo_update
+    AFTER UPDATE OF producto_id, fecha, precio_costo ON Compras
+    BEGIN
+        {_recalcular_ultimo_costo('OLD.producto_id')}
+        {_recalcular_ultimo_costo('NEW.producto_id')}
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_ultimo_costo_delete AFTER DELETE ON Compras
+    BEGIN
+        {_recalcular_ultimo_costo('OLD.producto_id')}
+    END
+    ''')
+
+def _migracion_cambios_productos(cursor):
+    """
+    Crea el registro CambiosProductos que usa el catálogo en caché (catalogo.py).
+
+    Cada alta, modificación o baja de un producto, incluidos los cambios de stock de
+    ventas, compras y devoluciones, y cada cambio de su último costo agregan una fila
+    con el id del producto. La clave autoincremental es la versión del catálogo. El
+    registro se recorta cada 1000 versiones y conserva al menos las últimas 1000.
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS CambiosProductos (
+        version INTEGER PRIMARY KEY AUTOINCREMENT,  -- Versión del catálogo después del cambio
+        producto_id INTEGER NOT NULL  -- Producto modificado
+    )
+    ''')
+    for sentencia in (
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_cambios_productos_insert AFTER INSERT ON Productos
+        BEGIN
+            INSERT INTO CambiosProductos (producto_id) VALUES (NEW.id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_cambios_productos_update AFTER UPDATE ON Productos
+        BEGIN
+            INSERT INTO CambiosProductos (producto_id) VALUES (OLD.id);
+            INSERT INTO CambiosProductos (producto_id) SELECT NEW.id WHERE NEW.id <> OLD.id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_cambios_productos_delete AFTER DELETE ON Productos
+        BEGIN
+            INSERT INTO CambiosProductos (producto_id) VALUES (OLD.id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_cambios_ultimo_costo_insert AFTER INSERT ON UltimoCosto
+        BEGIN
+            INSERT INTO CambiosProductos (producto_id) VALUES (NEW.producto_id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_cambios_ultimo_costo_delete AFTER DELETE ON UltimoCosto
+        BEGIN
+            INSERT INTO CambiosProductos (producto_id) VALUES (OLD.producto_id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_cambios_productos_recorte AFTER INSERT ON CambiosProductos
+        WHEN NEW.version % 1000 = 0
+        BEGIN
+            DELETE FROM CambiosProductos WHERE version <= NEW.version - 1000;
+        END
+        """,
+    ):
+        cursor.execute(sentencia)
+
+# Tablas FTS5 de búsqueda: tabla base -> (tabla FTS, columnas indexadas)
+TABLAS_FTS = {
+    "Productos": ("ProductosFTS", ("nombre", "descripcion")),
+    "Clientes": ("ClientesFTS", ("nombre", "telefono", "email")),
+    "Proveedores": ("ProveedoresFTS", ("nombre", "telefono", "email")),
+}
+
+def _migracion_busqueda_fts(cursor):
+    """
+    Crea los índices de texto completo (FTS5) de productos, clientes y proveedores.
+
+    Son tablas de contenido externo: guardan solo el índice y leen el texto de la
+    tabla base. Los triggers las actualizan en cada alta, baja o cambio de las
+    columnas indexadas (los cambios de stock no las tocan). El índice de prefijos de
+    2 y 3 caracteres acelera la búsqueda mientras se escribe.
+    """
+    for tabla, (tabla_fts, columnas) in TABLAS_FTS.items():
+        lista = ", ".join(columnas)
+        nuevos = ", ".join(f"NEW.{columna}" for columna in columnas)
+        viejos = ", ".join(f"OLD.{columna}" for columna in columnas)
+        for sentencia in (
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {tabla_fts} USING fts5(
+                {lista}, content='{tabla}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+            """,
+            f"INSERT INTO {tabla_fts} ({tabla_fts}) VALUES ('rebuild')",
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{tabla_fts.lower()}_insert AFTER INSERT ON {tabla}
+            BEGIN
+                INSERT INTO {tabla_fts} (rowid, {lista}) VALUES (NEW.id, {nuevos});
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{tabla_fts.lower()}_delete AFTER DELETE ON {tabla}
+            BEGIN
+                INSERT INTO {tabla_fts} ({tabla_fts}, rowid, {lista}) VALUES ('delete', OLD.id, {viejos});
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{tabla_fts.lower()}_update AFTER UPDATE OF {lista} ON {tabla}
+            BEGIN
+                INSERT INTO {tabla_fts} ({tabla_fts}, rowid, {lista}) VALUES ('delete', OLD.id, {viejos});
+                INSERT INTO {tabla_fts} (rowid, {lista}) VALUES (NEW.id, {nuevos});
+            END
+            """,
+        ):
+            cursor.execute(sentencia)
+
+# Tablas cuya versión se lleva en VersionesTablas (la usa la caché de gráficos): las de
+# movimientos y entidades desde la migración 7 y los resúmenes diarios desde la 9
+TABLAS_MOVIMIENTOS_VERSIONADAS = ("Facturas", "FacturaLineas", "Devoluciones", "Compras", "Productos", "Clientes",
+                                  "Proveedores")
+TABLAS_VERSIONADAS = TABLAS_MOVIMIENTOS_VERSIONADAS + TABLAS_RESUMEN
+# En estas solo cuentan las altas, las bajas y los cambios de nombre: los gráficos no
+# muestran el stock, que cambia con cada venta, compra o devolución
+TABLAS_VERSION_NOMBRE = ("Productos", "Clientes", "Proveedores")
+
+def _migracion_versiones_tablas(cursor):
+    """
+    Crea VersionesTablas: un contador por tabla que los triggers incrementan en cada
+    alta, baja o modificación de sus filas.
+
+    Un resultado calculado a partir de esas tablas (p. ej. un gráfico) sigue vigente
+    mientras sus versiones no cambien, sin importar qué terminal hizo la escritura.
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS VersionesTablas (
+        tabla TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    ''')
+    _versionar_tablas(cursor, TABLAS_MOVIMIENTOS_VERSIONADAS)
+
+def _versionar_tablas(cursor, tablas: Sequence[str]):
+    """
+    Agrega a VersionesTablas el contador de cada tabla y los triggers que lo incrementan.
+    """
+    for tabla in tablas:
+        cursor.execute("INSERT OR IGNORE INTO VersionesTablas (tabla) VALUES (?)", (tabla,))
+        incrementar = f"UPDATE VersionesTablas SET version = version + 1 WHERE tabla = '{tabla}';"
+        modificacion = "UPDATE OF nombre" if tabla in TABLAS_VERSION_NOMBRE else "UPDATE"
+        for nombre, evento in (("insert", "INSERT"), ("update", modificacion), ("delete", "DELETE")):
+            cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_version_{tabla.lower()}_{nombre} AFTER {evento} ON {tabla}
+            BEGIN
+                {incrementar}
+            END
+            """)
+
+def _migracion_resumenes_diarios(cursor):
+    """
+    Crea los resúmenes diarios por producto, por cliente y por proveedor (resumenes.py)
+    y los llena con los movimientos existentes.
+
+    Las claves (fecha, entidad) permiten leer un rango de fechas por el índice primario;
+    desde aquí las filas se actualizan en la misma transacción que cada venta, compra y
+    devolución.
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS ResumenDiarioProducto (
+        fecha TEXT NOT NULL,  -- Día de los movimientos
+        producto_id INTEGER NOT NULL,  -- Identificador del producto
+        unidades_vendidas INTEGER NOT NULL DEFAULT 0,  -- Unidades vendidas en el día
+        ventas REAL NOT NULL DEFAULT 0,  -- Importe vendido (cantidad * precio unitario)
+        unidades_devueltas INTEGER NOT NULL DEFAULT 0,  -- Unidades devueltas en el día
+        devoluciones REAL NOT NULL DEFAULT 0,  -- Importe devuelto (al precio de la factura)
+        unidades_compradas INTEGER NOT NULL DEFAULT 0,  -- Unidades compradas en el día
+        compras REAL NOT NULL DEFAULT 0,  -- Importe comprado (cantidad * precio de costo)
+        PRIMARY KEY (fecha, producto_id)
+    ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS ResumenDiarioCliente (
+        fecha TEXT NOT NULL,  -- Día de los movimientos
+        cliente_id INTEGER NOT NULL,  -- Identificador del cliente
+        unidades_vendidas INTEGER NOT NULL DEFAULT 0,  -- Unidades vendidas en el día
+        ventas REAL NOT NULL DEFAULT 0,  -- Importe vendido (cantidad * precio unitario)
+        unidades_devueltas INTEGER NOT NULL DEFAULT 0,  -- Unidades devueltas en el día
+        devoluciones REAL NOT NULL DEFAULT 0,  -- Importe devuelto (al precio de la factura)
+        PRIMARY KEY (fecha, cliente_id)
+    ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS ResumenDiarioProveedor (
+        fecha TEXT NOT NULL,  -- Día de los movimientos
+        proveedor_id INTEGER NOT NULL,  -- Identificador del proveedor
+        unidades_compradas INTEGER NOT NULL DEFAULT 0,  -- Unidades compradas en el día
+        compras REAL NOT NULL DEFAULT 0,  -- Importe comprado (cantidad * precio de costo)
+        PRIMARY KEY (fecha, proveedor_id)
+    ) WITHOUT ROWID
+    ''')
+    # Los resúmenes se llenan con consultas propias de esta migración (no con las de
+    # resumenes.py, que pueden cambiar): las filas sin producto, cliente o proveedor no se
+    # resumen y las devoluciones se valúan al precio de la línea de la factura devuelta.
+    devoluciones = '''
+        SELECT d.fecha, d.producto_id, d.cliente_id, d.cantidad,
+               d.cantidad * IFNULL(l.precio_unitario, 0) AS importe
+        FROM Devoluciones d
+        LEFT JOIN FacturaLineas l ON l.id = (
+            SELECT id FROM FacturaLineas
+            WHERE factura_id = d.factura_id AND producto_id = d.producto_id
+            LIMIT 1
+        )
+    '''
+    cursor.execute(f'''
+    INSERT INTO ResumenDiarioProducto (fecha, producto_id, unidades_vendidas, ventas, unidades_devueltas,
+                                       devoluciones, unidades_compradas, compras)
+    SELECT fecha, producto_id, IFNULL(SUM(uv), 0), IFNULL(SUM(v), 0), IFNULL(SUM(ud), 0), IFNULL(SUM(d), 0),
+           IFNULL(SUM(uc), 0), IFNULL(SUM(c), 0)
+    FROM (
+        SELECT f.fecha, l.producto_id, l.cantidad AS uv, l.cantidad * l.precio_unitario AS v,
+               0 AS ud, 0 AS d, 0 AS uc, 0 AS c
+        FROM Facturas f
+        JOIN FacturaLineas l ON l.factura_id = f.factura_id
+        UNION ALL
+        SELECT fecha, producto_id, 0, 0, cantidad, importe, 0, 0 FROM ({devoluciones})
+        UNION ALL
+        SELECT fecha, producto_id, 0, 0, 0, 0, cantidad, cantidad * precio_costo FROM Compras
+    )
+    WHERE fecha IS NOT NULL AND producto_id IS NOT NULL
+    GROUP BY fecha, producto_id
+    ''')
+    cursor.execute(f'''
+    INSERT INTO ResumenDiarioCliente (fecha, cliente_id, unidades_vendidas, ventas, unidades_devueltas,
+                                      devoluciones)
+    SELECT fecha, cliente_id, IFNULL(SUM(uv), 0), IFNULL(SUM(v), 0), IFNULL(SUM(ud), 0), IFNULL(SUM(d), 0)
+    FROM (
+        SELECT f.fecha, f.cliente_id, l.cantidad AS uv, l.cantidad * l.precio_unitario AS v, 0 AS ud, 0 AS d
+        FROM Facturas f
+        JOIN FacturaLineas l ON l.factura_id = f.factura_id
+        UNION ALL
+        SELECT fecha, cliente_id, 0, 0, cantidad, importe FROM ({devoluciones})
+    )
+    WHERE fecha IS NOT NULL AND cliente_id IS NOT NULL
+    GROUP BY fecha, cliente_id
+    ''')
+    cursor.execute('''
+    INSERT INTO ResumenDiarioProveedor (fecha, proveedor_id, unidades_compradas, compras)
+    SELECT fecha, proveedor_id, IFNULL(SUM(cantidad), 0), IFNULL(SUM(cantidad * precio_costo), 0)
+    FROM Compras
+    WHERE fecha IS NOT NULL AND proveedor_id IS NOT NULL
+    GROUP BY fecha, proveedor_id
+    ''')
+
+def _migracion_versiones_resumenes(cursor):
+    """
+    Versiona los resúmenes diarios, que desde aquí leen los gráficos: un gráfico en la
+    caché deja de valer cuando cambia algún resumen que lee.
+    """
+    _versionar_tablas(cursor, TABLAS_RESUMEN)
+
+def _migracion_resumenes_sin_entidad(cursor):
+    """
+    Reconstruye los resúmenes diarios para agregar los movimientos sin producto, cliente o
+    proveedor con el id SIN_ENTIDAD (resumenes.py). La migración 8 los dejaba fuera, y sin
+    ellos el balance, los gráficos y el tablero darían totales menores.
+    """
+    reconstruir_resumenes(cursor)
+
+MIGRACIONES = [
+    _migracion_indices_transacciones,  # 1
+    _migracion_secuencias,  # 2
+    _migracion_facturas,  # 3
+    _migracion_ultimo_costo,  # 4
+    _migracion_cambios_productos,  # 5
+    _migracion_busqueda_fts,  # 6
+    _migracion_versiones_tablas,  # 7
+    _migracion_resumenes_diarios,  # 8
+    _migracion_versiones_resumenes,  # 9
+    _migracion_resumenes_sin_entidad,  # 10
+]
+
+def version_esquema(conn) -> int:
+    """
+    Obtiene la versión actual del esquema.
+
+    Args:
+        conn: Conexión a la base de datos.
+
+    Returns:
+        int: Número de la última migración aplicada.
+    """
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def aplicar_migraciones():
+    """
+    Aplica en orden las migraciones pendientes, cada una en su propia transacción.
+
+    La versión se vuelve a leer con la base de datos bloqueada (BEGIN IMMEDIATE),
+    así dos terminales que arrancan a la vez no aplican la misma migración dos veces.
+
+    Returns:
+        int: Versión del esquema después de migrar.
+    """
+    with create_connection() as conn:
+        cursor = conn.cursor()
+        for numero, migracion in enumerate(MIGRACIONES, start=1):
+            if version_esquema(conn) >= numero:
+                continue
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                if version_esquema(conn) < numero:
+                    migracion(cursor)
+                    cursor.execute(f"PRAGMA user_version = {numero}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        cursor.execute("PRAGMA optimize")
+        return version_esquema(conn)
+
+def reiniciar_version_esquema():
+    """
+    Vuelve la versión del esquema a 0 para que las migraciones se apliquen de nuevo
+    (se usa después de eliminar y recrear las tablas).
+    """
+    with create_connection() as conn:
+        conn.execute("PRAGMA user_version = 0")
+
+if __name__ == "__main__":
+    print(f"Versión del esquema: {aplicar_migraciones()}")
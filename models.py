@@ -1,11 +1,34 @@
 # models.py
 from database import create_connection
+from secuencias import siguiente_numero_factura, numero_factura_previo
+from resumenes import acumular_compra, acumular_devolucion, acumular_venta
 
 class Model:
     """
     Clase base para los modelos de la aplicación.
     Define métodos comunes para guardar, actualizar y eliminar registros.
     """
+    def _ejecutar(self, query, params, cursor=None):
+        """
+        Ejecuta una sentencia de escritura.
+
+        Si se recibe un cursor, la sentencia forma parte de la transacción del llamador;
+        si no, se ejecuta en una conexión del pool y se confirma al terminar.
+
+        Args:
+            query (str): Sentencia SQL.
+            params (tuple): Parámetros de la sentencia.
+            cursor (sqlite3.Cursor, optional): Cursor de la base de datos. Defaults to None.
+
+        Returns:
+            int: ID de la última fila insertada.
+        """
+        if cursor is not None:
+            cursor.execute(query, params)
+            return cursor.lastrowid
+        with create_connection() as conn:
+            return conn.execute(query, params).lastrowid
+
     def save(self):
         """
         Guarda el objeto en la base de datos.
@@ -48,23 +71,22 @@ class Producto(Model):
         self.precio = precio
         self.stock = stock
 
-    def save(self):
+    def save(self, cursor=None):
         """
         Guarda un nuevo producto en la base de datos.
 
+        Args:
+            cursor (sqlite3.Cursor, optional): Cursor de la base de datos. Defaults to None.
+
         Raises:
             ValueError: Si el precio o el stock son negativos.
         """
         if self.precio < 0 or self.stock < 0:
             raise ValueError("El precio y el stock deben ser números positivos.")
-        conn = create_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
+        self.id = self._ejecutar('''
         INSERT INTO Productos (nombre, descripcion, precio, stock)
         VALUES (?, ?, ?, ?)
-        ''', (self.nombre, self.descripcion, self.precio, self.stock))
-        conn.commit()
-        conn.close()
+        ''', (self.nombre, self.descripcion, self.precio, self.stock), cursor)
 
     def update(self):
         """
@@ -77,13 +99,9 @@ class Producto(Model):
             raise ValueError("El ID del producto no está definido.")
         if self.precio < 0 or self.stock < 0:
             raise ValueError("El precio y el stock deben ser números positivos.")
-        conn = create_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
+        self._ejecutar('''
         UPDATE Productos SET nombre=?, descripcion=?, precio=?, stock=? WHERE id=?
         ''', (self.nombre, self.descripcion, self.precio, self.stock, self.id))
-        conn.commit()
-        conn.close()
 
     def delete(self):
         """
@@ -94,13 +112,9 @@ class Producto(Model):
         """
         if self.id is None:
             raise ValueError("El ID del producto no está definido.")
-        conn = create_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
+        self._ejecutar('''
         DELETE FROM Productos WHERE id=?
         ''', (self.id,))
-        conn.commit()
-        conn.close()
 
 class Cliente(Model):
     """
@@ -121,18 +135,17 @@ class Cliente(Model):
         self.telefono = telefono
         self.email = email
 
-    def save(self):
+    def save(self, cursor=None):
         """
         Guarda un nuevo cliente en la base de datos.
+
+        Args:
+            cursor (sqlite3.Cursor, optional): Cursor de la base de datos. Defaults to None.
         """
-        conn = create_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
+        self.id = self._ejecutar('''
         INSERT INTO Clientes (nombre, telefono, email)
         VALUES (?, ?, ?)
-        ''', (self.nombre, self.telefono, self.email))
-        conn.commit()
-        conn.close()
+        ''', (self.nombre, self.telefono, self.email), cursor)
 
     def update(self):
         """
@@ -143,13 +156,9 @@ class Cliente(Model):
         """
         if self.id is None:
             raise ValueError("El ID del cliente no está definido.")
-        conn = create_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
+        self._ejecutar('''
         UPDATE Clientes SET nombre=?, telefono=?, email=? WHERE id=?
         ''', (self.nombre, self.telefono, self.email, self.id))
-        conn.commit()
-        conn.close()
 
     def delete(self):
         """
@@ -160,13 +169,9 @@ class Cliente(Model):
         """
         if self.id is None:
             raise ValueError("El ID del cliente no está definido.")
-        conn = create_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
+        self._ejecutar('''
         DELETE FROM Clientes WHERE id=?
         ''', (self.id,))
-        conn.commit()
-        conn.close()
 
 class Proveedor(Model):
     """
@@ -187,18 +192,17 @@ class Proveedor(Model):
         self.telefono = telefono
         self.email = email
 
-    def save(self):
+    def save(self, cursor=None):
         """
         Guarda un nuevo proveedor en la base de datos.
+
+        Args:
+            cursor (sqlite3.Cursor, optional): Cursor de la base de datos. Defaults to None.
         """
-        conn = create_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
+        self.id = self._ejecutar('''
         INSERT INTO Proveedores (nombre, telefono, email)
         VALUES (?, ?, ?)
-        ''', (self.nombre, self.telefono, self.email))
-        conn.commit()
-        conn.close()
+        ''', (self.nombre, self.telefono, self.email), cursor)
 
     def update(self):
         """
@@ -209,13 +213,9 @@ class Proveedor(Model):
         """
         if self.id is None:
             raise ValueError("El ID del proveedor no está definido.")
-        conn = create_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
+        self._ejecutar('''
         UPDATE Proveedores SET nombre=?, telefono=?, email=? WHERE id=?
         ''', (self.nombre, self.telefono, self.email, self.id))
-        conn.commit()
-        conn.close()
 
     def delete(self):
         """
@@ -226,94 +226,265 @@ class Proveedor(Model):
         """
         if self.id is None:
             raise ValueError("El ID del proveedor no está definido.")
-        conn = create_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
+        self._ejecutar('''
         DELETE FROM Proveedores WHERE id=?
         ''', (self.id,))
-        conn.commit()
-        conn.close()
 
-class Venta(Model):
+class Factura(Model):
     """
-    Modelo para representar una venta en la base de datos.
+    Modelo para representar el encabezado de una factura de venta en la base de datos.
     """
-    def __init__(self, cliente_id, producto_id, cantidad, fecha, factura_id, id=None):
+    def __init__(self, factura_id, cliente_id, fecha, descuento_porcentaje=0, tasa_impuesto=0, id=None):
         """
-        Constructor de la clase Venta.
+        Constructor de la clase Factura.
 
         Args:
+            factura_id (str): Número de factura.
             cliente_id (int): ID del cliente que realizó la compra.
-            producto_id (int): ID del producto vendido.
-            cantidad (int): Cantidad de productos vendidos.
             fecha (str): Fecha de la venta.
-            factura_id (str): Número de factura de la venta.
-            id (int, optional): ID de la venta en la base de datos. Defaults to None.
+            descuento_porcentaje (float, optional): Descuento aplicado a la factura (%). Defaults to 0.
+            tasa_impuesto (float, optional): Tasa de impuesto aplicada (fracción). Defaults to 0.
+            id (int, optional): ID de la factura en la base de datos. Defaults to None.
         """
         self.id = id
+        self.factura_id = factura_id
         self.cliente_id = cliente_id
-        self.producto_id = producto_id
-        self.cantidad = cantidad
         self.fecha = fecha
+        self.descuento_porcentaje = descuento_porcentaje
+        self.tasa_impuesto = tasa_impuesto
+
+    def save(self, cursor=None):
+        """
+        Guarda una nueva factura en la base de datos.
+
+        Args:
+            cursor (sqlite3.Cursor, optional): Cursor de la base de datos. Defaults to None.
+
+        Raises:
+            ValueError: Si el descuento no está entre 0 y 100 o la tasa de impuesto es negativa.
+        """
+        if self.descuento_porcentaje < 0 or self.descuento_porcentaje > 100:
+            raise ValueError("El descuento debe estar entre 0 y 100.")
+        if self.tasa_impuesto < 0:
+            raise ValueError("La tasa de impuesto debe ser un número positivo.")
+        self.id = self._ejecutar('''
+        INSERT INTO Facturas (factura_id, cliente_id, fecha, descuento_porcentaje, tasa_impuesto)
+        VALUES (?, ?, ?, ?, ?)
+        ''', (self.factura_id, self.cliente_id, self.fecha, self.descuento_porcentaje, self.tasa_impuesto), cursor)
+
+    def update(self):
+        """
+        Actualiza una factura existente en la base de datos.
+
+        Raises:
+            ValueError: Si el ID de la factura no está definido.
+        """
+        if self.id is None:
+            raise ValueError("El ID de la factura no está definido.")
+        self._ejecutar('''
+        UPDATE Facturas SET factura_id=?, cliente_id=?, fecha=?, descuento_porcentaje=?, tasa_impuesto=? WHERE id=?
+        ''', (self.factura_id, self.cliente_id, self.fecha, self.descuento_porcentaje, self.tasa_impuesto, self.id))
+
+    def delete(self):
+        """
+        Elimina una factura y sus líneas de la base de datos.
+
+        Raises:
+            ValueError: Si el ID de la factura no está definido.
+        """
+        if self.id is None:
+            raise ValueError("El ID de la factura no está definido.")
+        with create_connection() as conn:
+            conn.execute("DELETE FROM FacturaLineas WHERE factura_id=?", (self.factura_id,))
+            conn.execute("DELETE FROM Facturas WHERE id=?", (self.id,))
+
+    @classmethod
+    def registrar_venta(cls, cliente_id, fecha, carrito, descuento_porcentaje=0, tasa_impuesto=0):
+        """
+        Registra una venta completa (encabezado, líneas, descuento de stock y resúmenes diarios)
+        en una sola transacción.
+
+        La transacción se abre con BEGIN IMMEDIATE, así el stock se verifica y se descuenta
+        con la base de datos bloqueada para escritura y dos terminales no pueden vender las
+        mismas unidades. Las líneas se insertan con executemany y el stock se descuenta con
+        un UPDATE condicional (stock >= cantidad) en lote: si alguna fila no se actualiza,
+        la venta completa se revierte. La cantidad de idas y vueltas a la base de datos no
+        depende del tamaño del carrito.
+
+        Args:
+            cliente_id (int): ID del cliente.
+            fecha (str): Fecha de la venta.
+            carrito (list): Tuplas (producto_id, producto_nombre, cantidad, precio_unitario).
+            descuento_porcentaje (float, optional): Descuento de la factura (%). Defaults to 0.
+            tasa_impuesto (float, optional): Tasa de impuesto (fracción). Defaults to 0.
+
+        Returns:
+            Factura: Factura registrada.
+
+        Raises:
+            ValueError: Si el carrito está vacío, algún producto no existe o no hay stock suficiente.
+        """
+        if not carrito:
+            raise ValueError("El carrito está vacío.")
+
+        # Un mismo producto puede estar en varias líneas; el stock se verifica por el total
+        cantidades = {}
+        for producto_id, _, cantidad, precio in carrito:
+            if cantidad <= 0 or precio < 0:
+                raise ValueError("La cantidad y el precio deben ser números positivos.")
+            cantidades[producto_id] = cantidades.get(producto_id, 0) + cantidad
+
+        factura = cls(numero_factura_previo(), cliente_id, fecha, descuento_porcentaje, tasa_impuesto)
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                if factura.factura_id is None:
+                    factura.factura_id = siguiente_numero_factura(cursor)
+                factura.save(cursor)
+
+                lineas = [
+                    FacturaLinea.calcular(factura.factura_id, producto_id, cantidad, precio,
+                                          descuento_porcentaje, tasa_impuesto)
+                    for producto_id, _, cantidad, precio in carrito
+                ]
+                cursor.executemany('''
+                INSERT INTO FacturaLineas (factura_id, producto_id, cantidad, precio_unitario, descuento, impuesto)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ''', [(l.factura_id, l.producto_id, l.cantidad, l.precio_unitario, l.descuento, l.impuesto)
+                      for l in lineas])
+
+                cursor.executemany(
+                    "UPDATE Productos SET stock = stock - ? WHERE id = ? AND stock >= ?",
+                    [(cantidad, producto_id, cantidad) for producto_id, cantidad in cantidades.items()]
+                )
+                if cursor.rowcount != len(cantidades):
+                    conn.rollback()
+                    raise ValueError(cls._mensaje_sin_stock(cursor, cantidades))
+
+                acumular_venta(cursor, fecha, cliente_id,
+                               [(l.producto_id, l.cantidad, l.precio_unitario) for l in lineas])
+
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return factura
+
+    @staticmethod
+    def _mensaje_sin_stock(cursor, cantidades):
+        """
+        Identifica el producto que impidió la venta. Solo se consulta cuando la venta ya
+        fue revertida, por lo que el stock leído es el real.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor de la base de datos.
+            cantidades (dict): Cantidad total pedida por producto_id.
+
+        Returns:
+            str: Mensaje de error.
+        """
+        marcadores = ", ".join("?" * len(cantidades))
+        cursor.execute(f"SELECT id, nombre, stock FROM Productos WHERE id IN ({marcadores})", list(cantidades))
+        productos = {producto_id: (nombre, stock) for producto_id, nombre, stock in cursor.fetchall()}
+        for producto_id, cantidad in cantidades.items():
+            if producto_id not in productos:
+                return f"Producto con ID {producto_id} no encontrado"
+            nombre, stock = productos[producto_id]
+            if stock < cantidad:
+                return f"No hay suficiente stock para {nombre}"
+        return "No hay suficiente stock para completar la venta"
+
+class FacturaLinea(Model):
+    """
+    Modelo para representar una línea (producto vendido) de una factura en la base de datos.
+    """
+    def __init__(self, factura_id, producto_id, cantidad, precio_unitario, descuento=0, impuesto=0, id=None):
+        """
+        Constructor de la clase FacturaLinea.
+
+        Args:
+            factura_id (str): Número de factura.
+            producto_id (int): ID del producto vendido.
+            cantidad (int): Cantidad de productos vendidos.
+            precio_unitario (float): Precio del producto al momento de la venta.
+            descuento (float, optional): Monto de descuento de la línea. Defaults to 0.
+            impuesto (float, optional): Monto de impuesto de la línea. Defaults to 0.
+            id (int, optional): ID de la línea en la base de datos. Defaults to None.
+        """
+        self.id = id
         self.factura_id = factura_id
+        self.producto_id = producto_id
+        self.cantidad = cantidad
+        self.precio_unitario = precio_unitario
+        self.descuento = descuento
+        self.impuesto = impuesto
+
+    @classmethod
+    def calcular(cls, factura_id, producto_id, cantidad, precio_unitario, descuento_porcentaje=0, tasa_impuesto=0):
+        """
+        Crea una línea calculando el descuento y el impuesto a partir de los de la factura.
+
+        Args:
+            factura_id (str): Número de factura.
+            producto_id (int): ID del producto vendido.
+            cantidad (int): Cantidad de productos vendidos.
+            precio_unitario (float): Precio del producto al momento de la venta.
+            descuento_porcentaje (float, optional): Descuento de la factura (%). Defaults to 0.
+            tasa_impuesto (float, optional): Tasa de impuesto de la factura (fracción). Defaults to 0.
+
+        Returns:
+            FacturaLinea: Línea con los montos calculados.
+        """
+        subtotal = cantidad * precio_unitario
+        descuento = subtotal * (descuento_porcentaje / 100)
+        impuesto = (subtotal - descuento) * tasa_impuesto
+        return cls(factura_id, producto_id, cantidad, precio_unitario, round(descuento, 2), round(impuesto, 2))
 
     def save(self, cursor=None):
         """
-        Guarda una nueva venta en la base de datos.
+        Guarda una nueva línea de factura en la base de datos.
 
         Args:
             cursor (sqlite3.Cursor, optional): Cursor de la base de datos. Defaults to None.
 
         Raises:
-            ValueError: Si la cantidad es negativa.
+            ValueError: Si la cantidad o el precio son negativos.
         """
-        if self.cantidad < 0:
-            raise ValueError("La cantidad debe ser un número positivo.")
-        conn = create_connection()
-        cursor = cursor or conn.cursor()
-        cursor.execute('''
-        INSERT INTO Ventas (cliente_id, producto_id, cantidad, fecha, factura_id)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (self.cliente_id, self.producto_id, self.cantidad, self.fecha, self.factura_id))
-        if cursor is None:
-            conn.commit()
-            conn.close()
+        if self.cantidad < 0 or self.precio_unitario < 0:
+            raise ValueError("La cantidad y el precio deben ser números positivos.")
+        self.id = self._ejecutar('''
+        INSERT INTO FacturaLineas (factura_id, producto_id, cantidad, precio_unitario, descuento, impuesto)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', (self.factura_id, self.producto_id, self.cantidad, self.precio_unitario, self.descuento, self.impuesto), cursor)
 
     def update(self):
         """
-        Actualiza una venta existente en la base de datos.
+        Actualiza una línea de factura existente en la base de datos.
 
         Raises:
-            ValueError: Si el ID de la venta no está definido o si la cantidad es negativa.
+            ValueError: Si el ID de la línea no está definido o si la cantidad o el precio son negativos.
         """
         if self.id is None:
-            raise ValueError("El ID de la venta no está definido.")
-        if self.cantidad < 0:
-            raise ValueError("La cantidad debe ser un número positivo.")
-        conn = create_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-        UPDATE Ventas SET cliente_id=?, producto_id=?, cantidad=?, fecha=?, factura_id=? WHERE id=?
-        ''', (self.cliente_id, self.producto_id, self.cantidad, self.fecha, self.factura_id, self.id))
-        conn.commit()
-        conn.close()
+            raise ValueError("El ID de la línea no está definido.")
+        if self.cantidad < 0 or self.precio_unitario < 0:
+            raise ValueError("La cantidad y el precio deben ser números positivos.")
+        self._ejecutar('''
+        UPDATE FacturaLineas SET factura_id=?, producto_id=?, cantidad=?, precio_unitario=?, descuento=?, impuesto=? WHERE id=?
+        ''', (self.factura_id, self.producto_id, self.cantidad, self.precio_unitario, self.descuento, self.impuesto, self.id))
 
     def delete(self):
         """
-        Elimina una venta de la base de datos.
+        Elimina una línea de factura de la base de datos.
 
         Raises:
-            ValueError: Si el ID de la venta no está definido.
+            ValueError: Si el ID de la línea no está definido.
         """
         if self.id is None:
-            raise ValueError("El ID de la venta no está definido.")
-        conn = create_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-        DELETE FROM Ventas WHERE id=?
+            raise ValueError("El ID de la línea no está definido.")
+        self._ejecutar('''
+        DELETE FROM FacturaLineas WHERE id=?
         ''', (self.id,))
-        conn.commit()
-        conn.close()
 
 class Compra(Model):
     """
@@ -352,23 +523,17 @@ class Compra(Model):
         """
         if self.cantidad < 0:
             raise ValueError("La cantidad debe ser un número positivo.")
-        conn = create_connection()
-        cursor = cursor or conn.cursor()
         if self.id:
-            cursor.execute("""
+            self._ejecutar("""
                 UPDATE Compras
                 SET proveedor_id=?, producto_id=?, cantidad=?, fecha=?, precio_costo=?, nro_referencia=?
                 WHERE id=?
-            """, (self.proveedor_id, self.producto_id, self.cantidad, self.fecha, self.precio_costo, self.nro_referencia, self.id))
+            """, (self.proveedor_id, self.producto_id, self.cantidad, self.fecha, self.precio_costo, self.nro_referencia, self.id), cursor)
         else:
-            cursor.execute("""
+            self.id = self._ejecutar("""
                 INSERT INTO Compras (proveedor_id, producto_id, cantidad, fecha, precio_costo, nro_referencia)
                 VALUES (?, ?, ?, ?, ?, ?)
-            """, (self.proveedor_id, self.producto_id, self.cantidad, self.fecha, self.precio_costo, self.nro_referencia))
-            self.id = cursor.lastrowid
-        if cursor is None:
-            conn.commit()
-            conn.close()
+            """, (self.proveedor_id, self.producto_id, self.cantidad, self.fecha, self.precio_costo, self.nro_referencia), cursor)
 
     def update(self):
         """
@@ -381,11 +546,7 @@ class Compra(Model):
             raise ValueError("El ID de la compra no está definido.")
         if self.cantidad < 0:
             raise ValueError("La cantidad debe ser un número positivo.")
-        conn = create_connection()
-        cursor = conn.cursor()
-        self.save(cursor)
-        conn.commit()
-        conn.close()
+        self.save()
 
     def delete(self):
         """
@@ -396,11 +557,45 @@ class Compra(Model):
         """
         if self.id is None:
             raise ValueError("El ID de la compra no está definido.")
-        conn = create_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM Compras WHERE id=?", (self.id,))
-        conn.commit()
-        conn.close()
+        self._ejecutar("DELETE FROM Compras WHERE id=?", (self.id,))
+
+    @classmethod
+    def registrar_compra(cls, proveedor_id, fecha, carrito, nro_referencia=None):
+        """
+        Registra una compra completa (una fila por producto, aumento de stock y resúmenes
+        diarios) en una sola transacción.
+
+        Args:
+            proveedor_id (int): ID del proveedor.
+            fecha (str): Fecha de la compra.
+            carrito (list): Tuplas (producto_id, producto_nombre, cantidad, precio_costo).
+            nro_referencia (str, optional): Número de referencia de la compra. Defaults to None.
+
+        Returns:
+            list: Compras registradas.
+
+        Raises:
+            ValueError: Si alguna cantidad es negativa o algún producto no existe.
+        """
+        compras = [cls(proveedor_id, producto_id, cantidad, fecha, precio_costo, nro_referencia)
+                   for producto_id, _, cantidad, precio_costo in carrito]
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                for compra in compras:
+                    compra.save(cursor)
+                    cursor.execute("UPDATE Productos SET stock = stock + ? WHERE id = ?",
+                                   (compra.cantidad, compra.producto_id))
+                    if cursor.rowcount == 0:
+                        raise ValueError(f"Error: Producto con ID {compra.producto_id} no encontrado")
+
+                acumular_compra(cursor, fecha, proveedor_id,
+                                [(compra.producto_id, compra.cantidad, compra.precio_costo) for compra in compras])
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return compras
 
 class Devolucion(Model):
     """
@@ -437,15 +632,10 @@ class Devolucion(Model):
         """
         if self.cantidad < 0:
             raise ValueError("La cantidad debe ser un número positivo.")
-        conn = create_connection()
-        cursor = cursor or conn.cursor()
-        cursor.execute('''
+        self._ejecutar('''
         INSERT INTO Devoluciones (factura_id, producto_id, cantidad, fecha, cliente_id)
         VALUES (?, ?, ?, ?, ?)
-        ''', (self.factura_id, self.producto_id, self.cantidad, self.fecha, self.cliente_id))
-        if cursor is None:
-            conn.commit()
-            conn.close()
+        ''', (self.factura_id, self.producto_id, self.cantidad, self.fecha, self.cliente_id), cursor)
 
     def update(self):
         """
@@ -458,13 +648,9 @@ class Devolucion(Model):
             raise ValueError("El ID de la devolución no está definido.")
         if self.cantidad < 0:
             raise ValueError("La cantidad debe ser un número positivo.")
-        conn = create_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
+        self._ejecutar('''
         UPDATE Devoluciones SET factura_id=?, producto_id=?, cantidad=?, fecha=?, cliente_id=? WHERE id=?
         ''', (self.factura_id, self.producto_id, self.cantidad, self.fecha, self.cliente_id, self.id))
-        conn.commit()
-        conn.close()
 
     def delete(self):
         """
@@ -475,10 +661,48 @@ class Devolucion(Model):
         """
         if self.id is None:
             raise ValueError("El ID de la devolución no está definido.")
-        conn = create_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
+        self._ejecutar('''
         DELETE FROM Devoluciones WHERE id=?
         ''', (self.id,))
-        conn.commit()
-        conn.close()
+
+    @classmethod
+    def registrar_devolucion(cls, factura_id, fecha, productos):
+        """
+        Registra la devolución de productos de una factura (una fila por producto, reposición
+        de stock y resúmenes diarios) en una sola transacción.
+
+        Args:
+            factura_id (str): Número de factura de la venta.
+            fecha (str): Fecha de la devolución.
+            productos (list): Tuplas (producto_id, cantidad) de los productos devueltos.
+
+        Returns:
+            list: Devoluciones registradas.
+
+        Raises:
+            ValueError: Si la factura no existe, alguna cantidad es negativa o algún producto no existe.
+        """
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT cliente_id FROM Facturas WHERE factura_id = ?", (factura_id,))
+                cliente_id = cursor.fetchone()
+                if cliente_id is None:
+                    raise ValueError("Error: No se encontró el cliente asociado a la factura.")
+                cliente_id = cliente_id[0]
+
+                devoluciones = []
+                for producto_id, cantidad in productos:
+                    cursor.execute("UPDATE Productos SET stock = stock + ? WHERE id = ?", (cantidad, producto_id))
+                    if cursor.rowcount == 0:
+                        raise ValueError(f"Error: Producto con ID {producto_id} no encontrado")
+                    devolucion = cls(factura_id, producto_id, cantidad, fecha, cliente_id)
+                    devolucion.save(cursor)
+                    devoluciones.append(devolucion)
+
+                acumular_devolucion(cursor, fecha, factura_id, cliente_id, productos)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return devoluciones
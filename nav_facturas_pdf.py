@@ -3,7 +3,7 @@ import flet as ft
 import os
 import subprocess
 import platform
-from libreria import BaseApp
+from libreria import BaseApp, ListaPaginada
 
 class NavFacturasPDF(BaseApp):
     """
@@ -37,15 +37,11 @@ class NavFacturasPDF(BaseApp):
         self.page.add(ft.Divider(height=20, color="transparent"))
         self.page.add(self.filtro_field)
 
-        list_view = ft.ListView(expand=True, spacing=10)
-        for factura in self.filtered_facturas:
-            list_view.controls.append(
-                ft.ListTile(
-                    title=ft.Text(factura),
-                    on_click=lambda e, f=factura: self.seleccionar_factura(f)
-                )
-            )
-        self.page.add(list_view)
+        facturas = self.filtered_facturas
+        lista = ListaPaginada(
+            lambda desplazamiento, limite: facturas[desplazamiento:desplazamiento + limite],
+            lambda factura: ft.ListTile(title=ft.Text(factura), on_click=lambda e, f=factura: self.seleccionar_factura(f)))
+        self.page.add(lista.control)
         self.page.add(ft.ElevatedButton("Volver", on_click=lambda _: self.main_menu_callback()))
         self.page.update()
 
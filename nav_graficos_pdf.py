@@ -3,7 +3,7 @@ import flet as ft
 import os
 import subprocess
 import platform
-from libreria import BaseApp
+from libreria import BaseApp, ListaPaginada
 
 class NavGraficosPDF(BaseApp):
     """
@@ -33,15 +33,11 @@ class NavGraficosPDF(BaseApp):
         self.page.add(ft.Text("Gráficos PDF", size=24, text_align=ft.TextAlign.CENTER))
         self.page.add(ft.Divider(height=20, color="transparent"))
 
-        list_view = ft.ListView(expand=True, spacing=10)
-        for grafico in self.graficos:
-            list_view.controls.append(
-                ft.ListTile(
-                    title=ft.Text(grafico),
-                    on_click=lambda e, g=grafico: self.seleccionar_grafico(g)
-                )
-            )
-        self.page.add(list_view)
+        graficos = self.graficos
+        lista = ListaPaginada(
+            lambda desplazamiento, limite: graficos[desplazamiento:desplazamiento + limite],
+            lambda grafico: ft.ListTile(title=ft.Text(grafico), on_click=lambda e, g=grafico: self.seleccionar_grafico(g)))
+        self.page.add(lista.control)
         self.page.add(ft.ElevatedButton("Volver", on_click=lambda _: self.main_menu_callback()))
         self.page.update()
 
@@ -3,7 +3,7 @@ import flet as ft
 import os
 import subprocess
 import platform
-from libreria import BaseApp
+from libreria import BaseApp, ListaPaginada
 
 class NavReportesPDF(BaseApp):
     """
@@ -33,15 +33,11 @@ class NavReportesPDF(BaseApp):
         self.page.add(ft.Text("Reportes PDF", size=24, text_align=ft.TextAlign.CENTER))
         self.page.add(ft.Divider(height=20, color="transparent"))
 
-        list_view = ft.ListView(expand=True, spacing=10)
-        for reporte in self.reportes:
-            list_view.controls.append(
-                ft.ListTile(
-                    title=ft.Text(reporte),
-                    on_click=lambda e, r=reporte: self.seleccionar_reporte(r)
-                )
-            )
-        self.page.add(list_view)
+        reportes = self.reportes
+        lista = ListaPaginada(
+            lambda desplazamiento, limite: reportes[desplazamiento:desplazamiento + limite],
+            lambda reporte: ft.ListTile(title=ft.Text(reporte), on_click=lambda e, r=reporte: self.seleccionar_reporte(r)))
+        self.page.add(lista.control)
         self.page.add(ft.ElevatedButton("Volver", on_click=lambda _: self.main_menu_callback()))
         self.page.update()
 
@@ -0,0 +1,105 @@
+# pantalla_diagnostico.py
+import flet as ft
+from typing import Any, Callable, Dict
+from libreria import BaseApp, ListaPaginada, BLUE_COLOR
+from datos_reporte import ColumnaReporte, DatosReporte
+from diagnostico_arranque import ARCHIVO_DIAGNOSTICO, OPCION_DIAGNOSTICO, VARIABLE_DIAGNOSTICO, leer_diagnostico
+
+# Constantes
+TITULO_DIAGNOSTICO = "Diagnóstico de Arranque"
+
+def formato_milisegundos(segundos: Any) -> str:
+    """
+    Formatea una duración en segundos como milisegundos.
+
+    Args:
+        segundos (Any): Duración en segundos.
+
+    Returns:
+        str: Duración con un decimal y la unidad.
+    """
+    return f"{segundos * 1000:.1f} ms"
+
+class DiagnosticoArranqueApp(BaseApp):
+    """
+    Clase para mostrar el último diagnóstico de arranque (diagnostico_arranque.ARCHIVO_DIAGNOSTICO):
+    las etapas, las operaciones medidas y los módulos que más tardaron en importarse.
+    """
+    def fila_dato(self, etiqueta: str, valor: str) -> ft.Row:
+        """
+        Arma una fila con una etiqueta y su valor.
+        :param etiqueta: Texto de la etiqueta.
+        :param valor: Valor a mostrar.
+        :return: La fila.
+        """
+        return ft.Row([
+            ft.Text(etiqueta, weight=ft.FontWeight.BOLD, color=BLUE_COLOR),
+            ft.Text(valor)
+        ], alignment=ft.MainAxisAlignment.CENTER)
+
+    def mostrar_diagnostico(self):
+        """
+        Muestra el último diagnóstico guardado, o cómo generarlo si todavía no hay ninguno.
+        :return: None
+        """
+        self.page.controls.clear()
+        self.page.add(ft.Text(TITULO_DIAGNOSTICO, size=24, text_align=ft.TextAlign.CENTER))
+        self.page.add(ft.Divider(height=20, color="transparent"))
+
+        try:
+            datos = leer_diagnostico()
+        except (OSError, ValueError) as e:
+            datos = None
+            self.mostrar_mensaje(f"Error al leer el diagnóstico: {str(e)}", "red")
+
+        if datos is None:
+            self.page.add(ft.Text(
+                f"No hay un diagnóstico guardado ({ARCHIVO_DIAGNOSTICO}). Inicie la aplicación con "
+                f"'{OPCION_DIAGNOSTICO}' o con la variable de entorno {VARIABLE_DIAGNOSTICO}=1.",
+                text_align=ft.TextAlign.CENTER))
+        else:
+            self.agregar_resumen(datos)
+
+        self.page.add(ft.ElevatedButton("Volver", on_click=lambda _: self.main_menu_callback()))
+        self.page.update()
+
+    def agregar_resumen(self, datos: Dict[str, Any]):
+        """
+        Agrega a la página los tiempos de un diagnóstico.
+        :param datos: Datos del diagnóstico (ver diagnostico_arranque.datos_diagnostico).
+        :return: None
+        """
+        self.page.add(self.fila_dato("Fecha:", datos["fecha"]))
+        self.page.add(self.fila_dato("Total hasta el inicio de sesión:", formato_milisegundos(datos["total_segundos"])))
+
+        self.page.add(ft.Text("Etapas", size=18, weight=ft.FontWeight.BOLD))
+        for etapa in datos["etapas"]:
+            self.page.add(self.fila_dato(f"{etapa['nombre']}:", formato_milisegundos(etapa["segundos"])))
+
+        self.page.add(ft.Text("Operaciones", size=18, weight=ft.FontWeight.BOLD))
+        for operacion, segundos in datos["operaciones"].items():
+            self.page.add(self.fila_dato(f"{operacion}:", formato_milisegundos(segundos)))
+        for momento, segundos in datos["momentos"].items():
+            self.page.add(self.fila_dato(f"{momento} (desde el inicio):", formato_milisegundos(segundos)))
+
+        importaciones = [(importacion["modulo"], importacion["acumulado"], importacion["propio"])
+                         for importacion in datos["importaciones"]]
+        reporte = DatosReporte([
+            ColumnaReporte("Módulo"),
+            ColumnaReporte("Acumulado", formato_milisegundos),
+            ColumnaReporte("Propio", formato_milisegundos),
+        ], importaciones)
+        self.page.add(ft.Text(f"Importaciones ({len(importaciones)} módulos, de la más lenta a la más rápida)",
+                              size=18, weight=ft.FontWeight.BOLD))
+        lista = ListaPaginada(reporte.obtener, lambda fila: self._crear_fila_reporte(reporte, fila))
+        self.page.add(ft.Container(content=lista.control, expand=True))
+
+def pantalla_diagnostico_app(page: ft.Page, main_menu_callback: Callable[[], None]):
+    """
+    Crea una instancia de la aplicación de diagnóstico de arranque y la ejecuta.
+    :param page: La página de la interfaz de usuario.
+    :param main_menu_callback: La función de devolución de llamada para volver al menú anterior.
+    :return: None
+    """
+    app = DiagnosticoArranqueApp(page, main_menu_callback)
+    app.mostrar_diagnostico()
@@ -1,6 +1,5 @@
 # password.py
 
-from cryptography.fernet import Fernet
 import os
 
 def password_app():
@@ -10,6 +9,9 @@ def password_app():
     """
     # Verificar si el archivo 'password.txt' ya existe
     if not os.path.exists("password.txt"):
+        # cryptography solo se carga la primera vez, cuando hay que crear el archivo
+        from cryptography.fernet import Fernet
+
         # Generar una clave de encriptación
         key = Fernet.generate_key()
         cipher_suite = Fernet(key)
@@ -2,9 +2,11 @@
 import flet as ft
 from typing import Callable, List, Tuple
 from models import Producto
-from libreria import BaseApp, get_db_connection, FormField
+from catalogo import obtener_productos_por_id, obtener_producto
+from libreria import BaseApp, get_db_connection, FormField, ListaPaginada
 from libreria import BLUE_COLOR, RED_COLOR, HEADER_SIZE, BUTTON_TEXT_SIZE, COLOR_SNACKBAR
 import time
+from busqueda import buscar_ids, LIMITE_RESULTADOS
 
 class ProductoApp(BaseApp):
     """
@@ -15,38 +17,26 @@ class ProductoApp(BaseApp):
 
     def listar_productos(self) -> None:
         """Lista todos los productos disponibles en la base de datos."""
-        productos = self._obtener_productos()
         self.page.controls.clear()
         self.page.add(ft.Text("Listado de Productos", size=HEADER_SIZE))
 
-        lista_productos = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True, spacing=10)
-
         def filtrar_productos(e):
             """
             Filtra los productos según el filtro ingresado.
             """
-            filtro = filtro_field.value.lower()
-            productos_filtrados = [producto for producto in productos if filtro in str(producto[0]).lower() or filtro in producto[1].lower()]
-            actualizar_lista_productos(productos_filtrados)
-
-        def actualizar_lista_productos(productos_filtrados):
-            """
-            Actualiza la lista de productos en la interfaz gráfica.
-             :param productos_filtrados: Lista de productos filtrados.
-             """
-            lista_productos.controls.clear()
-            for producto in productos_filtrados:
-                lista_productos.controls.append(self._crear_boton_producto(producto))
-            self.page.update()
+            lista_productos.recargar()
 
         filtro_field = ft.TextField(label="Filtrar por ID o Nombre", on_change=filtrar_productos, width=500, border_color=ft.colors.OUTLINE)
 
-        actualizar_lista_productos(productos)
+        # Los productos se leen por ventanas a medida que se desplaza la lista
+        lista_productos = ListaPaginada(
+            lambda desplazamiento, limite: self._obtener_productos(filtro_field.value, limite, desplazamiento),
+            self._crear_boton_producto)
 
         self.page.add(
             filtro_field,
             ft.Container(
-                content=lista_productos,
+                content=lista_productos.control,
                 expand=True,
                 height=400,
                 width=500,
@@ -58,12 +48,15 @@ class ProductoApp(BaseApp):
         self.page.add(ft.ElevatedButton("Volver", on_click=lambda _: self.main_menu()))
         self.page.update()
 
-    def _obtener_productos(self) -> List[Tuple]:
-        """Obtiene la lista de productos desde la base de datos."""
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM Productos")
-            return cursor.fetchall()
+    def _obtener_productos(self, filtro: str = "", limite: int = LIMITE_RESULTADOS,
+                           desplazamiento: int = 0) -> List[Tuple]:
+        """Busca los productos por ID, nombre o descripción y los toma del catálogo en caché.
+         :param filtro: Texto de búsqueda. Vacío para listar los primeros.
+         :param limite: Cantidad máxima de productos.
+         :param desplazamiento: Productos a saltar (paginación).
+         :return: Lista de productos.
+         """
+        return obtener_productos_por_id(buscar_ids("Productos", filtro, limite, desplazamiento))
 
     def _crear_boton_producto(self, producto: Tuple) -> ft.ElevatedButton:
         """Crea un botón con la información del producto.
@@ -105,10 +98,7 @@ class ProductoApp(BaseApp):
          :param producto_id: ID del producto a consultar.
          :return: Tupla con los datos del producto (id, nombre, descripcion, precio, stock).
          """
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM Productos WHERE id=?", (producto_id,))
-            return cursor.fetchone()
+        return obtener_producto(producto_id)
 
     def modificar(self, producto: Tuple) -> None:
         """Muestra la interfaz para modificar un producto existente.
@@ -159,7 +149,7 @@ class ProductoApp(BaseApp):
          :return: True si el producto tiene ventas, False si no."""
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM Ventas WHERE producto_id=?", (producto_id,))
+            cursor.execute("SELECT COUNT(*) FROM FacturaLineas WHERE producto_id=?", (producto_id,))
             return cursor.fetchone()[0] > 0
 
     def agregar(self) -> None:
@@ -2,9 +2,10 @@
 import flet as ft
 from typing import Callable, List, Tuple
 from models import Proveedor
-from libreria import BaseApp, get_db_connection, FormField
+from libreria import BaseApp, get_db_connection, FormField, ListaPaginada
 from libreria import BLUE_COLOR, RED_COLOR, HEADER_SIZE, BUTTON_TEXT_SIZE, COLOR_SNACKBAR
 import time
+from busqueda import buscar_registros, LIMITE_RESULTADOS
 
 class ProveedorApp(BaseApp):
     """
@@ -15,41 +16,28 @@ class ProveedorApp(BaseApp):
 
     def listar_proveedores(self) -> None:
         """Lista todos los proveedores disponibles en la base de datos."""
-        proveedores = self._obtener_proveedores()
         self.page.controls.clear()
         self.page.add(ft.Text("Listado de Proveedores", size=HEADER_SIZE))
 
-        lista_proveedores = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True, spacing=10)
-
         def filtrar_proveedores(e):
             """
             Filtra los proveedores según el valor ingresado en el campo de búsqueda.
             :param e: Evento de cambio de estado.
             :return: None
             """
-            filtro = filtro_field.value.lower()
-            proveedores_filtrados = [proveedor for proveedor in proveedores if filtro in str(proveedor[0]).lower() or filtro in proveedor[1].lower()]
-            actualizar_lista_proveedores(proveedores_filtrados)
-
-        def actualizar_lista_proveedores(proveedores_filtrados):
-            """
-            Actualiza la lista de proveedores con los proveedores filtrados.
-            :param proveedores_filtrados: Lista de proveedores filtrados.
-            :return: None
-            """
-            lista_proveedores.controls.clear()
-            for proveedor in proveedores_filtrados:
-                lista_proveedores.controls.append(self._crear_boton_proveedor(proveedor))
-            self.page.update()
+            lista_proveedores.recargar()
 
         filtro_field = ft.TextField(label="Filtrar por ID o Nombre", on_change=filtrar_proveedores, width=500, border_color=ft.colors.OUTLINE)
 
-        actualizar_lista_proveedores(proveedores)
+        # Los proveedores se leen por ventanas a medida que se desplaza la lista
+        lista_proveedores = ListaPaginada(
+            lambda desplazamiento, limite: self._obtener_proveedores(filtro_field.value, limite, desplazamiento),
+            self._crear_boton_proveedor)
 
         self.page.add(
             filtro_field,
             ft.Container(
-                content=lista_proveedores,
+                content=lista_proveedores.control,
                 expand=True,
                 height=400,
                 width=500,
@@ -61,14 +49,15 @@ class ProveedorApp(BaseApp):
         self.page.add(ft.ElevatedButton("Volver", on_click=lambda _: self.main_menu()))
         self.page.update()
 
-    def _obtener_proveedores(self) -> List[Tuple]:
-        """Obtiene la lista de proveedores desde la base de datos.
+    def _obtener_proveedores(self, filtro: str = "", limite: int = LIMITE_RESULTADOS,
+                             desplazamiento: int = 0) -> List[Tuple]:
+        """Busca los proveedores en la base de datos (índice de texto completo).
+        :param filtro: ID o palabras del nombre, teléfono o email. Vacío para listar los primeros.
+        :param limite: Cantidad máxima de proveedores.
+        :param desplazamiento: Proveedores a saltar (paginación).
         :return: Lista de tuplas con los detalles de los proveedores.
         """
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM Proveedores")
-            return cursor.fetchall()
+        return buscar_registros("Proveedores", filtro, limite, desplazamiento)
 
     def _crear_boton_proveedor(self, proveedor: Tuple) -> ft.ElevatedButton:
         """Crea un botón con la información del proveedor.
@@ -1,6 +1,11 @@
 # reiniciar_db.py
 import flet as ft
 from database import create_connection, create_tables
+from migraciones import aplicar_migraciones, reiniciar_version_esquema, TABLAS_FTS
+from catalogo import invalidar_catalogo
+from cache_graficos import vaciar_cache_graficos
+from resumenes import TABLAS_RESUMEN
+from secuencias import reiniciar_secuencia
 
 class ReiniciarDBApp:
     def __init__(self, page, main_menu_callback):
@@ -18,21 +23,42 @@ class ReiniciarDBApp:
         """
         Reinicia la base de datos eliminando todas las tablas existentes y volviéndolas a crear.
         """
-        conn = create_connection()
-        cursor = conn.cursor()
+        with create_connection() as conn:
+            cursor = conn.cursor()
 
-        # Eliminar todas las tablas
-        cursor.execute("DROP TABLE IF EXISTS Ventas")
-        cursor.execute("DROP TABLE IF EXISTS Compras")
-        cursor.execute("DROP TABLE IF EXISTS Productos")
-        cursor.execute("DROP TABLE IF EXISTS Clientes")
-        cursor.execute("DROP TABLE IF EXISTS Proveedores")
+            # Ventas es una vista desde la separación en Facturas/FacturaLineas;
+            # en una base sin migrar todavía es una tabla
+            cursor.execute("SELECT type FROM sqlite_master WHERE name='Ventas'")
+            tipo_ventas = cursor.fetchone()
+            if tipo_ventas and tipo_ventas[0] == 'view':
+                cursor.execute("DROP VIEW Ventas")
+            else:
+                cursor.execute("DROP TABLE IF EXISTS Ventas")
 
-        conn.commit()
-        conn.close()
+            # Eliminar todas las tablas
+            cursor.execute("DROP TABLE IF EXISTS FacturaLineas")
+            cursor.execute("DROP TABLE IF EXISTS Facturas")
+            cursor.execute("DROP TABLE IF EXISTS Compras")
+            cursor.execute("DROP TABLE IF EXISTS UltimoCosto")
+            cursor.execute("DROP TABLE IF EXISTS CambiosProductos")
+            cursor.execute("DROP TABLE IF EXISTS VersionesTablas")
+            for tabla_resumen in TABLAS_RESUMEN:
+                cursor.execute(f"DROP TABLE IF EXISTS {tabla_resumen}")
+            for tabla_fts, _ in TABLAS_FTS.values():
+                cursor.execute(f"DROP TABLE IF EXISTS {tabla_fts}")
+            cursor.execute("DROP TABLE IF EXISTS Productos")
+            cursor.execute("DROP TABLE IF EXISTS Clientes")
+            cursor.execute("DROP TABLE IF EXISTS Proveedores")
+            cursor.execute("DROP TABLE IF EXISTS Secuencias")
 
-        # Volver a crear las tablas
+        # Volver a crear las tablas y aplicar de nuevo las migraciones
         create_tables()
+        reiniciar_version_esquema()
+        aplicar_migraciones()
+        # Descarta también el bloque de números de factura reservado por este proceso
+        reiniciar_secuencia()
+        invalidar_catalogo()
+        vaciar_cache_graficos()
 
         self.mostrar_mensaje("Base de datos reiniciada con éxito", "green")
         self.main_menu()
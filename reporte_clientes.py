@@ -1,10 +1,18 @@
 # reporte_clientes.py
-import flet as ft
 from typing import Optional
-from libreria import BaseApp, get_db_connection
+from libreria import BaseApp
+from datos_reporte import ColumnaReporte, ConsultaPaginada, DatosReporte
 
 TITULO_CLIENTES = "Reporte de Clientes"
 
+# Columnas del reporte, en el orden de la consulta
+COLUMNAS_CLIENTES = [
+    ColumnaReporte("ID"),
+    ColumnaReporte("Nombre"),
+    ColumnaReporte("Teléfono"),
+    ColumnaReporte("Email"),
+]
+
 def listar_clientes(app: BaseApp, desde: Optional[str] = None, hasta: Optional[str] = None):
     """
     Lista y muestra los clientes en un reporte.
@@ -14,45 +22,14 @@ def listar_clientes(app: BaseApp, desde: Optional[str] = None, hasta: Optional[s
         desde (Optional[str]): Fecha de inicio del reporte. Por defecto es None.
         hasta (Optional[str]): Fecha de fin del reporte. Por defecto es None.
     """
-    clientes = _obtener_clientes(app)
-    elementos = _crear_elementos_clientes(clientes)
-    app._agregar_reporte(TITULO_CLIENTES, elementos, desde, hasta)
-
-def _obtener_clientes(app: BaseApp):
-    """
-    Obtiene la lista de clientes desde la base de datos.
-
-    Args:
-        app (BaseApp): Instancia de la aplicación base.
-
-    Returns:
-        List[Tuple]: Lista de tuplas con los datos de los clientes.
-    """
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM Clientes")
-        return cursor.fetchall()
+    app._agregar_reporte(TITULO_CLIENTES, datos_clientes(), desde, hasta)
 
-def _crear_elementos_clientes(clientes):
+def datos_clientes() -> DatosReporte:
     """
-    Crea los elementos de la interfaz de usuario para mostrar los clientes.
-
-    Args:
-        clientes (List[Tuple]): Lista de tuplas con los datos de los clientes.
+    Obtiene los datos del reporte de clientes, sin crear controles de la interfaz.
 
     Returns:
-        List[ft.Row]: Lista de filas con los datos de los clientes.
+        DatosReporte: Columnas y filas del reporte, que se leen de la base de datos por ventanas.
     """
-    return [
-        ft.Row([
-            ft.Text("ID:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(cliente[0]),
-            ft.Text("Nombre:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(cliente[1]),
-            ft.Text("Teléfono:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(cliente[2]),
-            ft.Text("Email:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(cliente[3])
-        ], alignment=ft.MainAxisAlignment.CENTER) for cliente in clientes
-    ]
-
+    return DatosReporte(COLUMNAS_CLIENTES, ConsultaPaginada("SELECT id, nombre, telefono, email FROM Clientes",
+                                                                 clave=("id",)))
@@ -1,10 +1,20 @@
 # reporte_compras.py
-import flet as ft
 from typing import Optional
-from libreria import BaseApp, get_db_connection
+from libreria import BaseApp
+from datos_reporte import ColumnaReporte, ConsultaPaginada, DatosReporte, formato_moneda
 
 TITULO_COMPRAS = "Reporte de Compras"
 
+# Columnas del reporte, en el orden de la consulta
+COLUMNAS_COMPRAS = [
+    ColumnaReporte("Nro Referencia"),
+    ColumnaReporte("Proveedor"),
+    ColumnaReporte("Producto"),
+    ColumnaReporte("Cantidad"),
+    ColumnaReporte("Fecha"),
+    ColumnaReporte("Precio Costo", formato_moneda),
+]
+
 def listar_compras(app: BaseApp, desde: Optional[str] = None, hasta: Optional[str] = None,
                    producto_id: Optional[int] = None, proveedor_id: Optional[int] = None):
     """
@@ -17,15 +27,25 @@ def listar_compras(app: BaseApp, desde: Optional[str] = None, hasta: Optional[st
         producto_id (Optional[int]): ID del producto a filtrar. Por defecto es None.
         proveedor_id (Optional[int]): ID del proveedor a filtrar. Por defecto es None.
     """
-    query, params = _construir_query_compras(desde, hasta, producto_id, proveedor_id)
+    datos = datos_compras(desde, hasta, producto_id, proveedor_id)
+    app._agregar_reporte(TITULO_COMPRAS, datos, desde, hasta)
 
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        compras = cursor.fetchall()
+def datos_compras(desde: Optional[str] = None, hasta: Optional[str] = None, producto_id: Optional[int] = None,
+                  proveedor_id: Optional[int] = None) -> DatosReporte:
+    """
+    Obtiene los datos del reporte de compras, sin crear controles de la interfaz.
+
+    Args:
+        desde (Optional[str]): Fecha de inicio del reporte. Por defecto es None.
+        hasta (Optional[str]): Fecha de fin del reporte. Por defecto es None.
+        producto_id (Optional[int]): ID del producto a filtrar. Por defecto es None.
+        proveedor_id (Optional[int]): ID del proveedor a filtrar. Por defecto es None.
 
-    elementos = _crear_elementos_compras(compras)
-    app._agregar_reporte(TITULO_COMPRAS, elementos, desde, hasta)
+    Returns:
+        DatosReporte: Columnas y filas del reporte, que se leen de la base de datos por ventanas.
+    """
+    query, params = _construir_query_compras(desde, hasta, producto_id, proveedor_id)
+    return DatosReporte(COLUMNAS_COMPRAS, ConsultaPaginada(query, params, clave=("compra_id",)))
 
 def _construir_query_compras(desde: Optional[str], hasta: Optional[str], producto_id: Optional[int],
                              proveedor_id: Optional[int]):
@@ -39,10 +59,12 @@ def _construir_query_compras(desde: Optional[str], hasta: Optional[str], product
         proveedor_id (Optional[int]): ID del proveedor a filtrar.
 
     Returns:
-        Tuple[str, List]: Consulta SQL y lista de parámetros.
+        Tuple[str, List]: Consulta SQL (sin ORDER BY: se ordena por el ID de la compra, la clave
+            que la ConsultaPaginada usa para leer por ventanas) y lista de parámetros.
     """
     query = """
-        SELECT Compras.nro_referencia, Proveedores.nombre, Productos.nombre, Compras.cantidad, Compras.fecha, Compras.precio_costo
+        SELECT Compras.nro_referencia, Proveedores.nombre, Productos.nombre, Compras.cantidad, Compras.fecha, Compras.precio_costo,
+               Compras.id AS compra_id
         FROM Compras
         JOIN Proveedores ON Compras.proveedor_id = Proveedores.id
         JOIN Productos ON Compras.producto_id = Productos.id
@@ -64,31 +86,3 @@ def _construir_query_compras(desde: Optional[str], hasta: Optional[str], product
         query += " WHERE " + " AND ".join(where_clauses)
 
     return query, params
-
-def _crear_elementos_compras(compras):
-    """
-    Crea los elementos de la interfaz de usuario para mostrar las compras.
-
-    Args:
-        compras (List[Tuple]): Lista de tuplas con los datos de las compras.
-
-    Returns:
-        List[ft.Row]: Lista de filas con los datos de las compras.
-    """
-    return [
-        ft.Row([
-            ft.Text("Nro Referencia:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(compra[0]),
-            ft.Text("Proveedor:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(compra[1]),
-            ft.Text("Producto:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(compra[2]),
-            ft.Text("Cantidad:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(compra[3]),
-            ft.Text("Fecha:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(compra[4]),
-            ft.Text("Precio Costo:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(f"${compra[5]:.2f}")
-        ], alignment=ft.MainAxisAlignment.CENTER) for compra in compras
-    ]
-
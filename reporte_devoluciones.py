@@ -1,10 +1,19 @@
 # reporte_devoluciones.py
-import flet as ft
 from typing import Optional
-from libreria import BaseApp, get_db_connection
+from libreria import BaseApp
+from datos_reporte import ColumnaReporte, ConsultaPaginada, DatosReporte
 
 TITULO_DEVOLUCIONES = "Reporte de Devoluciones"
 
+# Columnas del reporte, en el orden de la consulta
+COLUMNAS_DEVOLUCIONES = [
+    ColumnaReporte("Factura ID"),
+    ColumnaReporte("Cliente"),
+    ColumnaReporte("Producto"),
+    ColumnaReporte("Cantidad"),
+    ColumnaReporte("Fecha"),
+]
+
 def listar_devoluciones(app: BaseApp, desde: Optional[str] = None, hasta: Optional[str] = None,
                         producto_id: Optional[int] = None, cliente_id: Optional[int] = None):
     """
@@ -17,15 +26,25 @@ def listar_devoluciones(app: BaseApp, desde: Optional[str] = None, hasta: Option
         producto_id (Optional[int]): ID del producto a filtrar. Por defecto es None.
         cliente_id (Optional[int]): ID del cliente a filtrar. Por defecto es None.
     """
-    query, params = _construir_query_devoluciones(desde, hasta, producto_id, cliente_id)
+    datos = datos_devoluciones(desde, hasta, producto_id, cliente_id)
+    app._agregar_reporte(TITULO_DEVOLUCIONES, datos, desde, hasta)
 
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        devoluciones = cursor.fetchall()
+def datos_devoluciones(desde: Optional[str] = None, hasta: Optional[str] = None, producto_id: Optional[int] = None,
+                       cliente_id: Optional[int] = None) -> DatosReporte:
+    """
+    Obtiene los datos del reporte de devoluciones, sin crear controles de la interfaz.
+
+    Args:
+        desde (Optional[str]): Fecha de inicio del reporte. Por defecto es None.
+        hasta (Optional[str]): Fecha de fin del reporte. Por defecto es None.
+        producto_id (Optional[int]): ID del producto a filtrar. Por defecto es None.
+        cliente_id (Optional[int]): ID del cliente a filtrar. Por defecto es None.
 
-    elementos = _crear_elementos_devoluciones(devoluciones)
-    app._agregar_reporte(TITULO_DEVOLUCIONES, elementos, desde, hasta)
+    Returns:
+        DatosReporte: Columnas y filas del reporte, que se leen de la base de datos por ventanas.
+    """
+    query, params = _construir_query_devoluciones(desde, hasta, producto_id, cliente_id)
+    return DatosReporte(COLUMNAS_DEVOLUCIONES, ConsultaPaginada(query, params, clave=("devolucion_id",)))
 
 def _construir_query_devoluciones(desde: Optional[str], hasta: Optional[str], producto_id: Optional[int],
                                   cliente_id: Optional[int]):
@@ -39,10 +58,12 @@ def _construir_query_devoluciones(desde: Optional[str], hasta: Optional[str], pr
         cliente_id (Optional[int]): ID del cliente a filtrar.
 
     Returns:
-        Tuple[str, List]: Consulta SQL y lista de parámetros.
+        Tuple[str, List]: Consulta SQL (sin ORDER BY: se ordena por el ID de la devolución, la
+            clave que la ConsultaPaginada usa para leer por ventanas) y lista de parámetros.
     """
     query = """
-        SELECT d.factura_id, p.nombre AS producto_nombre, d.cantidad, d.fecha, c.nombre AS cliente_nombre
+        SELECT d.factura_id, c.nombre AS cliente_nombre, p.nombre AS producto_nombre, d.cantidad, d.fecha,
+               d.id AS devolucion_id
         FROM Devoluciones d
         JOIN Productos p ON d.producto_id = p.id
         JOIN Clientes c ON d.cliente_id = c.id
@@ -64,29 +85,3 @@ def _construir_query_devoluciones(desde: Optional[str], hasta: Optional[str], pr
         query += " WHERE " + " AND ".join(where_clauses)
 
     return query, params
-
-def _crear_elementos_devoluciones(devoluciones):
-    """
-    Crea los elementos de la interfaz de usuario para mostrar las devoluciones.
-
-    Args:
-        devoluciones (List[Tuple]): Lista de tuplas con los datos de las devoluciones.
-
-    Returns:
-        List[ft.Row]: Lista de filas con los datos de las devoluciones.
-    """
-    return [
-        ft.Row([
-            ft.Text("Factura ID:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(devolucion[0]),
-            ft.Text("Cliente:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(devolucion[4]),
-            ft.Text("Producto:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(devolucion[1]),
-            ft.Text("Cantidad:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(devolucion[2]),
-            ft.Text("Fecha:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(devolucion[3])
-        ], alignment=ft.MainAxisAlignment.CENTER) for devolucion in devoluciones
-    ]
-
@@ -1,10 +1,19 @@
 # reporte_productos.py
-import flet as ft
 from typing import Optional
-from libreria import BaseApp, get_db_connection
+from libreria import BaseApp
+from datos_reporte import ColumnaReporte, ConsultaPaginada, DatosReporte, formato_moneda
 
 TITULO_PRODUCTOS = "Reporte de Productos"
 
+# Columnas del reporte, en el orden de la consulta
+COLUMNAS_PRODUCTOS = [
+    ColumnaReporte("ID"),
+    ColumnaReporte("Nombre"),
+    ColumnaReporte("Stock"),
+    ColumnaReporte("Precio Venta", formato_moneda),
+    ColumnaReporte("Precio Costo", formato_moneda),
+]
+
 def listar_productos(app: BaseApp, desde: Optional[str] = None, hasta: Optional[str] = None):
     """
     Lista y muestra los productos en un reporte.
@@ -14,68 +23,32 @@ def listar_productos(app: BaseApp, desde: Optional[str] = None, hasta: Optional[
         desde (Optional[str]): Fecha de inicio del reporte. Por defecto es None.
         hasta (Optional[str]): Fecha de fin del reporte. Por defecto es None.
     """
-    productos = _obtener_productos(app, desde, hasta)
-    elementos = _crear_elementos_productos(productos)
-    app._agregar_reporte(TITULO_PRODUCTOS, elementos, desde, hasta)
+    app._agregar_reporte(TITULO_PRODUCTOS, datos_productos(desde, hasta), desde, hasta)
 
-def _obtener_productos(app: BaseApp, desde: Optional[str], hasta: Optional[str]):
+def datos_productos(desde: Optional[str] = None, hasta: Optional[str] = None) -> DatosReporte:
     """
-    Obtiene la lista de productos desde la base de datos.
+    Obtiene los datos del reporte de productos, sin crear controles de la interfaz.
 
     Args:
-        app (BaseApp): Instancia de la aplicación base.
-        desde (Optional[str]): Fecha de inicio del reporte.
-        hasta (Optional[str]): Fecha de fin del reporte.
+        desde (Optional[str]): Fecha de inicio del reporte. Por defecto es None.
+        hasta (Optional[str]): Fecha de fin del reporte. Por defecto es None.
 
     Returns:
-        List[Tuple]: Lista de tuplas con los datos de los productos.
+        DatosReporte: Columnas y filas del reporte, que se leen de la base de datos por ventanas.
     """
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        query = """
-            SELECT p.id, p.nombre, p.stock, p.precio AS precio_venta,
-                   (SELECT c.precio_costo
-                    FROM Compras c
-                    WHERE c.producto_id = p.id
-                    ORDER BY c.fecha DESC
-                    LIMIT 1) AS precio_costo
-            FROM Productos p
-        """
-        params = []
-        where_clauses = []
-
-        if desde and hasta:
-            where_clauses.append("p.fecha BETWEEN ? AND ?")
-            params.extend([desde, hasta])
-
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-
-        cursor.execute(query, params)
-        return cursor.fetchall()
-
-def _crear_elementos_productos(productos):
+    query = """
+        SELECT p.id, p.nombre, p.stock, p.precio AS precio_venta, u.precio_costo
+        FROM Productos p
+        LEFT JOIN UltimoCosto u ON u.producto_id = p.id
     """
-    Crea los elementos de la interfaz de usuario para mostrar los productos.
+    params = []
+    where_clauses = []
 
-    Args:
-        productos (List[Tuple]): Lista de tuplas con los datos de los productos.
+    if desde and hasta:
+        where_clauses.append("p.fecha BETWEEN ? AND ?")
+        params.extend([desde, hasta])
 
-    Returns:
-        List[ft.Row]: Lista de filas con los datos de los productos.
-    """
-    return [
-        ft.Row([
-            ft.Text("ID:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(producto[0]),
-            ft.Text("Nombre:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(producto[1]),
-            ft.Text("Stock:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(producto[2]),
-            ft.Text("Precio Venta:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(f"${producto[3]:.2f}"),
-            ft.Text("Precio Costo:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(f"${producto[4]:.2f}" if producto[4] else "N/A")
-        ], alignment=ft.MainAxisAlignment.CENTER) for producto in productos
-    ]
+    if where_clauses:
+        query += " WHERE " + " AND ".join(where_clauses)
 
+    return DatosReporte(COLUMNAS_PRODUCTOS, ConsultaPaginada(query, params, clave=("id",)))
@@ -1,10 +1,18 @@
 # reporte_proveedores.py
-import flet as ft
 from typing import Optional
-from libreria import BaseApp, get_db_connection
+from libreria import BaseApp
+from datos_reporte import ColumnaReporte, ConsultaPaginada, DatosReporte
 
 TITULO_PROVEEDORES = "Reporte de Proveedores"
 
+# Columnas del reporte, en el orden de la consulta
+COLUMNAS_PROVEEDORES = [
+    ColumnaReporte("ID"),
+    ColumnaReporte("Nombre"),
+    ColumnaReporte("Teléfono"),
+    ColumnaReporte("Email"),
+]
+
 def listar_proveedores(app: BaseApp, desde: Optional[str] = None, hasta: Optional[str] = None):
     """
     Lista y muestra los proveedores en un reporte.
@@ -14,45 +22,14 @@ def listar_proveedores(app: BaseApp, desde: Optional[str] = None, hasta: Optiona
         desde (Optional[str]): Fecha de inicio del reporte. Por defecto es None.
         hasta (Optional[str]): Fecha de fin del reporte. Por defecto es None.
     """
-    proveedores = _obtener_proveedores(app)
-    elementos = _crear_elementos_proveedores(proveedores)
-    app._agregar_reporte(TITULO_PROVEEDORES, elementos, desde, hasta)
-
-def _obtener_proveedores(app: BaseApp):
-    """
-    Obtiene la lista de proveedores desde la base de datos.
-
-    Args:
-        app (BaseApp): Instancia de la aplicación base.
-
-    Returns:
-        List[Tuple]: Lista de tuplas con los datos de los proveedores.
-    """
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM Proveedores")
-        return cursor.fetchall()
+    app._agregar_reporte(TITULO_PROVEEDORES, datos_proveedores(), desde, hasta)
 
-def _crear_elementos_proveedores(proveedores):
+def datos_proveedores() -> DatosReporte:
     """
-    Crea los elementos de la interfaz de usuario para mostrar los proveedores.
-
-    Args:
-        proveedores (List[Tuple]): Lista de tuplas con los datos de los proveedores.
+    Obtiene los datos del reporte de proveedores, sin crear controles de la interfaz.
 
     Returns:
-        List[ft.Row]: Lista de filas con los datos de los proveedores.
+        DatosReporte: Columnas y filas del reporte, que se leen de la base de datos por ventanas.
     """
-    return [
-        ft.Row([
-            ft.Text("ID:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(proveedor[0]),
-            ft.Text("Nombre:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(proveedor[1]),
-            ft.Text("Teléfono:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(proveedor[2]),
-            ft.Text("Email:", weight=ft.FontWeight.BOLD, color="blue"),
-            ft.Text(proveedor[3])
-        ], alignment=ft.MainAxisAlignment.CENTER) for proveedor in proveedores
-    ]
-
+    return DatosReporte(COLUMNAS_PROVEEDORES, ConsultaPaginada("SELECT id, nombre, telefono, email FROM Proveedores",
+                                                                     clave=("id",)))
@@ -10,16 +10,15 @@ from reporte_devoluciones import listar_devoluciones
 from reporte_balance import balance
 from nav_reportes_pdf import nav_reportes_pdf_app
 from nav_facturas_pdf import nav_facturas_pdf_app
-from libreria import BaseApp, FormField, get_db_connection
+from libreria import BaseApp, FormField, ListaPaginada
+from datos_reporte import ColumnaReporte, DatosReporte
+from exportacion import EXTENSION_GZIP, Progreso, exportar_csv, exportar_pdf
+from trabajos import Trabajo
 import os
-import csv
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, PageTemplate, Frame, LongTable
 import subprocess
 import platform
-from typing import List, Tuple, Optional, Any, Callable
+from typing import List, Optional, Any, Iterable, Sequence
+from busqueda import buscar_registros
 
 # Constantes para textos repetidos
 TITULO_REPORTES = "Reportes"
@@ -32,6 +31,9 @@ TITULO_COMPRAS = "Reporte de Compras"
 TITULO_BALANCE = "Balance"
 TITULO_DEVOLUCIONES = "Reporte de Devoluciones"
 
+# Tabla donde se buscan las opciones de cada tipo de filtro
+TABLAS_FILTRO = {"Producto": "Productos", "Cliente": "Clientes", "Proveedor": "Proveedores"}
+
 class ReportesApp(BaseApp):
     """
     Clase principal para la gestión de reportes.
@@ -61,8 +63,9 @@ class ReportesApp(BaseApp):
         listar_compras(self, desde, hasta, producto_id, proveedor_id)
 
     def balance(self, desde: Optional[str] = None, hasta: Optional[str] = None, producto_id: Optional[int] = None,
-                cliente_id: Optional[int] = None, proveedor_id: Optional[int] = None):
-        balance(self, desde, hasta, producto_id, cliente_id, proveedor_id)
+                cliente_id: Optional[int] = None, proveedor_id: Optional[int] = None,
+                agrupacion: Optional[str] = None):
+        balance(self, desde, hasta, producto_id, cliente_id, proveedor_id, agrupacion)
 
     def listar_devoluciones(self, desde: Optional[str] = None, hasta: Optional[str] = None,
                             producto_id: Optional[int] = None,
@@ -153,52 +156,50 @@ class ReportesApp(BaseApp):
         """
         nav_facturas_pdf_app(self.page, self.facturas_dir, self.main_menu_callback)
 
-    def generar_csv_reporte(self, titulo: str, elementos: List[Any]):
+    def generar_csv_reporte(self, titulo: str, datos: DatosReporte, comprimir: bool = False) -> Trabajo:
         """
-        Genera un archivo CSV con los datos del reporte.
+        Genera en segundo plano un archivo CSV con los datos del reporte.
+
+        Los valores se escriben sin formato (los importes como números), tal como
+        vienen de la base de datos, y el avance se muestra en la página.
 
         Args:
             titulo (str): Título del reporte.
-            elementos (List[Any]): Lista de elementos a incluir en el reporte.
+            datos (DatosReporte): Columnas y filas del reporte.
+            comprimir (bool): Si es True el archivo se comprime con gzip. Por defecto es False.
+
+        Returns:
+            Trabajo: El trabajo de exportación.
         """
         nombre_archivo = f"{titulo.replace(' ', '_').lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        encabezados, datos = self._obtener_datos_reporte(titulo, elementos)
-
-        ruta_archivo = self.generar_csv(nombre_archivo, encabezados, datos)
-        mensaje = f"Archivo CSV generado: {ruta_archivo}" if ruta_archivo else "Error al generar el archivo CSV"
+        if comprimir:
+            nombre_archivo += EXTENSION_GZIP
+        ruta_archivo = os.path.join(self.reportes_dir_csv, nombre_archivo)
 
-        self.mostrar_mensaje(mensaje, "green")  # Añade el color aquí
+        return self.ejecutar_en_segundo_plano(
+            "Generando CSV", exportar_csv, datos, ruta_archivo, comprimir, con_progreso=True,
+            al_terminar=lambda _: self.mostrar_mensaje(f"Archivo CSV generado: {ruta_archivo}", "green"))
 
-    def generar_pdf_reporte(self, titulo: str, elementos: List[Any]):
+    def generar_pdf_reporte(self, titulo: str, datos: DatosReporte) -> Trabajo:
         """
-        Genera un archivo PDF con los datos del reporte.
+        Genera en otro proceso un archivo PDF con los datos del reporte.
 
         Args:
             titulo (str): Título del reporte.
-            elementos (List[Any]): Lista de elementos a incluir en el reporte.
+            datos (DatosReporte): Columnas y filas del reporte.
+
+        Returns:
+            Trabajo: El trabajo de exportación.
         """
         nombre_archivo = f"{titulo.replace(' ', '_').lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         ruta_archivo = os.path.join(self.reportes_dir_pdf, nombre_archivo)
 
-        # Crear el documento PDF
-        doc = SimpleDocTemplate(ruta_archivo, pagesize=letter)
-        styles = getSampleStyleSheet()
-
-        elements = []
-        encabezados, datos = self._obtener_datos_reporte(titulo, elementos)
-        data = self._crear_data_para_pdf(encabezados, datos, styles)
-
-        table = LongTable(data, repeatRows=1)
-        table.setStyle(self._crear_estilo_tabla())
-
-        elements.append(table)
-
-        # Construir el documento con el encabezado
-        doc.build(elements, onFirstPage=self._encabezado_pdf(titulo), onLaterPages=self._encabezado_pdf(titulo))
+        def terminar(_):
+            self.mostrar_mensaje(f"Archivo PDF generado: {ruta_archivo}", "green")
+            self.mostrar_confirmacion_imprimir(ruta_archivo)
 
-        mensaje = f"Archivo PDF generado: {ruta_archivo}"
-        self.mostrar_mensaje(mensaje, "green")  # Añade el color aquí
-        self.mostrar_confirmacion_imprimir(ruta_archivo)
+        return self.ejecutar_en_segundo_plano("Generando PDF", exportar_pdf, datos, ruta_archivo, titulo,
+                                              en_proceso=True, con_progreso=True, al_terminar=terminar)
 
     def _mostrar_opciones_filtro(self, titulo: str, desde: str, hasta: str):
         opciones_filtro = {
@@ -221,29 +222,13 @@ class ReportesApp(BaseApp):
         self.page.update()
 
     def seleccionar_filtro(self, e, desde: str, hasta: str, tipo_filtro: str, reporte_tipo: str):
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            if tipo_filtro == "Producto":
-                cursor.execute("SELECT id, nombre FROM Productos")
-            elif tipo_filtro == "Cliente":
-                cursor.execute("SELECT id, nombre FROM Clientes")
-            elif tipo_filtro == "Proveedor":
-                cursor.execute("SELECT id, nombre FROM Proveedores")
-            opciones = cursor.fetchall()
+        tabla = TABLAS_FILTRO[tipo_filtro]
 
         def filtrar_opciones(e):
-            filtro = filtro_field.value.lower()
-            opciones_filtradas = [opcion for opcion in opciones if
-                                  filtro in str(opcion[0]).lower() or filtro in opcion[1].lower()]
-            actualizar_lista_opciones(opciones_filtradas)
-
-        def actualizar_lista_opciones(opciones_filtradas):
-            lista_opciones.controls.clear()
-            for opcion in opciones_filtradas:
-                lista_opciones.controls.append(
-                    ft.ElevatedButton(opcion[1], on_click=lambda _, o=opcion: seleccionar_opcion(_, o[0]))
-                )
-            self.page.update()
+            lista_opciones.recargar()
+
+        def crear_boton_opcion(opcion):
+            return ft.ElevatedButton(opcion[1], on_click=lambda _, o=opcion: seleccionar_opcion(_, o[0]))
 
         def seleccionar_opcion(e, opcion_id):
             if reporte_tipo == TITULO_VENTAS:
@@ -261,134 +246,19 @@ class ReportesApp(BaseApp):
                                          cliente_id=opcion_id if tipo_filtro == "Cliente" else None)
 
         filtro_field = ft.TextField(label=f"Filtrar por ID o {tipo_filtro}", on_change=filtrar_opciones)
-        lista_opciones = ft.ListView(expand=True, spacing=10, padding=20)
+        lista_opciones = ListaPaginada(
+            lambda desplazamiento, limite: buscar_registros(tabla, filtro_field.value, limite, desplazamiento),
+            crear_boton_opcion, padding=20)
 
         self.page.controls.clear()
         self.page.add(
             ft.Text(f"Seleccionar {tipo_filtro}", size=24),
             filtro_field,
-            lista_opciones,
+            lista_opciones.control,
             ft.ElevatedButton("Volver", on_click=lambda _: self.main_menu())
         )
-
-        actualizar_lista_opciones(opciones)
         self.page.update()
 
-    def _obtener_datos_reporte(self, titulo: str, elementos: List[Any]) -> Tuple[List[str], List[List[Any]]]:
-        """
-        Obtiene los encabezados y datos para el reporte.
-
-        Args:
-            titulo (str): Título del reporte.
-            elementos (List[Any]): Lista de elementos a incluir en el reporte.
-
-        Returns:
-            Tuple[List[str], List[List[Any]]]: Encabezados y datos del reporte.
-        """
-        if "Productos" in titulo:
-            encabezados = ["ID", "Nombre", "Stock", "Precio Venta", "Precio Costo"]
-            datos = [[e.controls[1].value, e.controls[3].value, e.controls[5].value, e.controls[7].value,
-                      e.controls[9].value] for e in elementos if len(e.controls) >= 10]
-        elif "Clientes" in titulo or "Proveedores" in titulo:
-            encabezados = ["ID", "Nombre", "Teléfono", "Email"]
-            datos = [[e.controls[1].value, e.controls[3].value, e.controls[5].value, e.controls[7].value] for e in
-                     elementos if len(e.controls) >= 8]
-        elif "Ventas" in titulo:
-            encabezados = ["Factura ID", "Cliente", "Producto", "Cantidad", "Precio", "Fecha"]
-            datos = [[e.controls[1].value, e.controls[5].value, e.controls[7].value, e.controls[9].value,
-                      e.controls[11].value, e.controls[3].value] for e in elementos if len(e.controls) >= 12]
-        elif "Compras" in titulo:
-            encabezados = ["Nro Referencia", "Proveedor", "Producto", "Cantidad", "Fecha", "Precio Costo"]
-            datos = [[e.controls[1].value, e.controls[3].value, e.controls[5].value, e.controls[7].value,
-                      e.controls[9].value, e.controls[11].value] for e in elementos if len(e.controls) >= 12]
-        elif "Devoluciones" in titulo:
-            encabezados = ["Factura ID", "Cliente", "Producto", "Cantidad", "Fecha"]
-            datos = [[e.controls[1].value, e.controls[3].value, e.controls[5].value, e.controls[7].value,
-                      e.controls[9].value] for e in elementos if len(e.controls) >= 10]
-        else:
-            encabezados, datos = [], []
-        return encabezados, datos
-
-    def _crear_data_para_pdf(self, encabezados: List[str], datos: List[List[Any]], styles) -> List[List[Paragraph]]:
-        """
-        Crea los datos para el PDF en formato de párrafos.
-
-        Args:
-            encabezados (List[str]): Lista de encabezados.
-            datos (List[List[Any]]): Lista de datos.
-            styles: Hoja de estilos para el PDF.
-
-        Returns:
-            List[List[Paragraph]]: Datos en formato de párrafos.
-        """
-        estilo_encabezado = ParagraphStyle(
-            'encabezado',
-            parent=styles['Normal'],
-            fontSize=7,
-            leading=8,
-            alignment=1,
-            wordWrap='CJK',
-            fontName='Helvetica-Bold',
-            textColor=colors.whitesmoke
-        )
-
-        estilo_datos = ParagraphStyle(
-            'datos',
-            parent=styles['Normal'],
-            fontSize=7,
-            leading=7,
-            alignment=1,
-            wordWrap='CJK'
-        )
-
-        encabezados_paragraph = [Paragraph(str(header), estilo_encabezado) for header in encabezados]
-        datos_paragraph = [[Paragraph(str(cell), estilo_datos) for cell in row] for row in datos]
-
-        return [encabezados_paragraph] + datos_paragraph
-
-    def _crear_estilo_tabla(self) -> TableStyle:
-        """
-        Crea el estilo de la tabla para el PDF.
-
-        Returns:
-            TableStyle: Estilo de la tabla.
-        """
-        return TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 7),
-            ('FONTSIZE', (0, 1), (-1, -1), 7),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('WORDWRAP', (0, 0), (-1, -1), True)
-        ])
-
-    def _encabezado_pdf(self, titulo: str) -> Callable:
-        """
-        Crea el encabezado para el PDF.
-
-        Args:
-            titulo (str): Título del reporte.
-
-        Returns:
-            Callable: Función que dibuja el encabezado en el PDF.
-        """
-        def encabezado(canvas, doc):
-            canvas.saveState()
-            canvas.setFont('Helvetica-Bold', 16)
-            width, height = letter
-            text_width = canvas.stringWidth(titulo, 'Helvetica-Bold', 16)
-            x_position = (width - text_width) / 2
-            canvas.drawString(x_position, 750, titulo)
-            canvas.setFont('Times-Roman', 10)
-            canvas.drawRightString(letter[0] - 30, 750, f"Página {doc.page}")
-            canvas.restoreState()
-        return encabezado
-
     def mostrar_confirmacion_imprimir(self, ruta_pdf: str):
         """
         Muestra un diálogo de confirmación para imprimir el PDF.
@@ -458,24 +328,28 @@ class ReportesApp(BaseApp):
         with open(ruta_archivo, 'w') as archivo:
             archivo.write(mensaje_error)
 
-    def generar_csv(self, nombre_archivo: str, encabezados: List[str], datos: List[List[Any]]) -> Optional[str]:
+    def generar_csv(self, nombre_archivo: str, encabezados: List[str], datos: Iterable[Sequence[Any]],
+                    comprimir: bool = False, progreso: Optional[Progreso] = None) -> Optional[str]:
         """
-        Genera un archivo CSV.
+        Genera un archivo CSV escribiendo las filas a medida que se leen.
 
         Args:
             nombre_archivo (str): Nombre del archivo CSV.
             encabezados (List[str]): Lista de encabezados.
-            datos (List[List[Any]]): Lista de datos.
+            datos (Iterable[Sequence[Any]]): Filas de datos (una lista, una ConsultaPaginada o un DatosReporte).
+            comprimir (bool): Si es True el archivo se comprime con gzip. Por defecto es False.
+            progreso (Optional[Progreso]): Recibe las filas escritas y el total. Por defecto es None.
 
         Returns:
             Optional[str]: Ruta del archivo CSV generado, o None si hubo un error.
         """
+        if not isinstance(datos, DatosReporte):
+            datos = DatosReporte([ColumnaReporte(encabezado) for encabezado in encabezados], datos)
+        if comprimir:
+            nombre_archivo += EXTENSION_GZIP
         ruta_archivo = os.path.join(self.reportes_dir_csv, nombre_archivo)
         try:
-            with open(ruta_archivo, 'w', newline='', encoding='utf-8') as archivo_csv:
-                writer = csv.writer(archivo_csv)
-                writer.writerow(encabezados)
-                writer.writerows(datos)
+            exportar_csv(datos, ruta_archivo, comprimir, progreso)
             return ruta_archivo
         except Exception as e:
             print(f"Error al generar el archivo CSV: {str(e)}")
@@ -0,0 +1,199 @@
+# resumenes.py
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+from database import create_connection
+
+# Resúmenes diarios: unidades e importes por día y producto, por día y cliente y por día
+# y proveedor. Se actualizan en la misma transacción que registra cada venta, compra o
+# devolución (acumular_*), así un gráfico o un balance de varios años lee unas pocas
+# filas por día en lugar de todas las líneas de factura, compras y devoluciones.
+#
+# Los importes son los mismos que calculan los gráficos y el balance: cantidad por precio
+# unitario (ventas), por precio de costo (compras) y, en las devoluciones, por el precio de
+# la línea de la factura devuelta. Los movimientos sin producto, cliente o proveedor se
+# resumen con el id SIN_ENTIDAD, así los totales de cada resumen incluyen todos los movimientos.
+#
+# Si los resúmenes se desincronizan (p. ej. por una edición manual de la base), se
+# reconstruyen con 'python resumenes.py' o desde el menú Mantenimiento.
+
+SIN_ENTIDAD = 0  # Id de los movimientos sin entidad (los ids de las tablas empiezan en 1)
+
+RESUMEN_PRODUCTO = "ResumenDiarioProducto"
+RESUMEN_CLIENTE = "ResumenDiarioCliente"
+RESUMEN_PROVEEDOR = "ResumenDiarioProveedor"
+TABLAS_RESUMEN = (RESUMEN_PRODUCTO, RESUMEN_CLIENTE, RESUMEN_PROVEEDOR)
+
+# Columna de la entidad de cada resumen
+COLUMNA_RESUMEN = {
+    RESUMEN_PRODUCTO: "producto_id",
+    RESUMEN_CLIENTE: "cliente_id",
+    RESUMEN_PROVEEDOR: "proveedor_id",
+}
+
+# Columnas (unidades, importe) de cada tipo de movimiento
+COLUMNAS_VENTAS = ("unidades_vendidas", "ventas")
+COLUMNAS_DEVOLUCIONES = ("unidades_devueltas", "devoluciones")
+COLUMNAS_COMPRAS = ("unidades_compradas", "compras")
+
+# Consultas que recalculan cada resumen desde las tablas de movimientos
+RECONSTRUCCION = (
+    (RESUMEN_PRODUCTO, COLUMNAS_VENTAS, """
+        SELECT f.fecha, IFNULL(l.producto_id, 0), SUM(l.cantidad), SUM(l.cantidad * l.precio_unitario)
+        FROM Facturas f
+        JOIN FacturaLineas l ON l.factura_id = f.factura_id
+        GROUP BY 1, 2
+    """),
+    (RESUMEN_CLIENTE, COLUMNAS_VENTAS, """
+        SELECT f.fecha, IFNULL(f.cliente_id, 0), SUM(l.cantidad), SUM(l.cantidad * l.precio_unitario)
+        FROM Facturas f
+        JOIN FacturaLineas l ON l.factura_id = f.factura_id
+        GROUP BY 1, 2
+    """),
+    (RESUMEN_PRODUCTO, COLUMNAS_DEVOLUCIONES, """
+        SELECT d.fecha, IFNULL(d.producto_id, 0), SUM(d.cantidad), SUM(d.cantidad * IFNULL(l.precio_unitario, 0))
+        FROM Devoluciones d
+        LEFT JOIN FacturaLineas l ON l.id = (
+            SELECT id FROM FacturaLineas
+            WHERE factura_id = d.factura_id AND producto_id = d.producto_id
+            LIMIT 1
+        )
+        GROUP BY 1, 2
+    """),
+    (RESUMEN_CLIENTE, COLUMNAS_DEVOLUCIONES, """
+        SELECT d.fecha, IFNULL(d.cliente_id, 0), SUM(d.cantidad), SUM(d.cantidad * IFNULL(l.precio_unitario, 0))
+        FROM Devoluciones d
+        LEFT JOIN FacturaLineas l ON l.id = (
+            SELECT id FROM FacturaLineas
+            WHERE factura_id = d.factura_id AND producto_id = d.producto_id
+            LIMIT 1
+        )
+        GROUP BY 1, 2
+    """),
+    (RESUMEN_PRODUCTO, COLUMNAS_COMPRAS, """
+        SELECT fecha, IFNULL(producto_id, 0), SUM(cantidad), SUM(cantidad * precio_costo)
+        FROM Compras
+        WHERE fecha IS NOT NULL
+        GROUP BY 1, 2
+    """),
+    (RESUMEN_PROVEEDOR, COLUMNAS_COMPRAS, """
+        SELECT fecha, IFNULL(proveedor_id, 0), SUM(cantidad), SUM(cantidad * precio_costo)
+        FROM Compras
+        WHERE fecha IS NOT NULL
+        GROUP BY 1, 2
+    """),
+)
+
+def _sumar(cursor, tabla: str, columnas: Tuple[str, str], filas: Iterable[Tuple[str, int, int, float]]):
+    """
+    Suma unidades e importes a las filas (fecha, entidad) de un resumen, creándolas si no existen.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor de la transacción del llamador.
+        tabla (str): Tabla de resumen.
+        columnas (Tuple[str, str]): Columnas de unidades e importe a incrementar.
+        filas (Iterable[Tuple[str, int, int, float]]): (fecha, id de la entidad, unidades, importe).
+    """
+    # Un mismo producto puede venir en varias líneas: se agrupa antes de escribir
+    totales: Dict[Tuple[str, int], list] = {}
+    for fecha, entidad, unidades, importe in filas:
+        if fecha is None:
+            continue
+        if entidad is None:
+            entidad = SIN_ENTIDAD
+        total = totales.setdefault((fecha, entidad), [0, 0.0])
+        total[0] += unidades or 0
+        total[1] += importe or 0.0
+    if not totales:
+        return
+    columna = COLUMNA_RESUMEN[tabla]
+    unidades, importe = columnas
+    cursor.executemany(f"INSERT OR IGNORE INTO {tabla} (fecha, {columna}) VALUES (?, ?)", list(totales))
+    cursor.executemany(
+        f"UPDATE {tabla} SET {unidades} = {unidades} + ?, {importe} = {importe} + ? WHERE fecha = ? AND {columna} = ?",
+        [(total[0], total[1], fecha, entidad) for (fecha, entidad), total in totales.items()]
+    )
+
+def acumular_venta(cursor, fecha: str, cliente_id: Optional[int], lineas: Sequence[Tuple[int, int, float]]):
+    """
+    Suma una venta a los resúmenes diarios (dentro de la transacción que la registra).
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor de la transacción de la venta.
+        fecha (str): Fecha de la factura.
+        cliente_id (Optional[int]): ID del cliente.
+        lineas (Sequence[Tuple[int, int, float]]): (producto_id, cantidad, precio_unitario) de cada línea.
+    """
+    _sumar(cursor, RESUMEN_PRODUCTO, COLUMNAS_VENTAS,
+           ((fecha, producto_id, cantidad, cantidad * precio) for producto_id, cantidad, precio in lineas))
+    _sumar(cursor, RESUMEN_CLIENTE, COLUMNAS_VENTAS,
+           ((fecha, cliente_id, cantidad, cantidad * precio) for _, cantidad, precio in lineas))
+
+def acumular_compra(cursor, fecha: str, proveedor_id: Optional[int], lineas: Sequence[Tuple[int, int, float]]):
+    """
+    Suma una compra a los resúmenes diarios (dentro de la transacción que la registra).
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor de la transacción de la compra.
+        fecha (str): Fecha de la compra.
+        proveedor_id (Optional[int]): ID del proveedor.
+        lineas (Sequence[Tuple[int, int, float]]): (producto_id, cantidad, precio_costo) de cada producto.
+    """
+    _sumar(cursor, RESUMEN_PRODUCTO, COLUMNAS_COMPRAS,
+           ((fecha, producto_id, cantidad, cantidad * (costo or 0)) for producto_id, cantidad, costo in lineas))
+    _sumar(cursor, RESUMEN_PROVEEDOR, COLUMNAS_COMPRAS,
+           ((fecha, proveedor_id, cantidad, cantidad * (costo or 0)) for _, cantidad, costo in lineas))
+
+def acumular_devolucion(cursor, fecha: str, factura_id: str, cliente_id: Optional[int],
+                        lineas: Sequence[Tuple[int, int]]):
+    """
+    Suma una devolución a los resúmenes diarios (dentro de la transacción que la registra).
+    Cada producto se valúa al precio de su línea en la factura devuelta.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor de la transacción de la devolución.
+        fecha (str): Fecha de la devolución.
+        factura_id (str): Número de la factura devuelta.
+        cliente_id (Optional[int]): ID del cliente.
+        lineas (Sequence[Tuple[int, int]]): (producto_id, cantidad) de cada producto devuelto.
+    """
+    marcadores = ", ".join("?" * len(lineas))
+    cursor.execute(f"""
+        SELECT producto_id, precio_unitario FROM FacturaLineas
+        WHERE factura_id = ? AND producto_id IN ({marcadores})
+        ORDER BY id DESC
+    """, (factura_id, *(producto_id for producto_id, _ in lineas)))
+    # Orden descendente: si un producto está en varias líneas queda el precio de la primera
+    precios = dict(cursor.fetchall())
+    importes = [(producto_id, cantidad, cantidad * precios.get(producto_id, 0)) for producto_id, cantidad in lineas]
+    _sumar(cursor, RESUMEN_PRODUCTO, COLUMNAS_DEVOLUCIONES,
+           ((fecha, producto_id, cantidad, importe) for producto_id, cantidad, importe in importes))
+    _sumar(cursor, RESUMEN_CLIENTE, COLUMNAS_DEVOLUCIONES,
+           ((fecha, cliente_id, cantidad, importe) for _, cantidad, importe in importes))
+
+def reconstruir_resumenes(cursor=None):
+    """
+    Vuelve a calcular todos los resúmenes diarios desde las tablas de movimientos.
+
+    Args:
+        cursor (sqlite3.Cursor, optional): Cursor de una transacción abierta (p. ej. la de una
+            migración). Si es None se usa una conexión del pool con su propia transacción.
+    """
+    if cursor is None:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                reconstruir_resumenes(cursor)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return
+    for tabla in TABLAS_RESUMEN:
+        cursor.execute(f"DELETE FROM {tabla}")
+    for tabla, columnas, consulta in RECONSTRUCCION:
+        cursor.execute(consulta)
+        _sumar(cursor, tabla, columnas, cursor.fetchall())
+
+if __name__ == "__main__":
+    reconstruir_resumenes()
+    print("Resúmenes diarios reconstruidos")
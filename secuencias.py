@@ -0,0 +1,131 @@
+# secuencias.py
+import threading
+from database import create_connection
+
+SECUENCIA_FACTURAS = "factura"
+DIGITOS_FACTURA = 8
+ARCHIVO_BLOQUE_FACTURAS = 'bloque_facturas.txt'
+
+def leer_tamano_bloque() -> int:
+    """
+    Lee cuántos números de factura reserva esta terminal de una sola vez.
+
+    El archivo 'bloque_facturas.txt' es opcional; si no existe o no contiene un
+    entero positivo se usa 1, es decir, cada número se toma dentro de la
+    transacción de la venta y la numeración queda sin huecos.
+
+    Returns:
+        int: Tamaño del bloque.
+    """
+    try:
+        with open(ARCHIVO_BLOQUE_FACTURAS, 'r') as archivo:
+            return max(1, int(archivo.read().strip()))
+    except (FileNotFoundError, ValueError):
+        return 1
+
+def _incrementar(cursor, nombre: str, cantidad: int) -> int:
+    """
+    Avanza la secuencia dentro de la transacción del cursor.
+
+    El UPDATE toma el bloqueo de escritura, por lo que el SELECT siguiente ve
+    el valor propio aunque otra terminal esté vendiendo al mismo tiempo.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor de la transacción en curso.
+        nombre (str): Nombre de la secuencia.
+        cantidad (int): Cuántos números se reservan.
+
+    Returns:
+        int: Último número reservado.
+    """
+    cursor.execute("UPDATE Secuencias SET valor = valor + ? WHERE nombre = ?", (cantidad, nombre))
+    if cursor.rowcount == 0:
+        cursor.execute("INSERT INTO Secuencias (nombre, valor) VALUES (?, ?)", (nombre, cantidad))
+    cursor.execute("SELECT valor FROM Secuencias WHERE nombre = ?", (nombre,))
+    return cursor.fetchone()[0]
+
+class GeneradorSecuencia:
+    """
+    Entrega números de una secuencia de la base de datos.
+
+    Con tamaño de bloque 1 cada número se toma en la transacción del llamador.
+    Con bloques mayores la terminal reserva un rango en una transacción corta
+    propia y lo consume en memoria, sin bloquear a las demás terminales en cada
+    venta; los números no usados de un bloque se pierden al cerrar la aplicación.
+    """
+    def __init__(self, nombre: str, tamano_bloque: int = 1):
+        self.nombre = nombre
+        self.tamano_bloque = tamano_bloque
+        self._siguiente = 0
+        self._limite = 0
+        self._lock = threading.Lock()
+
+    def siguiente(self, cursor) -> int:
+        """
+        Obtiene el siguiente número de la secuencia.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor de la transacción en curso (no se usa con bloques).
+
+        Returns:
+            int: Número asignado.
+        """
+        if self.tamano_bloque <= 1:
+            return _incrementar(cursor, self.nombre, 1)
+
+        with self._lock:
+            if self._limite == 0 or self._siguiente > self._limite:
+                with create_connection() as conn:
+                    self._limite = _incrementar(conn.cursor(), self.nombre, self.tamano_bloque)
+                self._siguiente = self._limite - self.tamano_bloque + 1
+            numero = self._siguiente
+            self._siguiente += 1
+            return numero
+
+    def descartar_bloque(self):
+        """
+        Olvida el bloque reservado en memoria (p. ej. después de reiniciar la secuencia).
+        """
+        with self._lock:
+            self._siguiente = 0
+            self._limite = 0
+
+_generador_facturas = GeneradorSecuencia(SECUENCIA_FACTURAS, leer_tamano_bloque())
+
+def siguiente_numero_factura(cursor) -> str:
+    """
+    Asigna el siguiente número de factura.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor de la transacción de la venta.
+
+    Returns:
+        str: Número de factura con ceros a la izquierda.
+    """
+    return str(_generador_facturas.siguiente(cursor)).zfill(DIGITOS_FACTURA)
+
+def numero_factura_previo():
+    """
+    Con numeración por bloques, asigna el número de factura antes de abrir la
+    transacción de la venta: reservar un bloque nuevo usa una conexión propia, que
+    esperaría al bloqueo de escritura (BEGIN IMMEDIATE) de la propia venta.
+
+    Returns:
+        str | None: Número de factura, o None si debe tomarse dentro de la transacción.
+    """
+    if _generador_facturas.tamano_bloque <= 1:
+        return None
+    return siguiente_numero_factura(None)
+
+def reiniciar_secuencia(nombre: str = SECUENCIA_FACTURAS, valor: int = 0):
+    """
+    Reinicia una secuencia; el próximo número entregado será 'valor + 1'.
+
+    Args:
+        nombre (str): Nombre de la secuencia.
+        valor (int): Último número considerado como usado.
+    """
+    with create_connection() as conn:
+        conn.execute("INSERT OR REPLACE INTO Secuencias (nombre, valor) VALUES (?, ?)", (nombre, valor))
+    if nombre == SECUENCIA_FACTURAS:
+        _generador_facturas.descartar_bloque()
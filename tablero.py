@@ -0,0 +1,217 @@
+# tablero.py
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from database import create_connection
+from artefacto_grafico import TIPO_BARRAS, TIPO_LINEAS
+from resumenes import (COLUMNA_RESUMEN, COLUMNAS_COMPRAS, COLUMNAS_DEVOLUCIONES, COLUMNAS_VENTAS, RESUMEN_CLIENTE,
+                       RESUMEN_PRODUCTO, RESUMEN_PROVEEDOR)
+
+# Módulo sin Flet: agregar_tablero se ejecuta en los procesos del gestor de trabajos.
+#
+# El tablero muestra los siete gráficos de la sección Gráficos para un mismo rango de
+# fechas. Los datos salen de los resúmenes diarios (resumenes.py), como en las consultas
+# de cada gráfico: cada resumen se lee una sola vez (una fila por día y entidad, con los
+# importes de todas sus fuentes) y las fuentes y sus agrupaciones se calculan en memoria
+# con NumPy.
+
+# Fuentes de datos: cada una es un importe de un resumen diario
+FUENTE_VENTAS_PRODUCTO = "ventas_producto"
+FUENTE_VENTAS_CLIENTE = "ventas_cliente"
+FUENTE_DEVOLUCIONES_PRODUCTO = "devoluciones_producto"
+FUENTE_DEVOLUCIONES_CLIENTE = "devoluciones_cliente"
+FUENTE_COMPRAS_PRODUCTO = "compras_producto"
+FUENTE_COMPRAS_PROVEEDOR = "compras_proveedor"
+
+LIMITE_TOP = 25  # Barras de los gráficos "Top 25"
+LOTE_NOMBRES = 500  # Ids por consulta al buscar nombres (límite de parámetros de SQLite)
+
+# Resumen y columnas (unidades, importe) de cada fuente
+RESUMEN_FUENTE = {
+    FUENTE_VENTAS_PRODUCTO: (RESUMEN_PRODUCTO, COLUMNAS_VENTAS),
+    FUENTE_VENTAS_CLIENTE: (RESUMEN_CLIENTE, COLUMNAS_VENTAS),
+    FUENTE_DEVOLUCIONES_PRODUCTO: (RESUMEN_PRODUCTO, COLUMNAS_DEVOLUCIONES),
+    FUENTE_DEVOLUCIONES_CLIENTE: (RESUMEN_CLIENTE, COLUMNAS_DEVOLUCIONES),
+    FUENTE_COMPRAS_PRODUCTO: (RESUMEN_PRODUCTO, COLUMNAS_COMPRAS),
+    FUENTE_COMPRAS_PROVEEDOR: (RESUMEN_PROVEEDOR, COLUMNAS_COMPRAS),
+}
+
+@dataclass(frozen=True)
+class GraficoTablero:
+    """
+    Un gráfico del tablero: de qué fuente sale, cómo se agrupa y cómo se dibuja.
+
+    Attributes:
+        titulo (str): Título del gráfico (el mismo que en su pantalla propia).
+        fuente (str): Fuente de datos (FUENTE_*).
+        columna (str): Columna de la fuente por la que se agrupa.
+        tabla_nombres (Optional[str]): Tabla con el nombre de cada id, o None si la columna
+            ya es la etiqueta (la fecha).
+        por_nombre (bool): Si es True se agrupa por nombre en lugar de por id, como hacen
+            las consultas de compras.
+        tipo (str): Tipo de gráfico (TIPO_BARRAS o TIPO_LINEAS).
+        etiqueta_x (str): Etiqueta del eje X.
+        etiqueta_y (str): Etiqueta del eje Y.
+        color (str): Color de las barras o de la línea.
+    """
+    titulo: str
+    fuente: str
+    columna: str
+    tabla_nombres: Optional[str]
+    por_nombre: bool
+    tipo: str
+    etiqueta_x: str
+    etiqueta_y: str
+    color: str
+
+GRAFICOS_TABLERO = (
+    GraficoTablero("Top 25 Productos con Más Ventas", FUENTE_VENTAS_PRODUCTO, "producto_id", "Productos", False,
+                   TIPO_BARRAS, "Productos", "Ventas Acumuladas ($)", "blue"),
+    GraficoTablero("Top 25 Clientes con Más Ventas", FUENTE_VENTAS_CLIENTE, "cliente_id", "Clientes", False,
+                   TIPO_BARRAS, "Clientes", "Ventas Acumuladas ($)", "blue"),
+    GraficoTablero("Ventas Diarias", FUENTE_VENTAS_CLIENTE, "fecha", None, False,
+                   TIPO_LINEAS, "Fecha", "Ventas Totales ($)", "blue"),
+    GraficoTablero("Top 25 Clientes con Más Devoluciones", FUENTE_DEVOLUCIONES_CLIENTE, "cliente_id", "Clientes",
+                   False, TIPO_BARRAS, "Nombres", "Total Devoluciones ($)", "red"),
+    GraficoTablero("Top 25 Productos con Más Devoluciones", FUENTE_DEVOLUCIONES_PRODUCTO, "producto_id", "Productos",
+                   False, TIPO_BARRAS, "Nombres", "Total Devoluciones ($)", "orange"),
+    GraficoTablero("Top 25 Proveedores con Más Compras", FUENTE_COMPRAS_PROVEEDOR, "proveedor_id", "Proveedores", True,
+                   TIPO_BARRAS, "Nombres", "Total Compras ($)", "green"),
+    GraficoTablero("Top 25 Productos con Más Compras", FUENTE_COMPRAS_PRODUCTO, "producto_id", "Productos", True,
+                   TIPO_BARRAS, "Nombres", "Total Compras ($)", "blue"),
+)
+
+# Columnas (unidades, importe) de todas las fuentes de cada resumen
+MEDIDAS_RESUMEN = {
+    tabla: tuple(columna for tabla_fuente, columnas in RESUMEN_FUENTE.values() if tabla_fuente == tabla
+                 for columna in columnas)
+    for tabla in dict.fromkeys(tabla for tabla, _ in RESUMEN_FUENTE.values())
+}
+# Columnas de cada resumen por las que agrupa algún gráfico (la fecha solo hace falta en el
+# cliente, para las ventas diarias: leerla en los demás resúmenes sería crear un texto por fila)
+AGRUPACIONES_RESUMEN = {
+    tabla: tuple(dict.fromkeys(grafico.columna for grafico in GRAFICOS_TABLERO
+                               if RESUMEN_FUENTE[grafico.fuente][0] == tabla))
+    for tabla in MEDIDAS_RESUMEN
+}
+# Consulta de cada resumen: las columnas de AGRUPACIONES_RESUMEN y de MEDIDAS_RESUMEN. Cada
+# fuente se queda después con los días en que tuvo movimientos (unidades > 0). Los
+# movimientos sin entidad tienen el id SIN_ENTIDAD, que nunca tiene nombre y queda fuera
+# de los gráficos (igual que con el JOIN de las consultas de cada gráfico).
+CONSULTAS_RESUMEN = {
+    tabla: f"""
+        SELECT {", ".join(AGRUPACIONES_RESUMEN[tabla] + medidas)}
+        FROM {tabla}
+        WHERE fecha BETWEEN ? AND ?
+    """
+    for tabla, medidas in MEDIDAS_RESUMEN.items()
+}
+
+def _leer_resumen(conn, tabla: str, desde: str, hasta: str) -> Dict[str, np.ndarray]:
+    """
+    Lee un resumen para el rango de fechas, con las medidas de todas sus fuentes.
+
+    Returns:
+        Dict[str, np.ndarray]: Un arreglo por columna de la consulta.
+    """
+    columnas = AGRUPACIONES_RESUMEN[tabla] + MEDIDAS_RESUMEN[tabla]
+    filas = conn.execute(CONSULTAS_RESUMEN[tabla], (desde, hasta)).fetchall()
+    valores = list(zip(*filas)) if filas else [()] * len(columnas)
+    tipos = {"fecha": str, COLUMNA_RESUMEN[tabla]: np.int64}
+    return {columna: np.asarray(valores[i], dtype=tipos.get(columna, np.float64))
+            for i, columna in enumerate(columnas)}
+
+def _fuente(resumen: Dict[str, np.ndarray], fuente: str) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    Separa de un resumen ya leído las filas y el importe de una fuente.
+
+    Returns:
+        Tuple[Dict[str, np.ndarray], np.ndarray]: Un arreglo por columna de agrupación y los importes.
+    """
+    tabla, (unidades, importe) = RESUMEN_FUENTE[fuente]
+    con_movimientos = resumen[unidades] > 0
+    datos = {columna: resumen[columna][con_movimientos] for columna in AGRUPACIONES_RESUMEN[tabla]}
+    return datos, resumen[importe][con_movimientos]
+
+def _agrupar(claves: np.ndarray, importes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Suma los importes por clave.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Claves distintas (ordenadas) y el total de cada una.
+    """
+    unicas, posiciones = np.unique(claves, return_inverse=True)
+    return unicas, np.bincount(posiciones.ravel(), weights=importes, minlength=len(unicas))
+
+def _nombres(conn, tabla: str, ids: np.ndarray) -> Dict[int, str]:
+    """
+    Busca el nombre de cada id en una tabla (Productos, Clientes o Proveedores).
+    """
+    nombres: Dict[int, str] = {}
+    ids = [int(id_) for id_ in ids if id_ >= 0]
+    for inicio in range(0, len(ids), LOTE_NOMBRES):
+        lote = ids[inicio:inicio + LOTE_NOMBRES]
+        marcadores = ", ".join("?" * len(lote))
+        nombres.update(conn.execute(f"SELECT id, nombre FROM {tabla} WHERE id IN ({marcadores})", lote))
+    return nombres
+
+def _mayores(etiquetas: np.ndarray, totales: np.ndarray) -> Tuple[List[str], List[float]]:
+    """
+    Deja los LIMITE_TOP totales más altos, de mayor a menor.
+    """
+    orden = np.argsort(-totales, kind="stable")[:LIMITE_TOP]
+    return [str(etiqueta) for etiqueta in etiquetas[orden]], totales[orden].tolist()
+
+def agregar_tablero(desde: str, hasta: str,
+                    titulos: Optional[Sequence[str]] = None) -> Dict[str, Tuple[List[str], List[float]]]:
+    """
+    Calcula los datos de los gráficos del tablero para un rango de fechas.
+
+    Cada resumen que hace falta se lee una sola vez con las medidas de todas sus fuentes;
+    después cada fuente se separa y se agrupa en memoria por cada columna que piden los
+    gráficos, y se buscan los nombres de una sola vez por tabla.
+
+    Args:
+        desde (str): Fecha de inicio del rango.
+        hasta (str): Fecha de fin del rango.
+        titulos (Optional[Sequence[str]]): Gráficos a calcular. Por defecto es None (todos).
+
+    Returns:
+        Dict[str, Tuple[List[str], List[float]]]: Etiquetas y valores de cada gráfico, por título.
+    """
+    graficos = [grafico for grafico in GRAFICOS_TABLERO if titulos is None or grafico.titulo in titulos]
+    series: Dict[str, Tuple[List[str], List[float]]] = {}
+    with create_connection() as conn:
+        fuentes_usadas = dict.fromkeys(grafico.fuente for grafico in graficos)
+        resumenes = {tabla: _leer_resumen(conn, tabla, desde, hasta)
+                     for tabla in dict.fromkeys(RESUMEN_FUENTE[fuente][0] for fuente in fuentes_usadas)}
+        fuentes = {fuente: _fuente(resumenes[RESUMEN_FUENTE[fuente][0]], fuente) for fuente in fuentes_usadas}
+
+        # Agrupaciones por columna (una sola vez aunque la usen dos gráficos)
+        grupos: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+        for grafico in graficos:
+            clave = (grafico.fuente, grafico.columna)
+            if clave not in grupos:
+                datos, importes = fuentes[grafico.fuente]
+                grupos[clave] = _agrupar(datos[grafico.columna], importes)
+
+        ids_por_tabla: Dict[str, List[np.ndarray]] = {}
+        for grafico in graficos:
+            if grafico.tabla_nombres:
+                ids_por_tabla.setdefault(grafico.tabla_nombres, []).append(grupos[grafico.fuente, grafico.columna][0])
+        nombres = {tabla: _nombres(conn, tabla, np.unique(np.concatenate(ids)))
+                   for tabla, ids in ids_por_tabla.items()}
+
+    for grafico in graficos:
+        claves, totales = grupos[grafico.fuente, grafico.columna]
+        if grafico.tabla_nombres is None:
+            series[grafico.titulo] = ([str(clave) for clave in claves], totales.tolist())
+            continue
+        nombres_tabla = nombres[grafico.tabla_nombres]
+        con_nombre = np.fromiter((int(clave) in nombres_tabla for clave in claves), dtype=bool, count=len(claves))
+        etiquetas = np.asarray([nombres_tabla[int(clave)] for clave in claves[con_nombre]], dtype=object)
+        totales = totales[con_nombre]
+        if grafico.por_nombre and len(etiquetas):
+            etiquetas, totales = _agrupar(etiquetas.astype(str), totales)
+        series[grafico.titulo] = _mayores(etiquetas, totales)
+    return series
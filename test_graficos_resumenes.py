@@ -0,0 +1,179 @@
+# test_graficos_resumenes.py
+import importlib
+import os
+import random
+from datetime import date, timedelta
+import pytest
+
+# Los gráficos leen los resúmenes diarios (resumenes.py): sus consultas deben dar lo
+# mismo que agregar las ventas, compras y devoluciones una por una.
+
+pytest.importorskip("flet")  # Las consultas están en los módulos de las pantallas
+
+from database import close_all_connections, create_connection, create_tables
+from migraciones import aplicar_migraciones
+from cache_graficos import clave_grafico, tablas_consulta
+from models import Factura
+from resumenes import TABLAS_RESUMEN, reconstruir_resumenes
+from tablero import agregar_tablero
+
+DESDE = "2024-01-01"
+HASTA = "2024-03-31"
+
+VENTAS_PRODUCTOS = """
+    SELECT p.nombre, SUM(l.cantidad * l.precio_unitario) AS total
+    FROM Facturas f
+    JOIN FacturaLineas l ON l.factura_id = f.factura_id
+    JOIN Productos p ON p.id = l.producto_id
+    WHERE f.fecha BETWEEN ? AND ?
+    GROUP BY p.id
+    ORDER BY total DESC
+    LIMIT 25
+"""
+VENTAS_CLIENTES = """
+    SELECT c.nombre, SUM(l.cantidad * l.precio_unitario) AS total
+    FROM Facturas f
+    JOIN FacturaLineas l ON l.factura_id = f.factura_id
+    JOIN Clientes c ON c.id = f.cliente_id
+    WHERE f.fecha BETWEEN ? AND ?
+    GROUP BY c.id
+    ORDER BY total DESC
+    LIMIT 25
+"""
+VENTAS_DIARIAS = """
+    SELECT f.fecha, SUM(l.cantidad * l.precio_unitario)
+    FROM Facturas f
+    JOIN FacturaLineas l ON l.factura_id = f.factura_id
+    WHERE f.fecha BETWEEN ? AND ?
+    GROUP BY f.fecha
+    ORDER BY f.fecha
+"""
+DEVOLUCIONES = """
+    SELECT {tabla}.nombre, SUM(d.cantidad * l.precio_unitario) AS total
+    FROM Devoluciones d
+    JOIN {tabla} ON {tabla}.id = d.{columna}
+    JOIN FacturaLineas l ON l.id = (
+        SELECT id FROM FacturaLineas WHERE factura_id = d.factura_id AND producto_id = d.producto_id LIMIT 1
+    )
+    WHERE d.fecha BETWEEN ? AND ?
+    GROUP BY {tabla}.id
+    ORDER BY total DESC
+    LIMIT 25
+"""
+COMPRAS = """
+    SELECT {tabla}.nombre, SUM(c.cantidad * c.precio_costo) AS total
+    FROM Compras c
+    JOIN {tabla} ON {tabla}.id = c.{columna}
+    WHERE c.fecha BETWEEN ? AND ?
+    GROUP BY {tabla}.nombre
+    ORDER BY total DESC
+    LIMIT 25
+"""
+
+# (módulo, consulta del gráfico, agregación de los movimientos, título en el tablero)
+GRAFICOS = [
+    ("graficos_ventas", "QUERY_VENTAS_ACUMULADAS", VENTAS_PRODUCTOS, "Top 25 Productos con Más Ventas"),
+    ("graficos_clientes", "QUERY_VENTAS_ACUMULADAS", VENTAS_CLIENTES, "Top 25 Clientes con Más Ventas"),
+    ("graf_ventas_diarias", "QUERY_VENTAS_DIARIAS", VENTAS_DIARIAS, "Ventas Diarias"),
+    ("graf_dev_clientes", "QUERY_DEVOLUCIONES_CLIENTES", DEVOLUCIONES.format(tabla="Clientes", columna="cliente_id"),
+     "Top 25 Clientes con Más Devoluciones"),
+    ("graf_dev_productos", "QUERY_DEVOLUCIONES_PRODUCTOS",
+     DEVOLUCIONES.format(tabla="Productos", columna="producto_id"), "Top 25 Productos con Más Devoluciones"),
+    ("graf_comp_producto", "QUERY_COMPRAS_ACUMULADAS", COMPRAS.format(tabla="Productos", columna="producto_id"),
+     "Top 25 Productos con Más Compras"),
+    ("graf_comp_provee", "QUERY_COMPRAS_ACUMULADAS", COMPRAS.format(tabla="Proveedores", columna="proveedor_id"),
+     "Top 25 Proveedores con Más Compras"),
+]
+
+@pytest.fixture(scope="module")
+def base_sintetica(tmp_path_factory):
+    """
+    Base de datos con unos meses de movimientos inventados (la ruta de la base es relativa al directorio actual).
+    """
+    directorio_anterior = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("graficos"))
+    create_tables()
+    aplicar_migraciones()
+    azar = random.Random(7)
+    with create_connection() as conn:
+        conn.executemany("INSERT INTO Productos (nombre, descripcion, precio, stock) VALUES (?, '', ?, 100000)",
+                         [(f"Producto {n}", round(azar.uniform(1, 100), 2)) for n in range(1, 41)])
+        conn.executemany("INSERT INTO Clientes (nombre, telefono, email) VALUES (?, '', '')",
+                         [(f"Cliente {n}",) for n in range(1, 31)])
+        conn.executemany("INSERT INTO Proveedores (nombre, telefono, email) VALUES (?, '', '')",
+                         [(f"Proveedor {n}",) for n in range(1, 7)])
+        precios = dict(conn.execute("SELECT id, precio FROM Productos").fetchall())
+
+    compras, devoluciones = [], []
+    for dia in range(91):
+        fecha = (date(2024, 1, 1) + timedelta(days=dia)).isoformat()
+        for _ in range(4):
+            carrito = [(producto_id, "", azar.randint(1, 5), precios[producto_id])
+                       for producto_id in azar.sample(sorted(precios), azar.randint(1, 4))]
+            factura = Factura.registrar_venta(azar.randint(1, 30), fecha, carrito, 0, 0.16)
+            if azar.random() < 0.2:
+                devoluciones.append((factura.factura_id, carrito[0][0], 1, fecha, factura.cliente_id))
+        compras.append((azar.randint(1, 6), azar.choice(sorted(precios)), azar.randint(5, 20), fecha,
+                        round(azar.uniform(1, 80), 2), f"R-{dia}"))
+
+    # Las compras y devoluciones se cargan directamente; los resúmenes se recalculan después
+    with create_connection() as conn:
+        conn.executemany("INSERT INTO Compras (proveedor_id, producto_id, cantidad, fecha, precio_costo, "
+                         "nro_referencia) VALUES (?, ?, ?, ?, ?, ?)", compras)
+        conn.executemany("INSERT INTO Devoluciones (factura_id, producto_id, cantidad, fecha, cliente_id) "
+                         "VALUES (?, ?, ?, ?, ?)", devoluciones)
+    reconstruir_resumenes()
+    yield
+    close_all_connections()
+    os.chdir(directorio_anterior)
+
+def _consulta_grafico(modulo: str, nombre: str) -> str:
+    return getattr(importlib.import_module(modulo), nombre)
+
+@pytest.mark.parametrize("modulo, nombre, agregacion, _titulo", GRAFICOS)
+def test_consulta_lee_resumenes_y_coincide(base_sintetica, modulo, nombre, agregacion, _titulo):
+    query = _consulta_grafico(modulo, nombre)
+    tablas = tablas_consulta(query)
+    assert any(tabla in TABLAS_RESUMEN for tabla in tablas)
+    assert not {"Facturas", "FacturaLineas", "Compras", "Devoluciones"} & set(tablas)
+
+    with create_connection() as conn:
+        grafico = conn.execute(query, (DESDE, HASTA)).fetchall()
+        esperado = conn.execute(agregacion, (DESDE, HASTA)).fetchall()
+    assert esperado
+    assert [etiqueta for etiqueta, _ in grafico] == [etiqueta for etiqueta, _ in esperado]
+    assert [total for _, total in grafico] == pytest.approx([total for _, total in esperado])
+
+@pytest.mark.parametrize("modulo, nombre, _agregacion, titulo", GRAFICOS)
+def test_tablero_coincide_con_cada_grafico(base_sintetica, modulo, nombre, _agregacion, titulo):
+    with create_connection() as conn:
+        grafico = conn.execute(_consulta_grafico(modulo, nombre), (DESDE, HASTA)).fetchall()
+    etiquetas, valores = agregar_tablero(DESDE, HASTA, [titulo])[titulo]
+    assert etiquetas == [etiqueta for etiqueta, _ in grafico]
+    assert valores == pytest.approx([total for _, total in grafico])
+
+def test_venta_cambia_clave_del_grafico(base_sintetica):
+    query = _consulta_grafico("graficos_ventas", "QUERY_VENTAS_ACUMULADAS")
+    antes = clave_grafico("ventas", query, DESDE, HASTA)
+    with create_connection() as conn:
+        producto_id, nombre, precio = conn.execute("SELECT id, nombre, precio FROM Productos LIMIT 1").fetchone()
+        cliente_id = conn.execute("SELECT id FROM Clientes LIMIT 1").fetchone()[0]
+    Factura.registrar_venta(cliente_id, HASTA, [(producto_id, nombre, 1, precio)], 0, 0)
+    assert clave_grafico("ventas", query, DESDE, HASTA) != antes
+
+def test_tablero_lee_cada_resumen_una_vez(base_sintetica, monkeypatch):
+    import tablero
+
+    for consulta in tablero.CONSULTAS_RESUMEN.values():
+        assert set(tablas_consulta(consulta)) <= set(TABLAS_RESUMEN)
+
+    leidos = []
+    leer_resumen = tablero._leer_resumen
+
+    def leer_contando(conn, tabla, desde, hasta):
+        leidos.append(tabla)
+        return leer_resumen(conn, tabla, desde, hasta)
+
+    monkeypatch.setattr(tablero, "_leer_resumen", leer_contando)
+    agregar_tablero(DESDE, HASTA)
+    assert sorted(leidos) == sorted(TABLAS_RESUMEN)
@@ -0,0 +1,148 @@
+# test_migraciones_transacciones.py
+import pytest
+
+# Una base con el esquema original (database.create_tables) y algunos movimientos se
+# migra hasta la última versión: las migraciones deben copiar lo que ya había. Después,
+# una venta, compra o devolución que falla no debe dejar rastros (stock, facturas,
+# secuencia de facturas ni resúmenes diarios).
+
+from busqueda import buscar_ids
+from database import close_all_connections, create_connection, create_tables
+from migraciones import MIGRACIONES, aplicar_migraciones, version_esquema
+from models import Compra, Devolucion, Factura
+from resumenes import SIN_ENTIDAD, TABLAS_RESUMEN, reconstruir_resumenes
+
+PRODUCTOS = [  # (nombre, descripcion, precio, stock)
+    ("Tornillo Fino", "Caja x100", 10.0, 50),
+    ("Tuerca Hexagonal", "", 20.0, 5),
+    ("Arandela", "", 2.5, 100),
+]
+CLIENTES = [("Mariana López", "555-1000", "mariana@ejemplo.com"), ("Pedro Díaz", "555-2000", "")]
+PROVEEDORES = [("Ferretería Central", "555-3000", ""), ("Metales del Sur", "", "")]
+VENTAS = [  # (cliente_id, producto_id, cantidad, fecha, factura_id)
+    (1, 1, 2, "2024-01-10", "00000001"),
+    (1, 2, 1, "2024-01-10", "00000001"),
+    (2, 1, 3, "2024-01-11", "00000002"),
+    (None, 3, 4, "2024-01-12", "00000003"),
+]
+COMPRAS = [  # (proveedor_id, producto_id, cantidad, fecha, precio_costo, nro_referencia)
+    (1, 1, 10, "2024-01-01", 4.0, "R-1"),
+    (1, 1, 5, "2024-01-05", 4.5, "R-2"),
+    (2, 2, 8, "2024-01-03", 7.0, "R-3"),
+]
+DEVOLUCIONES = [("00000002", 1, 1, "2024-01-15", 2)]  # (factura_id, producto_id, cantidad, fecha, cliente_id)
+
+# Tablas que una transacción fallida no debe modificar
+TABLAS_TRANSACCION = ("Productos", "Facturas", "FacturaLineas", "Compras", "Devoluciones", "Secuencias")
+
+@pytest.fixture
+def base_migrada(tmp_path, monkeypatch):
+    """
+    Base con el esquema original y sus movimientos, migrada hasta la última versión
+    (la ruta de la base es relativa al directorio actual).
+    """
+    monkeypatch.chdir(tmp_path)
+    create_tables()
+    with create_connection() as conn:
+        conn.executemany("INSERT INTO Productos (nombre, descripcion, precio, stock) VALUES (?, ?, ?, ?)", PRODUCTOS)
+        conn.executemany("INSERT INTO Clientes (nombre, telefono, email) VALUES (?, ?, ?)", CLIENTES)
+        conn.executemany("INSERT INTO Proveedores (nombre, telefono, email) VALUES (?, ?, ?)", PROVEEDORES)
+        conn.executemany("INSERT INTO Ventas (cliente_id, producto_id, cantidad, fecha, factura_id) "
+                         "VALUES (?, ?, ?, ?, ?)", VENTAS)
+        conn.executemany("INSERT INTO Compras (proveedor_id, producto_id, cantidad, fecha, precio_costo, "
+                         "nro_referencia) VALUES (?, ?, ?, ?, ?, ?)", COMPRAS)
+        conn.executemany("INSERT INTO Devoluciones (factura_id, producto_id, cantidad, fecha, cliente_id) "
+                         "VALUES (?, ?, ?, ?, ?)", DEVOLUCIONES)
+        conn.commit()
+    aplicar_migraciones()
+    yield
+    close_all_connections()
+
+def _consultar(query: str, params=()) -> list:
+    with create_connection() as conn:
+        return conn.execute(query, params).fetchall()
+
+def _estado() -> dict:
+    """
+    Contenido de las tablas de transacciones y de los resúmenes diarios.
+    """
+    return {tabla: _consultar(f"SELECT * FROM {tabla} ORDER BY 1, 2") for tabla in TABLAS_TRANSACCION + TABLAS_RESUMEN}
+
+def test_migra_hasta_la_ultima_version(base_migrada):
+    with create_connection() as conn:
+        assert version_esquema(conn) == len(MIGRACIONES)
+    assert aplicar_migraciones() == len(MIGRACIONES)  # Sin migraciones pendientes no cambia nada
+
+def test_ventas_se_copian_en_facturas(base_migrada):
+    assert _consultar("SELECT factura_id, cliente_id, fecha FROM Facturas ORDER BY factura_id") == [
+        ("00000001", 1, "2024-01-10"), ("00000002", 2, "2024-01-11"), ("00000003", None, "2024-01-12"),
+    ]
+    # Las líneas toman el precio actual del producto; la vista Ventas conserva las filas originales
+    assert _consultar("SELECT factura_id, producto_id, cantidad, precio_unitario FROM FacturaLineas ORDER BY id") == [
+        ("00000001", 1, 2, 10.0), ("00000001", 2, 1, 20.0), ("00000002", 1, 3, 10.0), ("00000003", 3, 4, 2.5),
+    ]
+    assert _consultar("SELECT cliente_id, producto_id, cantidad, fecha, factura_id FROM Ventas ORDER BY id") == VENTAS
+
+def test_secuencia_sigue_la_numeracion(base_migrada):
+    assert _consultar("SELECT valor FROM Secuencias WHERE nombre = 'factura'") == [(3,)]
+    factura = Factura.registrar_venta(1, "2024-02-01", [(3, "Arandela", 1, 2.5)])
+    assert factura.factura_id == "00000004"
+
+def test_ultimo_costo_de_las_compras(base_migrada):
+    assert _consultar("SELECT producto_id, precio_costo FROM UltimoCosto ORDER BY producto_id") == [(1, 4.5), (2, 7.0)]
+
+def test_resumenes_incluyen_los_movimientos_existentes(base_migrada):
+    assert _consultar("SELECT fecha, producto_id, unidades_vendidas, ventas, unidades_devueltas, devoluciones, "
+                      "unidades_compradas, compras FROM ResumenDiarioProducto ORDER BY fecha, producto_id") == [
+        ("2024-01-01", 1, 0, 0, 0, 0, 10, 40.0),
+        ("2024-01-03", 2, 0, 0, 0, 0, 8, 56.0),
+        ("2024-01-05", 1, 0, 0, 0, 0, 5, 22.5),
+        ("2024-01-10", 1, 2, 20.0, 0, 0, 0, 0),
+        ("2024-01-10", 2, 1, 20.0, 0, 0, 0, 0),
+        ("2024-01-11", 1, 3, 30.0, 0, 0, 0, 0),
+        ("2024-01-12", 3, 4, 10.0, 0, 0, 0, 0),
+        ("2024-01-15", 1, 0, 0, 1, 10.0, 0, 0),
+    ]
+    # La venta sin cliente queda en el resumen con SIN_ENTIDAD (migración 10)
+    assert _consultar("SELECT fecha, cliente_id, unidades_vendidas, ventas, unidades_devueltas, devoluciones "
+                      "FROM ResumenDiarioCliente ORDER BY fecha, cliente_id") == [
+        ("2024-01-10", 1, 3, 40.0, 0, 0),
+        ("2024-01-11", 2, 3, 30.0, 0, 0),
+        ("2024-01-12", SIN_ENTIDAD, 4, 10.0, 0, 0),
+        ("2024-01-15", 2, 0, 0, 1, 10.0),
+    ]
+    assert _consultar("SELECT fecha, proveedor_id, unidades_compradas, compras FROM ResumenDiarioProveedor "
+                      "ORDER BY fecha, proveedor_id") == [
+        ("2024-01-01", 1, 10, 40.0), ("2024-01-03", 2, 8, 56.0), ("2024-01-05", 1, 5, 22.5),
+    ]
+
+def test_busqueda_indexa_los_registros_existentes(base_migrada):
+    assert buscar_ids("Productos", "torn") == [1]
+    assert buscar_ids("Clientes", "mariana@") == [1]
+    assert buscar_ids("Proveedores", "metal") == [2]
+
+def test_venta_sin_stock_no_deja_rastros(base_migrada):
+    antes = _estado()
+    carrito = [(1, "Tornillo Fino", 1, 10.0), (2, "Tuerca Hexagonal", 6, 20.0)]  # Solo hay 5 tuercas
+    with pytest.raises(ValueError):
+        Factura.registrar_venta(1, "2024-02-01", carrito)
+    assert _estado() == antes
+
+def test_compra_y_devolucion_fallidas_no_dejan_rastros(base_migrada):
+    antes = _estado()
+    with pytest.raises(ValueError):
+        Compra.registrar_compra(1, "2024-02-01", [(1, "Tornillo Fino", 5, 4.0), (99, "No existe", 1, 1.0)], "R-4")
+    with pytest.raises(ValueError):
+        Devolucion.registrar_devolucion("00000001", "2024-02-01", [(1, 1), (99, 1)])
+    assert _estado() == antes
+
+def test_transacciones_mantienen_resumenes_al_dia(base_migrada):
+    Factura.registrar_venta(2, "2024-02-01", [(1, "Tornillo Fino", 2, 10.0), (2, "Tuerca Hexagonal", 5, 20.0)])
+    Compra.registrar_compra(2, "2024-02-02", [(2, "Tuerca Hexagonal", 10, 7.5)], "R-4")
+    Devolucion.registrar_devolucion("00000001", "2024-02-03", [(2, 1)])
+    assert _consultar("SELECT stock FROM Productos ORDER BY id") == [(48,), (11,), (100,)]
+
+    # Lo acumulado por cada transacción coincide con reconstruir los resúmenes desde cero
+    acumulado = _estado()
+    reconstruir_resumenes()
+    assert _estado() == acumulado
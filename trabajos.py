@@ -0,0 +1,333 @@
+# trabajos.py
+import itertools
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as TiempoAgotado
+from typing import Any, Callable, Dict, Optional, Tuple
+import traza_sql
+
+HILOS_TRABAJO = 4  # Trabajos que se atienden a la vez (los de proceso solo esperan en su hilo)
+PROCESOS_TRABAJO = 2  # Procesos para los trabajos de matplotlib y reportlab
+INTERVALO_ESPERA = 0.1  # Segundos entre revisiones de avance y cancelación de un trabajo en proceso
+
+# Estados de un trabajo
+PENDIENTE = "pendiente"
+EN_CURSO = "en curso"
+TERMINADO = "terminado"
+FALLIDO = "fallido"
+CANCELADO = "cancelado"
+
+class TrabajoCancelado(Exception):
+    """
+    Se lanza dentro de un trabajo, al informar su avance, cuando se pidió cancelarlo.
+    """
+
+class Avance:
+    """
+    Función de progreso que recibe un trabajo en el argumento 'progreso'.
+
+    Cada llamada informa las unidades hechas y el total (el mismo formato que
+    'exportacion.Progreso') y es también el punto donde se atiende la cancelación:
+    si se pidió cancelar el trabajo, lanza TrabajoCancelado. Se puede enviar a otro
+    proceso cuando el destino y el evento son objetos de un multiprocessing.Manager.
+    """
+    def __init__(self, destino: Callable[[Tuple[int, Optional[int]]], None], cancelado):
+        """
+        Constructor de la clase Avance.
+
+        Args:
+            destino (Callable): Recibe cada avance como (hechos, total).
+            cancelado: Evento que indica que se pidió cancelar el trabajo.
+        """
+        self.destino = destino
+        self.cancelado = cancelado
+
+    def __call__(self, hechos: int, total: Optional[int] = None):
+        if self.cancelado.is_set():
+            raise TrabajoCancelado()
+        self.destino((hechos, total))
+
+class Trabajo:
+    """
+    Trabajo enviado al gestor: su estado, su avance y su resultado.
+
+    Los avisos (al_progresar, al_terminar, al_fallar y al_cancelar) se llaman de a uno
+    por vez desde un hilo del gestor, nunca desde el que envió el trabajo; pueden
+    modificar controles y llamar a 'page.update()'.
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, descripcion: str, al_progresar: Optional[Callable[[int, Optional[int]], None]] = None,
+                 al_terminar: Optional[Callable[[Any], None]] = None,
+                 al_fallar: Optional[Callable[[Exception], None]] = None,
+                 al_cancelar: Optional[Callable[[], None]] = None):
+        """
+        Constructor de la clase Trabajo.
+
+        Args:
+            descripcion (str): Descripción para mostrar.
+            al_progresar (Optional[Callable]): Recibe las unidades hechas y el total.
+            al_terminar (Optional[Callable]): Recibe el resultado del trabajo.
+            al_fallar (Optional[Callable]): Recibe la excepción que lanzó el trabajo.
+            al_cancelar (Optional[Callable]): Se llama cuando el trabajo termina cancelado.
+        """
+        self.id = next(Trabajo._ids)
+        self.descripcion = descripcion
+        self.estado = PENDIENTE
+        self.hechos = 0
+        self.total: Optional[int] = None
+        self.resultado: Any = None
+        self.error: Optional[Exception] = None
+        self.al_progresar = al_progresar
+        self.al_terminar = al_terminar
+        self.al_fallar = al_fallar
+        self.al_cancelar = al_cancelar
+        self._cancelado = threading.Event()
+        self._finalizado = threading.Event()
+        self._futuro = None
+
+    @property
+    def cancelado(self) -> bool:
+        """
+        Indica si se pidió cancelar el trabajo.
+        """
+        return self._cancelado.is_set()
+
+    @property
+    def finalizado(self) -> bool:
+        """
+        Indica si el trabajo terminó, falló o fue cancelado.
+        """
+        return self._finalizado.is_set()
+
+    def cancelar(self):
+        """
+        Pide cancelar el trabajo.
+
+        Un trabajo pendiente no llega a ejecutarse. Uno en curso se detiene la próxima
+        vez que informa su avance; si no lo informa (o corre en otro proceso sin avance),
+        se da por cancelado enseguida y su resultado se descarta al llegar.
+        """
+        self._cancelado.set()
+
+    def esperar(self, tiempo: Optional[float] = None) -> bool:
+        """
+        Espera a que el trabajo finalice (pensado para scripts y pruebas, no para la interfaz).
+
+        Args:
+            tiempo (Optional[float]): Segundos máximos de espera. Por defecto es None (sin límite).
+
+        Returns:
+            bool: True si el trabajo finalizó.
+        """
+        return self._finalizado.wait(tiempo)
+
+def _ejecutar_con_traza(funcion: Callable[..., Any], *args, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Ejecuta un trabajo en un proceso del grupo con la traza SQL activa.
+
+    Returns:
+        Tuple[Any, Dict[str, Any]]: El resultado de la función y lo que registró la traza en
+            este proceso (ver traza_sql.extraer_registro), para sumarlo en el proceso principal.
+    """
+    traza_sql.activar_traza(escribir_log=False)
+    return funcion(*args, **kwargs), traza_sql.extraer_registro()
+
+class GestorTrabajos:
+    """
+    Cola de trabajos en segundo plano con un grupo de hilos y otro de procesos.
+
+    Cada trabajo ocupa un hilo del gestor mientras dura. Los que corren en hilos
+    (exportaciones a CSV, consultas) se ejecutan ahí mismo; los que usan matplotlib o
+    reportlab se envían al grupo de procesos, así no compiten por el GIL con la
+    interfaz y el estado global de pyplot no se comparte entre hilos, y el hilo solo
+    espera el resultado mientras reenvía el avance y la cancelación. Los procesos se
+    crean con 'spawn' (el método de Windows), de modo que no heredan las conexiones
+    del pool de la base de datos ni el estado de Flet; como los trabajos se envían por
+    pickle, la función debe estar definida a nivel de módulo en un módulo sin Flet.
+
+    Los grupos se crean con el primer trabajo que los necesita.
+    """
+    def __init__(self, hilos: int = HILOS_TRABAJO, procesos: int = PROCESOS_TRABAJO):
+        """
+        Constructor de la clase GestorTrabajos.
+
+        Args:
+            hilos (int): Trabajos que se atienden a la vez. Por defecto es HILOS_TRABAJO.
+            procesos (int): Procesos para los trabajos en proceso. Por defecto es PROCESOS_TRABAJO.
+        """
+        self.hilos = hilos
+        self.procesos = procesos
+        self._ejecutor_hilos: Optional[ThreadPoolExecutor] = None
+        self._ejecutor_procesos: Optional[ProcessPoolExecutor] = None
+        self._ejecutor_avisos: Optional[ThreadPoolExecutor] = None
+        self._administrador = None
+        self._lock = threading.Lock()
+
+    def _obtener_hilos(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._ejecutor_hilos is None:
+                self._ejecutor_hilos = ThreadPoolExecutor(self.hilos, thread_name_prefix="trabajo")
+                # Un solo hilo para los avisos: las actualizaciones de la página no se pisan
+                self._ejecutor_avisos = ThreadPoolExecutor(1, thread_name_prefix="avisos")
+            return self._ejecutor_hilos
+
+    def _obtener_procesos(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._ejecutor_procesos is None:
+                self._ejecutor_procesos = ProcessPoolExecutor(self.procesos,
+                                                              mp_context=multiprocessing.get_context("spawn"))
+            return self._ejecutor_procesos
+
+    def _obtener_administrador(self):
+        with self._lock:
+            if self._administrador is None:
+                self._administrador = multiprocessing.get_context("spawn").Manager()
+            return self._administrador
+
+    def enviar(self, funcion: Callable[..., Any], *args, descripcion: str = "", en_proceso: bool = False,
+               con_progreso: bool = False, al_progresar: Optional[Callable[[int, Optional[int]], None]] = None,
+               al_terminar: Optional[Callable[[Any], None]] = None,
+               al_fallar: Optional[Callable[[Exception], None]] = None,
+               al_cancelar: Optional[Callable[[], None]] = None, **kwargs) -> Trabajo:
+        """
+        Encola un trabajo y vuelve enseguida.
+
+        Args:
+            funcion (Callable): Función a ejecutar con 'args' y 'kwargs'.
+            descripcion (str): Descripción para mostrar. Por defecto es "".
+            en_proceso (bool): Si es True la función corre en el grupo de procesos. Por defecto es False.
+            con_progreso (bool): Si es True la función recibe un Avance en el argumento 'progreso'.
+                Por defecto es False.
+            al_progresar (Optional[Callable]): Recibe las unidades hechas y el total.
+            al_terminar (Optional[Callable]): Recibe el resultado de la función.
+            al_fallar (Optional[Callable]): Recibe la excepción que lanzó la función.
+            al_cancelar (Optional[Callable]): Se llama si el trabajo termina cancelado.
+
+        Returns:
+            Trabajo: El trabajo encolado, para consultar su estado o cancelarlo.
+        """
+        trabajo = Trabajo(descripcion, al_progresar, al_terminar, al_fallar, al_cancelar)
+        ejecutar = self._ejecutar_en_proceso if en_proceso else self._ejecutar_en_hilo
+        trabajo._futuro = self._obtener_hilos().submit(self._ejecutar, trabajo, ejecutar, funcion,
+                                                        args, kwargs, con_progreso)
+        return trabajo
+
+    def _avisar(self, aviso: Optional[Callable], *args):
+        """
+        Encola un aviso para que lo llame el hilo de avisos.
+        """
+        if aviso is not None:
+            self._ejecutor_avisos.submit(self._llamar_aviso, aviso, *args)
+
+    @staticmethod
+    def _llamar_aviso(aviso: Callable, *args):
+        try:
+            aviso(*args)
+        except Exception as e:
+            print(f"Error en el aviso de un trabajo: {str(e)}")
+
+    def _progresar(self, trabajo: Trabajo, avance: Tuple[int, Optional[int]]):
+        trabajo.hechos, trabajo.total = avance
+        self._avisar(trabajo.al_progresar, *avance)
+
+    def _ejecutar(self, trabajo: Trabajo, ejecutar: Callable, funcion: Callable, args: tuple, kwargs: dict,
+                  con_progreso: bool):
+        """
+        Ejecuta un trabajo en un hilo del gestor y llama a sus avisos.
+        """
+        try:
+            if trabajo.cancelado:
+                raise TrabajoCancelado()
+            trabajo.estado = EN_CURSO
+            resultado = ejecutar(trabajo, funcion, args, kwargs, con_progreso)
+            if trabajo.cancelado:
+                raise TrabajoCancelado()
+        except TrabajoCancelado:
+            trabajo.estado = CANCELADO
+            self._avisar(trabajo.al_cancelar)
+        except Exception as e:
+            trabajo.estado = FALLIDO
+            trabajo.error = e
+            self._avisar(trabajo.al_fallar, e)
+        else:
+            trabajo.estado = TERMINADO
+            trabajo.resultado = resultado
+            self._avisar(trabajo.al_terminar, resultado)
+        finally:
+            trabajo._finalizado.set()
+
+    def _ejecutar_en_hilo(self, trabajo: Trabajo, funcion: Callable, args: tuple, kwargs: dict,
+                          con_progreso: bool) -> Any:
+        if con_progreso:
+            kwargs = dict(kwargs, progreso=Avance(lambda avance: self._progresar(trabajo, avance), trabajo._cancelado))
+        return funcion(*args, **kwargs)
+
+    def _ejecutar_en_proceso(self, trabajo: Trabajo, funcion: Callable, args: tuple, kwargs: dict,
+                             con_progreso: bool) -> Any:
+        cola = cancelado = None
+        if con_progreso:
+            administrador = self._obtener_administrador()
+            cola, cancelado = administrador.Queue(), administrador.Event()
+            kwargs = dict(kwargs, progreso=Avance(cola.put, cancelado))
+        trazar = traza_sql.traza_activa()
+        if trazar:
+            futuro = self._obtener_procesos().submit(_ejecutar_con_traza, funcion, *args, **kwargs)
+        else:
+            futuro = self._obtener_procesos().submit(funcion, *args, **kwargs)
+
+        def leer_avance():
+            while cola is not None and not cola.empty():
+                self._progresar(trabajo, cola.get())
+
+        while True:
+            try:
+                resultado = futuro.result(INTERVALO_ESPERA)
+                break
+            except TiempoAgotado:
+                leer_avance()
+                if trabajo.cancelado:
+                    if cancelado is None:
+                        # Sin avance no se puede detener: se descarta el resultado cuando llegue
+                        futuro.cancel()
+                        raise TrabajoCancelado()
+                    cancelado.set()
+        leer_avance()
+        if trazar:
+            resultado, registro = resultado
+            traza_sql.combinar_registro(registro)
+        return resultado
+
+    def cerrar(self):
+        """
+        Cancela los trabajos pendientes y libera los hilos, los procesos y el administrador.
+        """
+        with self._lock:
+            for ejecutor in (self._ejecutor_hilos, self._ejecutor_procesos, self._ejecutor_avisos):
+                if ejecutor is not None:
+                    ejecutor.shutdown(wait=False, cancel_futures=True)
+            if self._administrador is not None:
+                self._administrador.shutdown()
+            self._ejecutor_hilos = self._ejecutor_procesos = self._ejecutor_avisos = None
+            self._administrador = None
+
+# Gestor compartido por todas las pantallas
+_gestor = GestorTrabajos()
+
+def enviar_trabajo(funcion: Callable[..., Any], *args, **kwargs) -> Trabajo:
+    """
+    Encola un trabajo en el gestor compartido (ver GestorTrabajos.enviar).
+
+    Args:
+        funcion (Callable): Función a ejecutar.
+
+    Returns:
+        Trabajo: El trabajo encolado.
+    """
+    return _gestor.enviar(funcion, *args, **kwargs)
+
+def cerrar_trabajos():
+    """
+    Cierra el gestor compartido al salir de la aplicación.
+    """
+    _gestor.cerrar()
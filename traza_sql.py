@@ -0,0 +1,423 @@
+# traza_sql.py
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+# Módulo sin Flet ni base de datos (solo la biblioteca estándar): database.py lo usa para
+# trazar las conexiones que presta el pool.
+#
+# Con la traza activa ('main.py --traza-sql', la variable de entorno VCI_TRAZA_SQL=1 o el
+# botón de Mantenimiento > Consultas SQL) cada conexión prestada instala un
+# set_trace_callback: SQLite avisa cuándo empieza cada sentencia, también las que no pasan
+# por execute (el BEGIN implícito, el COMMIT, cada sentencia de un executescript), y la
+# conexión le suma el tiempo que pasa dentro de SQLite (execute, fetch*, commit). Cada
+# ejecución se registra con su texto normalizado, la cantidad de parámetros, la duración
+# y el módulo que la pidió.
+#
+# Las estadísticas se agregan por sentencia normalizada. Las ejecuciones que superan
+# UMBRAL_CONSULTA_LENTA van además a ARCHIVO_CONSULTAS_LENTAS, un log rotativo. Los
+# trabajos en proceso (trabajos.py) trazan en su propio proceso y devuelven lo registrado
+# junto con el resultado, así un solo proceso escribe el log.
+
+OPCION_TRAZA = "--traza-sql"
+VARIABLE_TRAZA = "VCI_TRAZA_SQL"
+UMBRAL_CONSULTA_LENTA = 0.1  # Segundos a partir de los cuales una ejecución se anota en el log
+ARCHIVO_CONSULTAS_LENTAS = "consultas_lentas.log"
+TAMANO_LOG_LENTAS = 1024 * 1024  # Bytes de cada archivo del log antes de rotarlo
+COPIAS_LOG_LENTAS = 3  # Archivos anteriores que se conservan (consultas_lentas.log.1, .2, .3)
+LARGO_SQL_LOG = 500  # Caracteres del texto con valores que se anotan en el log
+ARCHIVO_ESTADISTICAS_SQL = "estadisticas_sql.json"
+MAXIMO_SENTENCIAS = 1000  # Sentencias distintas que se conservan; las demás se suman en SENTENCIA_OTRAS
+MAXIMO_LENTAS_PENDIENTES = 1000  # Ejecuciones lentas que guarda un proceso de trabajo hasta devolverlas
+SENTENCIA_OTRAS = "(otras sentencias)"
+LLAMADORES_POR_SENTENCIA = 5  # Llamadores que se muestran por sentencia
+
+# Módulos que no cuentan como llamador: el de la consulta es el primero fuera de ellos.
+# Además de la conexión y la traza, los ayudantes de acceso a datos que usan todas las
+# pantallas: así el llamador es la pantalla o el reporte y no, p. ej., models._ejecutar.
+MODULOS_INTERNOS = frozenset({"database", "traza_sql", "models", "resumenes", "secuencias", "catalogo", "busqueda",
+                              "datos_reporte"})
+
+# Criterios para ordenar las sentencias
+ORDEN_TOTAL = "total"
+ORDEN_MAXIMO = "maximo"
+ORDEN_PROMEDIO = "promedio"
+ORDEN_EJECUCIONES = "ejecuciones"
+
+# SQLite entrega el texto con los valores ya puestos: cadenas, blobs y números pasan a '?'
+# (los comentarios se quitan; las cadenas van primero para no confundir '--' dentro de ellas).
+# SQLite también acepta nombres entre comillas simples ('main'.'ProductosFTS_data', como los
+# que usa FTS5 por dentro): esos no son valores y se dejan (ver _es_identificador).
+_PARTES_SQL = re.compile(r"""
+    (?P<literal>'(?:[^']|'')*'|[xX]'[0-9a-fA-F]*')
+    |(?P<comentario>--[^\n]*|/\*.*?\*/)
+    |(?P<numero>(?<![\w.])\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)
+""", re.VERBOSE | re.DOTALL)
+_ANTES_DE_NOMBRE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN|TABLE)$", re.IGNORECASE)
+_LISTA_IN = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_ESPACIOS = re.compile(r"\s+")
+
+def _es_identificador(parte: re.Match) -> bool:
+    """
+    Indica si una cadena entre comillas simples es un nombre (de esquema, tabla o columna)
+    y no un valor: va junto a un punto o después de FROM, INTO, UPDATE, JOIN o TABLE.
+    """
+    if not parte.group("literal").startswith("'"):
+        return False
+    antes = parte.string[:parte.start()].rstrip()
+    despues = parte.string[parte.end():].lstrip()
+    return antes.endswith(".") or despues.startswith(".") or _ANTES_DE_NOMBRE.search(antes) is not None
+
+def _reemplazar_parte(parte: re.Match) -> str:
+    if parte.group("comentario"):
+        return " "
+    if parte.group("literal") and _es_identificador(parte):
+        return parte.group()
+    return "?"
+
+@lru_cache(maxsize=1024)
+def normalizar_sql(sql: str) -> str:
+    """
+    Normaliza el texto de una sentencia para agrupar sus ejecuciones: reemplaza los valores
+    (no los nombres entre comillas) por '?', junta las listas 'IN (?, ?, ...)' de cualquier largo y compacta los espacios.
+
+    Args:
+        sql (str): Texto de la sentencia.
+
+    Returns:
+        str: Texto normalizado.
+    """
+    sql = _PARTES_SQL.sub(_reemplazar_parte, sql)
+    sql = _LISTA_IN.sub("IN (?, ...)", sql)
+    return _ESPACIOS.sub(" ", sql).strip().rstrip(";").strip()
+
+def llamador() -> str:
+    """
+    Devuelve quién ejecuta la consulta: el primer módulo de la pila fuera de MODULOS_INTERNOS,
+    con la función ('compras.listar_productos') o solo el módulo si es código de nivel de módulo.
+
+    Returns:
+        str: Módulo y función del llamador.
+    """
+    marco = sys._getframe(1)
+    while marco is not None:
+        modulo = marco.f_globals.get("__name__", "?")
+        if modulo not in MODULOS_INTERNOS:
+            funcion = marco.f_code.co_name
+            return modulo if funcion == "<module>" else f"{modulo}.{funcion}"
+        marco = marco.f_back
+    return "?"
+
+@dataclass
+class EstadisticaSentencia:
+    """
+    Estadísticas acumuladas de una sentencia normalizada.
+
+    Attributes:
+        sql (str): Texto normalizado.
+        ejecuciones (int): Veces que se ejecutó.
+        total (float): Segundos acumulados.
+        maximo (float): Segundos de la ejecución más lenta.
+        lentas (int): Ejecuciones que superaron el umbral de consulta lenta.
+        parametros (int): Parámetros de la última ejecución.
+        llamadores (Dict[str, int]): Ejecuciones por llamador.
+    """
+    sql: str
+    ejecuciones: int = 0
+    total: float = 0.0
+    maximo: float = 0.0
+    lentas: int = 0
+    parametros: int = 0
+    llamadores: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def promedio(self) -> float:
+        """
+        Segundos promedio por ejecución.
+        """
+        return self.total / self.ejecuciones if self.ejecuciones else 0.0
+
+    def agregar(self, duracion: float, parametros: int, llamador: str, lenta: bool):
+        """
+        Suma una ejecución.
+        """
+        self.ejecuciones += 1
+        self.total += duracion
+        self.maximo = max(self.maximo, duracion)
+        self.lentas += lenta
+        self.parametros = parametros
+        self.llamadores[llamador] = self.llamadores.get(llamador, 0) + 1
+
+    def combinar(self, otra: "EstadisticaSentencia"):
+        """
+        Suma las ejecuciones de otra estadística de la misma sentencia (p. ej. de otro proceso).
+        """
+        self.ejecuciones += otra.ejecuciones
+        self.total += otra.total
+        self.maximo = max(self.maximo, otra.maximo)
+        self.lentas += otra.lentas
+        self.parametros = otra.parametros
+        for nombre, cantidad in otra.llamadores.items():
+            self.llamadores[nombre] = self.llamadores.get(nombre, 0) + cantidad
+
+    def llamadores_principales(self, limite: int = LLAMADORES_POR_SENTENCIA) -> List[str]:
+        """
+        Los llamadores con más ejecuciones, como 'modulo.funcion (ejecuciones)'.
+        """
+        mayores = sorted(self.llamadores.items(), key=lambda item: item[1], reverse=True)[:limite]
+        return [f"{nombre} ({cantidad})" for nombre, cantidad in mayores]
+
+class RegistroConsultas:
+    """
+    Estadísticas por sentencia y log de consultas lentas de un proceso.
+
+    Un registro puede recibir ejecuciones desde varios hilos a la vez (cada conexión
+    prestada trabaja en un solo hilo, pero hay varias prestadas).
+    """
+    def __init__(self, umbral: float = UMBRAL_CONSULTA_LENTA, maximo_sentencias: int = MAXIMO_SENTENCIAS):
+        """
+        Constructor de la clase RegistroConsultas.
+
+        Args:
+            umbral (float): Segundos a partir de los cuales una ejecución es lenta. Por defecto es UMBRAL_CONSULTA_LENTA.
+            maximo_sentencias (int): Sentencias distintas que se conservan. Por defecto es MAXIMO_SENTENCIAS.
+        """
+        self.umbral = umbral
+        self.maximo_sentencias = maximo_sentencias
+        self.escribir_log = True  # False en los procesos de trabajo: las lentas se devuelven al principal
+        self.estadisticas: Dict[str, EstadisticaSentencia] = {}
+        self.lentas_pendientes: List[Dict[str, Any]] = []
+        self._log = None
+        self._lock = threading.Lock()
+
+    def registrar(self, sql: str, parametros: int, duracion: float, llamador: str):
+        """
+        Registra una ejecución.
+
+        Args:
+            sql (str): Texto de la sentencia tal como lo informó SQLite.
+            parametros (int): Cantidad de parámetros de la llamada.
+            duracion (float): Segundos dentro de SQLite.
+            llamador (str): Módulo y función que la pidió.
+        """
+        normalizada = normalizar_sql(sql)
+        lenta = duracion >= self.umbral
+        with self._lock:
+            estadistica = self.estadisticas.get(normalizada)
+            if estadistica is None:
+                if len(self.estadisticas) >= self.maximo_sentencias:
+                    normalizada = SENTENCIA_OTRAS
+                    estadistica = self.estadisticas.get(normalizada)
+                if estadistica is None:
+                    estadistica = self.estadisticas[normalizada] = EstadisticaSentencia(normalizada)
+            estadistica.agregar(duracion, parametros, llamador, lenta)
+        if lenta:
+            self._anotar_lenta({
+                "fecha": datetime.now().isoformat(timespec="seconds"),
+                "duracion": duracion,
+                "llamador": llamador,
+                "parametros": parametros,
+                "sql": normalizada,
+                "sql_con_valores": sql[:LARGO_SQL_LOG],
+            })
+
+    def _anotar_lenta(self, lenta: Dict[str, Any]):
+        """
+        Escribe una ejecución lenta en el log o, en un proceso de trabajo, la guarda para devolverla.
+        """
+        if not self.escribir_log:
+            with self._lock:
+                if len(self.lentas_pendientes) < MAXIMO_LENTAS_PENDIENTES:
+                    self.lentas_pendientes.append(lenta)
+            return
+        try:
+            self._obtener_log().warning(
+                "%s | %.1f ms | %s | %d parámetros | %s | %s", lenta["fecha"], lenta["duracion"] * 1000,
+                lenta["llamador"], lenta["parametros"], lenta["sql"], lenta["sql_con_valores"])
+        except OSError as e:
+            print(f"Error al escribir el log de consultas lentas: {e}")
+
+    def _obtener_log(self):
+        """
+        Crea el log rotativo la primera vez que se anota una consulta lenta.
+        """
+        with self._lock:
+            if self._log is None:
+                import logging
+                from logging.handlers import RotatingFileHandler
+                log = logging.getLogger("consultas_lentas")
+                log.propagate = False
+                log.setLevel(logging.WARNING)
+                manejador = RotatingFileHandler(ARCHIVO_CONSULTAS_LENTAS, maxBytes=TAMANO_LOG_LENTAS,
+                                                backupCount=COPIAS_LOG_LENTAS, encoding="utf-8", delay=True)
+                manejador.setFormatter(logging.Formatter("%(message)s"))
+                log.addHandler(manejador)
+                self._log = log
+            return self._log
+
+    def extraer(self) -> Dict[str, Any]:
+        """
+        Devuelve lo registrado hasta ahora, listo para enviar a otro proceso, y lo vacía.
+
+        Returns:
+            Dict[str, Any]: Estadísticas ('estadisticas') y ejecuciones lentas pendientes ('lentas').
+        """
+        with self._lock:
+            estadisticas, self.estadisticas = self.estadisticas, {}
+            lentas, self.lentas_pendientes = self.lentas_pendientes, []
+        return {"estadisticas": [asdict(estadistica) for estadistica in estadisticas.values()], "lentas": lentas}
+
+    def combinar(self, registro: Dict[str, Any]):
+        """
+        Suma lo registrado en otro proceso (ver extraer) y anota sus ejecuciones lentas.
+
+        Args:
+            registro (Dict[str, Any]): Registro devuelto por 'extraer'.
+        """
+        with self._lock:
+            for datos in registro["estadisticas"]:
+                otra = EstadisticaSentencia(**datos)
+                estadistica = self.estadisticas.get(otra.sql)
+                if estadistica is None:
+                    self.estadisticas[otra.sql] = otra
+                else:
+                    estadistica.combinar(otra)
+        for lenta in registro["lentas"]:
+            self._anotar_lenta(lenta)
+
+    def mayores(self, orden: str = ORDEN_TOTAL, limite: Optional[int] = None) -> List[EstadisticaSentencia]:
+        """
+        Las sentencias que más pesan según un criterio, de mayor a menor.
+
+        Args:
+            orden (str): ORDEN_TOTAL, ORDEN_MAXIMO, ORDEN_PROMEDIO u ORDEN_EJECUCIONES. Por defecto es ORDEN_TOTAL.
+            limite (Optional[int]): Sentencias a devolver. Por defecto es None (todas).
+
+        Returns:
+            List[EstadisticaSentencia]: Copias de las estadísticas.
+        """
+        if orden not in (ORDEN_TOTAL, ORDEN_MAXIMO, ORDEN_PROMEDIO, ORDEN_EJECUCIONES):
+            raise ValueError(f"Orden desconocido: {orden}")
+        with self._lock:
+            copias = [EstadisticaSentencia(**asdict(estadistica)) for estadistica in self.estadisticas.values()]
+        copias.sort(key=lambda estadistica: getattr(estadistica, orden), reverse=True)
+        return copias[:limite] if limite is not None else copias
+
+    def vaciar(self):
+        """
+        Borra las estadísticas acumuladas.
+        """
+        with self._lock:
+            self.estadisticas = {}
+            self.lentas_pendientes = []
+
+# Registro del proceso y estado de la traza
+_registro = RegistroConsultas()
+_activa = False
+_guardar_al_salir = False
+
+def traza_pedida(argumentos: Optional[Sequence[str]] = None, entorno: Optional[Dict[str, str]] = None) -> bool:
+    """
+    Indica si se pidió la traza por la línea de comandos o por la variable de entorno.
+
+    Args:
+        argumentos (Optional[Sequence[str]]): Argumentos de la línea de comandos. Por defecto es sys.argv.
+        entorno (Optional[Dict[str, str]]): Variables de entorno. Por defecto es os.environ.
+
+    Returns:
+        bool: True si se pidió la traza.
+    """
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    entorno = os.environ if entorno is None else entorno
+    valor = entorno.get(VARIABLE_TRAZA, "").strip().lower()
+    return OPCION_TRAZA in argumentos or valor not in ("", "0", "no", "false")
+
+def traza_activa() -> bool:
+    """
+    Indica si las conexiones que se presten a partir de ahora se trazan.
+    """
+    return _activa
+
+def activar_traza(escribir_log: bool = True):
+    """
+    Activa la traza para las conexiones que se presten a partir de ahora.
+
+    Args:
+        escribir_log (bool): Si es False (procesos de trabajo) las ejecuciones lentas se guardan
+            para devolverlas con 'extraer_registro' en lugar de escribirse en el log. Por defecto es True.
+    """
+    global _activa, _guardar_al_salir
+    _registro.escribir_log = escribir_log
+    _activa = True
+    if escribir_log and not _guardar_al_salir:
+        # Las estadísticas de la sesión quedan en ARCHIVO_ESTADISTICAS_SQL al cerrar la aplicación
+        _guardar_al_salir = True
+        atexit.register(guardar_estadisticas)
+
+def desactivar_traza():
+    """
+    Desactiva la traza (las conexiones ya prestadas la conservan hasta devolverse).
+    """
+    global _activa
+    _activa = False
+
+def registrar_ejecucion(sql: str, parametros: int, duracion: float, llamador: str):
+    """
+    Registra una ejecución en el registro del proceso (ver RegistroConsultas.registrar).
+    Las sentencias vacías, como las que FTS5 ejecuta por dentro, no se registran.
+    """
+    if normalizar_sql(sql):
+        _registro.registrar(sql, parametros, duracion, llamador)
+
+def extraer_registro() -> Dict[str, Any]:
+    """
+    Devuelve y vacía lo registrado en este proceso (ver RegistroConsultas.extraer).
+    """
+    return _registro.extraer()
+
+def combinar_registro(registro: Dict[str, Any]):
+    """
+    Suma lo registrado en otro proceso (ver RegistroConsultas.combinar).
+    """
+    _registro.combinar(registro)
+
+def sentencias_mayores(orden: str = ORDEN_TOTAL, limite: Optional[int] = None) -> List[EstadisticaSentencia]:
+    """
+    Las sentencias que más pesan según un criterio (ver RegistroConsultas.mayores).
+    """
+    return _registro.mayores(orden, limite)
+
+def vaciar_estadisticas():
+    """
+    Borra las estadísticas acumuladas en este proceso.
+    """
+    _registro.vaciar()
+
+def guardar_estadisticas(ruta: str = ARCHIVO_ESTADISTICAS_SQL) -> str:
+    """
+    Guarda las estadísticas por sentencia en un archivo JSON, de la que más tiempo suma a la que menos.
+
+    Args:
+        ruta (str): Ruta del archivo. Por defecto es ARCHIVO_ESTADISTICAS_SQL.
+
+    Returns:
+        str: Ruta del archivo.
+    """
+    sentencias = []
+    for estadistica in sentencias_mayores(ORDEN_TOTAL):
+        datos = asdict(estadistica)
+        datos["promedio"] = estadistica.promedio
+        sentencias.append(datos)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump({"fecha": datetime.now().isoformat(timespec="seconds"), "umbral_lenta": _registro.umbral,
+                   "sentencias": sentencias}, archivo, ensure_ascii=False, indent=2)
+    os.replace(temporal, ruta)
+    return ruta
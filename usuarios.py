@@ -1,5 +1,7 @@
 # usuarios.py
-from cryptography.fernet import Fernet
+
+# cryptography se importa dentro de cada función: el módulo se carga al arrancar y la
+# pantalla de inicio de sesión se muestra antes de leer las credenciales.
 
 def cargar_credenciales():
     """
@@ -8,6 +10,8 @@ def cargar_credenciales():
     Returns:
         tuple: Una tupla que contiene la clave de encriptación y una lista de usuarios desencriptados.
     """
+    from cryptography.fernet import Fernet
+
     with open("password.txt", "rb") as file:
         key = file.readline().strip()
         usuarios_encriptados = file.readlines()
@@ -30,6 +34,8 @@ def guardar_credenciales(key, usuarios):
         key (bytes): La clave de encriptación.
         usuarios (list): Lista de usuarios a guardar.
     """
+    from cryptography.fernet import Fernet
+
     with open("password.txt", "wb") as file:
         file.write(key + b"\n")
         cipher_suite = Fernet(key)
@@ -46,6 +52,8 @@ def crear_usuario(nuevo_usuario, nueva_password, key):
         nueva_password (str): Contraseña del nuevo usuario.
         key (bytes): La clave de encriptación.
     """
+    from cryptography.fernet import Fernet
+
     cipher_suite = Fernet(key)
     usuario_encriptado = cipher_suite.encrypt(f"{nuevo_usuario}:{nueva_password}".encode())
     with open("password.txt", "ab") as file:
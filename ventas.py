@@ -3,15 +3,15 @@ import os
 import subprocess
 import flet as ft
 from typing import List, Tuple, Optional
-from models import Venta, Producto, Cliente
+from models import Factura, Producto, Cliente
 from database import create_connection
+from catalogo import obtener_productos_por_id
 import datetime
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
 import platform
-from libreria import BaseApp, FormField
+from libreria import BaseApp, FormField, ListaPaginada
+from exportacion import exportar_factura_pdf
+from trabajos import Trabajo
+from busqueda import buscar_registros, buscar_ids
 
 FACTURA_DIR = 'facturas'
 ERROR_DIR = 'errores'
@@ -57,18 +57,11 @@ class VentasApp(BaseApp):
         """
         Muestra la lista de clientes.
         """
-        with create_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM Clientes")
-            clientes = cursor.fetchall()
-
         def filtrar_clientes(e):
             """
             Filtra la lista de clientes por el texto introducido en el campo de búsqueda.
             """
-            filtro = filtro_field.value.lower()
-            clientes_filtrados = [cliente for cliente in clientes if filtro in str(cliente[0]).lower() or filtro in cliente[1].lower()]
-            actualizar_lista_clientes(clientes_filtrados)
+            cliente_list.recargar()
 
         def seleccionar_cliente(e):
             """
@@ -80,46 +73,41 @@ class VentasApp(BaseApp):
             self.page.update()
             self.main_menu()
 
-        def actualizar_lista_clientes(clientes_filtrados):
+        def crear_boton_cliente(cliente):
             """
-            Actualiza la lista de clientes mostrada en la pantalla.
+            Crea el botón de un cliente de la lista.
             Args:
-                clientes_filtrados (list): Lista de clientes filtrados.
+                cliente (tuple): Datos del cliente.
             """
-            cliente_list.controls.clear()
-            for cliente in clientes_filtrados:
-                cliente_list.controls.append(
-                    ft.ElevatedButton(
-                        content=ft.Column([
-                            ft.Row([
-                                ft.Text(f"Nombre: ", color="blue"),
-                                ft.Text(f"{cliente[1]}", weight=ft.FontWeight.BOLD, color="white"),
-                                ft.Text(f"Teléfono: ", color="blue"),
-                                ft.Text(f"{cliente[2]}", weight=ft.FontWeight.BOLD, color="white")
-                            ], alignment=ft.MainAxisAlignment.CENTER),
-                        ],
-                            alignment=ft.MainAxisAlignment.CENTER,
-                            horizontal_alignment=ft.CrossAxisAlignment.CENTER
-                        ),
-                        on_click=seleccionar_cliente,
-                        data=(cliente[0], cliente[1])
-                    )
-                )
-            self.page.update()
+            return ft.ElevatedButton(
+                content=ft.Column([
+                    ft.Row([
+                        ft.Text(f"Nombre: ", color="blue"),
+                        ft.Text(f"{cliente[1]}", weight=ft.FontWeight.BOLD, color="white"),
+                        ft.Text(f"Teléfono: ", color="blue"),
+                        ft.Text(f"{cliente[2]}", weight=ft.FontWeight.BOLD, color="white")
+                    ], alignment=ft.MainAxisAlignment.CENTER),
+                ],
+                    alignment=ft.MainAxisAlignment.CENTER,
+                    horizontal_alignment=ft.CrossAxisAlignment.CENTER
+                ),
+                on_click=seleccionar_cliente,
+                data=(cliente[0], cliente[1])
+            )
 
         self.page.controls.clear()
         self.page.add(ft.Text("Seleccionar Cliente", size=24))
 
         filtro_field = ft.TextField(label="Filtrar por ID o Nombre", on_change=filtrar_clientes, width=500, border_color=ft.colors.OUTLINE)
 
-        cliente_list = ft.ListView(expand=1, spacing=10, padding=20, auto_scroll=True)
-
-        actualizar_lista_clientes(clientes)
+        cliente_list = ListaPaginada(
+            lambda desplazamiento, limite: buscar_registros("Clientes", filtro_field.value, limite, desplazamiento),
+            crear_boton_cliente, expand=1, padding=20)
 
         self.page.add(
             filtro_field,
             ft.Container(
-                content=cliente_list,
+                content=cliente_list.control,
                 height=400,
                 width=600,
                 border=ft.border.all(1, ft.colors.OUTLINE),
@@ -133,18 +121,11 @@ class VentasApp(BaseApp):
         """
         Muestra la lista de productos.
         """
-        with create_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM Productos")
-            productos = cursor.fetchall()
-
         def filtrar_productos(e):
             """
             Filtra la lista de productos por el texto introducido en el campo de búsqueda.
             """
-            filtro = filtro_field.value.lower()
-            productos_filtrados = [producto for producto in productos if filtro in str(producto[0]).lower() or filtro in producto[1].lower()]
-            actualizar_lista_productos(productos_filtrados)
+            producto_list.recargar()
 
         def agregar_al_carrito(e):
             """
@@ -191,44 +172,41 @@ class VentasApp(BaseApp):
             self.mostrar_mensaje(f"Agregado al carrito: {producto_nombre} x {cantidad}", "green")
             self.actualizar_vista_carrito()
 
-        def actualizar_lista_productos(productos_filtrados):
+        def crear_fila_producto(producto):
             """
-            Actualiza la lista de productos en la vista.
+            Crea la fila de un producto de la lista.
             Args:
-                productos_filtrados (list): Lista de productos filtrados.
+                producto (tuple): Datos del producto.
                 """
-            producto_list.controls.clear()
-            for producto in productos_filtrados:
-                producto_row = ft.Row([
-                    ft.Text(f"Nombre: ", color="blue"),
-                    ft.Text(f"{producto[1]}", weight=ft.FontWeight.BOLD, color="white"),
-                    ft.Text(f"Stock: ", color="blue"),
-                    ft.Text(f"{producto[4]}", weight=ft.FontWeight.BOLD, color="white"),
-                    ft.Text(f"Precio: $", color="blue"),
-                    ft.Text(f"{producto[3]:.2f}", weight=ft.FontWeight.BOLD, color="white"),
-                    ft.TextField(label="Cantidad", value="1", width=100),
-                    ft.ElevatedButton(
-                        "Agregar al carrito",
-                        on_click=agregar_al_carrito,
-                        data=(producto[0], producto[1], producto[3])
-                    )
-                ])
-                producto_list.controls.append(producto_row)
-            self.page.update()
+            return ft.Row([
+                ft.Text(f"Nombre: ", color="blue"),
+                ft.Text(f"{producto[1]}", weight=ft.FontWeight.BOLD, color="white"),
+                ft.Text(f"Stock: ", color="blue"),
+                ft.Text(f"{producto[4]}", weight=ft.FontWeight.BOLD, color="white"),
+                ft.Text(f"Precio: $", color="blue"),
+                ft.Text(f"{producto[3]:.2f}", weight=ft.FontWeight.BOLD, color="white"),
+                ft.TextField(label="Cantidad", value="1", width=100),
+                ft.ElevatedButton(
+                    "Agregar al carrito",
+                    on_click=agregar_al_carrito,
+                    data=(producto[0], producto[1], producto[3])
+                )
+            ])
 
         self.page.controls.clear()
         self.page.add(ft.Text("Seleccionar Productos", size=24))
 
         filtro_field = ft.TextField(label="Filtrar por ID o Nombre", on_change=filtrar_productos, width=500, border_color=ft.colors.OUTLINE)
 
-        producto_list = ft.ListView(expand=1, spacing=10, padding=20, auto_scroll=True)
-
-        actualizar_lista_productos(productos)
+        producto_list = ListaPaginada(
+            lambda desplazamiento, limite: obtener_productos_por_id(
+                buscar_ids("Productos", filtro_field.value, limite, desplazamiento)),
+            crear_fila_producto, expand=1, padding=20)
 
         self.page.add(
             filtro_field,
             ft.Container(
-                content=producto_list,
+                content=producto_list.control,
                 height=400,
                 border=ft.border.all(1, ft.colors.OUTLINE),
                 border_radius=ft.border_radius.all(10),
@@ -368,40 +346,21 @@ class VentasApp(BaseApp):
                 return
 
             fecha = datetime.datetime.now().strftime("%Y-%m-%d")
-            factura_id = self.generar_numero_factura()
-
-            with create_connection() as conn:
-                cursor = conn.cursor()
-                try:
-                    for producto_id, producto_nombre, cantidad, _ in self.carrito:
-                        nueva_venta = Venta(
-                            cliente_id=cliente_id,
-                            producto_id=producto_id,
-                            cantidad=cantidad,
-                            fecha=fecha,
-                            factura_id=factura_id
-                        )
-                        nueva_venta.save(cursor)
+            tasa_impuesto = leer_taza_interes(self) or 0.0
 
-                        cursor.execute("SELECT stock FROM Productos WHERE id=?", (producto_id,))
-                        stock_result = cursor.fetchone()
-
-                        if stock_result is None:
-                            raise ValueError(f"Error: Producto con ID {producto_id} no encontrado")
-
-                        stock = stock_result[0]
-                        if cantidad > stock:
-                            raise ValueError(f"Error: No hay suficiente stock para {producto_nombre}")
-
-                        cursor.execute("UPDATE Productos SET stock = stock - ? WHERE id = ?", (cantidad, producto_id))
-
-                    conn.commit()
-                    self.mostrar_mensaje(f"Venta finalizada con éxito. Número de factura: {factura_id}", "green")
-                    self.generar_factura_pdf(factura_id, cliente_id, fecha, descuento_porcentaje)
+            try:
+                factura = Factura.registrar_venta(
+                    cliente_id=cliente_id,
+                    fecha=fecha,
+                    carrito=self.carrito,
+                    descuento_porcentaje=descuento_porcentaje,
+                    tasa_impuesto=tasa_impuesto
+                )
+                self.mostrar_mensaje(f"Venta finalizada con éxito. Número de factura: {factura.factura_id}", "green")
+                self.generar_factura_pdf(factura.factura_id, cliente_id, fecha, descuento_porcentaje, tasa_impuesto)
 
-                except Exception as e:
-                    conn.rollback()
-                    self.mostrar_mensaje(f"Error: {str(e)}", "red")
+            except Exception as e:
+                self.mostrar_mensaje(f"Error: {str(e)}", "red")
 
             self.cliente_field.value = ""
             self.descuento_field.value = "0"
@@ -430,39 +389,26 @@ class VentasApp(BaseApp):
 
         self.page.update()
 
-    def generar_numero_factura(self) -> str:
-        """
-        Genera el número de factura siguiente disponible.
-
-        :return: Número de factura como cadena de caracteres.
+    def generar_factura_pdf(self, factura_id: str, cliente_id: int, fecha: str, descuento_porcentaje: float,
+                            tasa_impuesto: Optional[float] = None) -> Optional[Trabajo]:
         """
-        with create_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT MAX(factura_id) FROM Ventas")
-            max_factura_id = cursor.fetchone()[0]
-
-        if max_factura_id is None:
-            return "00000001"
-        else:
-            try:
-                return str(int(max_factura_id) + 1).zfill(8)
-            except ValueError:
-                return "00000001"
+        Genera en segundo plano un PDF con la información de la venta.
 
-    def generar_factura_pdf(self, factura_id: str, cliente_id: int, fecha: str, descuento_porcentaje: float):
-        """
-        Genera un PDF con la información de la venta.
+        Los datos del cliente y del carrito se leen aquí; el PDF se arma en otro proceso
+        y, al terminar, se ofrece imprimirlo. Vuelve enseguida, sin esperar el PDF.
 
         :param factura_id: ID de la factura.
         :param cliente_id: ID del cliente.
         :param fecha: Fecha de la venta.
         :param descuento_porcentaje: Porcentaje de descuento aplicado.
+        :param tasa_impuesto: Tasa de impuesto guardada en la factura. Si es None se lee de 'taza_impuesto.txt'.
+        :return: El trabajo que genera el PDF, o None si el cliente no existe.
         """
         ruta_facturas = os.path.join(os.getcwd(), FACTURA_DIR)
         os.makedirs(ruta_facturas, exist_ok=True)
         ruta_factura = os.path.join(ruta_facturas, f'factura_{factura_id}.pdf')
 
-        TAX_RATE = leer_taza_interes(self)
+        TAX_RATE = tasa_impuesto if tasa_impuesto is not None else leer_taza_interes(self)
 
         with create_connection() as conn:
             cursor = conn.cursor()
@@ -471,91 +417,17 @@ class VentasApp(BaseApp):
 
         if cliente_info is None:
             self.mostrar_mensaje("Error: Cliente no encontrado", "red")
-            return
-
-        cliente_nombre, cliente_telefono, cliente_email = cliente_info
-
-        doc = SimpleDocTemplate(ruta_factura, pagesize=letter)
-        elements = []
-
-        styles = getSampleStyleSheet()
-        title_style = styles['Heading1']
-        normal_style = styles['Normal']
-
-        elements.append(Paragraph("Inversiones Torino, C.A.", title_style))
-        elements.append(Spacer(1, 12))
-
-        factura_info = [
-            ["Nro. Factura:", factura_id],
-            ["Fecha:", fecha],
-            ["Cliente:", cliente_nombre],
-            ["Teléfono:", cliente_telefono],
-            ["Email:", cliente_email],
-            ["Descuento:", f"{descuento_porcentaje}%"]
-        ]
-        t = Table(factura_info, colWidths=[100, 300])
-        t.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
-        elements.append(t)
-        elements.append(Spacer(1, 12))
-
-        data = [["Producto", "Cantidad", "Precio", "Total"]]
-        total_venta = 0
-        for producto_id, producto_nombre, cantidad, precio in self.carrito:
-            total = cantidad * precio
-            total_venta += total
-            data.append([producto_nombre, str(cantidad), f"${precio:.2f}", f"${total:.2f}"])
-
-        t = Table(data, colWidths=[250, 70, 70, 70])
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(t)
-        elements.append(Spacer(1, 12))
-
-        descuento = total_venta * (descuento_porcentaje / 100)
-        total_venta_con_descuento = total_venta - descuento
-        impuesto = total_venta_con_descuento * TAX_RATE
-        total_con_impuesto = total_venta_con_descuento + impuesto
-        data = [
-            ["Total de la venta:", f"${total_venta:.2f}"],
-            [f"Descuento ({descuento_porcentaje:.2f}%):", f"${descuento:.2f}"],
-            ["Total con descuento:", f"${total_venta_con_descuento:.2f}"],
-            [f"Impuesto ({TAX_RATE * 100:.2f}%):", f"${impuesto:.2f}"],
-            ["Total con impuesto:", f"${total_con_impuesto:.2f}"]
-        ]
-        t = Table(data, colWidths=[350, 110])
-        t.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(t)
-
-        doc.build(elements)
-
-        self.mostrar_mensaje(f"Factura generada en {ruta_factura}", "green")
-        self.mostrar_confirmacion_imprimir(ruta_factura)
+            return None
+
+        def terminar(ruta_pdf: str):
+            self.mostrar_mensaje(f"Factura generada en {ruta_pdf}", "green")
+            self.mostrar_confirmacion_imprimir(ruta_pdf)
+
+        # El carrito se copia porque se vacía al finalizar la venta, antes de que el PDF esté listo
+        return self.ejecutar_en_segundo_plano(
+            f"Generando factura {factura_id}", exportar_factura_pdf, ruta_factura, factura_id, fecha,
+            tuple(cliente_info), list(self.carrito), descuento_porcentaje, TAX_RATE or 0.0,
+            en_proceso=True, al_terminar=terminar, mostrar_indicador=False)
 
     def mostrar_confirmacion_imprimir(self, ruta_pdf: str):
         """